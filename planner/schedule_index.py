@@ -0,0 +1,149 @@
+"""Precomputed run <-> schedule block index.
+
+Pure-Python helper that can be imported without Flask. Matching follows
+``schedule_planner._match_run_to_block``, but every run and block is
+normalized only once while the index is built instead of on every call.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _norm(value) -> str:
+    return str(value or "").strip().lower()
+
+
+def is_run_block(block: Dict) -> bool:
+    return (block.get("type") or block.get("block_type") or "").lower() == "run"
+
+
+def _run_key(run: Dict) -> Tuple[str, str, str]:
+    return _norm(run.get("laufart")), _norm(run.get("kategorie")), str(run.get("klasse"))
+
+
+def _block_filter(block: Dict):
+    laufart = (block.get("timing_run_type") or "").strip().lower()
+    if laufart == "other":
+        laufart = ""
+    size_categories = {_norm(s) for s in (block.get("size_categories") or []) if _norm(s)}
+    size_cat = (block.get("size_category") or "").lower()
+    if size_cat == "all":
+        size_cat = ""
+    classes = {str(c) for c in (block.get("classes") or [])}
+    return laufart, size_categories, size_cat, classes
+
+
+def _matches(run_key: Tuple[str, str, str], block_filter) -> bool:
+    laufart, category, klasse = run_key
+    block_laufart, size_categories, size_cat, classes = block_filter
+    if block_laufart and laufart != block_laufart:
+        return False
+    if size_categories:
+        if category not in size_categories:
+            return False
+    elif size_cat and category != size_cat:
+        return False
+    if classes and klasse not in classes:
+        return False
+    return True
+
+
+class ScheduleIndex:
+    """Maps run blocks to their matching runs and runs to their (ring, block) slots.
+
+    Blocks and runs are tracked by object identity (the index keeps references
+    to both), so blocks without an id and runs without an id work as well.
+    Blocks that are not part of the indexed schedule are matched on the fly.
+    """
+
+    def __init__(self, schedule: Optional[Dict], runs: Optional[List[Dict]]):
+        self.schedule = schedule
+        self.runs = runs
+        self.run_count = len(runs or [])
+        self._block_runs: Dict[int, List[Dict]] = {}
+        self._block_run_ids: Dict[int, set] = {}
+        self._run_slots: Dict[int, List[Tuple[str, Dict]]] = {}
+        self._blocks_by_id: Dict[str, Tuple[Dict, str]] = {}
+        self._build()
+
+    def _build(self) -> None:
+        runs = [r for r in (self.runs or []) if isinstance(r, dict)]
+        keys = [(run, _run_key(run)) for run in runs]
+        # runs with identical attributes share one match result per block
+        buckets: Dict[Tuple[str, str, str], List[Dict]] = {}
+        for run, key in keys:
+            buckets.setdefault(key, []).append(run)
+        for run in runs:
+            self._run_slots[id(run)] = []
+
+        rings = (self.schedule or {}).get("rings") or {}
+        for ring_key, ring_data in rings.items():
+            for block in (ring_data or {}).get("blocks") or []:
+                block_id = block.get("id")
+                if block_id and block_id not in self._blocks_by_id:
+                    self._blocks_by_id[block_id] = (block, ring_key)
+                if not is_run_block(block):
+                    continue
+                block_filter = _block_filter(block)
+                matching_keys = {key for key in buckets if _matches(key, block_filter)}
+                matched = [run for run, key in keys if key in matching_keys]
+                self._block_runs[id(block)] = matched
+                self._block_run_ids[id(block)] = {id(run) for run in matched}
+                for run in matched:
+                    self._run_slots[id(run)].append((str(ring_key), block))
+
+    # --- blocks -> runs ---------------------------------------------------
+
+    def runs_for_block(self, block: Dict) -> List[Dict]:
+        """All runs matching ``block`` in event order (do not modify the list)."""
+        matched = self._block_runs.get(id(block))
+        if matched is not None:
+            return matched
+        block_filter = _block_filter(block)
+        return [
+            run for run in (self.runs or [])
+            if isinstance(run, dict) and _matches(_run_key(run), block_filter)
+        ]
+
+    def run_ids_for_block(self, block_id: str) -> List[str]:
+        block, _ = self.block_by_id(block_id)
+        if not block:
+            return []
+        return [run.get("id") for run in self.runs_for_block(block)]
+
+    def matches(self, run: Dict, block: Dict) -> bool:
+        matched = self._block_run_ids.get(id(block))
+        if matched is not None and id(run) in self._run_slots:
+            return id(run) in matched
+        return _matches(_run_key(run), _block_filter(block))
+
+    # --- runs -> blocks ---------------------------------------------------
+
+    def slots_for_run(self, run: Dict, ring_key: Optional[str] = None) -> List[Tuple[str, Dict]]:
+        """``(ring_key, block)`` pairs of all run blocks matching ``run`` in schedule order."""
+        slots = self._run_slots.get(id(run))
+        if slots is None:
+            key = _run_key(run)
+            slots = []
+            for ring, ring_data in ((self.schedule or {}).get("rings") or {}).items():
+                for block in (ring_data or {}).get("blocks") or []:
+                    if is_run_block(block) and _matches(key, _block_filter(block)):
+                        slots.append((str(ring), block))
+        if ring_key is not None:
+            return [slot for slot in slots if slot[0] == str(ring_key)]
+        return slots
+
+    def first_slot_for_run(self, run: Dict, ring_key: Optional[str] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        slots = self.slots_for_run(run, ring_key)
+        if not slots:
+            return None, None
+        ring, block = slots[0]
+        return block, ring
+
+    def block_by_id(self, block_id: Optional[str]) -> Tuple[Optional[Dict], Optional[str]]:
+        if not block_id:
+            return None, None
+        return self._blocks_by_id.get(block_id, (None, None))
+
+    def is_current(self, schedule: Optional[Dict], runs: Optional[Iterable[Dict]]) -> bool:
+        return schedule is self.schedule and runs is self.runs and len(runs or []) == self.run_count
@@ -1,6 +1,9 @@
 import copy
 import datetime
+import json
+import threading
 import uuid
+from collections import OrderedDict
 from typing import Dict, List, Tuple
 
 CATEGORY_ORDER_ASC = ["small", "medium", "intermediate", "large"]
@@ -112,7 +115,10 @@ def calculate_briefing_and_prep(participants_total: int, planning_settings: Dict
 
 
 def calculate_run_seconds(participants_by_class: Dict[str, int], timing_run_type: str, size_category: str, classes: List[str], settings: Dict) -> int:
-    settings = upgrade_settings(settings)
+    return _calculate_run_seconds(participants_by_class, timing_run_type, size_category, classes, upgrade_settings(settings))
+
+
+def _calculate_run_seconds(participants_by_class: Dict[str, int], timing_run_type: str, size_category: str, classes: List[str], settings: Dict) -> int:
     run_type_key = (timing_run_type or "other").strip().lower() or "other"
     matrix = settings.get("start_time_seconds", DEFAULT_START_TIME_SECONDS)
     time_matrix = matrix.get(run_type_key, matrix.get("other", {}))
@@ -143,12 +149,16 @@ def calculate_run_seconds(participants_by_class: Dict[str, int], timing_run_type
 
 
 def calculate_estimates(participants_by_class: Dict[str, int], block: Dict, settings: Dict) -> Dict:
-    settings = upgrade_settings(settings)
+    return _calculate_estimates(participants_by_class, block, upgrade_settings(settings))
+
+
+def _calculate_estimates(participants_by_class: Dict[str, int], block: Dict, settings: Dict) -> Dict:
+    """``calculate_estimates`` for settings that already went through ``upgrade_settings``."""
     planning = settings.get("schedule_planning", {})
     participants_total = sum(participants_by_class.values())
     changeover_seconds = planning.get("changeover_seconds", 0)
     _, briefing_seconds, prep_pause_seconds = calculate_briefing_and_prep(participants_total, planning)
-    run_seconds = calculate_run_seconds(participants_by_class, block.get("timing_run_type"), block.get("size_category"), block.get("classes", []), settings)
+    run_seconds = _calculate_run_seconds(participants_by_class, block.get("timing_run_type"), block.get("size_category"), block.get("classes", []), settings)
     total_seconds = changeover_seconds + briefing_seconds + prep_pause_seconds + run_seconds
     return {
         "participants_total": participants_total,
@@ -271,71 +281,267 @@ def _apply_rounding(dt_obj: datetime.datetime, minutes: int) -> datetime.datetim
     return dt_obj
 
 
-def _compute_timeline_for_ring(ring_id: str, ring_data: Dict, settings: Dict, event_runs, event_date: str, round_to_minutes=None):
-    planning = settings.get("schedule_planning", {})
-    start_time_str = ring_data.get("start_time", "07:30")
-    try:
-        current_time = datetime.datetime.strptime(f"{event_date} {start_time_str}", "%Y-%m-%d %H:%M")
-    except Exception:
-        current_time = datetime.datetime.now().replace(hour=7, minute=30, second=0, microsecond=0)
+def _ring_sort_key(ring_id):
+    return int(ring_id) if str(ring_id).isdigit() else str(ring_id)
+
+
+def _start_time_for_ring(ring_key: str, ring_data: Dict, start_times_by_ring) -> str:
+    if "start_time" in ring_data:
+        return ring_data.get("start_time")
+    for key, fallback in (start_times_by_ring or {}).items():
+        if str(key).replace("ring_", "") == ring_key and fallback:
+            return fallback
+    return "07:30"
+
+
+def _block_signature(block: Dict) -> Tuple:
+    """Block fields that influence timing (judges, sorting etc. do not)."""
+    return (
+        block.get("id"),
+        block.get("type"),
+        block.get("title"),
+        block.get("timing_run_type"),
+        block.get("size_category"),
+        tuple(block.get("size_categories") or ()),
+        tuple(str(c) for c in (block.get("classes") or ())),
+        block.get("duration_seconds"),
+    )
+
+
+def _match_signature(block: Dict) -> Tuple:
+    return (
+        block.get("type"),
+        block.get("timing_run_type"),
+        block.get("size_category"),
+        tuple(block.get("size_categories") or ()),
+        tuple(str(c) for c in (block.get("classes") or ())),
+    )
+
+
+def schedule_fingerprint(schedule: Dict, start_times_by_ring=None) -> Tuple:
+    """Everything in ``schedule`` that influences the computed timeline, as a hashable tuple."""
+    rings = (schedule or {}).get("rings") or {}
+    fingerprint = []
+    for ring_key in sorted(rings.keys(), key=_ring_sort_key):
+        ring_data = rings.get(ring_key) or {}
+        blocks = tuple(_block_signature(block) for block in ring_data.get("blocks") or [])
+        fingerprint.append((str(ring_key), _start_time_for_ring(str(ring_key), ring_data, start_times_by_ring), blocks))
+    return tuple(fingerprint)
+
+
+def participants_fingerprint(event_runs) -> Tuple:
+    """Run attributes and entry counts, i.e. the inputs of ``collect_participants_by_class``."""
+    return tuple(
+        (run.get("laufart"), run.get("kategorie"), str(run.get("klasse")), len(run.get("entries") or []))
+        for run in event_runs or []
+        if isinstance(run, dict)
+    )
+
+
+def _settings_fingerprint(settings: Dict) -> str:
+    return json.dumps(
+        [settings.get("schedule_planning"), settings.get("start_time_seconds")],
+        sort_keys=True, default=str,
+    )
+
+
+_TIMELINE_CACHE_MAX = 32
+_RING_CACHE_MAX = 64
+_PARTICIPANTS_CACHE_MAX = 4
+_timeline_cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+_ring_cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+_participants_cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+_timeline_cache_lock = threading.Lock()
+timeline_cache_stats = {"hits": 0, "misses": 0, "rings_reused": 0, "rings_retimed": 0, "blocks_retimed": 0}
+
+
+def clear_timeline_cache() -> None:
+    with _timeline_cache_lock:
+        _timeline_cache.clear()
+        _ring_cache.clear()
+        _participants_cache.clear()
+
+
+def _participants_memo(participants_fp: Tuple) -> Dict:
+    """Participant counts per block match signature, shared while the runs do not change."""
+    with _timeline_cache_lock:
+        memo = _participants_cache.get(participants_fp)
+        if memo is None:
+            memo = _participants_cache[participants_fp] = {}
+            while len(_participants_cache) > _PARTICIPANTS_CACHE_MAX:
+                _participants_cache.popitem(last=False)
+        else:
+            _participants_cache.move_to_end(participants_fp)
+    return memo
 
-    timeline_items = []
 
-    def add_segment(segment_type: str, duration_seconds: int, label: str, block: Dict, num_starters: int = 0):
+def _compute_ring(blocks: List[Dict], start_time_str: str, settings: Dict, event_runs, participants: Dict, event_date: str,
+                  round_to_minutes=None, previous: Dict = None) -> Dict:
+    """Time one ring. Blocks up to the first difference to ``previous`` (same start time) are reused as they are."""
+    planning = settings.get("schedule_planning", {})
+    signature = tuple(_block_signature(block) for block in blocks)
+
+    reuse = 0
+    if previous is not None and previous["start_time"] == start_time_str:
+        limit = min(len(signature), len(previous["signature"]))
+        while reuse < limit and signature[reuse] == previous["signature"][reuse]:
+            reuse += 1
+
+    if reuse:
+        segments = previous["segments"][:previous["segment_ends"][reuse - 1]]
+        estimates = {idx: est for idx, est in previous["estimates"].items() if idx < reuse}
+        checkpoints = previous["checkpoints"][:reuse]
+        segment_ends = previous["segment_ends"][:reuse]
+        current_time = checkpoints[-1]
+    else:
+        segments, estimates, checkpoints, segment_ends = [], {}, [], []
+        try:
+            current_time = datetime.datetime.strptime(f"{event_date} {start_time_str}", "%Y-%m-%d %H:%M")
+        except Exception:
+            current_time = datetime.datetime.now().replace(hour=7, minute=30, second=0, microsecond=0)
+
+    def add_segment(segment_type: str, duration_seconds: int, label: str, block_index: int, block: Dict, num_starters: int = 0):
         nonlocal current_time
         start_time = current_time
         end_time = current_time + datetime.timedelta(seconds=duration_seconds)
         if round_to_minutes:
             start_time = _apply_rounding(start_time, round_to_minutes)
             end_time = _apply_rounding(end_time, round_to_minutes)
-        item = {
-            "block": block,
+        segments.append({
+            "block_index": block_index,
+            "block_id": block.get("id"),
             "segment_type": segment_type,
             "label": label,
             "start_time": start_time.strftime("%H:%M"),
             "end_time": end_time.strftime("%H:%M"),
             "duration": duration_seconds / 60 if duration_seconds else 0,
             "num_starters": num_starters,
-        }
-        timeline_items.append(item)
+        })
         current_time = end_time
 
-    for block in ring_data.get("blocks") or []:
+    for block_index in range(reuse, len(blocks)):
+        block = blocks[block_index]
         block_type = block.get("type")
         if block_type == "run":
-            participants_by_class = collect_participants_by_class(event_runs, block)
-            block["estimated"] = calculate_estimates(participants_by_class, block, settings)
-            est = block.get("estimated") or {}
-            add_segment("changeover", est.get("changeover_seconds", planning.get("changeover_seconds", 0)), "Umbau", block)
-            add_segment("briefing", est.get("briefing_seconds", 0), "Briefing", block)
+            match_key = _match_signature(block)
+            participants_by_class = participants.get(match_key)
+            if participants_by_class is None:
+                participants_by_class = participants[match_key] = collect_participants_by_class(event_runs, block)
+            est = _calculate_estimates(participants_by_class, block, settings)
+            estimates[block_index] = est
+            add_segment("changeover", est.get("changeover_seconds", planning.get("changeover_seconds", 0)), "Umbau", block_index, block)
+            add_segment("briefing", est.get("briefing_seconds", 0), "Briefing", block_index, block)
             prep_seconds = est.get("prep_pause_seconds", 0)
             if prep_seconds:
-                add_segment("prep_pause", prep_seconds, "Prep-Pause", block)
-            add_segment("run", est.get("run_seconds", 0), "Lauf", block, num_starters=est.get("participants_total", 0))
+                add_segment("prep_pause", prep_seconds, "Prep-Pause", block_index, block)
+            add_segment("run", est.get("run_seconds", 0), "Lauf", block_index, block, num_starters=est.get("participants_total", 0))
         elif block_type == "rank_announcement":
             duration_seconds = block.get("duration_seconds") or planning.get("rank_announcement_default_seconds", 300)
-            add_segment("rank_announcement", duration_seconds, block.get("title") or "Rangverkündigung", block)
+            add_segment("rank_announcement", duration_seconds, block.get("title") or "Rangverkündigung", block_index, block)
         else:
             duration_seconds = block.get("duration_seconds", 0)
-            add_segment(block_type or "other", duration_seconds, block.get("title") or block_type or "Block", block)
+            add_segment(block_type or "other", duration_seconds, block.get("title") or block_type or "Block", block_index, block)
+        checkpoints.append(current_time)
+        segment_ends.append(len(segments))
 
-    return timeline_items
+    return {
+        "start_time": start_time_str,
+        "signature": signature,
+        "segments": segments,
+        "estimates": estimates,
+        # time after each block and number of segments up to it, to resume from there next time
+        "checkpoints": checkpoints,
+        "segment_ends": segment_ends,
+        "retimed": len(blocks) - reuse,
+    }
 
 
-def compute_computed_timeline(schedule: Dict, event_runs=None, settings=None, start_times_by_ring=None, event_date=None, round_to_minutes=None):
-    settings = upgrade_settings(settings or {})
-    event_date = event_date or datetime.datetime.now().strftime("%Y-%m-%d")
-    schedule = copy.deepcopy(schedule or {})
-    rings = schedule.get("rings") or {}
+def compute_timeline_segments(schedule: Dict, event_runs=None, settings=None, start_times_by_ring=None, event_date=None, round_to_minutes=None) -> Dict:
+    """Compute the timeline without touching ``schedule``.
 
-    # apply start time fallback
-    for ring_key, fallback in (start_times_by_ring or {}).items():
-        key = str(ring_key).replace("ring_", "")
-        if key in rings and fallback:
-            rings[key].setdefault("start_time", fallback)
+    Returns ``{"rings": {ring_id: [segment, ...]}, "estimates": {ring_id: {block_index: estimate}}}``.
+    Segments reference their block by ``block_index`` (position in the ring) and
+    ``block_id``. Results are cached per (schedule fingerprint, participants
+    fingerprint, settings, date, rounding) and shared between callers, so treat
+    them as read-only.
 
+    On a miss only the rings that changed are re-timed, each from its first
+    changed block onward; participant counts per block are reused while the
+    runs stay the same.
+    """
+    settings = upgrade_settings(settings or {})
+    event_date = event_date or datetime.datetime.now().strftime("%Y-%m-%d")
+    participants_fp = participants_fingerprint(event_runs)
+    context = (participants_fp, _settings_fingerprint(settings), event_date, round_to_minutes)
+    key = (schedule_fingerprint(schedule, start_times_by_ring),) + context
+    with _timeline_cache_lock:
+        cached = _timeline_cache.get(key)
+        if cached is not None:
+            _timeline_cache.move_to_end(key)
+            timeline_cache_stats["hits"] += 1
+            return cached
+
+    participants = _participants_memo(participants_fp)
+    rings = (schedule or {}).get("rings") or {}
+    computed = {"rings": {}, "estimates": {}}
+    reused = retimed = blocks_retimed = 0
+    for ring_id in sorted(rings.keys(), key=_ring_sort_key):
+        ring_data = rings.get(ring_id) or {}
+        ring_key = (str(ring_id),) + context
+        with _timeline_cache_lock:
+            previous = _ring_cache.get(ring_key)
+        ring = _compute_ring(
+            ring_data.get("blocks") or [], _start_time_for_ring(str(ring_id), ring_data, start_times_by_ring),
+            settings, event_runs or [], participants, event_date, round_to_minutes, previous,
+        )
+        if ring["retimed"]:
+            retimed += 1
+            blocks_retimed += ring["retimed"]
+            with _timeline_cache_lock:
+                _ring_cache[ring_key] = ring
+                _ring_cache.move_to_end(ring_key)
+                while len(_ring_cache) > _RING_CACHE_MAX:
+                    _ring_cache.popitem(last=False)
+        else:
+            reused += 1
+        computed["rings"][str(ring_id)] = ring["segments"]
+        computed["estimates"][str(ring_id)] = ring["estimates"]
+
+    with _timeline_cache_lock:
+        timeline_cache_stats["misses"] += 1
+        timeline_cache_stats["rings_reused"] += reused
+        timeline_cache_stats["rings_retimed"] += retimed
+        timeline_cache_stats["blocks_retimed"] += blocks_retimed
+        _timeline_cache[key] = computed
+        while len(_timeline_cache) > _TIMELINE_CACHE_MAX:
+            _timeline_cache.popitem(last=False)
+    return computed
+
+
+def materialize_timeline(schedule: Dict, computed: Dict) -> Dict:
+    """Timeline items (``{"block": ..., "segment_type": ..., ...}``) pointing at the blocks of ``schedule``."""
+    rings = {str(k): v for k, v in ((schedule or {}).get("rings") or {}).items()}
     timeline_by_ring = {}
-    for ring_id in sorted(rings.keys(), key=lambda x: int(x) if str(x).isdigit() else str(x)):
-        ring_data = rings.get(ring_id, {})
-        timeline_by_ring[str(ring_id)] = _compute_timeline_for_ring(str(ring_id), ring_data, settings, event_runs or [], event_date, round_to_minutes)
+    for ring_id, segments in computed["rings"].items():
+        blocks = (rings.get(ring_id) or {}).get("blocks") or []
+        items = []
+        for segment in segments:
+            item = dict(segment)
+            item["block"] = blocks[segment["block_index"]]
+            items.append(item)
+        timeline_by_ring[ring_id] = items
     return timeline_by_ring
+
+
+def apply_estimates(schedule: Dict, computed: Dict) -> None:
+    """Write the estimates of ``computed`` into the run blocks of ``schedule`` (``block["estimated"]``)."""
+    rings = {str(k): v for k, v in ((schedule or {}).get("rings") or {}).items()}
+    for ring_id, estimates in computed["estimates"].items():
+        blocks = (rings.get(ring_id) or {}).get("blocks") or []
+        for block_index, est in estimates.items():
+            blocks[block_index]["estimated"] = dict(est)
+
+
+def compute_computed_timeline(schedule: Dict, event_runs=None, settings=None, start_times_by_ring=None, event_date=None, round_to_minutes=None):
+    computed = compute_timeline_segments(schedule, event_runs, settings, start_times_by_ring, event_date, round_to_minutes)
+    return materialize_timeline(schedule, computed)
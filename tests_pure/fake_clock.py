@@ -0,0 +1,8 @@
+class FakeClock:
+    """Stellbare Uhr für ``clock=``-Parameter: ``clock.now`` setzen oder erhöhen."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
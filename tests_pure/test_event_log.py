@@ -0,0 +1,98 @@
+from fake_clock import FakeClock
+from tools.replay_ring_log import record_request, replay
+from web_app.ring_server.event_log import RingEventLog, log_files, read_records, replay_schedule
+from web_app.ring_server.ring_machine import RingHub
+from web_app.ring_server.timing_input import feed_machine, generate_impulses
+
+
+def _ready(machine, license_nr, start_no):
+    machine.set_starter_ready({"run_id": "run-1", "event_id": "ev-1",
+                               "starter": {"Lizenznummer": license_nr, "Startnummer": start_no}})
+
+
+def test_ring_transitions_and_impulses_are_logged_per_ring_and_event(tmp_path):
+    log = RingEventLog(str(tmp_path)).start()
+    hub = RingHub(recorder=log)
+    ring1, ring2 = hub.add("1"), hub.add("2")
+    _ready(ring1, "L1", 1)
+    ring1.handle_line("0001 C0  10:00:00.0000 00")
+    ring1.increment_counter({"type": "faults"})
+    ring1.handle_line("0002 C1  10:00:31.5000 00")
+    ring2.handle_line("0003 C1  10:00:40.0000 00")  # Ring 2 nicht bereit: nur der Impuls
+    log.close()
+
+    assert [p.rsplit("/", 1)[-1] for p in log_files(str(tmp_path))] == ["ring1_ev-1.jsonl", "ring2_ohne_event.jsonl"]
+    kinds = [r["k"] for r in read_records(log_files(str(tmp_path), ring_id="1"))]
+    assert kinds == ["ready", "impulse", "start", "count", "impulse", "finish"]
+    finish = list(read_records(log_files(str(tmp_path), ring_id="1")))[-1]
+    assert (finish["license"], finish["final_time"], finish["faults"], finish["start_tod"]) == \
+        ("L1", "31.50", 1, "10:00:00.0000")
+    ignored = list(read_records(log_files(str(tmp_path), ring_id="2")))
+    assert [(r["k"], r["status"]) for r in ignored] == [("impulse", "idle")]
+
+
+def test_rotation_keeps_all_records_in_order(tmp_path):
+    clock = FakeClock(1000.0)
+    log = RingEventLog(str(tmp_path), max_bytes=400, backups=20, fsync=False, clock=clock)
+    for n in range(60):
+        clock.now += 1
+        log.record("1", "ev", "count", {"type": "faults", "value": n})
+    log.write_batch([log._queue.get() for _ in range(60)])
+    log._close_files()
+    assert log.rotations > 3
+    values = [r["value"] for r in read_records(log_files(str(tmp_path)))]
+    assert values == list(range(60))
+
+
+def test_simulated_rings_record_every_impulse(tmp_path):
+    log = RingEventLog(str(tmp_path), fsync=False).start()
+    machine = RingHub(recorder=log).add("3")
+    lines = generate_impulses(starters=25, seed=4, noise=0.3)
+    feed = feed_machine(machine, auto_ready=True)
+    for line in lines:
+        feed(line)
+    log.close()
+    records = list(read_records(log_files(str(tmp_path))))
+    assert sum(r["k"] == "impulse" for r in records) == len(lines)
+    assert sum(r["k"] == "finish" for r in records) == 25
+
+
+def test_replay_paces_and_maps_records_to_main_app():
+    records = [
+        {"t": 100.0, "ring": "2", "event": "ev", "k": "ready", "run_id": "r", "license": "L1"},
+        {"t": 101.0, "ring": "2", "event": "ev", "k": "impulse", "line": "x"},
+        {"t": 131.0, "ring": "2", "event": "ev", "k": "finish", "run_id": "r", "license": "L1",
+         "start_tod": "10:00:00.0000", "final_time": "30.00", "faults": 0, "refusals": 1},
+    ]
+    assert [delay for delay, _ in replay_schedule(records, speed=10)] == [0.0, 0.1, 3.0]
+
+    clock, slept, sent = FakeClock(0.0), [], []
+
+    def sleep(seconds):
+        slept.append(round(seconds, 3))
+        clock.now += seconds
+
+    def send(record):
+        request = record_request(record, key_prefix="replay:")
+        if request:
+            sent.append(request)
+        return bool(request)
+
+    summary = replay(records, send, speed=10, sleep=sleep, clock=clock)
+    assert slept == [0.1, 3.0]
+    assert summary == {"records": 3, "sent": 2, "max_lag_s": 0.0}
+    assert sent[0] == ("/live/api/ring_starter_changed", {"event_id": "ev", "ring_no": "2", "run_id": "r"})
+    path, submission = sent[1]
+    assert path == "/api/submit_result"
+    assert submission["idempotency_key"] == "replay:ring2:r:L1:10:00:00.0000"
+    assert (submission["zeit"], submission["verweigerungen"]) == ("30.00", 1)
+
+
+def test_replay_can_stamp_finish_with_replay_time():
+    finish = {"t": 131.0, "ring": "2", "event": "ev", "k": "finish", "run_id": "r", "license": "L1",
+              "start_tod": "10:00:00.0000", "final_time": "30.00"}
+    _, recorded = record_request(finish)
+    _, replayed = record_request(finish, finished_at="2026-05-09T12:00:00")
+    assert recorded["finished_at"] != replayed["finished_at"] == "2026-05-09T12:00:00"
+    # vom Hauptserver protokollierte Speicherungen werden nicht nochmals gesendet
+    assert record_request({**finish, "k": "saved", "source": "dialog"}) is None
@@ -0,0 +1,146 @@
+import json
+import os
+
+from web_app.storage.event_repository import EventRepository
+from web_app.storage.files import atomic_write_json
+from web_app.storage.result_journal import apply_ops, set_entry_op, set_event_op, set_run_op
+from web_app.storage.sqlite_store import SQLiteEventRepository, SQLiteStore
+
+
+def _write_events(data_dir, events):
+    with open(os.path.join(data_dir, "events.json"), "w", encoding="utf-8") as f:
+        json.dump(events, f)
+
+
+def _event(event_id, run_ids=("r1",)):
+    return {"id": event_id, "runs": [{"id": rid, "entries": []} for rid in run_ids]}
+
+
+def test_legacy_file_is_migrated_to_shards(tmp_path):
+    _write_events(tmp_path, [_event("e1", ("r1", "r2")), _event("e2")])
+    repo = EventRepository(str(tmp_path))
+
+    assert repo.get_event("e1")["id"] == "e1"
+    assert repo.get_run("e1", "r2")["id"] == "r2"
+    assert repo.get_run("e2", "r2") is None
+    assert repo.get_event("missing") is None
+    assert [e["id"] for e in repo.load_all()] == ["e1", "e2"]
+
+    assert os.path.exists(os.path.join(tmp_path, "events", "e1.json"))
+    assert os.path.exists(os.path.join(tmp_path, "events.json.migrated"))
+    with open(os.path.join(tmp_path, "events.json"), encoding="utf-8") as f:
+        assert json.load(f) == []
+    # Nur die Alt-Datei wurde geparst; die Shards kommen aus dem Cache.
+    assert repo.parse_count == 1
+
+
+def test_external_shard_change_invalidates_cache(tmp_path):
+    repo = EventRepository(str(tmp_path))
+    repo.save_event(_event("e1"))
+    assert repo.get_run("e1", "r2") is None
+
+    shard = os.path.join(tmp_path, "events", "e1.json")
+    atomic_write_json(shard, _event("e1", ("r1", "r2")))
+    os.utime(shard, ns=(1, 1))
+    assert repo.get_run("e1", "r2") is not None
+    assert repo.parse_count == 1
+
+
+def test_save_event_writes_only_its_shard(tmp_path):
+    repo = EventRepository(str(tmp_path))
+    repo.save_all([_event("e1"), _event("e2")])
+    other = os.path.join(tmp_path, "events", "e2.json")
+    os.utime(other, ns=(1, 1))
+
+    event = repo.get_event("e1")
+    event["runs"].append({"id": "r9", "entries": []})
+    repo.save_event(event)
+    repo.save_event(_event("e3"))
+
+    assert os.stat(other).st_mtime_ns == 1
+    assert repo.get_run("e1", "r9") is not None
+    fresh = EventRepository(str(tmp_path))
+    assert fresh.get_run("e1", "r9") is not None
+    assert [e["id"] for e in fresh.load_all()] == ["e1", "e2", "e3"]
+
+
+def test_save_all_skips_unchanged_and_deletes_removed(tmp_path):
+    repo = EventRepository(str(tmp_path))
+    assert repo.load_all() == []
+    repo.save_all([_event("a"), _event("b")])
+    written = repo.bytes_written
+
+    repo.save_all([e for e in repo.load_all() if e["id"] != "a"])
+    assert repo.bytes_written == written
+    assert repo.get_event("a") is None
+    assert [e["id"] for e in repo.load_all()] == ["b"]
+    assert not os.path.exists(os.path.join(tmp_path, "events", "a.json"))
+
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+    target = os.path.join(tmp_path, "x.json")
+    atomic_write_json(target, {"a": 1})
+    atomic_write_json(target, {"a": 2}, indent=4)
+    with open(target, encoding="utf-8") as f:
+        assert json.load(f) == {"a": 2}
+    assert os.listdir(tmp_path) == ["x.json"]
+
+
+def _entry_event(event_id):
+    return {"id": event_id, "runs": [{"id": "r1", "entries": [{"Lizenznummer": "L1"}, {"Lizenznummer": "L2"}]}]}
+
+
+def test_journal_is_replayed_and_compacted(tmp_path):
+    repo = EventRepository(str(tmp_path))
+    repo.save_event(_entry_event("e1"))
+    shard = os.path.join(tmp_path, "events", "e1.json")
+    written = repo.bytes_written
+
+    event = repo.get_event("e1")
+    event["runs"][0]["entries"][0]["result"] = {"zeit": "31.20", "fehler": 1}
+    repo.append_journal(event, [
+        set_entry_op("r1", "L1", result={"zeit": "31.20", "fehler": 1}),
+        set_run_op("r1", current_starter={"Lizenznummer": "L2"}),
+        set_event_op(ring_entry_state={"1": {"current_entry_id": "L2", "ready_entry_id": None}}),
+    ])
+    # Nur eine Journal-Zeile, kein neuer Snapshot
+    assert repo.bytes_written == written
+    with open(os.path.join(tmp_path, "events", "e1.journal.jsonl"), "a", encoding="utf-8") as f:
+        f.write('{"ts": "abgeschnitt')
+
+    # "Neustart": Snapshot + Journal
+    fresh = EventRepository(str(tmp_path))
+    run = fresh.get_run("e1", "r1")
+    assert run["entries"][0]["result"]["zeit"] == "31.20"
+    assert run["current_starter"] == {"Lizenznummer": "L2"}
+    assert fresh.get_event("e1")["ring_entry_state"]["1"]["current_entry_id"] == "L2"
+
+    assert fresh.compact() == 1
+    assert not os.path.exists(os.path.join(tmp_path, "events", "e1.journal.jsonl"))
+    with open(shard, encoding="utf-8") as f:
+        assert json.load(f)["runs"][0]["entries"][0]["result"]["fehler"] == 1
+
+
+def test_sqlite_journal_keeps_event_level_ops(tmp_path):
+    store = SQLiteStore(os.path.join(tmp_path, "test.sqlite3"))
+    repo = SQLiteEventRepository(store)
+    repo.save_event(_entry_event("e1"))
+
+    event = repo.get_event("e1")
+    event["ring_entry_state"] = {"1": {"current_entry_id": "L2", "ready_entry_id": None}}
+    repo.append_journal(event, [set_event_op(ring_entry_state=event["ring_entry_state"])])
+
+    # "Neustart": neuer Store auf derselben Datenbank
+    fresh = SQLiteEventRepository(SQLiteStore(os.path.join(tmp_path, "test.sqlite3")))
+    reopened = fresh.get_event("e1")
+    assert reopened["ring_entry_state"]["1"]["current_entry_id"] == "L2"
+    assert [r["id"] for r in reopened["runs"]] == [r["id"] for r in _entry_event("e1")["runs"]]
+
+
+def test_journal_ops_are_idempotent():
+    event = _entry_event("e1")
+    ops = [set_entry_op("r1", "L2", status_vermerk="a.K."), set_entry_op("r9", "L1", result={})]
+    assert apply_ops(event, ops) == 1
+    once = json.dumps(event, sort_keys=True)
+    apply_ops(event, ops)
+    assert json.dumps(event, sort_keys=True) == once
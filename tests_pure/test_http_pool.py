@@ -0,0 +1,106 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from fake_clock import FakeClock
+from web_app.net.http_pool import CircuitBreaker, CircuitOpenError, HttpPool, LatencyHistogram
+
+
+class _Stub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.hits += 1
+            status = server.statuses.pop(0) if server.statuses else 200
+        if server.delay:
+            threading.Event().wait(server.delay)
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    server.connections, server.statuses, server.hits, server.delay = set(), [], 0, 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.02}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_pool_reuses_keep_alive_connection_and_records_latency(stub):
+    pool = HttpPool(f"http://127.0.0.1:{stub.server_port}")
+    for _ in range(5):
+        assert pool.request("POST", "/api/liveupdate", body=b"{}", name="live_update") == (200, b"{}")
+    assert pool.connects == 1 and len(stub.connections) == 1
+    stats = pool.stats()
+    assert stats["latency"]["live_update"]["count"] == 5
+    assert stats["pool"] == {"open": 1, "idle": 1, "max": 4}
+    pool.close()
+
+
+def test_pool_limits_parallel_connections(stub):
+    stub.delay = 0.05
+    pool = HttpPool(f"http://127.0.0.1:{stub.server_port}", max_connections=2)
+    threads = [threading.Thread(target=pool.request, args=("POST", "/x"), kwargs={"body": b"{}"}) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert stub.hits == 6
+    assert pool.connects == 2
+    pool.close()
+
+
+def test_circuit_opens_after_failures_and_skips_requests(stub):
+    clock = FakeClock()
+    pool = HttpPool(f"http://127.0.0.1:{stub.server_port}",
+                    breaker=CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock))
+    stub.statuses = [503, 503, 503]
+    for _ in range(3):
+        assert pool.request("POST", "/x", body=b"{}")[0] == 503
+    assert pool.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        pool.request("POST", "/x", body=b"{}")
+    assert stub.hits == 3 and pool.rejected == 1
+
+    # nach reset_timeout darf genau eine Probe durch; Erfolg schliesst den Breaker
+    clock.now = 31
+    assert pool.request("POST", "/x", body=b"{}")[0] == 200
+    assert pool.breaker.snapshot()["state"] == "closed"
+    pool.close()
+
+
+def test_half_open_failure_reopens_and_admits_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert not breaker.allow() and breaker.is_open()
+    clock.now = 10
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.retry_in() == 10
+    assert breaker.allow(probe=True)
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram(bounds_ms=(10, 100))
+    for seconds in (0.005, 0.005, 0.05, 0.5):
+        histogram.observe(seconds, ok=seconds < 0.1)
+    snap = histogram.snapshot()
+    assert snap["count"] == 4 and snap["errors"] == 1
+    assert snap["p50_ms"] == 10.0 and snap["p95_ms"] == 500.0
+    assert snap["buckets"] == {"≤10": 2, "≤100": 1, ">100": 1}
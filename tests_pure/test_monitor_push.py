@@ -0,0 +1,18 @@
+from web_app.live.monitor_push import FragmentTracker, ring_room
+
+
+def test_tracker_returns_only_changed_fragments_per_room():
+    tracker = FragmentTracker()
+    room = ring_room("e1", 1)
+    assert room == "event:e1:ring:1"
+
+    first = {"meta": "<h2>A</h2>", "ranking": "<tr></tr>"}
+    assert tracker.update(room, first) == first
+    assert tracker.update(room, dict(first)) == {}
+    assert tracker.update(room, {"meta": "<h2>A</h2>", "ranking": "<tr>1</tr>"}) == {"ranking": "<tr>1</tr>"}
+
+    # Anderer Room hat eigenen Stand
+    assert tracker.update(ring_room("e1", 2), first) == first
+
+    tracker.forget(room)
+    assert set(tracker.update(room, first)) == {"meta", "ranking"}
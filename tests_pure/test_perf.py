@@ -0,0 +1,49 @@
+from web_app.diagnostics.perf import PerfRecorder, RollingStats, enabled_by_config
+
+
+def test_disabled_recorder_records_nothing():
+    rec = PerfRecorder()
+    rec.record("endpoint", "home", 0.5)
+    rec.count("socketio_room", "event:e1")
+    with rec.timed("ranking", "calc") as counters:
+        counters["entries"] = 3
+    snap = rec.snapshot()
+    assert snap["enabled"] is False
+    assert snap["timings"] == {} and snap["counts"] == {}
+
+
+def test_percentiles_counters_and_window():
+    stats = RollingStats(window=100)
+    for ms in range(1, 201):
+        stats.add(ms / 1000.0, {"bytes_read": 10})
+    summary = stats.summary()
+    assert summary["count"] == 200
+    assert summary["max_ms"] == 200.0
+    # Perzentile nur über die letzten 100 Werte (101..200)
+    assert summary["p50_ms"] == 151.0
+    assert summary["p99_ms"] >= 198.0
+    assert summary["bytes_read"] == 2000
+
+
+def test_enabled_recorder_groups_by_category():
+    rec = PerfRecorder()
+    rec.enable()
+    with rec.timed("load_data", "dogs.json") as counters:
+        counters["bytes_read"] = 42
+    rec.count("socketio_room", "event:e1:ring:1", 2)
+    snap = rec.snapshot()
+    assert snap["timings"]["load_data"]["dogs.json"]["count"] == 1
+    assert snap["timings"]["load_data"]["dogs.json"]["bytes_read"] == 42
+    assert snap["counts"]["socketio_room"]["event:e1:ring:1"] == 2
+    rec.reset()
+    assert rec.snapshot()["timings"] == {}
+
+
+def test_enabled_by_config(monkeypatch):
+    monkeypatch.delenv("AGILITY_PERF", raising=False)
+    assert enabled_by_config({}) is False
+    assert enabled_by_config({"perf_instrumentation": True}) is True
+    monkeypatch.setenv("AGILITY_PERF", "0")
+    assert enabled_by_config({"perf_instrumentation": True}) is False
+    monkeypatch.setenv("AGILITY_PERF", "1")
+    assert enabled_by_config({}) is True
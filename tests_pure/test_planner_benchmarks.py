@@ -0,0 +1,166 @@
+"""Micro-Benchmarks für das planner-Paket (1×, 10× und 50× normale Turniergrösse).
+
+Nur aktiv mit AGILITY_BENCH=1, damit die normale Testsuite schnell bleibt:
+
+    AGILITY_BENCH=1 python -m pytest -q tests_pure/test_planner_benchmarks.py
+
+Gemessen wird der Median über mehrere Durchläufe. Ein Wert, der mehr als
+AGILITY_BENCH_TOLERANCE (Standard 3.0) mal langsamer ist als in
+tests_pure/benchmarks/planner_baseline.json, lässt den Test fehlschlagen.
+Mit AGILITY_BENCH_SAVE=1 werden die gemessenen Werte als neue Baseline gespeichert.
+
+1× entspricht einem normalen Turnier: 2 Ringe, 24 Läufe, ca. 400 Starts.
+Grössere Faktoren vervielfachen Starts und Zeitplan-Blöcke (nationale Anlässe).
+"""
+import copy
+import json
+import os
+import statistics
+import time
+
+import pytest
+
+from planner import schedule_planner as sp
+from planner.briefing_groups import build_briefing_sessions_from_timeline, split_into_groups
+from planner.print_order import get_ordered_runs_for_print
+from planner.print_schedule_order import build_schedule_print_sections
+from tools.synthetic_tournament import generate_tournament
+
+BENCH_ENV = "AGILITY_BENCH"
+SCALES = (1, 10, 50)
+BASE_ENTRIES = 400
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "planner_baseline.json")
+
+pytestmark = pytest.mark.skipif(os.environ.get(BENCH_ENV) != "1", reason="Micro-Benchmarks nur mit AGILITY_BENCH=1")
+
+_measured = {}
+
+
+def _load_baseline():
+    try:
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _scenario(factor):
+    _, event, _ = generate_tournament(seed=factor, rings=2, entries=BASE_ENTRIES * factor)
+    # Zeitplan mitwachsen lassen: jeder Block wird factor-mal geplant (mehrere Durchgänge)
+    for ring in event["schedule"]["rings"].values():
+        blocks = ring["blocks"]
+        ring["blocks"] = [
+            dict(copy.deepcopy(block), id=f"{block['id']}_{i}")
+            for i in range(factor)
+            for block in blocks
+        ]
+    return event
+
+
+@pytest.fixture(scope="module")
+def scenarios():
+    cache = {}
+
+    def get(factor):
+        if factor not in cache:
+            cache[factor] = _scenario(factor)
+        return cache[factor]
+
+    return get
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _baseline_file():
+    yield
+    if os.environ.get("AGILITY_BENCH_SAVE") == "1" and _measured:
+        baseline = _load_baseline()
+        baseline.update(_measured)
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(baseline.items())), f, indent=2)
+            f.write("\n")
+
+
+def bench(name, func, *args, min_rounds=3, max_rounds=50, budget=0.5):
+    """Misst func(*args) wiederholt (bis ``budget`` Sekunden) und vergleicht den Median mit der Baseline."""
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < min_rounds or (len(samples) < max_rounds and time.perf_counter() - started < budget):
+        t0 = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - t0)
+    median_ms = round(statistics.median(samples) * 1000, 3)
+    _measured[name] = {"median_ms": median_ms, "min_ms": round(min(samples) * 1000, 3), "rounds": len(samples)}
+
+    reference = _load_baseline().get(name)
+    if reference and os.environ.get("AGILITY_BENCH_SAVE") != "1":
+        tolerance = float(os.environ.get("AGILITY_BENCH_TOLERANCE", "3.0"))
+        limit = reference["median_ms"] * tolerance
+        assert median_ms <= limit, f"{name}: {median_ms} ms > {tolerance}× Baseline ({reference['median_ms']} ms)"
+    return median_ms
+
+
+def _timeline(event, settings):
+    return sp.compute_computed_timeline(
+        event["schedule"], event_runs=event["runs"], settings=settings,
+        start_times_by_ring=event["start_times_by_ring"], event_date=event["Datum"],
+    )
+
+
+def _cold_timeline(event, settings):
+    # ohne Cache: gemessen wird die Berechnung selbst, nicht der Cache-Treffer
+    sp.clear_timeline_cache()
+    return _timeline(event, settings)
+
+
+@pytest.mark.parametrize("factor", SCALES)
+def test_bench_compute_computed_timeline(scenarios, factor):
+    event = scenarios(factor)
+    settings = sp.upgrade_settings({})
+    bench(f"compute_computed_timeline[{factor}x]", _cold_timeline, event, settings)
+
+
+@pytest.mark.parametrize("factor", SCALES)
+def test_bench_compute_computed_timeline_cached(scenarios, factor):
+    event = scenarios(factor)
+    settings = sp.upgrade_settings({})
+    _timeline(event, settings)
+    bench(f"compute_computed_timeline_cached[{factor}x]", _timeline, event, settings)
+
+
+@pytest.mark.parametrize("factor", SCALES)
+def test_bench_expand_size_class_groups(scenarios, factor):
+    blocks = [b for ring in scenarios(factor)["schedule"]["rings"].values() for b in ring["blocks"] if b["type"] == "run"]
+    primary = {"field": "category", "direction": "desc"}
+    secondary = {"field": "class", "direction": "asc"}
+
+    def expand_all():
+        for block in blocks:
+            sp.expand_size_class_groups("all", block["classes"], primary, secondary, block.get("size_categories"))
+
+    bench(f"expand_size_class_groups[{factor}x]", expand_all)
+
+
+@pytest.mark.parametrize("factor", SCALES)
+def test_bench_build_briefing_sessions_from_timeline(scenarios, factor):
+    timeline = _timeline(scenarios(factor), sp.upgrade_settings({}))
+    items = [item for ring_items in timeline.values() for item in ring_items]
+    bench(f"build_briefing_sessions_from_timeline[{factor}x]", build_briefing_sessions_from_timeline, items)
+
+
+@pytest.mark.parametrize("factor", SCALES)
+def test_bench_split_into_groups(scenarios, factor):
+    participants = [e for run in scenarios(factor)["runs"] for e in run["entries"]]
+    bench(f"split_into_groups[{factor}x]", split_into_groups, participants, 50)
+
+
+@pytest.mark.parametrize("factor", SCALES)
+def test_bench_get_ordered_runs_for_print(scenarios, factor):
+    event = scenarios(factor)
+    bench(f"get_ordered_runs_for_print[{factor}x]", get_ordered_runs_for_print, event)
+
+
+@pytest.mark.parametrize("factor", SCALES)
+def test_bench_build_schedule_print_sections(scenarios, factor):
+    event = scenarios(factor)
+    bench(f"build_schedule_print_sections[{factor}x]", build_schedule_print_sections, event)
@@ -0,0 +1,219 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Ensure web_app package is importable when running from repository root
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+WEB_APP_PATH = os.path.join(PROJECT_ROOT, "web_app")
+if WEB_APP_PATH not in sys.path:
+    sys.path.insert(0, WEB_APP_PATH)
+
+import portal_sync
+from fake_clock import FakeClock
+from portal_sync import OutboxWorker
+from web_app.storage.outbox import DurableOutbox
+
+
+class _StubPortal(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        server.connections.add(self.client_address)
+        status = server.statuses.pop(0) if server.statuses else 200
+        if status == 200:
+            server.received.append(json.loads(body))
+        reply = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def portal():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubPortal)
+    server.received, server.statuses, server.connections = [], [], set()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.02}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def _no_status_file(monkeypatch):
+    monkeypatch.setattr(portal_sync, "_record_status", lambda *a, **k: None)
+
+
+def _worker(tmp_path, portal, **kwargs):
+    settings = {"portal_url": f"http://127.0.0.1:{portal.server_port}", "portal_live_api_key": "k"}
+    return OutboxWorker(DurableOutbox(str(tmp_path / "outbox.json")), lambda: settings, **kwargs)
+
+
+def _payload(seq, run_id, update_type="result", license_no=None):
+    return {"sequence_no": seq, "run_id": run_id, "update_type": update_type, "result": {"license_no": license_no}}
+
+
+def test_outbox_coalesces_per_run_and_survives_restart(tmp_path):
+    path = str(tmp_path / "outbox.json")
+    outbox = DurableOutbox(path)
+    outbox.enqueue(1, "liveupdate", _payload(1, "r1", "run_changed"), coalesce_key="r1:run_changed")
+    outbox.enqueue(2, "liveupdate", _payload(2, "r2", "run_changed"), coalesce_key="r2:run_changed")
+    outbox.enqueue(3, "liveupdate", _payload(3, "r1", license_no="A"), coalesce_key="r1:result:A",
+                   supersedes=("r1:run_changed",))
+    outbox.enqueue(4, "liveupdate", _payload(4, "r1", license_no="A"), coalesce_key="r1:result:A",
+                   supersedes=("r1:run_changed",))
+
+    reopened = DurableOutbox(path)
+    assert [item["seq"] for item in reopened.peek()] == [2, 4]
+    assert outbox.stats()["coalesced"] == 2
+
+
+def test_worker_sends_batch_in_order_over_one_connection(tmp_path, portal):
+    worker = _worker(tmp_path, portal)
+    for seq in (5, 3, 4):
+        worker.outbox.enqueue(seq, "liveupdate", _payload(seq, f"r{seq}"))
+    result = worker.drain_once()
+    assert result == {"sent": 3, "dropped": 0, "failed": False}
+    assert [p["sequence_no"] for p in portal.received] == [3, 4, 5]
+    assert len(portal.connections) == 1
+    assert len(worker.outbox) == 0
+    worker.stop()
+
+
+def test_worker_retries_with_backoff_and_keeps_order(tmp_path, portal):
+    worker = _worker(tmp_path, portal, backoff_base=1.0, backoff_max=4.0)
+    for seq in (1, 2, 3):
+        worker.outbox.enqueue(seq, "liveupdate", _payload(seq, "r1", license_no=str(seq)))
+    portal.statuses = [200, 503, 503, 503, 503]
+
+    result = worker.drain_once()
+    assert result["sent"] == 1 and result["failed"]
+    assert [item["seq"] for item in worker.outbox.peek()] == [2, 3]
+    assert worker.outbox.peek()[0]["attempts"] == 1
+    assert worker.backoff_delay() == 1.0
+    for expected in (2.0, 4.0, 4.0):
+        worker.drain_once()
+        assert worker.backoff_delay() == expected
+
+    result = worker.drain_once()
+    assert result == {"sent": 2, "dropped": 0, "failed": False}
+    assert [p["sequence_no"] for p in portal.received] == [1, 2, 3]
+    assert worker.failures == 0
+    worker.stop()
+
+
+def test_worker_drops_rejected_messages(tmp_path, portal):
+    worker = _worker(tmp_path, portal)
+    worker.outbox.enqueue(1, "liveupdate", _payload(1, "r1"))
+    worker.outbox.enqueue(2, "liveupdate", _payload(2, "r1", license_no="B"))
+    portal.statuses = [400]
+    assert worker.drain_once() == {"sent": 1, "dropped": 1, "failed": False}
+    assert [p["sequence_no"] for p in portal.received] == [2]
+    assert len(worker.outbox) == 0
+    worker.stop()
+
+
+def test_worker_thread_delivers_after_notify(tmp_path, portal):
+    worker = _worker(tmp_path, portal)
+    worker.start()
+    try:
+        worker.outbox.enqueue(1, "liveupdate", _payload(1, "r1"))
+        worker.notify()
+        for _ in range(200):
+            if portal.received:
+                break
+            threading.Event().wait(0.01)
+        assert [p["sequence_no"] for p in portal.received] == [1]
+    finally:
+        worker.stop()
+
+
+def test_export_scheduler_debounces_triggers():
+    clock = FakeClock(100.0)
+    uploads = []
+    scheduler = portal_sync.ExportScheduler(uploads.append, clock=clock)
+    for _ in range(5):
+        scheduler.request("e1", window=10)
+        clock.now += 2
+    assert scheduler.run_due() == []
+    clock.now += 8
+    assert scheduler.run_due() == ["e1"]
+    assert uploads == ["e1"]
+    assert scheduler.stats() == {"pending": 0, "requested": 5, "uploads": 1, "errors": 0}
+
+
+def test_export_scheduler_max_delay_under_constant_load():
+    clock = FakeClock(100.0)
+    uploads = []
+    scheduler = portal_sync.ExportScheduler(uploads.append, clock=clock)
+    for _ in range(40):
+        scheduler.request("e1", window=10)
+        clock.now += 1
+        scheduler.run_due()
+    # one result per second never leaves a quiet window, but exports still happen every 3 windows
+    assert uploads == ["e1"]
+    assert scheduler.stats()["pending"] == 1
+
+
+def test_export_scheduler_retries_failed_upload_with_backoff():
+    clock = FakeClock(100.0)
+    attempts = []
+
+    def upload(event_id):
+        attempts.append(clock.now)
+        if len(attempts) < 3:
+            raise OSError("portal down")
+
+    scheduler = portal_sync.ExportScheduler(upload, clock=clock, retry_base=5, retry_max=8)
+    scheduler.request("e1", window=0)
+    assert scheduler.run_due() == ["e1"]
+    assert scheduler.stats()["pending"] == 1
+    # a new trigger does not pull the retry forward
+    clock.now += 1
+    scheduler.request("e1", window=0)
+    assert scheduler.run_due() == []
+    clock.now += 4
+    assert scheduler.run_due() == ["e1"]
+    clock.now += 9
+    assert scheduler.run_due() == ["e1"]
+    assert attempts == [100.0, 105.0, 114.0]
+    assert scheduler.stats() == {"pending": 0, "requested": 2, "uploads": 1, "errors": 2}
+
+
+def test_export_scheduler_thread_uploads_one_at_a_time():
+    active, seen = [0], []
+    lock = threading.Lock()
+
+    def upload(event_id):
+        with lock:
+            active[0] += 1
+            seen.append(active[0])
+        threading.Event().wait(0.05)
+        with lock:
+            active[0] -= 1
+
+    scheduler = portal_sync.ExportScheduler(upload)
+    scheduler.start()
+    try:
+        for i in range(3):
+            scheduler.request(f"e{i}", window=0)
+        for _ in range(100):
+            if scheduler.uploads == 3:
+                break
+            threading.Event().wait(0.02)
+        assert scheduler.uploads == 3
+        assert max(seen) == 1
+    finally:
+        scheduler.stop()
@@ -0,0 +1,126 @@
+import io
+import json
+import os
+import sys
+import zipfile
+
+# Ensure web_app package is importable when running from repository root
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+WEB_APP_PATH = os.path.join(PROJECT_ROOT, "web_app")
+if WEB_APP_PATH not in sys.path:
+    sys.path.insert(0, WEB_APP_PATH)
+
+import portal_sync
+from utils import invalidate_run_results
+
+
+def _run(run_id, times):
+    return {
+        "id": run_id, "name": f"Agility {run_id}", "klasse": "3", "laufart": "Agility", "kategorie": "Large",
+        "assigned_ring": "ring_1",
+        "laufdaten": {"parcours_laenge": "200"},
+        "entries": [
+            {"Lizenznummer": f"{run_id}-{i}", "Startnummer": i + 1, "Hundename": f"Dog {i}",
+             "result": {"zeit": t, "fehler": 0, "verweigerungen": 0}}
+            for i, t in enumerate(times)
+        ],
+    }
+
+
+def _results_json(zip_bytes):
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
+        raw = zf.read("results.json").decode("utf-8")
+    return raw, json.loads(raw)
+
+
+def test_export_reuses_fragments_of_unchanged_runs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    event = {"id": "exp-e1", "runs": [_run("exp-r1", ["40.00", "41.50"]), _run("exp-r2", ["38.20"]), _run("exp-r3", [])]}
+    event["runs"][2]["entries"].append({"Lizenznummer": "x", "Startnummer": 9})
+
+    stats = portal_sync.export_fragment_stats
+    raw, first = _results_json(portal_sync.build_result_export_zip(event))
+    assert [c["results"][0]["registration_external_id"] for c in first["classes"]] == ["exp-r1-0", "exp-r2-0"]
+    assert first["classes"][0]["ring"] == "Ring 1"
+    assert list(first) == ["event_external_id", "exported_at", "final", "classes", "documents"]
+    assert raw == json.dumps(first, ensure_ascii=False)
+
+    hits, misses = stats["hits"], stats["misses"]
+    _, second = _results_json(portal_sync.build_result_export_zip(event, final=True))
+    assert stats["hits"] == hits + 3 and stats["misses"] == misses
+    assert second["classes"] == first["classes"] and second["final"] is True
+
+    # ein neues Resultat in Lauf 2 → nur dieser Lauf wird neu serialisiert
+    event["runs"][1]["entries"][0]["result"]["zeit"] = "36.00"
+    invalidate_run_results("exp-r2")
+    _, third = _results_json(portal_sync.build_result_export_zip(event))
+    assert stats["misses"] == misses + 1
+    assert third["classes"][0] == first["classes"][0]
+    assert third["classes"][1]["results"][0]["time_s"] == 36.0
+
+
+def test_delta_export_sends_only_runs_changed_since_last_acknowledged_export(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    monkeypatch.setattr(portal_sync, "_sync_status", {"live_update": {}, "result_export": {}})
+    uploads = []
+
+    def fake_send(client, api_key, zip_bytes, **kwargs):
+        uploads.append(_results_json(zip_bytes)[1])
+        return {"ok": True, "final": uploads[-1]["final"]}
+
+    monkeypatch.setattr(portal_sync, "_do_send_result_export", fake_send)
+    settings = {"portal_url": "http://portal", "portal_results_api_key": "k", "portal_export_delta": True}
+    event = {"id": "dlt-e1", "runs": [_run("dlt-r1", ["40.00"]), _run("dlt-r2", ["38.20"])]}
+
+    assert [r["run_id"] for r in portal_sync.pending_export_runs(event, settings)] == ["dlt-r1", "dlt-r2"]
+    first = portal_sync.send_result_export(settings, event)
+    assert first["classes_sent"] == 2 and uploads[0]["delta"] is True
+    assert portal_sync.pending_export_runs(event, settings) == []
+    assert portal_sync.send_result_export(settings, event)["skipped"] is True
+    assert len(uploads) == 1
+
+    event["runs"][1]["entries"][0]["result"]["zeit"] = "36.00"
+    invalidate_run_results("dlt-r2")
+    assert [r["name"] for r in portal_sync.pending_export_runs(event, settings)] == ["Agility dlt-r2"]
+    _, zipped = _results_json(portal_sync.build_result_export_zip(event, delta=True))
+    assert [c["results"][0]["registration_external_id"] for c in zipped["classes"]] == ["dlt-r2-0"]
+
+    # fehlgeschlagener Upload → Wasserzeichen bleibt, Lauf bleibt offen
+    monkeypatch.setattr(portal_sync, "_do_send_result_export", lambda *a, **k: {"error": "offline"})
+    assert portal_sync.send_result_export(settings, event)["error"] == "offline"
+    assert len(portal_sync.pending_export_runs(event, settings)) == 1
+    monkeypatch.setattr(portal_sync, "_do_send_result_export", fake_send)
+    portal_sync.send_result_export(settings, event)
+    assert [c["results"][0]["time_s"] for c in uploads[-1]["classes"]] == [36.0]
+
+    # Abschluss-Export enthält immer alle Läufe, ohne Delta-Markierung
+    portal_sync.send_result_export(settings, event, final=True)
+    assert len(uploads[-1]["classes"]) == 2 and uploads[-1]["final"] is True and "delta" not in uploads[-1]
+    with open(tmp_path / "data" / portal_sync.STATUS_FILE, encoding="utf-8") as f:
+        assert set(json.load(f)["export_watermark"]["dlt-e1"]) == {"dlt-r1", "dlt-r2"}
+
+
+def test_delta_export_clears_runs_whose_results_were_removed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    monkeypatch.setattr(portal_sync, "_sync_status", {"live_update": {}, "result_export": {}})
+    uploads = []
+
+    def fake_send(client, api_key, zip_bytes, **kwargs):
+        uploads.append(_results_json(zip_bytes)[1])
+        return {"ok": True}
+
+    monkeypatch.setattr(portal_sync, "_do_send_result_export", fake_send)
+    settings = {"portal_url": "http://portal", "portal_results_api_key": "k", "portal_export_delta": True}
+    event = {"id": "clr-e1", "runs": [_run("clr-r1", ["40.00"]), _run("clr-r2", ["38.20"])]}
+    portal_sync.send_result_export(settings, event)
+
+    # alle Resultate von Lauf 2 gelöscht → das Portal muss die Klasse leeren
+    event["runs"][1]["entries"][0].pop("result")
+    invalidate_run_results("clr-r2")
+    assert [r["run_id"] for r in portal_sync.pending_export_runs(event, settings)] == ["clr-r2"]
+    portal_sync.send_result_export(settings, event)
+    assert [(c["category_code"], c["results"]) for c in uploads[-1]["classes"]] == [("Large", [])]
+    assert portal_sync.pending_export_runs(event, settings) == []
@@ -0,0 +1,157 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from web_app.live.result_intake import ingest_results
+from web_app.ring_server.result_handoff import ResultHandoff, build_submission
+from web_app.ring_server.ring_machine import RingStateMachine, parse_impulse
+from web_app.storage.idempotency import IdempotencyLog
+
+
+class _MainApp(BaseHTTPRequestHandler):
+    """Hauptserver-Attrappe: /api/submit_result mit result_intake und einem Zähler pro Resultat."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        with server.lock:
+            status = server.statuses.pop(0) if server.statuses else 200
+            if status == 200:
+                outcomes = ingest_results(payload, server.save, server.log, default_event_id="ev")
+        body = json.dumps({"success": True, "results": outcomes}).encode() if status == 200 else b"down"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def main_app(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MainApp)
+    server.lock = threading.Lock()
+    server.statuses = []
+    server.saved = {}
+    server.log = IdempotencyLog(str(tmp_path / "submitted_results.jsonl"))
+
+    def save(event_id, run_id, data, finished_at=None):
+        server.saved.setdefault((event_id, run_id, data["license_number"]), []).append(data)
+        return {"success": True, "message": "ok"}, 200
+
+    server.save = save
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.02}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def _finish_run(machine, license_nr, second):
+    machine.set_starter_ready({"run_id": "run-1", "event_id": "ev",
+                               "starter": {"Startnummer": second, "Lizenznummer": license_nr}})
+    machine.handle_impulse(parse_impulse(f"0001 C0  10:{second // 60:02d}:{second % 60:02d}.0000 00"))
+    machine.handle_impulse(parse_impulse(f"0002 C1  10:{second // 60:02d}:{second % 60:02d}.5000 00"))
+
+
+def test_build_submission_needs_run_and_starter():
+    state = {"active_run_id": "r", "event_id": "ev", "start_time_tod": "10:00:00.0000",
+             "current_starter": {"Lizenznummer": "L1"}}
+    item = build_submission("2", state, {"final_time": "31.20", "faults": 1, "refusals": 0})
+    assert item["idempotency_key"] == "ring2:r:L1:10:00:00.0000"
+    assert (item["zeit"], item["fehler"], item["verweigerungen"]) == ("31.20", 1, 0)
+    assert build_submission("2", {**state, "current_starter": None}, {}) is None
+
+
+def test_three_rings_burst_without_loss_despite_outage(main_app, tmp_path):
+    main_app.statuses = [503, 503]
+    handoff = ResultHandoff(f"http://127.0.0.1:{main_app.server_port}/api/submit_result",
+                            str(tmp_path / "outbox.json"), backoff_base=0.01, backoff_max=0.05).start()
+    rings = [RingStateMachine(ring, on_result=handoff) for ring in ("1", "2", "3")]
+
+    def drive(machine):
+        for n in range(40):
+            _finish_run(machine, f"R{machine.ring_id}-{n}", n)
+
+    threads = [threading.Thread(target=drive, args=(machine,)) for machine in rings]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert _wait_until(lambda: len(handoff.outbox) == 0)
+    handoff.stop()
+    assert len(main_app.saved) == 120
+    assert all(len(saves) == 1 for saves in main_app.saved.values())
+    assert main_app.saved[("ev", "run-1", "R2-7")][0]["zeit"] == "0.50"
+
+
+def test_queued_results_replay_after_restart(main_app, tmp_path):
+    outbox = str(tmp_path / "outbox.json")
+    url = f"http://127.0.0.1:{main_app.server_port}/api/submit_result"
+    offline = ResultHandoff(url, outbox)
+    machine = RingStateMachine("1", on_result=offline)
+    for n in range(3):
+        _finish_run(machine, f"L{n}", n)
+    assert len(offline.outbox) == 3 and not main_app.saved
+
+    restarted = ResultHandoff(url, outbox)
+    assert restarted.drain_once() == {"done": 3, "failed": False}
+    assert sorted(key[2] for key in main_app.saved) == ["L0", "L1", "L2"]
+
+
+def test_resent_batch_is_not_saved_twice(main_app, tmp_path):
+    handoff = ResultHandoff(f"http://127.0.0.1:{main_app.server_port}/api/submit_result",
+                            str(tmp_path / "outbox.json"))
+    state = {"active_run_id": "r", "start_time_tod": "10:00:00.0000", "current_starter": {"Lizenznummer": "L1"}}
+    handoff.submit("1", state, {"final_time": "30.00", "faults": 0, "refusals": 0})
+    handoff.drain_once()
+    # Antwort ging verloren → der Ring-Server schickt dasselbe Resultat nochmals
+    handoff.submit("1", state, {"final_time": "30.00", "faults": 0, "refusals": 0})
+    handoff.drain_once()
+    assert len(main_app.saved[("ev", "r", "L1")]) == 1
+    assert handoff.counts["saved"] == 1 and handoff.counts["duplicate"] == 1
+
+
+def test_intake_statuses_and_persistent_log(tmp_path):
+    path = str(tmp_path / "submitted.jsonl")
+    log = IdempotencyLog(path)
+    responses = {"L1": ({"success": True}, 200), "L2": ({"success": True, "superseded": True}, 200),
+                 "L3": ({"success": False, "message": "unbekannt"}, 404), "L4": ({"message": "kaputt"}, 500)}
+
+    def save(event_id, run_id, data, finished_at=None):
+        return responses[data["license_number"]]
+
+    batch = {"results": [{"idempotency_key": f"k{n}", "run_id": "r", "license_number": f"L{n}"}
+                         for n in range(1, 5)] + [{"run_id": "r"}]}
+    statuses = [o["status"] for o in ingest_results(batch, save, log, default_event_id="ev")]
+    assert statuses == ["saved", "superseded", "rejected", "error", "rejected"]
+    # "error" wird nicht gemerkt (erneut senden), der Rest übersteht einen Neustart
+    reloaded = IdempotencyLog(path)
+    assert "k1" in reloaded and "k4" not in reloaded
+    assert ingest_results({"idempotency_key": "k1"}, save, reloaded)[0]["status"] == "duplicate"
+
+
+def test_idempotency_log_compacts_to_newest_keys(tmp_path):
+    path = tmp_path / "submitted.jsonl"
+    log = IdempotencyLog(str(path), keep=10)
+    for n in range(25):
+        log.remember(f"k{n}", {"status": "saved"})
+    assert len(path.read_text().splitlines()) <= 20
+    reloaded = IdempotencyLog(str(path), keep=10)
+    assert "k24" in reloaded and "k0" not in reloaded
@@ -0,0 +1,81 @@
+from web_app.ring_server.result_handoff import build_submission
+from web_app.ring_server.ring_machine import (
+    RingHub, RingStateMachine, normalize_ring_id, parse_ring_spec, parse_timy_output, ring_room,
+)
+
+
+def _hub():
+    sent = []
+    hub = RingHub(lambda ring_id: (lambda event, payload=None: sent.append((ring_id, event, payload))))
+    for ring_id in parse_ring_spec("3"):
+        hub.add(ring_id)
+    return hub, sent
+
+
+def test_parse_timy_output_and_ring_ids():
+    assert parse_timy_output("0012 C0  10:15:01.2345 00") == {
+        "type": "impulse", "channel": "C0", "time_of_day": "10:15:01.2345"}
+    assert parse_timy_output("garbage") is None
+    assert [normalize_ring_id(v) for v in ("Ring 2", "ring_2", 2, "02")] == ["2"] * 4
+    assert parse_ring_spec("1,Ring 3") == ["1", "3"]
+    assert ring_room("Ring 1") == "ring:1"
+
+
+def test_full_run_emits_clock_and_result():
+    sent = []
+    machine = RingStateMachine("1", emit=lambda event, payload=None: sent.append((event, payload)))
+    machine.set_starter_ready({"run_id": "r1", "starter": {"Startnummer": 7}})
+    machine.handle_line("0001 C0 10:00:00.00")
+    machine.increment_counter({"type": "faults"})
+    machine.handle_line("0002 C1 10:00:41.37")
+    events = [event for event, _ in sent]
+    assert events.index("start_clock") < events.index("run_finished_timing")
+    result = dict(sent)["run_finished_timing"]
+    assert result == {"final_time": "41.37", "faults": 1, "refusals": 0}
+    assert machine.snapshot()["run_status"] == "finished_timing"
+    assert "result_handed_off" not in events
+
+
+def test_handed_off_result_is_announced_with_its_key():
+    sent = []
+    machine = RingStateMachine("2", emit=lambda event, payload=None: sent.append((event, payload)),
+                               on_result=lambda ring_id, state, package: build_submission(ring_id, state, package))
+    machine.set_starter_ready({"run_id": "r1", "starter": {"Startnummer": 7, "Lizenznummer": "L7"}})
+    machine.handle_line("0001 C0 10:00:00.00")
+    machine.handle_line("0002 C1 10:00:41.37")
+    events = [event for event, _ in sent]
+    assert events.index("run_finished_timing") < events.index("result_handed_off")
+    assert dict(sent)["result_handed_off"] == {
+        "idempotency_key": "ring2:r1:L7:10:00:00.00", "run_id": "r1", "license_number": "L7",
+        "zeit": "41.37", "fehler": 0, "verweigerungen": 0}
+
+
+def test_rings_are_isolated():
+    hub, sent = _hub()
+    hub.rings["1"].set_starter_ready({"run_id": "a"})
+    hub.rings["2"].set_starter_ready({"run_id": "b"})
+    hub.rings["1"].handle_line("0001 C0 10:00:00.00")
+    # ungültige Zeit in Ring 2 setzt nur Ring 2 zurück
+    hub.rings["2"].handle_line("0002 C0 10:00:05.00")
+    hub.rings["2"].handle_line("0003 C1 10:00:01.00")
+    hub.rings["2"].handle_line("0004 C1 09:00:00.00")
+    assert hub.rings["1"].snapshot()["run_status"] == "running"
+    assert hub.rings["2"].snapshot()["run_status"] == "idle"
+    assert hub.rings["3"].snapshot()["run_status"] == "idle"
+    assert {ring for ring, event, _ in sent if event == "start_clock"} == {"1", "2"}
+    assert not any(ring == "3" for ring, _, _ in sent)
+
+
+def test_hub_routes_clients_to_their_ring():
+    hub, _ = _hub()
+    assert hub.attach("sid-a", "2").ring_id == "2"
+    assert hub.attach("sid-b") is None  # mehrere Ringe: Ring muss angegeben werden
+    assert hub.for_client("sid-a").ring_id == "2"
+    assert hub.for_client("sid-a", {"ring": "3"}).ring_id == "3"
+    assert [(r["ring"], r["clients"]) for r in hub.config()] == [("1", 0), ("2", 1), ("3", 0)]
+    hub.detach("sid-a")
+    assert hub.for_client("sid-a") is None
+
+    single = RingHub()
+    single.add("Ring 2", "Ring 2")
+    assert single.attach("sid-c").label == "Ring 2"
@@ -0,0 +1,61 @@
+import copy
+import os
+import sys
+
+# Ensure web_app package is importable when running from repository root
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+WEB_APP_PATH = os.path.join(PROJECT_ROOT, "web_app")
+if WEB_APP_PATH not in sys.path:
+    sys.path.insert(0, WEB_APP_PATH)
+
+import utils
+from utils import build_ring_view_model, get_ring_state, touch_ring_views
+
+
+def _event():
+    return {
+        "id": "view-e1",
+        "current_runs_by_ring": {"1": "r1"},
+        "runs": [{
+            "id": "r1", "name": "Agility A1", "klasse": "3", "laufart": "Agility",
+            "laufdaten": {"parcours_laenge": "200"},
+            "entries": [
+                {"Lizenznummer": "A", "Startnummer": 1, "result": {"zeit": "40.00", "fehler": 0, "verweigerungen": 0}},
+                {"Lizenznummer": "B", "Startnummer": 2},
+            ],
+        }],
+    }
+
+
+def test_ring_view_is_shared_until_state_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    event = _event()
+    stats = utils.ring_view_cache_stats
+    misses = stats["misses"]
+
+    view = build_ring_view_model(event, 1)
+    assert view["current_run"]["id"] == "r1"
+    assert build_ring_view_model(event, 1) is view
+    assert stats["misses"] == misses + 1 and stats["recompute_seconds"] > 0
+
+    # Änderung am Event → genau eine Neuberechnung
+    touch_ring_views("view-e1")
+    fresh = build_ring_view_model(event, 1)
+    assert fresh is not view
+    assert build_ring_view_model(event, 1) is fresh
+    assert stats["misses"] == misses + 2
+
+    # Neu geladenes Event-Objekt (externe Änderung) gilt als neuer Stand
+    assert build_ring_view_model(copy.deepcopy(event), 1) is not fresh
+    assert utils.ring_view_cache_snapshot()["size"] >= 1
+
+
+def test_ring_state_leaves_cached_runs_untouched(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    event = _event()
+    event["runs"][0]["assigned_ring"] = "1"
+    state = get_ring_state(event, 1)
+    assert [run["id"] for run in state["schedule_runs"]] == ["r1"]
+    assert "judge_display" in state["schedule_runs"][0]
+    assert "judge_display" not in event["runs"][0]
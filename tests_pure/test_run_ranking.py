@@ -0,0 +1,165 @@
+import copy
+import os
+import random
+import sys
+
+# Ensure web_app package is importable when running from repository root
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+WEB_APP_PATH = os.path.join(PROJECT_ROOT, "web_app")
+if WEB_APP_PATH not in sys.path:
+    sys.path.insert(0, WEB_APP_PATH)
+
+import utils
+from utils import RunRanking, _calculate_run_results, get_run_results, invalidate_run_results
+
+
+def _random_result(rng):
+    roll = rng.random()
+    if roll < 0.1:
+        return {"zeit": None, "fehler": 0, "verweigerungen": 0, "disqualifikation": rng.choice(["DIS", "ABR", "DNS"])}
+    if roll < 0.2:
+        return None
+    zeit = round(rng.uniform(28, 75), 2)
+    return {
+        "zeit": f"{zeit:.2f}" if rng.random() < 0.7 else str(zeit).replace(".", ","),
+        "fehler": rng.choice([0, 0, 0, 1, 2]),
+        "verweigerungen": rng.choice([0, 0, 1]),
+        "disqualifikation": None,
+    }
+
+
+def _random_run(rng, klasse, laufart, size):
+    laufdaten = {"parcours_laenge": rng.choice(["", "150", "180,5", 200])}
+    if klasse in ("1", "Oldie"):
+        laufdaten["standardzeit_sct"] = rng.choice(["", "40", None])
+        laufdaten["geschwindigkeit"] = rng.choice(["3.5", "", None])
+    if rng.random() < 0.3:
+        laufdaten["sct_mode"] = "qualification"
+    entries = []
+    for i in range(size):
+        entry = {"Lizenznummer": f"L{i}", "Startnummer": 100 + i}
+        result = _random_result(rng)
+        if result is not None:
+            entry["result"] = result
+        entries.append(entry)
+    return {"id": "r1", "klasse": klasse, "laufart": laufart, "laufdaten": laufdaten, "entries": entries}
+
+
+def _reference(run):
+    reference_run = copy.deepcopy(run)
+    results = _calculate_run_results(reference_run, {})
+    return results, reference_run["laufdaten"]
+
+
+def test_incremental_ranking_matches_full_recalculation():
+    rng = random.Random(4711)
+    for klasse in ("1", "2", "3", "Oldie", "Senior"):
+        for laufart in ("Agility", "Jumping"):
+            run = _random_run(rng, klasse, laufart, rng.randint(0, 25))
+            ranking = RunRanking(run)
+            expected, expected_laufdaten = _reference(run)
+            assert ranking.results() == expected
+            assert run["laufdaten"] == expected_laufdaten
+
+            for _ in range(40):
+                if not run["entries"]:
+                    break
+                idx = rng.randrange(len(run["entries"]))
+                result = _random_result(rng)
+                if result is None:
+                    run["entries"][idx].pop("result", None)
+                else:
+                    run["entries"][idx]["result"] = result
+                ranking.update_entry(idx)
+
+                expected, expected_laufdaten = _reference(run)
+                assert ranking.results() == expected
+                assert run["laufdaten"] == expected_laufdaten
+                place = ranking.place_of(idx)
+                lic = run["entries"][idx]["Lizenznummer"]
+                assert place == next(r.get("platz") for r in expected if r["Lizenznummer"] == lic)
+
+
+def test_scoring_only_reruns_when_best_candidate_changes():
+    run = {
+        "id": "r1", "klasse": "3", "laufart": "Agility", "laufdaten": {"parcours_laenge": "200"},
+        "entries": [
+            {"Lizenznummer": "A", "result": {"zeit": "40.00", "fehler": 0, "verweigerungen": 0}},
+            {"Lizenznummer": "B", "result": {"zeit": "45.00", "fehler": 1, "verweigerungen": 0}},
+            {"Lizenznummer": "C"},
+        ],
+    }
+    ranking = RunRanking(run)
+    assert ranking.full_rescores == 1
+
+    run["entries"][2]["result"] = {"zeit": "50.00", "fehler": 0, "verweigerungen": 0}
+    assert ranking.update_license("C") is False
+    assert ranking.full_rescores == 1
+
+    run["entries"][2]["result"] = {"zeit": "38.00", "fehler": 0, "verweigerungen": 0}
+    assert ranking.update_license("C") is True
+    assert ranking.full_rescores == 2
+    assert ranking.results() == _reference(run)[0]
+
+    run["laufdaten"]["parcours_laenge"] = "150"
+    assert ranking.is_stale()
+    assert ranking.results() == _reference(run)[0]
+
+
+def test_run_results_cache_hits_and_invalidation():
+    run = {
+        "id": "cache-r1", "klasse": "1", "laufart": "Agility", "laufdaten": {"standardzeit_sct": "40"},
+        "entries": [{"Lizenznummer": "A", "result": {"zeit": "41.00", "fehler": 0, "verweigerungen": 0}}],
+    }
+    first = get_run_results(run)
+    hits = utils.run_results_cache_stats["hits"]
+    run["laufdaten"].pop("standardzeit_sct_gerundet")
+    assert get_run_results(run) is first
+    assert utils.run_results_cache_stats["hits"] == hits + 1
+    # Seiteneffekt wird auch bei einem Treffer wieder gesetzt
+    assert run["laufdaten"]["standardzeit_sct_gerundet"] == 40
+
+    run["entries"][0]["result"]["fehler"] = 1
+    invalidate_run_results("cache-r1")
+    assert get_run_results(run)[0]["fehler_total"] == 6
+
+    # Neue Startliste (z.B. Teilnehmer entfernt) wird ohne Invalidierung erkannt
+    run["entries"] = []
+    assert get_run_results(run) == []
+
+
+def _two_starter_run(run_id):
+    return {
+        "id": run_id, "klasse": "2", "laufart": "Agility", "laufdaten": {"standardzeit_sct": "40"},
+        "entries": [{"Lizenznummer": "A", "result": {"zeit": "38.00", "fehler": 0, "verweigerungen": 0}},
+                    {"Lizenznummer": "B", "result": {"zeit": "39.00", "fehler": 0, "verweigerungen": 0}}],
+    }
+
+
+def test_invalidation_also_drops_shared_ranking():
+    run = _two_starter_run("cache-r2")
+    ranking = utils.get_run_ranking(run)
+    ranking.results()
+    # Korrektur direkt am Eintrag (nicht über update_entry) + Invalidierung
+    run["entries"][1]["result"] = {"zeit": "39.00", "fehler": 3, "verweigerungen": 0}
+    invalidate_run_results("cache-r2")
+    ranking = utils.get_run_ranking(run)
+    ranking.update_license("A")
+    assert ranking.results() == _reference(run)[0]
+    assert ranking.results()[1]["fehler_total"] == 15
+
+
+def test_save_event_drops_rankings_of_its_runs(monkeypatch):
+    class _Repo:
+        def save_event(self, event):
+            pass
+
+    monkeypatch.setattr(utils, "_get_event_repository", lambda: _Repo())
+    run = _two_starter_run("cache-r3")
+    event = {"id": "cache-ev", "runs": [run]}
+    assert [r["Lizenznummer"] for r in get_run_results(run)] == ["A", "B"]
+    # z.B. swap_start_numbers/generate_test_results: Einträge direkt ändern, dann speichern
+    run["entries"][0]["result"]["zeit"] = "45.00"
+    utils.save_event(event)
+    assert [r["Lizenznummer"] for r in get_run_results(run)] == ["B", "A"]
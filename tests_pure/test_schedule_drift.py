@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+from planner import schedule_planner as sp
+from web_app.live.schedule_drift import DriftTracker, project_ring_timeline
+
+
+T0 = datetime(2026, 5, 9, 9, 0, 0)
+
+
+def test_drift_tracker_ewma_per_ring():
+    tracker = DriftTracker(alpha=0.5)
+    assert tracker.observe("e1", "1", "run_a", T0, 60) is None
+    assert tracker.observe("e1", "1", "run_a", T0 + timedelta(seconds=90), 60) == 1.5
+    # 0.5 * (60/60) + 0.5 * 1.5
+    assert tracker.observe("e1", "1", "run_a", (T0 + timedelta(seconds=150)).isoformat(), 60) == 1.25
+    assert tracker.pace("e1", "2") is None
+    assert tracker.snapshot()["e1:1"]["samples"] == 2
+
+
+def test_drift_tracker_ignores_breaks_and_run_changes():
+    tracker = DriftTracker(alpha=0.5)
+    tracker.observe("e1", "1", "run_a", T0, 60)
+    tracker.observe("e1", "1", "run_a", T0 + timedelta(seconds=60), 60)
+    # lunch break
+    assert tracker.observe("e1", "1", "run_a", T0 + timedelta(minutes=45), 60) == 1.0
+    # first result of the next run
+    assert tracker.observe("e1", "1", "run_b", T0 + timedelta(minutes=46), 60) == 1.0
+    assert tracker.observe("e1", "1", "run_b", "kaputt", 60) == 1.0
+    tracker.reset("e1")
+    assert tracker.pace("e1", "1") is None
+
+
+def test_drift_tracker_counts_only_first_result_per_start():
+    tracker = DriftTracker(alpha=0.5)
+    tracker.observe("e1", "1", "run_a", T0, 60, license_nr="A")
+    assert tracker.observe("e1", "1", "run_a", T0 + timedelta(seconds=60), 60, license_nr="B") == 1.0
+    # correction of B a few seconds later is not a new sample and keeps the interval base
+    assert tracker.observe("e1", "1", "run_a", T0 + timedelta(seconds=65), 60, license_nr="B") == 1.0
+    assert tracker.observe("e1", "1", "run_a", T0 + timedelta(seconds=120), 60, license_nr="C") == 1.0
+    assert tracker.snapshot()["e1:1"]["samples"] == 2
+
+
+def _ring_items():
+    schedule = {"rings": {"1": {"start_time": "09:00", "blocks": [
+        {"id": "a", "type": "run", "timing_run_type": "agility", "size_category": "large", "classes": ["1"]},
+        {"id": "p", "type": "pause", "duration_seconds": 1800},
+        {"id": "b", "type": "run", "timing_run_type": "jumping", "size_category": "large", "classes": ["1"]},
+    ]}}}
+    runs = [
+        {"laufart": "agility", "kategorie": "large", "klasse": "1", "entries": [{}] * 30},
+        {"laufart": "jumping", "kategorie": "large", "klasse": "1", "entries": [{}] * 30},
+    ]
+    return sp.compute_computed_timeline(schedule, event_runs=runs, event_date="2026-05-09")["1"]
+
+
+def test_projection_shifts_following_segments():
+    items = _ring_items()
+    run_a = next(i for i, item in enumerate(items) if item["block_id"] == "a" and item["segment_type"] == "run")
+    now = datetime(2026, 5, 9, 10, 0)
+    projected = project_ring_timeline(items, 0, remaining_seconds=10 * 65, now=now, pace=1.2)
+
+    assert all(row["done"] for row in projected[:run_a])
+    assert projected[run_a]["forecast_end"] == "10:13"
+    pause = projected[run_a + 1]
+    assert pause["segment_type"] == "pause"
+    assert pause["forecast_start"] == "10:13"
+    assert pause["forecast_end"] == "10:43"
+    planned = datetime.strptime(f"2026-05-09 {pause['start_time']}", "%Y-%m-%d %H:%M")
+    assert pause["delay_minutes"] == round((datetime(2026, 5, 9, 10, 13) - planned).total_seconds() / 60)
+    # run segments of later blocks are scaled by the pace, the rest is not
+    last = projected[-1]
+    assert last["segment_type"] == "run"
+    start = datetime.strptime(f"2026-05-09 {last['forecast_start']}", "%Y-%m-%d %H:%M")
+    end = datetime.strptime(f"2026-05-09 {last['forecast_end']}", "%Y-%m-%d %H:%M")
+    assert abs((end - start).total_seconds() - items[-1]["duration"] * 60 * 1.2) <= 60
+    # input items are untouched
+    assert "forecast_start" not in items[0]
+
+
+def test_projection_without_current_block_keeps_plan():
+    items = _ring_items()
+    projected = project_ring_timeline(items, None, 0, datetime(2026, 5, 9, 10, 0))
+    assert [row["forecast_start"] for row in projected] == [None] * len(items)
+    assert not any(row["done"] for row in projected)
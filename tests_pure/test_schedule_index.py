@@ -0,0 +1,82 @@
+import random
+
+from planner import schedule_planner as sp
+from planner.schedule_index import ScheduleIndex
+
+SIZES = ["Small", "Medium", "Intermediate", "Large"]
+
+
+def _random_schedule(rng):
+    rings = {}
+    for ring_key in ("1", "2"):
+        blocks = []
+        for i in range(rng.randint(3, 12)):
+            if rng.random() < 0.2:
+                blocks.append({"id": f"b{ring_key}_{i}", "type": "pause"})
+                continue
+            block = {
+                "id": f"b{ring_key}_{i}",
+                "type": "run",
+                "timing_run_type": rng.choice(["agility", "jumping", "other", ""]),
+                "classes": rng.sample(["1", "2", "3", "Oldie"], rng.randint(0, 2)),
+            }
+            if rng.random() < 0.5:
+                block["size_categories"] = [s.lower() for s in rng.sample(SIZES, rng.randint(1, 3))]
+            else:
+                block["size_category"] = rng.choice(["all", "small", "large", ""])
+            blocks.append(block)
+        rings[ring_key] = {"blocks": blocks}
+    return {"rings": rings}
+
+
+def _random_runs(rng):
+    return [
+        {
+            "id": f"r{i}",
+            "laufart": rng.choice(["Agility", "Jumping", " agility "]),
+            "kategorie": rng.choice(SIZES),
+            "klasse": rng.choice(["1", "2", "3", "Oldie", 3]),
+        }
+        for i in range(rng.randint(5, 30))
+    ]
+
+
+def test_index_matches_planner_matching():
+    rng = random.Random(20240601)
+    for _ in range(50):
+        schedule = _random_schedule(rng)
+        runs = _random_runs(rng)
+        index = ScheduleIndex(schedule, runs)
+        for ring_key, ring in schedule["rings"].items():
+            for block in ring["blocks"]:
+                if block["type"] != "run":
+                    continue
+                expected = [r for r in runs if sp._match_run_to_block(r, block)]
+                assert index.runs_for_block(block) == expected
+                assert index.run_ids_for_block(block["id"]) == [r["id"] for r in expected]
+                # Kopie eines Blocks (nicht im Index) wird direkt gematcht
+                assert index.runs_for_block(dict(block)) == expected
+        for run in runs:
+            expected = [
+                (ring_key, block)
+                for ring_key, ring in schedule["rings"].items()
+                for block in ring["blocks"]
+                if block["type"] == "run" and sp._match_run_to_block(run, block)
+            ]
+            assert index.slots_for_run(run) == expected
+            assert index.slots_for_run(run, "2") == [slot for slot in expected if slot[0] == "2"]
+            assert index.slots_for_run(dict(run)) == expected
+
+
+def test_block_lookup_and_staleness():
+    schedule = {"rings": {"1": {"blocks": [{"id": "b1", "type": "run", "classes": ["1"]}]}}}
+    runs = [{"id": "r1", "laufart": "Agility", "kategorie": "Large", "klasse": "1"}]
+    index = ScheduleIndex(schedule, runs)
+    assert index.block_by_id("b1") == (schedule["rings"]["1"]["blocks"][0], "1")
+    assert index.block_by_id("missing") == (None, None)
+    assert index.first_slot_for_run(runs[0]) == (schedule["rings"]["1"]["blocks"][0], "1")
+    assert index.is_current(schedule, runs)
+
+    runs.append({"id": "r2", "laufart": "Agility", "kategorie": "Small", "klasse": "1"})
+    assert not index.is_current(schedule, runs)
+    assert not index.is_current(dict(schedule), runs[:1])
@@ -142,3 +142,116 @@ def test_rank_applies_preserved():
 if __name__ == "__main__":
     import pytest
     raise SystemExit(pytest.main([__file__]))
+
+
+def _timeline_fixture():
+    schedule = {
+        "rings": {
+            "1": {
+                "blocks": [
+                    {"id": "blk_a", "type": "run", "timing_run_type": "agility", "size_category": "large", "classes": ["1"],
+                     "judge_id": "j1"},
+                    {"id": "blk_p", "type": "pause", "title": "Mittag", "duration_seconds": 1800},
+                ],
+            }
+        }
+    }
+    runs = [{"laufart": "agility", "kategorie": "large", "klasse": "1", "entries": [{} for _ in range(20)]}]
+    return schedule, runs
+
+
+def test_computed_timeline_does_not_mutate_schedule():
+    sp.clear_timeline_cache()
+    schedule, runs = _timeline_fixture()
+    before = copy.deepcopy(schedule)
+    timeline = sp.compute_computed_timeline(schedule, event_runs=runs, start_times_by_ring={"ring_1": "09:00"}, event_date="2026-01-01")
+    assert schedule == before
+    assert timeline["1"][0]["start_time"] == "09:00"
+    # items point at the caller's blocks, not at copies
+    assert timeline["1"][0]["block"] is schedule["rings"]["1"]["blocks"][0]
+    assert timeline["1"][-1]["block_id"] == "blk_p"
+
+
+def test_timeline_segments_cached_until_inputs_change():
+    sp.clear_timeline_cache()
+    schedule, runs = _timeline_fixture()
+    args = dict(event_runs=runs, event_date="2026-01-01")
+    first = sp.compute_timeline_segments(schedule, **args)
+    hits = sp.timeline_cache_stats["hits"]
+    # equal content (e.g. reloaded from disk) is a hit as well
+    assert sp.compute_timeline_segments(copy.deepcopy(schedule), **args) is first
+    assert sp.timeline_cache_stats["hits"] == hits + 1
+    # judge changes do not affect timing
+    schedule["rings"]["1"]["blocks"][0]["judge_id"] = "j2"
+    assert sp.compute_timeline_segments(schedule, **args) is first
+
+    runs[0]["entries"].append({})
+    second = sp.compute_timeline_segments(schedule, **args)
+    assert second is not first
+    assert second["estimates"]["1"][0]["participants_total"] == 21
+    assert sp.compute_timeline_segments(schedule, round_to_minutes=5, **args) is not second
+
+    schedule["rings"]["1"]["blocks"][1]["duration_seconds"] = 600
+    third = sp.compute_timeline_segments(schedule, **args)
+    assert third is not second
+    assert third["rings"]["1"][-1]["duration"] == 10
+
+
+def test_apply_estimates_writes_run_blocks_only():
+    schedule, runs = _timeline_fixture()
+    computed = sp.compute_timeline_segments(schedule, event_runs=runs, event_date="2026-01-01")
+    sp.apply_estimates(schedule, computed)
+    blocks = schedule["rings"]["1"]["blocks"]
+    assert blocks[0]["estimated"]["participants_total"] == 20
+    assert "estimated" not in blocks[1]
+    blocks[0]["estimated"]["participants_total"] = 0
+    assert computed["estimates"]["1"][0]["participants_total"] == 20
+
+
+def _multi_ring_schedule(rings=3, blocks=8):
+    schedule = {"rings": {}}
+    for r in range(1, rings + 1):
+        ring_blocks = []
+        for b in range(blocks):
+            if b % 3 == 2:
+                ring_blocks.append({"id": f"p{r}_{b}", "type": "pause", "duration_seconds": 600})
+            else:
+                ring_blocks.append({"id": f"r{r}_{b}", "type": "run", "timing_run_type": "agility" if b % 2 else "jumping",
+                                    "size_category": sp.CATEGORY_ORDER_ASC[b % 4], "classes": [str(b % 3 + 1)]})
+        schedule["rings"][str(r)] = {"start_time": "07:30", "blocks": ring_blocks}
+    runs = [
+        {"laufart": laufart, "kategorie": size, "klasse": klasse, "entries": [{} for _ in range(7)]}
+        for laufart in ("agility", "jumping") for size in sp.CATEGORY_ORDER_ASC for klasse in ("1", "2", "3")
+    ]
+    return schedule, runs
+
+
+def test_incremental_retiming_matches_full_computation():
+    sp.clear_timeline_cache()
+    schedule, runs = _multi_ring_schedule()
+    sp.compute_timeline_segments(schedule, event_runs=runs, event_date="2026-01-01", round_to_minutes=5)
+    stats_before = dict(sp.timeline_cache_stats)
+
+    # move block 5 of ring 2 one up, as move_schedule_block does
+    blocks = schedule["rings"]["2"]["blocks"]
+    blocks[4], blocks[5] = blocks[5], blocks[4]
+    incremental = sp.compute_timeline_segments(schedule, event_runs=runs, event_date="2026-01-01", round_to_minutes=5)
+
+    assert sp.timeline_cache_stats["rings_reused"] - stats_before["rings_reused"] == 2
+    assert sp.timeline_cache_stats["rings_retimed"] - stats_before["rings_retimed"] == 1
+    assert sp.timeline_cache_stats["blocks_retimed"] - stats_before["blocks_retimed"] == 4
+
+    sp.clear_timeline_cache()
+    full = sp.compute_timeline_segments(schedule, event_runs=runs, event_date="2026-01-01", round_to_minutes=5)
+    assert incremental == full
+
+
+def test_start_time_change_retimes_whole_ring():
+    sp.clear_timeline_cache()
+    schedule, runs = _multi_ring_schedule(rings=1, blocks=4)
+    sp.compute_timeline_segments(schedule, event_runs=runs, event_date="2026-01-01")
+    schedule["rings"]["1"]["start_time"] = "08:00"
+    before = sp.timeline_cache_stats["blocks_retimed"]
+    computed = sp.compute_timeline_segments(schedule, event_runs=runs, event_date="2026-01-01")
+    assert sp.timeline_cache_stats["blocks_retimed"] - before == 4
+    assert computed["rings"]["1"][0]["start_time"] == "08:00"
@@ -0,0 +1,83 @@
+import json
+import os
+
+from web_app.storage.event_repository import EventRepository
+from web_app.storage.result_journal import set_entry_op
+from web_app.storage.sqlite_store import SQLiteEventRepository, SQLiteStore
+
+
+def _event(event_id):
+    return {
+        "id": event_id,
+        "Bezeichnung": f"Turnier {event_id}",
+        "runs": [
+            {"id": "r1", "laufart": "Agility", "entries": [{"Lizenznummer": "L1"}, {"Lizenznummer": "L2"}]},
+            {"id": "r2", "laufart": "Jumping", "entries": [{"Lizenznummer": "L1"}]},
+        ],
+    }
+
+
+def _store(tmp_path):
+    return SQLiteStore(os.path.join(tmp_path, "test.sqlite3"))
+
+
+def test_event_round_trip_and_license_index(tmp_path):
+    store = _store(tmp_path)
+    repo = SQLiteEventRepository(store)
+    repo.save_all([_event("e1"), _event("e2")])
+
+    fresh = SQLiteEventRepository(store)
+    assert [e["id"] for e in fresh.load_all()] == ["e1", "e2"]
+    assert fresh.get_event("e1") == _event("e1")
+    assert fresh.get_run("e2", "r2")["laufart"] == "Jumping"
+    hits = store.find_entries_by_license("L1")
+    assert [(e, r) for e, r, _ in hits] == [("e1", "r1"), ("e1", "r2"), ("e2", "r1"), ("e2", "r2")]
+
+    assert fresh.delete_event("e1") is True
+    assert [e["id"] for e in repo.load_all()] == ["e2"]
+
+
+def test_journal_ops_update_single_rows(tmp_path):
+    store = _store(tmp_path)
+    repo = SQLiteEventRepository(store)
+    repo.save_event(_event("e1"))
+
+    event = repo.get_event("e1")
+    entry = event["runs"][0]["entries"][1]
+    entry["result"] = {"zeit": "30.00", "fehler": 0}
+    repo.append_journal(event, [set_entry_op("r1", "L2", result=entry["result"])])
+
+    other = SQLiteEventRepository(store)
+    assert other.get_run("e1", "r1")["entries"][1]["result"]["zeit"] == "30.00"
+    # Fremde Schreibzugriffe (Revision) verwerfen den Cache
+    assert repo.get_event("e1") is event
+    other.save_event(dict(_event("e1"), Bezeichnung="neu"))
+    assert repo.get_event("e1")["Bezeichnung"] == "neu"
+
+
+def test_import_from_json_folder(tmp_path):
+    data_dir = str(tmp_path)
+    EventRepository(data_dir).save_event(_event("e1"))
+    with open(os.path.join(data_dir, "dogs.json"), "w", encoding="utf-8") as f:
+        json.dump([{"Lizenznummer": "L1", "Hundename": "Rex"}, {"Lizenznummer": "L2", "Hundename": "Bella"}], f)
+
+    store = _store(tmp_path)
+    counts = store.import_json(data_dir)
+    assert counts["events"] == 1 and counts["dogs.json"] == 2
+    assert store.get_record("dogs.json", "L2")["Hundename"] == "Bella"
+    assert set(store.get_records("dogs.json", ["L1", "L9"])) == {"L1"}
+    assert [d["Hundename"] for d in store.load_collection("dogs.json")] == ["Rex", "Bella"]
+    assert SQLiteEventRepository(store).get_run("e1", "r1") is not None
+
+
+def test_collection_revision_changes_only_with_its_table(tmp_path):
+    store = _store(tmp_path)
+    store.save_collection("dogs.json", [{"Lizenznummer": "L1"}, {"Lizenznummer": "L1", "Hundename": "Doppelt"}])
+    dogs_rev = store.collection_revision("dogs.json")
+    # Resultate (Event-Schreibzugriffe) lassen den Stammdaten-Cache der Aufrufer gültig
+    SQLiteEventRepository(store).save_event(_event("e1"))
+    store.save_collection("handlers.json", [{"id": "h1"}])
+    assert store.collection_revision("dogs.json") == dogs_rev
+    assert store.get_records("dogs.json") == {"L1": {"Lizenznummer": "L1"}}
+    store.save_collection("dogs.json", [])
+    assert store.collection_revision("dogs.json") > dogs_rev
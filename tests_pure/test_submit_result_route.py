@@ -0,0 +1,105 @@
+import os
+import sys
+import uuid
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_socketio")
+pytest.importorskip("flask_babel")
+
+# Ensure web_app package is importable when running from repository root
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+WEB_APP_PATH = os.path.join(PROJECT_ROOT, "web_app")
+if WEB_APP_PATH not in sys.path:
+    sys.path.insert(0, WEB_APP_PATH)
+
+from flask import Flask  # noqa: E402
+
+import blueprints.routes_live as routes_live  # noqa: E402
+from web_app.ring_server.event_log import RingEventLog, log_files, read_records  # noqa: E402
+from web_app.storage.idempotency import IdempotencyLog  # noqa: E402
+
+
+@pytest.fixture
+def live(monkeypatch, tmp_path):
+    run = {"id": str(uuid.uuid4()), "klasse": "2", "laufart": "Agility", "assigned_ring": "1",
+           "laufdaten": {"standardzeit_sct": "40"},
+           "entries": [{"Lizenznummer": "A", "Startnummer": 1}, {"Lizenznummer": "B", "Startnummer": 2}]}
+    event = {"id": "ev", "runs": [run]}
+    timing = []
+    monkeypatch.setattr(routes_live, "get_event", lambda event_id: event if event_id == "ev" else None)
+    monkeypatch.setattr(routes_live, "get_run", lambda event_id, run_id: run if run_id == run["id"] else None)
+    journal = []
+    monkeypatch.setattr(routes_live, "record_event_ops", lambda event, ops: journal.extend(ops))
+    monkeypatch.setattr(routes_live, "record_result_timing",
+                        lambda event, run, timestamp, settings=None, license_nr=None: timing.append((timestamp, license_nr)))
+    monkeypatch.setattr(routes_live, "_load_settings", lambda: {})
+    monkeypatch.setattr(routes_live, "_get_active_event_id", lambda: "ev")
+    monkeypatch.setattr(routes_live, "push_ring_monitor_update", lambda *args: None)
+    monkeypatch.setattr(routes_live.socketio, "emit", lambda *args, **kwargs: None)
+    monkeypatch.setattr(routes_live, "_submitted_results", IdempotencyLog(str(tmp_path / "submitted.jsonl")))
+    monkeypatch.setattr(routes_live, "_result_events", RingEventLog(str(tmp_path / "result_logs"), fsync=False).start())
+    app = Flask(__name__)
+    app.register_blueprint(routes_live.live_bp)
+    return app.test_client(), run, timing, journal
+
+
+def _submission(run, license_nr, finished_at, fehler=0):
+    return {"idempotency_key": f"ring1:{run['id']}:{license_nr}:{finished_at}", "run_id": run["id"],
+            "license_number": license_nr, "zeit": "35.10", "fehler": fehler, "verweigerungen": 0,
+            "finished_at": finished_at}
+
+
+def test_submit_result_route_saves_once_and_paces_by_finish_time(live):
+    client, run, timing, _journal = live
+    batch = {"results": [_submission(run, "A", "2026-05-09T09:00:00"), _submission(run, "B", "2026-05-09T09:01:00")]}
+    response = client.post("/api/submit_result", json=batch)
+    assert [o["status"] for o in response.get_json()["results"]] == ["saved", "saved"]
+    # Antwort verloren → Ring-Server sendet denselben Stapel nochmals
+    response = client.post("/api/submit_result", json=batch)
+    assert [o["status"] for o in response.get_json()["results"]] == ["duplicate", "duplicate"]
+    assert timing == [("2026-05-09T09:00:00", "A"), ("2026-05-09T09:01:00", "B")]
+    assert run["entries"][1]["result"]["zeit"] == "35.10"
+
+
+def test_browser_correction_wins_over_late_handoff(live):
+    client, run, timing, _journal = live
+    response = client.post(f"/live/save_result/ev/{run['id']}",
+                           json={"license_number": "A", "zeit": "35.10", "fehler": 1, "verweigerungen": 0})
+    assert response.get_json()["success"] is True
+    # nachgelieferter Zieldurchgang von vorher: nichts überschreiben, kein zweiter Tempo-Messwert
+    response = client.post("/api/submit_result", json=_submission(run, "A", "2000-01-01T09:00:00"))
+    assert response.get_json()["results"][0]["status"] == "superseded"
+    assert run["entries"][0]["result"]["fehler"] == 1
+    # erneutes Speichern im Dialog ist eine Korrektur, kein neuer Start
+    client.post(f"/live/save_result/ev/{run['id']}",
+                json={"license_number": "A", "zeit": "35.10", "fehler": 2, "verweigerungen": 0})
+    assert [license_nr for _, license_nr in timing] == ["A"]
+    routes_live._result_events.close()
+    logged = list(read_records(log_files(routes_live._result_events.directory)))
+    assert [(r["k"], r["source"], r["status"], r["fehler"]) for r in logged] == [
+        ("saved", "dialog", "saved", 1), ("saved", "ring_server", "superseded", 0), ("saved", "dialog", "saved", 2)]
+
+
+def test_save_result_data_superseded_branch(live):
+    _client, run, timing, _journal = live
+    payload, status = routes_live._save_result_data("ev", run["id"], {"license_number": "B", "zeit": "30.00"})
+    assert status == 200 and not payload.get("superseded")
+    payload, status = routes_live._save_result_data("ev", run["id"], {"license_number": "B", "zeit": "31.00"},
+                                                    finished_at="2000-01-01T00:00:00")
+    assert (status, payload["superseded"]) == (200, True)
+    assert run["entries"][1]["result"]["zeit"] == "30.00"
+
+
+def test_starter_change_is_journaled_instead_of_a_snapshot(live, monkeypatch):
+    client, run, _timing, journal = live
+    event = routes_live.get_event("ev")
+    event["ring_entry_state"] = {"1": {"current_entry_id": "A", "ready_entry_id": None}}
+    monkeypatch.setattr(routes_live, "save_event", lambda event: pytest.fail("kein Snapshot erwartet"))
+    monkeypatch.setattr(routes_live, "_build_ring_payload", lambda event, ring_no: {})
+    response = client.post("/live/api/ring_starter_changed", json={"event_id": "ev", "ring_no": 1, "run_id": run["id"]})
+    assert response.get_json()["success"] is True
+    assert event["ring_entry_state"]["1"] == {"current_entry_id": "A", "ready_entry_id": "B"}
+    assert journal == [{"op": "set_event", "fields": {"ring_entry_state": event["ring_entry_state"]}}]
@@ -0,0 +1,39 @@
+import json
+import os
+
+from planner.schedule_index import ScheduleIndex
+from tools.synthetic_tournament import generate_tournament, result_stream, write_data_dir
+from web_app.storage.event_repository import EventRepository
+
+
+def test_generator_is_reproducible_and_schedule_matches_runs():
+    master, event, past = generate_tournament(seed=7, rings=3, entries=400, past_events=2)
+    again = generate_tournament(seed=7, rings=3, entries=400, past_events=2)[1]
+    assert event["runs"] == again["runs"]
+    assert len(past) == 2 and all(e["result"] for r in past[0]["runs"] for e in r["entries"])
+    assert len(master["dogs.json"]) == 200
+
+    index = ScheduleIndex(event["schedule"], event["runs"])
+    for run in event["runs"]:
+        block, ring = index.first_slot_for_run(run)
+        assert block["title"] == run["name"]
+        assert run["assigned_ring"] == f"ring_{ring}"
+
+
+def test_result_stream_covers_every_entry_once():
+    _, event, _ = generate_tournament(seed=3, rings=2, entries=200)
+    stream = list(result_stream(event, seed=3))
+    expected = {(r["id"], e["Lizenznummer"]) for r in event["runs"] for e in r["entries"]}
+    assert {(item["run_id"], item["license_number"]) for item in stream} == expected
+    assert len(stream) == len(expected)
+    # Ringe wechseln sich ab
+    assert {item["ring_no"] for item in stream[:2]} == {1, 2}
+
+
+def test_write_data_dir(tmp_path):
+    master, event, past = generate_tournament(seed=1, rings=1, runs=4, entries=100, past_events=1)
+    data_dir = str(tmp_path / "data")
+    write_data_dir(data_dir, master, event, past)
+    assert [e["id"] for e in EventRepository(data_dir).load_all()] == [past[0]["id"], event["id"]]
+    with open(os.path.join(data_dir, "active_event.json"), encoding="utf-8") as f:
+        assert json.load(f) == {"active_event_id": event["id"]}
@@ -0,0 +1,149 @@
+import io
+import time
+
+from web_app.ring_server.ring_machine import RingStateMachine, parse_impulse
+from web_app.ring_server.timing_input import (
+    ImpulseDispatcher, LineReaderInput, SimulatedTimy, build_input, feed_machine, generate_impulses,
+    parse_input_spec,
+)
+
+# Impuls → run_finished_timing auf dem Ring-Server (ohne Netzwerk)
+LATENCY_BUDGET_MS = 10
+
+
+def _machine():
+    sent = []
+    machine = RingStateMachine("1", emit=lambda event, payload=None: sent.append((event, payload)))
+    return machine, sent
+
+
+def test_generated_impulses_are_deterministic():
+    first = generate_impulses(starters=20, seed=3, noise=0.3)
+    assert first == generate_impulses(starters=20, seed=3, noise=0.3)
+    assert first != generate_impulses(starters=20, seed=4, noise=0.3)
+    assert sum(1 for line in first if " C0 " in line) >= 20
+
+
+def test_simulated_timy_drives_ring_and_records_latency():
+    machine, sent = _machine()
+    sim = SimulatedTimy(generate_impulses(starters=200, seed=1, noise=0.2), rate=0)
+    sim.run(feed_machine(machine, auto_ready=True))
+
+    finished = [payload for event, payload in sent if event == "run_finished_timing"]
+    assert len(finished) == 200
+    assert all(28.0 <= float(p["final_time"]) <= 55.0 for p in finished)
+    latency = machine.latency.snapshot()
+    assert latency["start"]["count"] == 200 and latency["finish"]["count"] == 200
+    assert latency["finish"]["p99_ms"] < LATENCY_BUDGET_MS
+
+
+def test_simulated_timy_paces_by_time_of_day():
+    pauses = []
+    lines = ["0001 C0  10:00:00.00 00", "noise", "0002 C1  10:00:40.00 00", "0003 C0  10:01:00.00 00"]
+    sim = SimulatedTimy(lines, rate=10, sleep=pauses.append)
+    received = []
+    sim.run(lambda line, at: received.append(line))
+    assert pauses == [4.0, 2.0]
+    assert received == lines
+
+
+def test_line_reader_feeds_bytes_and_text():
+    machine, sent = _machine()
+    machine.set_starter_ready({"run_id": "r1", "starter": {"Startnummer": 1}})
+    stream = io.BytesIO(b"0001 C0  09:00:00.000 00\r\n0002 C1  09:00:33.125 00\r\n")
+    LineReaderInput(lambda: stream).run(feed_machine(machine))
+    assert dict(sent)["run_finished_timing"]["final_time"] == "33.12"
+
+
+class _ChunkedSerial:
+    """Serieller Port mit Lese-Timeout: readline() liefert, was bis dahin da ist."""
+
+    is_open = True
+
+    def __init__(self, chunks, source):
+        self.chunks = list(chunks)
+        self.source = source
+
+    def readline(self):
+        if not self.chunks:
+            self.source.stop()
+            return b""
+        return self.chunks.pop(0)
+
+    def close(self):
+        self.is_open = False
+
+
+def test_line_reader_joins_lines_split_by_read_timeout():
+    machine, sent = _machine()
+    machine.set_starter_ready({"run_id": "r1", "starter": {"Startnummer": 1}})
+    chunks = [b"0001 C0  09:0", b"0:00.000 00\r0002 C1", b"", b"  09:00:33.125 00\r"]
+    source = LineReaderInput(None)
+    source.opener = lambda: _ChunkedSerial(chunks, source)
+    lines = []
+    on_line = feed_machine(machine)
+    source.run(lambda line, received_at=None: lines.append(on_line(line, received_at)))
+    assert [impulse.channel for impulse in lines] == ["C0", "C1"]
+    assert dict(sent)["run_finished_timing"]["final_time"] == "33.12"
+
+
+def test_parse_input_spec():
+    spec = parse_input_spec("1=timy:0, Ring 2=serial:COM4@19200,3=sim:impulse.txt@10")
+    assert spec == {"1": ("timy", "0", None), "2": ("serial", "COM4", 19200.0), "3": ("sim", "impulse.txt", 10.0)}
+    sim = build_input("sim", "5", 0)
+    assert sim.rate == 0 and len(sim.lines) == 10
+
+
+def test_input_thread_start_and_stop():
+    machine, sent = _machine()
+    sim = SimulatedTimy(generate_impulses(starters=3), rate=0)
+    sim.start(feed_machine(machine, auto_ready=True))
+    sim.join(2.0)
+    assert sim.sent == 6
+
+    slow = SimulatedTimy(generate_impulses(starters=3), rate=1)
+    slow.start(lambda line, at: None)
+    started = time.perf_counter()
+    slow.stop()
+    slow.join(2.0)
+    assert time.perf_counter() - started < 1.0 and slow.sent < 6
+
+
+def test_dispatcher_emits_from_queue_in_order_within_budget():
+    machine, sent = _machine()
+    dispatcher = ImpulseDispatcher(machine, auto_ready=True).start()
+    # 20'000-fach: Starts im Abstand von wenigen ms wie an einem (sehr) schnellen Ring
+    impulses = generate_impulses(starters=60, seed=2, noise=0.2)
+    SimulatedTimy(impulses, rate=20000).run(dispatcher)
+    # der Geräte-Thread kehrt sofort zurück; der Dispatcher arbeitet die Queue ab
+    dispatcher.stop()
+    finished = [payload for event, payload in sent if event == "run_finished_timing"]
+    assert len(finished) == 60 and dispatcher.pending() == 0
+
+    expected, _ = _machine()
+    reference = []
+    expected.emit = lambda event, payload=None: reference.append((event, payload))
+    SimulatedTimy(impulses, rate=0).run(feed_machine(expected, auto_ready=True))
+    assert sent == reference
+
+    latency = machine.latency.snapshot()
+    assert latency["start"]["p99_ms"] < LATENCY_BUDGET_MS
+    assert latency["finish"]["p99_ms"] < LATENCY_BUDGET_MS
+
+
+def test_dispatcher_wakes_immediately_for_single_impulse():
+    machine, sent = _machine()
+    dispatcher = ImpulseDispatcher(machine).start()
+    machine.set_starter_ready({"run_id": "r1", "starter": {"Startnummer": 1}})
+    dispatcher("0001 C0  10:00:00.00 00", time.perf_counter())
+    dispatcher("0002 C1  10:00:31.50 00", time.perf_counter())
+    assert dispatcher("rubbish") is None and dispatcher.ignored == 1
+    dispatcher.stop()
+    assert dict(sent)["run_finished_timing"]["final_time"] == "31.50"
+    assert machine.latency.snapshot()["finish"]["max_ms"] < LATENCY_BUDGET_MS
+
+
+def test_impulse_is_parsed_once_with_hardware_seconds():
+    impulse = parse_impulse(" 0007 C1M 13:45:10.1234 00 ", received_at=5.0)
+    assert impulse.channel == "C1M" and impulse.received_at == 5.0
+    assert abs(impulse.seconds - (13 * 3600 + 45 * 60 + 10.1234)) < 1e-9
@@ -0,0 +1,45 @@
+"""Importiert den JSON-Datenordner in die SQLite-Datenbank (data/agility.sqlite3).
+
+Usage:
+    python tools/import_json_to_sqlite.py [--data-dir data] [--activate]
+
+Ohne --activate bleibt settings.json unverändert; mit --activate wird
+"storage_backend": "sqlite" gesetzt.
+"""
+import argparse
+import json
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from web_app.storage.files import atomic_write_json  # noqa: E402
+from web_app.storage.sqlite_store import DB_FILENAME, SQLiteStore  # noqa: E402
+
+
+def main(data_dir: str, activate: bool):
+    store = SQLiteStore(os.path.join(data_dir, DB_FILENAME))
+    counts = store.import_json(data_dir)
+    for name, count in counts.items():
+        print(f"[OK] {name}: {count}")
+
+    if activate:
+        settings_path = os.path.join(data_dir, "settings.json")
+        try:
+            with open(settings_path, "r", encoding="utf-8") as f:
+                settings = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            settings = {}
+        settings["storage_backend"] = "sqlite"
+        atomic_write_json(settings_path, settings, indent=4)
+        print("[OK] settings.json: storage_backend = sqlite")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="JSON-Daten in die SQLite-Datenbank importieren")
+    ap.add_argument("--data-dir", default="data", help="Datenordner (Standard: data)")
+    ap.add_argument("--activate", action="store_true", help="SQLite-Backend in settings.json aktivieren")
+    args = ap.parse_args()
+    main(args.data_dir, args.activate)
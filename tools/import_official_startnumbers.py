@@ -1,8 +1,15 @@
 import argparse
 import json
 import os
+import sys
 from typing import Any, Dict, List
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from web_app.storage.event_repository import EventRepository  # noqa: E402
+
 
 def load_json(path: str, default: Any):
     if not os.path.exists(path):
@@ -59,15 +66,13 @@ def main(startlist_json_path: str, sort_entries: bool):
 
     # 2) Stammdaten laden
     dogs_path = os.path.join("data", "dogs.json")
-    events_path = os.path.join("data", "events.json")
+    repo = EventRepository("data")
 
     dogs = load_json(dogs_path, [])
-    events = load_json(events_path, [])
+    events = repo.load_all()
 
     if not isinstance(dogs, list):
         raise SystemExit("data/dogs.json ist nicht eine Liste.")
-    if not isinstance(events, list):
-        raise SystemExit("data/events.json ist nicht eine Liste.")
 
     # 3) Dogs updaten (nur Debug-Felder)
     updated_dogs = 0
@@ -130,7 +135,7 @@ def main(startlist_json_path: str, sort_entries: bool):
 
     # 5) Speichern
     save_json(dogs_path, dogs)
-    save_json(events_path, events)
+    repo.save_all(events)
 
     # 6) Debug-Map zusätzlich speichern (für 1:1 Vergleich)
     save_json(os.path.join("data", "debug_startnumbers_offiziell.json"), by_license)
@@ -0,0 +1,146 @@
+"""Spielt ein Ring-Protokoll (data/ring_logs/*.jsonl) gegen den Hauptserver ab.
+
+Usage:
+    python tools/replay_ring_log.py data/ring_logs/ring1_<event>.jsonl [--speed 10]
+    python tools/replay_ring_log.py data/ring_logs --ring 2 --dry-run
+    python tools/replay_ring_log.py data/ring_logs --speed 0 --fresh-keys --event <event_id>
+
+Starter bereit → /live/api/ring_starter_changed, Ziel → /api/submit_result
+(mit dem Idempotenz-Schlüssel des Rings). --speed 1 spielt in Echtzeit, 10
+zehnfach, 0 ohne Pausen (Lasttest). Ein Ordner spielt alle Ringe gemischt
+nach Zeit ab. --dry-run zeigt nur den Ablauf (z.B. bei umstrittenen Zeiten).
+
+Der Hauptserver kennt die Schlüssel bereits gespeicherter Resultate und
+überschreibt kein neueres Ergebnis mit einem älteren Zieldurchgang. Für einen
+Lasttest gegen denselben Datenordner --fresh-keys verwenden (neue Schlüssel,
+Zielzeit = Abspielzeit); für eine Rekonstruktion in einem kopierten Datenordner,
+der die Resultate schon enthält, --now (Zielzeit = Abspielzeit).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from web_app.net.http_pool import HttpPool  # noqa: E402
+from web_app.ring_server.event_log import log_files, read_records, replay_schedule  # noqa: E402
+from web_app.ring_server.result_handoff import build_submission  # noqa: E402
+
+
+def record_request(record, event_id=None, key_prefix="", finished_at=None):
+    """
+    (Pfad, JSON) für den Hauptserver oder None, wenn der Eintrag dort keine
+    Entsprechung hat. ``finished_at`` ersetzt die aufgezeichnete Zielzeit.
+    """
+    event_id = event_id or record.get("event")
+    ring = record.get("ring")
+    if record.get("k") == "ready":
+        return "/live/api/ring_starter_changed", {"event_id": event_id, "ring_no": ring, "run_id": record.get("run_id")}
+    if record.get("k") == "finish":
+        state = {"active_run_id": record.get("run_id"), "event_id": event_id, "start_time_tod": record.get("start_tod"),
+                 "current_starter": {"Lizenznummer": record.get("license")}}
+        package = {"final_time": record.get("final_time"), "faults": record.get("faults", 0),
+                   "refusals": record.get("refusals", 0)}
+        submission = build_submission(ring, state, package,
+                                      finished_at=finished_at or datetime.fromtimestamp(record.get("t", 0)).isoformat())
+        if submission is None:
+            return None
+        submission["idempotency_key"] = key_prefix + submission["idempotency_key"]
+        return "/api/submit_result", submission
+    return None
+
+
+def replay(records, send, speed=1.0, sleep=time.sleep, clock=time.monotonic):
+    """
+    Sendet die Einträge im aufgezeichneten Takt. Die Zeitpunkte sind absolut
+    (ab Start), ein langsamer Server verschiebt also nicht den ganzen Rest;
+    ``max_lag_s`` zeigt, wie weit das Abspielen hinter dem Plan lag.
+    """
+    started = clock()
+    due = 0.0
+    summary = {"records": 0, "sent": 0, "max_lag_s": 0.0}
+    for delay, record in replay_schedule(records, speed):
+        due += delay
+        wait = started + due - clock()
+        if wait > 0:
+            sleep(wait)
+        else:
+            summary["max_lag_s"] = max(summary["max_lag_s"], round(-wait, 3))
+        summary["records"] += 1
+        if send(record):
+            summary["sent"] += 1
+    return summary
+
+
+def _describe(record):
+    details = {k: v for k, v in record.items() if k not in ("t", "ring", "event", "k")}
+    at = datetime.fromtimestamp(record.get("t", 0)).strftime("%H:%M:%S.%f")[:-3]
+    return f"{at}  Ring {record.get('ring')}  {record.get('k'):<8} {json.dumps(details, ensure_ascii=False)}"
+
+
+def main(paths, main_server, speed, ring=None, event_id=None, fresh_keys=False, now=False, dry_run=False):
+    files = []
+    for path in paths:
+        files.extend(log_files(path, ring_id=ring) if os.path.isdir(path) else [path])
+    if not files:
+        print("[!] keine Protokolldateien gefunden")
+        return 1
+    key_prefix = f"replay-{uuid.uuid4().hex[:8]}:" if fresh_keys else ""
+    pool = None if dry_run else HttpPool(main_server, max_connections=1, timeout=10.0)
+    outcomes = {}
+
+    def send(record):
+        if dry_run:
+            print(_describe(record))
+            return False
+        finished_at = datetime.now().isoformat() if (now or fresh_keys) else None
+        request = record_request(record, event_id, key_prefix, finished_at)
+        if request is None:
+            return False
+        path, payload = request
+        try:
+            status, body = pool.request("POST", path, body=json.dumps(payload).encode("utf-8"),
+                                        headers={"Content-Type": "application/json"}, name=path.rsplit("/", 1)[-1])
+        except OSError as exc:
+            outcomes[type(exc).__name__] = outcomes.get(type(exc).__name__, 0) + 1
+            return False
+        if path == "/api/submit_result" and status == 200:
+            for outcome in json.loads(body.decode("utf-8")).get("results") or []:
+                outcomes[outcome.get("status")] = outcomes.get(outcome.get("status"), 0) + 1
+        elif status != 200:
+            outcomes[f"HTTP {status}"] = outcomes.get(f"HTTP {status}", 0) + 1
+        return True
+
+    summary = replay(read_records(files), send, speed=speed)
+    print(f"[OK] {summary['records']} Einträge aus {len(files)} Datei(en), {summary['sent']} gesendet, "
+          f"max. Verzug {summary['max_lag_s']:.3f}s")
+    if outcomes:
+        print("     " + ", ".join(f"{status}: {count}" for status, count in sorted(outcomes.items())))
+    if pool is not None:
+        for name, latency in pool.stats()["latency"].items():
+            print(f"     {name}: n={latency['count']} p50={latency['p50_ms']}ms p95={latency['p95_ms']}ms "
+                  f"max={latency['max_ms']}ms")
+        pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="Protokolldatei(en) oder Ordner")
+    parser.add_argument("--main-server", default="http://127.0.0.1:5000")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = Echtzeit, 10 = zehnfach, 0 = ohne Pausen")
+    parser.add_argument("--ring", default=None, help="nur diesen Ring (bei Ordnern)")
+    parser.add_argument("--event", default=None, help="in dieses Event einspielen statt ins aufgezeichnete")
+    parser.add_argument("--fresh-keys", action="store_true",
+                        help="neue Idempotenz-Schlüssel und Zielzeit = Abspielzeit (Lasttest)")
+    parser.add_argument("--now", action="store_true", help="Zielzeit = Abspielzeit (bestehende Resultate ersetzen)")
+    parser.add_argument("--dry-run", action="store_true", help="nur anzeigen, nichts senden")
+    args = parser.parse_args()
+    sys.exit(main(args.paths, args.main_server, args.speed, ring=args.ring, event_id=args.event,
+                  fresh_keys=args.fresh_keys, now=args.now, dry_run=args.dry_run))
@@ -0,0 +1,212 @@
+"""End-to-End-Benchmark mit synthetischem Turnier.
+
+Usage:
+    python tools/run_benchmarks.py [--entries 600] [--rings 2] [--past-events 20]
+                                   [--results 400] [--out benchmark_results.json]
+                                   [--compare alte_messung.json]
+
+Ablauf: Turnier erzeugen (tools/synthetic_tournament.py) in einem temporären
+Datenordner, App mit Flask- und Socket.IO-Test-Client starten, Startnummern
+generieren, dann einen realistischen Resultat-Strom über /live/save_result
+abspielen. Dazwischen werden Ring-Monitor, Rangliste, TKAMO-Export und
+Resultat-ZIP gemessen. Ergebnis (Durchsatz, p50/p99) als JSON; mit --compare
+werden die Werte einer früheren Messung daneben gestellt.
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEB_APP_PATH = os.path.join(PROJECT_ROOT, "web_app")
+for path in (PROJECT_ROOT, WEB_APP_PATH):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from tools.synthetic_tournament import generate_tournament, result_stream, ring_run_order, write_data_dir  # noqa: E402
+
+
+class Timings:
+    def __init__(self):
+        self.samples = {}
+
+    def measure(self, name, func, *args, **kwargs):
+        started = time.perf_counter()
+        value = func(*args, **kwargs)
+        self.samples.setdefault(name, []).append(time.perf_counter() - started)
+        return value
+
+    def report(self):
+        out = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            total = sum(ordered)
+
+            def pct(p):
+                return round(ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))] * 1000, 3)
+
+            out[name] = {
+                "count": len(ordered),
+                "total_s": round(total, 4),
+                "throughput_per_s": round(len(ordered) / total, 1) if total else None,
+                "mean_ms": round(total * 1000 / len(ordered), 3),
+                "p50_ms": pct(50),
+                "p99_ms": pct(99),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return out
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def _check(response, name):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{name}: HTTP {response.status_code}")
+    return response
+
+
+def run_benchmark(args, data_dir):
+    master, event, past = generate_tournament(args.seed, args.rings, args.runs, args.entries, args.past_events)
+    write_data_dir(os.path.join(data_dir, "data"), master, event, past)
+    event_id = event["id"]
+
+    # Die App arbeitet mit relativen Pfaden (data/...)
+    os.chdir(data_dir)
+    from app import app, APP_VERSION
+    from extensions import socketio
+    import utils
+    from portal_sync import build_result_export_zip
+
+    app.config.update(TESTING=True)
+    client = app.test_client()
+    sio = socketio.test_client(app, flask_test_client=client)
+    ring_numbers = sorted(ring_run_order(event))
+    for ring_no in ring_numbers:
+        sio.emit("join_room", {"room": f"event:{event_id}:ring:{ring_no}"})
+
+    timings = Timings()
+    for _ in range(args.repeat):
+        _check(timings.measure("generate_startlist", client.post, f"/events/generate_startlist/{event_id}",
+                               data={"handler_distance": "20"}), "generate_startlist")
+
+    # Startnummern stehen jetzt fest → Strom in Startreihenfolge der gespeicherten Daten
+    live_event = utils.get_event(event_id)
+    order = ring_run_order(live_event)
+    current = {}
+    for ring_no in ring_numbers:
+        first = order[ring_no][0]
+        _check(client.get(f"/live/set_active_announcer_run/{event_id}/{first['id']}?ring={ring_no}"), "set_active_announcer_run")
+        current[ring_no] = first["id"]
+
+    settings = utils._load_settings()
+    sio.get_received()
+    emitted = {}
+    for i, item in enumerate(result_stream(live_event, args.seed)):
+        if args.results and i >= args.results:
+            break
+        ring_no, run_id = item.pop("ring_no"), item.pop("run_id")
+        if current.get(ring_no) != run_id:
+            timings.measure("set_active_run", client.get, f"/live/set_active_announcer_run/{event_id}/{run_id}?ring={ring_no}")
+            current[ring_no] = run_id
+        _check(timings.measure("save_result", client.post, f"/live/save_result/{event_id}/{run_id}", json=item), "save_result")
+
+        if i % args.render_every == 0:
+            _check(timings.measure("ring_monitor_page", client.get, f"/ring_monitor/{ring_no}"), "ring_monitor")
+            _check(timings.measure("ring_monitor_content", client.get, f"/api/render_ring_monitor_content/{ring_no}"), "monitor content")
+            run = utils.get_run(event_id, run_id)
+            timings.measure("ranking_full", utils._calculate_run_results, run, settings)
+            timings.measure("ranking_cached", utils.get_run_results, run, settings)
+            for packet in sio.get_received():
+                emitted[packet["name"]] = emitted.get(packet["name"], 0) + 1
+
+    for packet in sio.get_received():
+        emitted[packet["name"]] = emitted.get(packet["name"], 0) + 1
+
+    for _ in range(args.repeat):
+        _check(timings.measure("tkamo_export", client.get, f"/print/tkamo_export/{event_id}"), "tkamo_export")
+        snapshot = copy.deepcopy(utils.get_event(event_id))
+        timings.measure("build_result_export_zip", build_result_export_zip, snapshot)
+
+    sio.disconnect()
+    return {
+        "meta": {
+            "app_version": APP_VERSION,
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "params": {
+                "seed": args.seed, "rings": args.rings, "runs": len(event["runs"]),
+                "entries": sum(len(r["entries"]) for r in event["runs"]),
+                "past_events": args.past_events, "results": args.results, "repeat": args.repeat,
+            },
+        },
+        "operations": timings.report(),
+        "socketio_received": emitted,
+    }
+
+
+def print_report(report, baseline=None):
+    base_ops = (baseline or {}).get("operations", {})
+    print(f"{'Operation':28} {'n':>6} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9}" + ("   Δp50      Δp99" if baseline else ""))
+    for name, row in sorted(report["operations"].items()):
+        line = f"{name:28} {row['count']:>6} {row['throughput_per_s'] or 0:>9} {row['p50_ms']:>9} {row['p99_ms']:>9}"
+        old = base_ops.get(name)
+        if old:
+            line += f"  {row['p50_ms'] - old['p50_ms']:+8.2f}  {row['p99_ms'] - old['p99_ms']:+8.2f}"
+        print(line)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="End-to-End-Benchmark mit synthetischem Turnier")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--rings", type=int, default=2)
+    ap.add_argument("--runs", type=int, default=None, help="Anzahl Läufe (max. 24)")
+    ap.add_argument("--entries", type=int, default=600, help="Starts im Benchmark-Event (100–2000)")
+    ap.add_argument("--past-events", type=int, default=20, help="abgeschlossene Events im Store")
+    ap.add_argument("--results", type=int, default=400, help="Anzahl abgespielter Resultate (0 = alle)")
+    ap.add_argument("--render-every", type=int, default=5, help="Monitor/Rangliste alle N Resultate messen")
+    ap.add_argument("--repeat", type=int, default=3, help="Wiederholungen für Startliste und Exporte")
+    ap.add_argument("--out", default="benchmark_results.json", help="Ergebnisdatei (JSON)")
+    ap.add_argument("--compare", default=None, help="frühere Ergebnisdatei zum Vergleich")
+    ap.add_argument("--keep-data", action="store_true", help="temporären Datenordner nicht löschen")
+    args = ap.parse_args()
+    args.render_every = max(1, args.render_every)
+    out_path = os.path.abspath(args.out)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    cwd = os.getcwd()
+    data_dir = tempfile.mkdtemp(prefix="agility_bench_")
+    try:
+        report = run_benchmark(args, data_dir)
+    finally:
+        os.chdir(cwd)
+        if args.keep_data:
+            print(f"[INFO] Daten: {data_dir}")
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print_report(report, baseline)
+    print(f"\n[OK] {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Erzeugt synthetische Turniere (Stammdaten, Events, Zeitplan, Resultat-Strom).
+
+Wird vom Benchmark (tools/run_benchmarks.py) verwendet, ist aber auch direkt
+nutzbar, um einen Datenordner zum Ausprobieren zu füllen:
+
+    python tools/synthetic_tournament.py --data-dir /tmp/agility_data --entries 800 --rings 2
+
+Alles ist über --seed reproduzierbar.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import uuid
+from datetime import date, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from web_app.storage.event_repository import EventRepository  # noqa: E402
+from web_app.storage.files import atomic_write_json  # noqa: E402
+
+SIZES = ["Small", "Medium", "Intermediate", "Large"]
+CLASSES = ["1", "2", "3"]
+LAUFARTEN = ["Agility", "Jumping"]
+FIRST_NAMES = ["Anna", "Beat", "Carla", "Daniel", "Eva", "Fabio", "Gina", "Hans", "Ines", "Jonas", "Karin", "Luca"]
+LAST_NAMES = ["Muster", "Keller", "Meier", "Brunner", "Frei", "Graf", "Huber", "Roth", "Vogel", "Weber"]
+DOG_NAMES = ["Aiko", "Balu", "Cira", "Dusty", "Easy", "Fly", "Gipsy", "Happy", "Ivy", "Joy", "Kira", "Lucky"]
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate_master_data(rng, dog_count, judge_count=6, club_count=12):
+    """Hunde, Hundeführer, Richter und Vereine im Format der data/*.json-Dateien."""
+    clubs = [{"nummer": str(100 + i), "name": f"Agility-Club {i + 1}"} for i in range(club_count)]
+    judges = [
+        {"id": str(700 + i), "firstname": rng.choice(FIRST_NAMES), "lastname": rng.choice(LAST_NAMES)}
+        for i in range(judge_count)
+    ]
+    handlers, dogs = [], []
+    for i in range(dog_count):
+        # etwa jeder dritte Hundeführer führt zwei Hunde
+        if handlers and rng.random() < 0.33:
+            handler = rng.choice(handlers)
+        else:
+            handler = {
+                "id": _uuid(rng),
+                "Vorname": rng.choice(FIRST_NAMES),
+                "Nachname": f"{rng.choice(LAST_NAMES)}-{i}",
+                "Vereinsnummer": rng.choice(clubs)["nummer"],
+            }
+            handlers.append(handler)
+        dogs.append({
+            "Lizenznummer": f"SYN{i:05d}",
+            "Hundename": f"{rng.choice(DOG_NAMES)} {i}",
+            "Hundefuehrer_ID": handler["id"],
+            "Kategorie": rng.choice(SIZES),
+            "Klasse": rng.choice(CLASSES),
+        })
+    return {"dogs.json": dogs, "handlers.json": handlers, "judges.json": judges, "clubs.json": clubs}
+
+
+def _laufdaten(rng, klasse):
+    laufdaten = {
+        "parcours_laenge": str(rng.randint(160, 210)),
+        "anzahl_hindernisse": str(rng.randint(18, 22)),
+    }
+    if klasse == "1":
+        laufdaten["geschwindigkeit"] = "3.5"
+    return laufdaten
+
+
+def _entry(dog, handlers_by_id):
+    handler = handlers_by_id.get(dog["Hundefuehrer_ID"], {})
+    return {
+        "Lizenznummer": dog["Lizenznummer"],
+        "Hundename": dog["Hundename"],
+        "Hundefuehrer": f"{handler.get('Vorname', '')} {handler.get('Nachname', '')}".strip(),
+        "Kategorie": dog["Kategorie"],
+        "Klasse": dog["Klasse"],
+        "Startnummer": 0,
+    }
+
+
+def random_result(rng, sct=45.0):
+    """Ein plausibles Resultat (ca. 8 % DIS, Rest mit Fehlern/Verweigerungen um die SCT)."""
+    if rng.random() < 0.08:
+        return {"zeit": None, "fehler": 0, "verweigerungen": 0, "disqualifikation": "DIS"}
+    return {
+        "zeit": f"{rng.uniform(sct * 0.75, sct * 1.25):.2f}",
+        "fehler": rng.choice([0, 0, 0, 1, 1, 2]),
+        "verweigerungen": rng.choice([0, 0, 0, 1]),
+        "disqualifikation": None,
+    }
+
+
+def generate_event(rng, master, rings=2, runs=None, event_date=None, with_results=False, name=None):
+    """
+    Ein Event mit Läufen pro (Laufart, Kategorie, Klasse), Zeitplan-Blöcken
+    (ein Block pro Lauf, reihum auf die Ringe verteilt) und Startnummern-Schema.
+    ``runs`` begrenzt die Anzahl Läufe (Standard: alle 24 Kombinationen).
+    """
+    handlers_by_id = {h["id"]: h for h in master["handlers.json"]}
+    dogs_by_group = {}
+    for dog in master["dogs.json"]:
+        dogs_by_group.setdefault((dog["Kategorie"], dog["Klasse"]), []).append(dog)
+
+    combos = [(laufart, size, klasse) for size in SIZES for klasse in CLASSES for laufart in LAUFARTEN]
+    if runs:
+        combos = combos[:runs]
+
+    event_id = _uuid(rng)
+    event_date = event_date or date.today()
+    judges = master["judges.json"]
+    schedule_rings = {str(r): {"start_time": "07:30", "blocks": []} for r in range(1, rings + 1)}
+    event_runs = []
+    for idx, (laufart, size, klasse) in enumerate(combos):
+        ring_key = str(idx % rings + 1)
+        run = {
+            "id": _uuid(rng),
+            "name": f"{laufart} {size} {klasse}",
+            "laufart": laufart,
+            "kategorie": size,
+            "klasse": klasse,
+            "assigned_ring": f"ring_{ring_key}",
+            "laufdaten": _laufdaten(rng, klasse),
+            "entries": [_entry(dog, handlers_by_id) for dog in dogs_by_group.get((size, klasse), [])],
+        }
+        if with_results:
+            for entry in run["entries"]:
+                entry["result"] = random_result(rng)
+        event_runs.append(run)
+        blocks = schedule_rings[ring_key]["blocks"]
+        blocks.append({
+            "id": f"blk_{rng.getrandbits(32):08x}",
+            "type": "run",
+            "title": run["name"],
+            "timing_run_type": laufart.lower(),
+            "size_category": size.lower(),
+            "size_categories": [],
+            "classes": [klasse],
+            "judge_id": rng.choice(judges)["id"] if judges else None,
+            "sort": {"primary": {"field": "none", "direction": "asc"}, "secondary": {"field": "none", "direction": "asc"}},
+        })
+        if len(blocks) % 5 == 0:
+            blocks.append({"id": f"blk_{rng.getrandbits(32):08x}", "type": "pause", "title": "Pause", "duration_seconds": 900})
+
+    schema = {}
+    for i, (size, klasse) in enumerate((s, k) for s in SIZES for k in CLASSES):
+        schema[f"{size}-{klasse}"] = 100 + i * 100
+    return {
+        "id": event_id,
+        "Bezeichnung": name or f"Synthetisches Turnier {event_date.isoformat()}",
+        "Datum": event_date.isoformat(),
+        "Turniernummer": f"SYN-{event_date.strftime('%Y%m%d')}",
+        "num_rings": rings,
+        "start_times_by_ring": {f"ring_{r}": "07:30" for r in range(1, rings + 1)},
+        "start_number_schema": schema,
+        "schedule": {
+            "schedule_version": 1,
+            "event_id": event_id,
+            "rings": schedule_rings,
+            "meta": {"last_updated": f"{event_date.isoformat()}T06:00:00", "updated_by": "system"},
+        },
+        "runs": event_runs,
+    }
+
+
+def generate_tournament(seed=1, rings=2, runs=None, entries=600, past_events=0):
+    """Stammdaten, das aktuelle Event (ohne Resultate) und ``past_events`` abgeschlossene Events."""
+    rng = random.Random(seed)
+    # jeder Hund startet im Agility- und im Jumping-Lauf seiner Gruppe
+    master = generate_master_data(rng, max(1, entries // 2))
+    today = date.today()
+    past = [
+        generate_event(rng, master, rings, runs, today - timedelta(days=7 * (i + 1)), with_results=True)
+        for i in range(past_events)
+    ]
+    event = generate_event(rng, master, rings, runs, today, name="Benchmark-Turnier")
+    return master, event, past
+
+
+def ring_run_order(event):
+    """Läufe pro Ring in Zeitplan-Reihenfolge: {ring_no: [run, ...]}."""
+    runs_by_name = {}
+    for run in event["runs"]:
+        runs_by_name.setdefault(run["name"], run)
+    order = {}
+    for ring_key, ring in event["schedule"]["rings"].items():
+        order[int(ring_key)] = [runs_by_name[b["title"]] for b in ring["blocks"] if b["type"] == "run"]
+    return order
+
+
+def result_stream(event, seed=1):
+    """
+    Realistischer Resultat-Strom: pro Ring Lauf für Lauf in Startnummer-Reihenfolge,
+    die Ringe wechseln sich ab. Liefert dicts mit ring_no, run_id, license_number
+    und den Resultatfeldern (Payload von /live/save_result).
+    """
+    rng = random.Random(seed)
+    queues = {}
+    for ring_no, runs in ring_run_order(event).items():
+        queue = []
+        for run in runs:
+            for entry in sorted(run["entries"], key=lambda e: (e.get("Startnummer") or 0, e["Lizenznummer"])):
+                queue.append((run, entry))
+        queues[ring_no] = queue
+    positions = {ring_no: 0 for ring_no in queues}
+    while positions:
+        for ring_no in list(positions):
+            pos = positions[ring_no]
+            if pos >= len(queues[ring_no]):
+                positions.pop(ring_no)
+                continue
+            run, entry = queues[ring_no][pos]
+            positions[ring_no] = pos + 1
+            payload = {"license_number": entry["Lizenznummer"], **random_result(rng)}
+            yield {"ring_no": ring_no, "run_id": run["id"], **payload}
+
+
+def write_data_dir(data_dir, master, event, past=(), settings=None):
+    """Schreibt alles im Format der App (Events als Einzeldateien) und setzt das Event live."""
+    os.makedirs(data_dir, exist_ok=True)
+    for filename, records in master.items():
+        atomic_write_json(os.path.join(data_dir, filename), records, indent=4)
+    repo = EventRepository(data_dir)
+    repo.save_all(list(past) + [event])
+    atomic_write_json(os.path.join(data_dir, "active_event.json"), {"active_event_id": event["id"]}, indent=4)
+    atomic_write_json(os.path.join(data_dir, "settings.json"), settings or {}, indent=4)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Synthetisches Turnier in einen Datenordner schreiben")
+    ap.add_argument("--data-dir", required=True, help="Zielordner (wird angelegt)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--rings", type=int, default=2)
+    ap.add_argument("--runs", type=int, default=None, help="Anzahl Läufe (max. 24)")
+    ap.add_argument("--entries", type=int, default=600, help="Starts im aktuellen Event (100–2000)")
+    ap.add_argument("--past-events", type=int, default=0, help="Anzahl abgeschlossener Events im Store")
+    args = ap.parse_args()
+
+    master, event, past = generate_tournament(args.seed, args.rings, args.runs, args.entries, args.past_events)
+    write_data_dir(args.data_dir, master, event, past)
+    total = sum(len(r["entries"]) for r in event["runs"])
+    print(json.dumps({"event_id": event["id"], "runs": len(event["runs"]), "entries": total, "past_events": len(past)}))
+
+
+if __name__ == "__main__":
+    main()
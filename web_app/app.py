@@ -4,8 +4,11 @@ from flask_babel import Babel, gettext as _, lazy_gettext as _l
 import sys
 import importlib.metadata
 import os
+import time
 from datetime import datetime
 
+_startup_started = time.perf_counter()
+
 APP_VERSION = "4.4"
 app = Flask(__name__)
 from extensions import socketio
@@ -27,7 +30,25 @@ def _select_locale():
 babel.init_app(app, locale_selector=_select_locale)
 socketio.init_app(app)
 
-from utils import get_category_sort_key
+from utils import get_category_sort_key, _load_settings as _startup_settings
+from web_app.diagnostics.perf import recorder as perf, enabled_by_config
+
+# Opt-in: AGILITY_PERF=1 oder "perf_instrumentation": true in settings.json
+perf.enable(enabled_by_config(_startup_settings()))
+
+
+@app.before_request
+def _perf_request_started():
+    if perf.enabled:
+        request.environ['agility.perf_started'] = time.perf_counter()
+
+
+@app.teardown_request
+def _perf_request_finished(exc=None):
+    started = request.environ.get('agility.perf_started')
+    if started is not None:
+        perf.record('endpoint', request.endpoint or request.path, time.perf_counter() - started,
+                    errors=1 if exc is not None else 0)
 
 def judge_name(judges, rid):
     try:
@@ -89,6 +110,16 @@ def settings():
         current_settings['portal_live_api_key']    = request.form.get('portal_live_api_key', '').strip()
         current_settings['portal_results_api_key'] = request.form.get('portal_results_api_key', '').strip()
         current_settings['portal_device_id']       = request.form.get('portal_device_id', '').strip() or 'agility-software'
+        try:
+            current_settings['portal_export_debounce_seconds'] = max(0, int(request.form.get('portal_export_debounce_seconds', 20)))
+        except (TypeError, ValueError):
+            current_settings['portal_export_debounce_seconds'] = 20
+        current_settings['portal_export_delta'] = request.form.get('portal_export_delta') == 'on'
+        for key, default in (('portal_timeout_seconds', 8), ('portal_export_timeout_seconds', 30)):
+            try:
+                current_settings[key] = max(1, int(request.form.get(key, default)))
+            except (TypeError, ValueError):
+                current_settings[key] = default
         # Drucksprache
         print_language = request.form.get('print_language', 'de')
         if print_language in ('de', 'fr'):
@@ -96,9 +127,9 @@ def settings():
         _save_data('settings.json', current_settings)
         flash(_('Einstellungen erfolgreich gespeichert.'), 'success')
         return redirect(url_for('settings'))
-    from portal_sync import get_sync_status
+    from portal_sync import get_sync_status, get_outbox_status
     return render_template('settings.html', settings=_load_settings(),
-                           sync_status=get_sync_status())
+                           sync_status=get_sync_status(), outbox_status=get_outbox_status())
 
 @app.route('/settings/test-portal', methods=['POST'])
 def settings_test_portal():
@@ -142,6 +173,7 @@ app.register_blueprint(live_bp)
 app.register_blueprint(print_bp)
 app.register_blueprint(debug_bp)
 app.register_blueprint(sm_bp)
+perf.record('startup', 'app_import', time.perf_counter() - _startup_started)
 
 @app.context_processor
 def inject_current_year():
@@ -157,5 +189,11 @@ def handle_join_room(data):
 
 if __name__ == '__main__':
     initialize_files()
+    from utils import start_event_compactor
+    start_event_compactor()
+    # Outbox-Worker nur im Server-Prozess (nicht im Reloader-Elternprozess) starten
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from portal_sync import start_outbox_worker
+        start_outbox_worker()
     print(f'Starte Agility Software v{APP_VERSION} …')
     socketio.run(app, host='0.0.0.0', allow_unsafe_werkzeug=True, debug=True)
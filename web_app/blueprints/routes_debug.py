@@ -1,15 +1,18 @@
 # blueprints/routes_debug.py
-from flask import Blueprint, redirect, url_for, flash, abort
+from flask import Blueprint, redirect, url_for, flash, abort, jsonify, request, render_template
 import random
 import math
-from utils import _load_data, _save_data, _load_settings, _to_float
+from utils import (_load_settings, _to_float, get_event, save_event, ring_view_cache_snapshot, run_results_cache_stats,
+                   schedule_index_stats)
+from web_app.diagnostics.perf import recorder as perf
+from planner.schedule_planner import timeline_cache_stats
+from portal_sync import export_fragment_stats
 
 debug_bp = Blueprint('debug_bp', __name__)
 
 @debug_bp.route('/debug/generate_results/<event_id>')
 def generate_test_results(event_id):
-    events = _load_data('events.json')
-    event = next((e for e in events if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
     settings = _load_settings()
     for run in event.get('runs', []):
@@ -47,6 +50,45 @@ def generate_test_results(event_id):
                 'verweigerungen': verweigerungen,
                 'disqualifikation': None
             }
-    _save_data('events.json', events)
+    save_event(event)
     flash(f"Test-Resultate für das Event '{event.get('Bezeichnung')}' wurden erfolgreich generiert.", "success")
     return redirect(url_for('events_bp.manage_runs', event_id=event_id))
+
+
+@debug_bp.route('/debug/ring_view_cache')
+def ring_view_cache_stats():
+    """Treffer/Fehlschläge und Rechenzeit der geteilten Ring-Ansichten (plus Ranglisten-Cache)."""
+    return jsonify({
+        "ring_views": ring_view_cache_snapshot(),
+        "run_results": dict(run_results_cache_stats),
+    })
+
+
+@debug_bp.route('/debug/perf')
+def perf_report():
+    """Hot-Path-Bericht: Endpunkte, Datei-I/O, Ranglisten, Socket.IO-Emits (Perzentile über die letzten Messwerte)."""
+    report = perf.snapshot()
+    report["caches"] = {
+        "ring_views": ring_view_cache_snapshot(),
+        "run_results": dict(run_results_cache_stats),
+        "schedule_index": dict(schedule_index_stats),
+        "timeline": dict(timeline_cache_stats),
+        "result_export_fragments": dict(export_fragment_stats),
+    }
+    if request.args.get('format') == 'json':
+        return jsonify(report)
+    return render_template('debug_perf.html', report=report)
+
+
+@debug_bp.route('/debug/perf/toggle', methods=['POST'])
+def perf_toggle():
+    perf.enable(not perf.enabled)
+    flash("Messung eingeschaltet." if perf.enabled else "Messung ausgeschaltet.", "info")
+    return redirect(url_for('debug_bp.perf_report'))
+
+
+@debug_bp.route('/debug/perf/reset', methods=['POST'])
+def perf_reset():
+    perf.reset()
+    flash("Messwerte zurückgesetzt.", "info")
+    return redirect(url_for('debug_bp.perf_report'))
@@ -2,6 +2,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, Response, jsonify, abort
 from flask_babel import gettext as _
 from werkzeug.utils import secure_filename
+import copy
 import json
 import os
 import re
@@ -19,7 +20,9 @@ from utils import (
     _load_data, _save_data, _decode_csv_file, _get_active_event_id,
     _get_concrete_run_list, _place_entries_with_distance,
     _load_settings, _calculate_timelines, get_category_sort_key, _recalculate_schedule_estimates,
-    resolve_judge_name, _calculate_run_results, find_run_ring_number
+    resolve_judge_name, _calculate_run_results, find_run_ring_number,
+    get_event, get_run, save_event, delete_event as _delete_event,
+    get_dogs_by_license, invalidate_run_results, get_schedule_index, invalidate_schedule_index
 )
 from web_app.live.ring_state import init_ring_entry_state
 import planner.schedule_planner as schedule_planner
@@ -1153,8 +1156,7 @@ def edit_event(event_id):
 
 @events_bp.route('/delete/<event_id>', methods=['POST'])
 def delete_event(event_id):
-    events = [e for e in _load_data(EVENTS_FILE) if e.get('id') != event_id]
-    _save_data(EVENTS_FILE, events)
+    _delete_event(event_id)
     if _get_active_event_id() == event_id:
         _save_data('active_event.json', {})
     flash(_("Veranstaltung wurde gelöscht."), "success")
@@ -1179,7 +1181,7 @@ def clear_active_event():
 
 @events_bp.route('/manage_runs/<event_id>')
 def manage_runs(event_id):
-    event = next((e for e in _load_data(EVENTS_FILE) if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event:
         return redirect(url_for('events_bp.events_list'))
     judges = _load_data(JUDGES_FILE)
@@ -1214,11 +1216,10 @@ def set_live_run(event_id):
     run_id = data.get("run_id")
     if not run_id:
         return jsonify({"success": False, "message": "run_id fehlt"}), 400
-    events = _load_data(EVENTS_FILE)
-    event = next((e for e in events if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event:
         return jsonify({"success": False, "message": "Event nicht gefunden"}), 404
-    run = next((r for r in event.get('runs', []) or [] if r.get('id') == run_id), None)
+    run = get_run(event_id, run_id)
     if not run:
         return jsonify({"success": False, "message": "Lauf nicht gefunden"}), 404
 
@@ -1226,17 +1227,7 @@ def set_live_run(event_id):
     if not ring_no:
         return jsonify({"success": False, "message": "Kein Ring für diesen Lauf gefunden"}), 400
 
-    run_block = None
-    schedule = event.get("schedule") or {}
-    for ring_key, ring_data in (schedule.get("rings") or {}).items():
-        for block in ring_data.get("blocks") or []:
-            if (block.get("type") or "").lower() != "run":
-                continue
-            if schedule_planner._match_run_to_block(run, block):
-                run_block = block
-                break
-        if run_block:
-            break
+    run_block, _ = get_schedule_index(event).first_slot_for_run(run)
 
     current_runs = event.get("current_runs_by_ring") or {}
     current_runs[str(ring_no)] = run_id
@@ -1254,7 +1245,7 @@ def set_live_run(event_id):
         }
         event["current_run_blocks"] = current_blocks
 
-    _save_data(EVENTS_FILE, events)
+    save_event(event)
 
     # Runs nach Ring gruppieren (Schedule-Blöcke bevorzugt, Fallback assigned_ring)
     import re as _re
@@ -1264,20 +1255,19 @@ def set_live_run(event_id):
     schedule = event.get('schedule') or {}
     schedule_rings = schedule.get('rings') or {}
     placed_run_ids = set()
+    index = get_schedule_index(event)
     for ring_key, ring_data in schedule_rings.items():
         digits = _re.sub(r'[^0-9]', '', str(ring_key)) or '1'
         bucket = ring_runs.setdefault(digits, [])
         for block in (ring_data.get('blocks') or []):
             if (block.get('type') or '').lower() != 'run':
                 continue
-            import planner.schedule_planner as _sp
-            for run in event.get('runs', []) or []:
+            for run in index.runs_for_block(block):
                 if run.get('id') in placed_run_ids:
                     continue
-                if _sp._match_run_to_block(run, block):
-                    bucket.append(run)
-                    placed_run_ids.add(run.get('id'))
-                    break
+                bucket.append(run)
+                placed_run_ids.add(run.get('id'))
+                break
     for run in event.get('runs', []) or []:
         if run.get('id') in placed_run_ids:
             continue
@@ -1323,6 +1313,7 @@ def edit_run(event_id, run_id):
             laufdaten['geschwindigkeit'] = request.form.get('geschwindigkeit') if not laufdaten['sct_direkt'] else ''
         run['laufdaten'] = laufdaten
         # Bug 3 Fix: SCT/MCT nach Änderung sofort berechnen und persistieren
+        invalidate_run_results(run_id)
         _calculate_run_results(run, _load_settings())
         _save_data(EVENTS_FILE, events)
         return_url = request.form.get('return_url') or request.args.get('return_url')
@@ -1388,6 +1379,7 @@ def manage_run_participants(event_id, run_id):
                 "Hundename": dog.get('Hundename'),
                 "Hundefuehrer": handler_full
             })
+            invalidate_run_results(run_id)
             _save_data(EVENTS_FILE, events)
             flash(_("Teilnehmer hinzugefügt."), "success")
             return redirect(url_for('events_bp.manage_run_participants', event_id=event_id, run_id=run_id))
@@ -1397,6 +1389,7 @@ def manage_run_participants(event_id, run_id):
             before = len(run.get('entries', []))
             run['entries'] = [p for p in run.get('entries', []) if _norm(p.get('Lizenznummer')) != lic]
             after = len(run.get('entries', []))
+            invalidate_run_results(run_id)
             _save_data(EVENTS_FILE, events)
             flash(_("Teilnehmer entfernt.") if after < before else _("Teilnehmer war nicht in diesem Lauf."), "info")
             return redirect(url_for('events_bp.manage_run_participants', event_id=event_id, run_id=run_id))
@@ -1406,6 +1399,7 @@ def manage_run_participants(event_id, run_id):
             for p in run.get('entries', []):
                 key = f"start_last_{p.get('Lizenznummer')}"
                 p['start_last'] = request.form.get(key) == 'on'
+            invalidate_run_results(run_id)
             _save_data(EVENTS_FILE, events)
             flash(_("Einstellungen gespeichert."), "success")
             return redirect(url_for('events_bp.manage_run_participants', event_id=event_id, run_id=run_id))
@@ -1423,6 +1417,7 @@ def manage_run_participants(event_id, run_id):
             found = next((e for e in run.get('entries', []) if _norm(e.get('Lizenznummer')) == lic), None)
             if found:
                 found['Startnummer'] = num
+                invalidate_run_results(run_id)
                 _save_data(EVENTS_FILE, events)
                 flash(_("Startnummer gesetzt."), "success")
             else:
@@ -1728,9 +1723,11 @@ def swap_start_numbers(event_id):
 
 @events_bp.route('/plan_schedule/<event_id>')
 def plan_schedule(event_id):
-    event = next((e for e in _load_data(EVENTS_FILE) if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event:
         return redirect(url_for('events_bp.events_list'))
+    # Nur Anzeige: Zeitplan/Schätzungen auf einer Kopie ergänzen, nicht im geteilten Cache
+    event = copy.deepcopy(event)
     settings = _load_settings()
     start_times_by_ring = event.get('start_times_by_ring', {}) or {}
     schedule = schedule_planner.ensure_schedule_root(event_id, event.get('num_rings', 1), start_times_by_ring, event.get('schedule'))
@@ -1741,7 +1738,7 @@ def plan_schedule(event_id):
     _recalculate_schedule_estimates(event, schedule, settings)
     timelines_by_ring = _calculate_timelines(event)
     unique_participants = {}
-    dog_map = {d['Lizenznummer']: d for d in _load_data(DOGS_FILE) if isinstance(d, dict) and d.get('Lizenznummer')}
+    dog_map = get_dogs_by_license()
     all_entries_with_start_num = [entry for run in event.get('runs', []) for entry in run.get('entries', []) if entry.get('Startnummer')]
     for entry in all_entries_with_start_num:
         license_nr = entry.get('Lizenznummer')
@@ -1879,6 +1876,7 @@ def add_schedule_block(event_id):
             block['title'] = schedule_planner.generate_run_title(block)
 
     blocks.append(block)
+    invalidate_schedule_index(event_id)
     schedule_data = schedule_planner.ensure_run_titles(schedule_data)
     schedule_data['meta']['last_updated'] = datetime.utcnow().isoformat()
     schedule_data['meta']['updated_by'] = 'user'
@@ -1909,6 +1907,7 @@ def delete_schedule_block(event_id):
     ring_blocks = (schedule_data.get('rings') or {}).get(ring_key, {}).get('blocks', [])
     original_len = len(ring_blocks)
     ring_blocks[:] = [block for block in ring_blocks if block.get('id') != block_id]
+    invalidate_schedule_index(event_id)
 
     if len(ring_blocks) == original_len:
         flash("Block nicht gefunden.", "warning")
@@ -1950,6 +1949,7 @@ def move_schedule_block(event_id):
         ring_blocks[index - 1], ring_blocks[index] = ring_blocks[index], ring_blocks[index - 1]
     elif direction == 'down' and index < len(ring_blocks) - 1:
         ring_blocks[index + 1], ring_blocks[index] = ring_blocks[index], ring_blocks[index + 1]
+    invalidate_schedule_index(event_id)
 
     schedule_data['meta']['last_updated'] = datetime.utcnow().isoformat()
     schedule_data['meta']['updated_by'] = 'user'
@@ -1990,6 +1990,7 @@ def save_schedule(event_id):
     settings = _load_settings()
     schedule_data = schedule_planner.ensure_schedule_root(event_id, num_rings, start_times, schedule_payload or event.get('schedule'))
     schedule_data = schedule_planner.ensure_run_titles(schedule_data)
+    invalidate_schedule_index(event_id)
     schedule_data['meta']['last_updated'] = datetime.utcnow().isoformat()
     schedule_data['meta']['updated_by'] = 'user'
     _recalculate_schedule_estimates(event, schedule_data, settings)
@@ -2027,10 +2028,8 @@ def load_schema_template(event_id):
 
 @events_bp.route('/generate_startlist/<event_id>', methods=['POST'])
 def generate_startlist(event_id):
-    events = _load_data(EVENTS_FILE)
-    dogs = [d for d in _load_data(DOGS_FILE) if isinstance(d, dict) and d.get('Lizenznummer')]
-    handler_map = {h['id']: h for h in _load_data(HANDLERS_FILE) if isinstance(h, dict) and h.get('id')}
-    event = next((e for e in events if e.get('id') == event_id), None)
+    event = get_event(event_id)
+    dog_map = get_dogs_by_license()
     if not event:
         return redirect(url_for('events_bp.events_list'))
 
@@ -2050,7 +2049,6 @@ def generate_startlist(event_id):
     random.shuffle(all_entries_in_schedule_order)
 
     # handler_id anreichern (für Abstandslogik)
-    dog_map = {d['Lizenznummer']: d for d in dogs}
     for entry in all_entries_in_schedule_order:
         lic = entry.get('Lizenznummer')
         d = dog_map.get(lic, {})
@@ -2070,7 +2068,6 @@ def generate_startlist(event_id):
 
     participant_number_map = {}
     unique_entries = {e['Lizenznummer']: e for e in final_timeline}.values()
-    dog_map = {d['Lizenznummer']: d for d in dogs}
 
     for entry in unique_entries:
         license_nr = entry['Lizenznummer']
@@ -2089,7 +2086,7 @@ def generate_startlist(event_id):
             if entry['Lizenznummer'] in participant_number_map:
                 entry['Startnummer'] = participant_number_map[entry['Lizenznummer']]
 
-    _save_data(EVENTS_FILE, events)
+    save_event(event)
     flash(f"{len(participant_number_map)} Startnummern erfolgreich vergeben.", "success")
     return redirect(url_for('events_bp.plan_schedule', event_id=event_id))
 
@@ -2100,7 +2097,7 @@ def generate_startlist(event_id):
 
 @events_bp.route('/export_package/<event_id>')
 def export_event_package(event_id):
-    event = next((e for e in _load_data(EVENTS_FILE) if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event:
         abort(404)
     return Response(json.dumps(event, indent=4, ensure_ascii=False),
@@ -2240,7 +2237,7 @@ def import_event_package():
 @events_bp.route('/api/get_starter_count/<event_id>', methods=['POST'])
 def get_starter_count(event_id):
     import math
-    event = next((e for e in _load_data(EVENTS_FILE) if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event:
         return jsonify({"error": "Event not found"}), 404
     data = request.json
@@ -2318,100 +2315,13 @@ def remove_participant_from_event(event_id, license_nr):
     return jsonify(success=True, removed=removed_count)
 
 def _load_event_by_id(event_id: str):
-    """Versucht das Event zu laden (per-file oder zentrale Liste)."""
-    from pathlib import Path
-    PROJECT_ROOT = Path(__file__).resolve().parent
-    per_file = PROJECT_ROOT / 'data' / 'events' / f'{event_id}.json'
-    # 1) Direktdatei {id}.json
-    if per_file.exists():
-        try:
-            with per_file.open('r', encoding='utf-8') as f:
-                data = json.load(f)
-            if isinstance(data, dict) and data.get('id') == event_id:
-                return data, 'per_file'
-            if isinstance(data, list):
-                for ev in data:
-                    if isinstance(ev, dict) and ev.get('id') == event_id:
-                        return ev, 'per_file_list'
-        except Exception:
-            pass
-
-    # 2) Zentrales events.json
-    events_json = PROJECT_ROOT / 'data' / 'events.json'
-    if events_json.exists():
-        try:
-            with events_json.open('r', encoding='utf-8') as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                for ev in data:
-                    if isinstance(ev, dict) and ev.get('id') == event_id:
-                        return ev, 'events_list'
-            elif isinstance(data, dict) and data.get('id') == event_id:
-                return data, 'events_json_dict'
-        except Exception:
-            pass
-
-    # 3) Fallback: alle Dateien im Verzeichnis durchsuchen
-    events_dir = PROJECT_ROOT / 'data' / 'events'
-    if events_dir.exists() and events_dir.is_dir():
-        for p in events_dir.glob('*.json'):
-            try:
-                with p.open('r', encoding='utf-8') as f:
-                    data = json.load(f)
-                if isinstance(data, dict) and data.get('id') == event_id:
-                    return data, f'per_file({p.name})'
-                if isinstance(data, list):
-                    for ev in data:
-                        if isinstance(ev, dict) and ev.get('id') == event_id:
-                            return ev, f'per_file_list({p.name})'
-            except Exception:
-                continue
-    return None, ''
+    """Lädt das Event aus dem Repository (Einzeldatei data/events/<id>.json)."""
+    event = get_event(event_id)
+    return event, ('repository' if event else '')
 
 def _save_event_by_source(event_id: str, event_obj: dict, source_flag: str) -> None:
-    """Speichert das Event basierend auf seiner Quelle zurück."""
-    from pathlib import Path
-    PROJECT_ROOT = Path(__file__).resolve().parent
-    events_dir = PROJECT_ROOT / 'data' / 'events'
-    events_dir.mkdir(parents=True, exist_ok=True)
-    events_json = PROJECT_ROOT / 'data' / 'events.json'
-
-    def _write_json(p: Path, data):
-        p.parent.mkdir(parents=True, exist_ok=True)
-        with p.open('w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-    if source_flag == 'per_file':
-        _write_json(events_dir / f'{event_id}.json', event_obj)
-        return
-    if source_flag.startswith('per_file(') or source_flag.startswith('per_file_list('):
-        name = source_flag[source_flag.find('(')+1: source_flag.rfind(')')]
-        _write_json(events_dir / name, event_obj)
-        return
-    if source_flag == 'per_file_list':
-        _write_json(events_dir / f'{event_id}.json', event_obj)
-        return
-    if source_flag == 'events_list':
-        if events_json.exists():
-            try:
-                with events_json.open('r', encoding='utf-8') as f:
-                    data = json.load(f)
-                if isinstance(data, list):
-                    for i, ev in enumerate(data):
-                        if isinstance(ev, dict) and ev.get('id') == event_id:
-                            data[i] = event_obj
-                            _write_json(events_json, data)
-                            return
-            except Exception:
-                pass
-        _write_json(events_dir / f'{event_id}.json', event_obj)
-        return
-    if source_flag == 'events_json_dict':
-        _write_json(events_json, event_obj)
-        return
-
-    # Default-Fallback
-    _write_json(events_dir / f'{event_id}.json', event_obj)
+    """Speichert das Event zurück; seit den Einzeldateien immer über das Repository."""
+    save_event(event_obj)
 # === END ring-api helpers ====================================================
 
 @events_bp.route('/api/list_runs/<event_id>', methods=['GET'])
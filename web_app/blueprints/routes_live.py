@@ -2,23 +2,72 @@
 from flask import Blueprint, render_template, request, jsonify, abort, flash, redirect, url_for, session, Response
 from flask_babel import gettext as _
 from datetime import datetime
+import atexit
 import json
 import math
+import os
 import re
+import threading
 
 from pathlib import Path
 
 from extensions import socketio
+from flask_socketio import emit
 from utils import (_load_data, _save_data, _get_active_event,
-                   _calculate_run_results, _load_settings, _get_active_event_id,
-                   _calculate_timelines, resolve_judge_name, resolve_judge_id, _to_int,
+                   _load_settings, _get_active_event_id,
+                   resolve_judge_name, resolve_judge_id, _to_int,
                    build_ring_view_model, collect_ring_numbers, format_ring_name,
-                   _format_time, _format_total_errors, get_ring_state)
-import planner.schedule_planner as schedule_planner
+                   _format_time, _format_total_errors, get_ring_state,
+                   get_event, get_run, save_event, record_event_ops, get_run_ranking,
+                   get_run_results, store_run_results, invalidate_run_results,
+                   get_schedule_index, record_result_timing, get_schedule_forecast)
 from web_app.live.ring_state import apply_start_impulse, apply_result_saved, init_ring_entry_state
+from web_app.storage.result_journal import set_entry_op, set_event_op, set_run_op
+from web_app.live.monitor_push import FragmentTracker, ring_room as monitor_room
+from web_app.live.result_intake import ingest_results
+from web_app.storage.idempotency import IdempotencyLog
+from web_app.ring_server.event_log import RingEventLog
 
 live_bp = Blueprint('live_bp', __name__, template_folder='../templates')
 
+# Zuletzt gesendete Ring-Monitor-Fragmente pro Room (für Diff-Pushes)
+_monitor_fragments = FragmentTracker()
+
+# Resultate werden nacheinander gespeichert (Browser und Ring-Server gleichzeitig,
+# mehrere Ringe im selben Moment); bereits verarbeitete Ring-Server-Resultate
+# merkt sich data/submitted_results.jsonl. Jedes gespeicherte Resultat (auch
+# Korrekturen im Dialog) landet zusätzlich im Protokoll data/result_logs/.
+_result_lock = threading.RLock()
+_submitted_results = None
+_result_events = None
+
+
+def _submitted_results_log() -> IdempotencyLog:
+    global _submitted_results
+    if _submitted_results is None:
+        _submitted_results = IdempotencyLog(os.path.join('data', 'submitted_results.jsonl'))
+    return _submitted_results
+
+
+def _result_event_log() -> RingEventLog:
+    global _result_events
+    if _result_events is None:
+        _result_events = RingEventLog(os.path.join('data', 'result_logs')).start()
+        atexit.register(_result_events.close)
+    return _result_events
+
+
+def _log_saved_result(event_id, run, license_nr, result, source, status, finished_at=None):
+    """Ein "saved"-Eintrag im Resultat-Protokoll; darf das Speichern nie stören."""
+    try:
+        ring_num = re.sub(r"[^0-9]", "", str(run.get('assigned_ring') or "")) or "1"
+        _result_event_log().record(ring_num, event_id, "saved", {
+            "source": source, "status": status, "run_id": run.get('id'), "license": license_nr,
+            **(result or {}), "finished_at": finished_at,
+        })
+    except Exception:
+        pass
+
 # --- LIVE STATE + RING NORMALIZATION HELPERS (auto-insert) ---
 # Persistenter Live-State: welches Event/Ring zeigt welchen aktiven Lauf?
 # Speicherung in data/live_state.json via utils._load_data/_save_data
@@ -87,15 +136,13 @@ def _schedule_runs_for_ring(event, ring_key):
     debug = []
     runs_for_ring = []
     seen_ids = set()
+    index = get_schedule_index(event)
     for block in blocks:
         block_type = (block.get("type") or block.get("block_type") or "").lower()
         if block_type != "run":
             debug.append(f"skip:{block_type or 'unknown'}")
             continue
-        matched = [
-            run for run in event.get("runs", []) or []
-            if isinstance(run, dict) and schedule_planner._match_run_to_block(run, block)
-        ]
+        matched = index.runs_for_block(block)
         if not matched:
             debug.append(f"no_match:{block.get('title') or block.get('label') or block.get('laufart') or 'run'}")
             continue
@@ -110,18 +157,7 @@ def _schedule_runs_for_ring(event, ring_key):
 
 
 def _find_run_block_for_run(event, run, ring_key: str | None = None):
-    schedule = event.get("schedule") or {}
-    rings = schedule.get("rings") or {}
-    ring_keys = [ring_key] if ring_key is not None else list(rings.keys())
-    for key in ring_keys:
-        ring_data = rings.get(str(key)) or {}
-        for block in ring_data.get("blocks") or []:
-            block_type = (block.get("type") or block.get("block_type") or "").lower()
-            if block_type != "run":
-                continue
-            if schedule_planner._match_run_to_block(run, block):
-                return block, str(key)
-    return None, None
+    return get_schedule_index(event).first_slot_for_run(run, ring_key)
 
 
 def _persist_current_run(events, event_id, ring_key, run_block_id, run_id=None):
@@ -203,7 +239,7 @@ def _get_live_data_for_ring(event, ring_name):
         return None
 
     settings = _load_settings()
-    all_results = _calculate_run_results(run, settings)
+    all_results = get_run_results(run, settings)
     last_results = sorted(
         [res for res in all_results if res.get('platz')],
         key=lambda x: x.get('timestamp', 0), reverse=True
@@ -245,22 +281,27 @@ def live_event_dashboard():
         return redirect(url_for('events_bp.events_list'))
     ring_numbers = collect_ring_numbers(event)
     ring_cards = [get_ring_state(event, ring_number) for ring_number in ring_numbers]
+    try:
+        from portal_sync import pending_export_runs
+        export_pending = pending_export_runs(event)
+    except Exception:
+        export_pending = []
     return render_template(
         'live_event_dashboard.html',
         event=event,
         ring_numbers=ring_numbers,
         ring_cards=ring_cards,
+        export_pending=export_pending,
     )
 
 @live_bp.route('/live/run_entry/<event_id>/<uuid:run_id>')
 def live_run_entry(event_id, run_id):
     run_id = str(run_id)
-    events = _load_data('events.json')
-    event = next((e for e in events if e.get('id') == event_id), None)
-    run = next((r for r in event.get('runs', []) if r.get('id') == run_id), None) if event else None
+    event = get_event(event_id)
+    run = get_run(event_id, run_id)
     if not event or not run: abort(404)
     settings = _load_settings()
-    _calculate_run_results(run, settings)
+    get_run_results(run, settings)
     laufdaten = run.get('laufdaten', {})
     sct_display = laufdaten.get('standardzeit_sct_gerundet') or laufdaten.get('standardzeit_sct_berechnet') or laufdaten.get('standardzeit_sct') or 'N/A'
     mct_display = laufdaten.get('maximalzeit_mct_gerundet') or laufdaten.get('maximalzeit_mct_berechnet') or laufdaten.get('maximalzeit_mct') or 'N/A'
@@ -294,20 +335,66 @@ def save_result(event_id, run_id):
             'disqualifikation': q.get('disqualifikation')
         }
 
+    with _result_lock:
+        payload, status = _save_result_data(event_id, run_id, data)
+    return jsonify(payload), status
+
+
+@live_bp.route('/api/submit_result', methods=['POST'])
+def submit_result():
+    """
+    Resultate direkt vom Ring-Server (ohne Browser). Einzeln oder als
+    {"results": [...]}; jedes mit idempotency_key, run_id, license_number,
+    zeit, fehler, verweigerungen und optional event_id (sonst aktives Event)
+    und finished_at. Antwort: Status pro Resultat (siehe live/result_intake.py).
+    """
+    payload = request.get_json(force=True, silent=True) or {}
+    with _result_lock:
+        outcomes = ingest_results(payload, _save_from_ring_server, _submitted_results_log(),
+                                  default_event_id=_get_active_event_id())
+    return jsonify({"success": True, "results": outcomes})
+
+
+def _save_from_ring_server(event_id, run_id, data, finished_at=None):
+    return _save_result_data(event_id, run_id, data, finished_at, source='ring_server')
+
+
+def _has_result(entry):
+    result = entry.get('result')
+    return bool(result and (result.get('zeit') or result.get('disqualifikation')))
+
+
+def _save_result_data(event_id, run_id, data, finished_at=None, source='dialog'):
+    """
+    Speichert ein Resultat und verteilt es (Rangliste, Journal, Socket.IO,
+    Portal). Gemeinsamer Kern von save_result (Ring-PC im Browser) und
+    /api/submit_result (Ring-Server). Liefert (Antwort, HTTP-Status).
+
+    ``finished_at`` (ISO-Zeit des Zieldurchgangs): ist der Eintrag schon
+    neuer gespeichert (z.B. Korrektur im Browser), wird nichts überschrieben.
+    Das Tempo des Rings misst nur das erste Resultat eines Starts, mit
+    ``finished_at`` statt der Speicherzeit (nachgelieferte Resultate).
+    ``source`` ("dialog"/"ring_server") steht im Resultat-Protokoll.
+    """
     license_nr = data.get('license_number')
-    from utils import _load_data, _save_data, _load_settings, _calculate_run_results
-    events = _load_data('events.json')
-    event = next((e for e in events if e.get('id') == event_id), None)
-    run = next((r for r in (event.get('runs', []) if event else []) if r.get('id') == run_id), None)
+    event = get_event(event_id)
+    run = get_run(event_id, run_id)
 
     if not all([event, run, license_nr]):
-        return jsonify({"success": False, "message": "Event, Lauf oder Lizenznummer nicht gefunden."}), 404
+        return {"success": False, "message": "Event, Lauf oder Lizenznummer nicht gefunden."}, 404
 
     entry = next((e for e in run.get('entries', []) if e.get('Lizenznummer') == license_nr), None)
     if not entry:
-        return jsonify({"success": False, "message": "Teilnehmer nicht in diesem Lauf gefunden."}), 404
+        return {"success": False, "message": "Teilnehmer nicht in diesem Lauf gefunden."}, 404
+
+    if finished_at and entry.get('result') and str(entry.get('timestamp') or '') >= str(finished_at):
+        submitted = {k: data.get(k) for k in ('zeit', 'fehler', 'verweigerungen', 'disqualifikation')}
+        _log_saved_result(event_id, run, license_nr, submitted, source, "superseded", finished_at)
+        return {"success": True, "superseded": True, "message": "Neueres Ergebnis bereits gespeichert.",
+                "result": entry['result']}, 200
 
     try:
+        first_result = not _has_result(entry)
         # Werte normalisieren
         zeit = data.get('zeit')
         fehler = int(data.get('fehler') or 0)
@@ -327,14 +414,27 @@ def save_result(event_id, run_id):
             run.get('entries', []),
             key=lambda e: _to_int(e.get('Startnummer'), default=999999)
         )
-        unfinished = [
-            e for e in entries_sorted
-            if not (e.get('result') and (e['result'].get('zeit') or e['result'].get('disqualifikation')))
-        ]
+        unfinished = [e for e in entries_sorted if not _has_result(e)]
         run['current_starter'] = unfinished[0] if unfinished else {}
         run['next_starter'] = unfinished[1] if len(unfinished) > 1 else {}
 
-        _save_data('events.json', events)
+        # Rangliste inkrementell nachführen (nur dieser Start, SCT/MCT nur bei neuem Bestwert)
+        ranking = get_run_ranking(run)
+        ranking.update_license(license_nr)
+        store_run_results(run, ranking.results())
+
+        record_event_ops(event, [
+            set_entry_op(run_id, license_nr, result=entry['result'], timestamp=entry['timestamp']),
+            set_run_op(run_id, current_starter=run['current_starter'], next_starter=run['next_starter']),
+        ])
+        settings_for_sync = _load_settings()
+        pace = None
+        if first_result:
+            try:
+                pace = record_result_timing(event, run, finished_at or entry['timestamp'], settings_for_sync,
+                                            license_nr)
+            except Exception:
+                pace = None
 
         # Realtime Updates
         try:
@@ -352,50 +452,50 @@ def save_result(event_id, run_id):
             socketio.emit('current_run_changed', {
                 'event_id': event_id, 'ring_id': ring_num, 'run_block_id': None
             }, room=f"event:{event_id}")
+            # Zeitplan-Prognose: Sprecher holt sich den neu gerechneten Zeitplan
+            socketio.emit('schedule_forecast_changed', {
+                'event_id': event_id, 'ring_id': ring_num, 'pace': pace
+            }, room=f"event:{event_id}")
         except Exception:
             pass
+        push_ring_monitor_update(event, ring_num)
+        _log_saved_result(event_id, run, license_nr, entry['result'], source, "saved", finished_at)
 
         # Portal-Sync: Live-Update + Result-Export im Hintergrund
         try:
-            from portal_sync import push_live_update, send_result_export
-            from threading import Thread
-            settings_for_sync = _load_settings()
+            from portal_sync import push_live_update, schedule_result_export
             if settings_for_sync.get("portal_url"):
-                # 1) Live-Update (Einzel-Ergebnis, asynchron)
+                # 1) Live-Update (Einzel-Ergebnis + Zeitplan-Prognose des Rings, asynchron)
                 if settings_for_sync.get("portal_live_api_key"):
-                    all_results_for_sync = _calculate_run_results(run, settings_for_sync)
+                    all_results_for_sync = get_run_results(run, settings_for_sync)
                     enriched_entry = next(
                         (r for r in all_results_for_sync if r.get("Lizenznummer") == license_nr),
                         entry
                     )
-                    push_live_update(settings_for_sync, event, run, enriched_entry)
+                    try:
+                        ring_forecast = get_schedule_forecast(event, ring=ring_num, settings=settings_for_sync).get(ring_num)
+                    except Exception:
+                        ring_forecast = None
+                    push_live_update(settings_for_sync, event, run, enriched_entry, forecast=ring_forecast)
                 # 2) Result-Export (aktuelle Rangliste, asynchron)
-                if settings_for_sync.get("portal_results_api_key"):
-                    _event_snap = dict(event)  # shallow copy für Thread-Sicherheit
-                    _settings_snap = dict(settings_for_sync)
-                    def _bg_export():
-                        try:
-                            send_result_export(_settings_snap, _event_snap, final=False)
-                        except Exception:
-                            pass
-                    Thread(target=_bg_export, daemon=True).start()
+                # (entprellt: mehrere Resultate kurz nacheinander → ein Upload mit dem neuesten Stand)
+                schedule_result_export(settings_for_sync, event_id)
         except Exception:
             pass  # Portal-Sync darf nie den Hauptprozess unterbrechen
 
-        return jsonify({"success": True, "message": "Ergebnis erfolgreich gespeichert.", "result": entry['result']})
+        return {"success": True, "message": "Ergebnis erfolgreich gespeichert.", "result": entry['result']}, 200
     except Exception as ex:
-        return jsonify({"success": False, "message": f"Fehler beim Speichern: {ex}"}), 500
+        return {"success": False, "message": f"Fehler beim Speichern: {ex}"}, 500
 
 
 @live_bp.route('/live/ranking/<event_id>/<uuid:run_id>')
 def show_ranking(event_id, run_id):
     run_id = str(run_id)
-    events = _load_data('events.json')
-    event = next((e for e in events if e.get('id') == event_id), None)
-    run = next((r for r in event.get('runs', []) if r.get('id') == run_id), None)
+    event = get_event(event_id)
+    run = get_run(event_id, run_id)
     if not event or not run: abort(404)
     settings = _load_settings()
-    rankings = _calculate_run_results(run, settings)
+    rankings = get_run_results(run, settings)
     judges = _load_data('judges.json')
     judge_display = resolve_judge_name(event, run, judges)
 
@@ -416,7 +516,7 @@ def show_ranking(event_id, run_id):
 
 @live_bp.route('/announcer_dashboard/<event_id>')
 def announcer_dashboard(event_id):
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
     ring_numbers = collect_ring_numbers(event)
     ring_views = {ring_no: build_ring_view_model(event, ring_no) for ring_no in ring_numbers}
@@ -475,18 +575,13 @@ def set_active_announcer_run(event_id, run_id):
     }
     state[evt_id] = by_event
     _save_live_state(state)
-    events = _load_data('events.json')
-    if _persist_current_run(events, evt_id, ring_key, run_block.get('id') if run_block else None, run.get('id')):
-        for evt in events:
-            if evt.get("id") != evt_id:
-                continue
-            evt.setdefault("current_runs_by_ring", {})[str(ring_key)] = run.get("id")
-            from utils import sort_entries_for_startlist
-            evt.setdefault("ring_entry_state", {})[str(ring_key)] = init_ring_entry_state(
-                sort_entries_for_startlist(run.get("entries", []))
-            )
-            break
-        _save_data('events.json', events)
+    if _persist_current_run([event], evt_id, ring_key, run_block.get('id') if run_block else None, run.get('id')):
+        event.setdefault("current_runs_by_ring", {})[str(ring_key)] = run.get("id")
+        from utils import sort_entries_for_startlist
+        event.setdefault("ring_entry_state", {})[str(ring_key)] = init_ring_entry_state(
+            sort_entries_for_startlist(run.get("entries", []))
+        )
+        save_event(event)
 
     # Echtzeit-Update
     try:
@@ -501,6 +596,7 @@ def set_active_announcer_run(event_id, run_id):
         socketio.emit('ring_run_changed', payload, room=f"event:{evt_id}")
     except Exception:
         pass
+    push_ring_monitor_update(event, ring_key)
 
     flash(_("'%(run)s' ist jetzt aktiv für die Anzeige auf %(ring)s.", run=run.get('name'), ring=ring_label), 'success')
 
@@ -526,8 +622,7 @@ def ring_starter_changed():
     ring_no = data.get("ring_no")
     if not event_id or not ring_no:
         return jsonify({"success": False, "message": "event_id oder ring_no fehlt"}), 400
-    events = _load_data('events.json')
-    event = next((e for e in events if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event:
         return jsonify({"success": False, "message": "Event nicht gefunden"}), 404
     try:
@@ -538,12 +633,14 @@ def ring_starter_changed():
     if not run_id:
         current_runs = event.get("current_runs_by_ring") or {}
         run_id = current_runs.get(str(ring_no))
-    run = next((r for r in event.get("runs", []) or [] if r.get("id") == run_id), None)
+    run = get_run(event_id, run_id)
     if run:
-        ring_state = event.get("ring_entry_state") or {}
-        ring_state[str(ring_no)] = apply_start_impulse(ring_state.get(str(ring_no)) or {}, run.get("entries", []))
-        event["ring_entry_state"] = ring_state
-        _save_data("events.json", events)
+        # gleiche Sperre wie beim Speichern von Resultaten (Journal-Reihenfolge)
+        with _result_lock:
+            ring_state = event.get("ring_entry_state") or {}
+            ring_state[str(ring_no)] = apply_start_impulse(ring_state.get(str(ring_no)) or {}, run.get("entries", []))
+            event["ring_entry_state"] = ring_state
+            record_event_ops(event, [set_event_op(ring_entry_state=ring_state)])
     payload = _build_ring_payload(event, ring_no)
     payload.update({"event_id": event_id})
     try:
@@ -552,6 +649,7 @@ def ring_starter_changed():
         socketio.emit('ring_ready_changed', payload, room=f"event:{event_id}")
     except Exception:
         pass
+    push_ring_monitor_update(event, ring_no)
     return jsonify({"success": True})
 
 @live_bp.route('/ring_monitor/<int:ring_number>')
@@ -559,7 +657,9 @@ def display_ring_monitor(ring_number):
     event = _get_active_event()
     if not event: return "Kein aktives Event."
     view_model = build_ring_view_model(event, ring_number)
-    return render_template('ring_monitor.html', event=event, ring_name=f"Ring {ring_number}", view_model=view_model, kiosk_mode=True)
+    fragments = _render_monitor_fragments(view_model, _ring_label_for_display(ring_number=ring_number))
+    return render_template('ring_monitor.html', event=event, ring_name=f"Ring {ring_number}", ring_number=ring_number,
+                           fragments=fragments, kiosk_mode=True)
 
 @live_bp.route('/ring_pc_dashboard/<int:ring_number>')
 def ring_pc_dashboard(ring_number):
@@ -574,9 +674,11 @@ def ring_pc_dashboard(ring_number):
         ring_key = str(ring_number)
         runs_for_ring, debug = _schedule_runs_for_ring(event, ring_key)
         judges = _load_data('judges.json')
-        for run in runs_for_ring:
-            run_block, _ = _find_run_block_for_run(event, run, ring_key)
-            run["judge_display"] = resolve_judge_name(event, run, judges, run_block)
+        # Kopien: die Läufe gehören dem Event-Cache des Repositorys
+        runs_for_ring = [
+            {**run, "judge_display": resolve_judge_name(event, run, judges, _find_run_block_for_run(event, run, ring_key)[0])}
+            for run in runs_for_ring
+        ]
         if not runs_for_ring and debug:
             flash(
                 _("Zeitplan gefunden, aber keine Lauf-Blöcke für %(ring)s: %(debug)s", ring=ring_name, debug=', '.join(debug)),
@@ -594,14 +696,12 @@ def ring_pc_dashboard(ring_number):
     if not selected_run_id:
         ring_key = str(ring_number)
         ring_data = (schedule.get("rings") or {}).get(ring_key) or {}
+        index = get_schedule_index(event)
         for block in ring_data.get("blocks") or []:
             block_type = (block.get("type") or block.get("block_type") or "").lower()
             if block_type != "run":
                 continue
-            matched = [
-                run for run in event.get("runs", []) or []
-                if isinstance(run, dict) and schedule_planner._match_run_to_block(run, block)
-            ]
+            matched = index.runs_for_block(block)
             if matched:
                 selected_run_id = matched[0].get("id")
                 break
@@ -631,16 +731,16 @@ def ring_pc_dashboard(ring_number):
 
 @live_bp.route('/api/render_announcer_schedule/<event_id>')
 def render_announcer_schedule(event_id):
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event:
         abort(404)
-    timelines_by_ring = _calculate_timelines(event)
-    return render_template('_announcer_schedule.html', timelines_by_ring=timelines_by_ring)
+    forecast = get_schedule_forecast(event)
+    timelines_by_ring = {ring: data['items'] for ring, data in forecast.items()}
+    return render_template('_announcer_schedule.html', timelines_by_ring=timelines_by_ring, forecast=forecast)
 
 @live_bp.route('/api/render_speaker_panel_content/<event_id>/<ring_name>')
 def render_speaker_panel_content(event_id, ring_name):
-    events = _load_data('events.json')
-    event = next((e for e in events if isinstance(e, dict) and e.get('id') == event_id), None)
+    event = get_event(event_id)
     digits = re.sub(r"[^0-9]", "", str(ring_name))
     ring_number = int(digits) if digits else 1
     ring_label = _ring_label_for_display(ring_number=ring_number)
@@ -734,17 +834,10 @@ def _ring_state_keys(ring_hint: str):
     norm = _norm_ring_strict(ring_hint)              # z.B. "ring_1"
     return [disp, f"Ring {norm}"]
 
-@live_bp.route('/api/render_ring_monitor_content/<int:ring_number>')
-def render_ring_monitor_content(ring_number: int):
-    ring_label = _ring_label_for_display(ring_number=ring_number)
-    event = _get_active_event()
-    if not event:
-        return Response("<div class='ring-monitor'><p>Kein aktives Event.</p></div>", mimetype='text/html')
-    view = build_ring_view_model(event, ring_number)
+def _render_monitor_meta(view, ring_label):
     current_run = view.get("current_run")
     if not current_run:
-        html = f"<div class='ring-monitor'><h2>{ring_label}</h2><p>Kein Lauf wurde für diesen Ring aktiviert.</p></div>"
-        return Response(html, mimetype='text/html')
+        return f"<h2>{ring_label}</h2><p>Kein Lauf wurde für diesen Ring aktiviert.</p>"
     meta_bits = []
     if current_run.get("klasse"):
         meta_bits.append(f"Klasse: {current_run.get('klasse')}")
@@ -753,15 +846,7 @@ def render_ring_monitor_content(ring_number: int):
     if current_run.get("laufart"):
         meta_bits.append(f"Laufart: {current_run.get('laufart')}")
     meta_line = " | ".join(meta_bits) if meta_bits else "—"
-
-    current_starter = view.get("current_starter") or {}
-    current_label = format_ring_name(current_starter)
-    current_startno = current_starter.get("Startnummer")
-    current_startno_display = f"#{current_startno}" if current_startno else ""
-
-    parts = [
-        "<div class='ring-monitor'>",
-        "<div class='mb-3'>",
+    return ''.join([
         f"<h2 class='h3 mb-1'>{ring_label} – {current_run.get('title','')}</h2>",
         f"<div class='text-muted mb-2'><strong>Richter:</strong> {current_run.get('judge_name','—')}</div>",
         "<div class='card shadow-sm mb-3'>",
@@ -774,30 +859,136 @@ def render_ring_monitor_content(ring_number: int):
         "</div>",
         f"<div class='mt-2 small text-muted'>{meta_line}</div>",
         "</div></div>",
-        "</div>",
+    ])
+
+
+def _render_monitor_startlist(view):
+    start_entries = view.get("startlist") or []
+    if not start_entries:
+        return "<li class='list-group-item text-muted'>Keine Startliste verfügbar.</li>"
+    parts = []
+    for entry in start_entries:
+        startno = entry.get("Startnummer")
+        startno_display = f"#{startno}" if startno else ""
+        parts.append(
+            "<li class='list-group-item d-flex justify-content-between align-items-center'>"
+            f"<span class='fw-semibold'>{format_ring_name(entry)}</span>"
+            f"<span class='small text-muted'>{startno_display}</span>"
+            "</li>"
+        )
+    return ''.join(parts)
+
+
+def _render_monitor_ranking(view):
+    ranked_results = view.get("ranking") or []
+    if not ranked_results:
+        return "<tr><td colspan='4' class='text-muted'>Noch keine Rangliste verfügbar.</td></tr>"
+    return ''.join(
+        "<tr>"
+        f"<td>{res.get('platz')}</td>"
+        f"<td>{format_ring_name(res)}</td>"
+        f"<td>{_format_total_errors(res)}</td>"
+        f"<td>{_format_time(res.get('zeit_total'))}</td>"
+        "</tr>"
+        for res in ranked_results
+    )
+
+
+def _render_monitor_last_results(view):
+    last_results = view.get("last_results") or []
+    if not last_results:
+        return "<div class='text-muted'>Noch keine Ergebnisse.</div>"
+    parts = ["<div class='d-flex flex-column gap-2'>"]
+    for res in last_results:
+        platz = res.get("platz") or "—"
+        parts.append(
+            "<div class='d-flex justify-content-between align-items-center'>"
+            f"<span class='fw-semibold'>{platz} – {format_ring_name(res)}</span>"
+            f"<span class='text-muted small'>Fehler {_format_total_errors(res)} · Zeit {_format_time(res.get('zeit_total') or res.get('zeit'))} s</span>"
+            "</div>"
+        )
+    parts.append("</div>")
+    return ''.join(parts)
+
+
+def _render_monitor_current(view):
+    current_starter = view.get("current_starter") or {}
+    current_startno = current_starter.get("Startnummer")
+    current_startno_display = f"#{current_startno}" if current_startno else ""
+    return (
+        "<div class='text-uppercase small text-muted'>Aktueller Starter</div>"
+        f"<div class='display-6 fw-semibold'>{format_ring_name(current_starter)}</div>"
+        f"<div class='text-muted'>{current_startno_display}</div>"
+    )
+
+
+def _render_monitor_fragments(view, ring_label):
+    """Alle Fragmente des Ring-Monitors (Name → HTML), siehe MONITOR_FRAGMENTS."""
+    return {
+        "meta": _render_monitor_meta(view, ring_label),
+        "startlist": _render_monitor_startlist(view),
+        "ranking": _render_monitor_ranking(view),
+        "last_results": _render_monitor_last_results(view),
+        "current": _render_monitor_current(view),
+    }
+
+
+def push_ring_monitor_update(event, ring_number):
+    """
+    Berechnet das Ring-View-Model einmal und sendet nur die geänderten
+    Monitor-Fragmente an den Room event:<id>:ring:<n> (alle Monitore gleichzeitig).
+    """
+    try:
+        ring_no = int(re.sub(r"[^0-9]", "", str(ring_number)) or 1)
+        view = build_ring_view_model(event, ring_no)
+        fragments = _render_monitor_fragments(view, _ring_label_for_display(ring_number=ring_no))
+        room = monitor_room(event.get('id'), ring_no)
+        changed = _monitor_fragments.update(room, fragments)
+        if changed:
+            socketio.emit('ring_monitor_patch', {
+                'event_id': event.get('id'), 'ring_no': ring_no, 'fragments': changed,
+            }, room=room)
+    except Exception:
+        pass
+
+
+@socketio.on('ring_monitor_sync')
+def handle_ring_monitor_sync(data):
+    """Monitor (neu) verbunden: vollständigen Stand nur an diesen Client senden."""
+    data = data or {}
+    event = get_event(data.get('event_id')) or _get_active_event()
+    try:
+        ring_no = int(data.get('ring_no') or 1)
+    except (TypeError, ValueError):
+        ring_no = 1
+    if not event:
+        return
+    view = build_ring_view_model(event, ring_no)
+    fragments = _render_monitor_fragments(view, _ring_label_for_display(ring_number=ring_no))
+    _monitor_fragments.update(monitor_room(event.get('id'), ring_no), fragments)
+    emit('ring_monitor_patch', {'event_id': event.get('id'), 'ring_no': ring_no, 'fragments': fragments})
+
+
+@live_bp.route('/api/render_ring_monitor_content/<int:ring_number>')
+def render_ring_monitor_content(ring_number: int):
+    ring_label = _ring_label_for_display(ring_number=ring_number)
+    event = _get_active_event()
+    if not event:
+        return Response("<div class='ring-monitor'><p>Kein aktives Event.</p></div>", mimetype='text/html')
+    view = build_ring_view_model(event, ring_number)
+    if not view.get("current_run"):
+        html = f"<div class='ring-monitor'>{_render_monitor_meta(view, ring_label)}</div>"
+        return Response(html, mimetype='text/html')
+    fragments = _render_monitor_fragments(view, ring_label)
+
+    parts = [
+        "<div class='ring-monitor'>",
+        "<div class='mb-3'>", fragments["meta"], "</div>",
         "<div class='row g-3'>",
         "<div class='col-12 col-lg-6'>",
         "<div class='card shadow-sm h-100'>",
         "<div class='card-header bg-light fw-semibold'>Aktuelle Startliste</div>",
-        "<ul class='list-group list-group-flush'>",
-    ]
-
-    start_entries = view.get("startlist") or []
-    if start_entries:
-        for entry in start_entries:
-            startno = entry.get("Startnummer")
-            startno_display = f"#{startno}" if startno else ""
-            parts.append(
-                "<li class='list-group-item d-flex justify-content-between align-items-center'>"
-                f"<span class='fw-semibold'>{format_ring_name(entry)}</span>"
-                f"<span class='small text-muted'>{startno_display}</span>"
-                "</li>"
-            )
-    else:
-        parts.append("<li class='list-group-item text-muted'>Keine Startliste verfügbar.</li>")
-
-    parts.extend([
-        "</ul>",
+        "<ul class='list-group list-group-flush'>", fragments["startlist"], "</ul>",
         "</div>",
         "</div>",
         "<div class='col-12 col-lg-6'>",
@@ -806,25 +997,7 @@ def render_ring_monitor_content(ring_number: int):
         "<div class='table-responsive'>",
         "<table class='table table-sm mb-0'>",
         "<thead><tr><th>Platz</th><th>Name</th><th>Gesamtfehler</th><th>Zeit</th></tr></thead>",
-        "<tbody>",
-    ])
-
-    ranked_results = view.get("ranking") or []
-    if ranked_results:
-        for res in ranked_results:
-            parts.append(
-                "<tr>"
-                f"<td>{res.get('platz')}</td>"
-                f"<td>{format_ring_name(res)}</td>"
-                f"<td>{_format_total_errors(res)}</td>"
-                f"<td>{_format_time(res.get('zeit_total'))}</td>"
-                "</tr>"
-            )
-    else:
-        parts.append("<tr><td colspan='4' class='text-muted'>Noch keine Rangliste verfügbar.</td></tr>")
-
-    parts.extend([
-        "</tbody>",
+        "<tbody>", fragments["ranking"], "</tbody>",
         "</table>",
         "</div>",
         "</div>",
@@ -832,37 +1005,13 @@ def render_ring_monitor_content(ring_number: int):
         "</div>",
         "<div class='card shadow-sm mt-3'>",
         "<div class='card-header bg-light fw-semibold'>Letzte 3 Ergebnisse</div>",
-        "<div class='card-body py-2'>",
-    ])
-
-    last_results = view.get("last_results") or []
-    if last_results:
-        parts.append("<div class='d-flex flex-column gap-2'>")
-        for res in last_results:
-            platz = res.get("platz") or "—"
-            parts.append(
-                "<div class='d-flex justify-content-between align-items-center'>"
-                f"<span class='fw-semibold'>{platz} – {format_ring_name(res)}</span>"
-                f"<span class='text-muted small'>Fehler {_format_total_errors(res)} · Zeit {_format_time(res.get('zeit_total') or res.get('zeit'))} s</span>"
-                "</div>"
-            )
-        parts.append("</div>")
-    else:
-        parts.append("<div class='text-muted'>Noch keine Ergebnisse.</div>")
-
-    parts.extend([
-        "</div>",
+        "<div class='card-body py-2'>", fragments["last_results"], "</div>",
         "</div>",
         "<div class='card bg-dark text-white mt-3'>",
-        "<div class='card-body text-center'>",
-        "<div class='text-uppercase small text-muted'>Aktueller Starter</div>",
-        f"<div class='display-6 fw-semibold'>{current_label}</div>",
-        f"<div class='text-muted'>{current_startno_display}</div>",
-        "</div>",
+        "<div class='card-body text-center'>", fragments["current"], "</div>",
         "</div>",
         "</div>",
-    ])
-
+    ]
     return Response(''.join(parts), mimetype='text/html')
 
 
@@ -871,41 +1020,46 @@ def api_update_run_laufdaten(event_id, run_id):
     """Aktualisiert Laufdaten (Parcours, Richter, SCT) direkt vom Ring-PC-Dashboard."""
     run_id = str(run_id)
     data = request.get_json(force=True, silent=True) or {}
-    events = _load_data('events.json')
-    event = next((e for e in events if e.get('id') == event_id), None)
-    run = next((r for r in (event.get('runs', []) if event else []) if r.get('id') == run_id), None)
+    event = get_event(event_id)
+    run = get_run(event_id, run_id)
     if not event or not run:
         return jsonify({'success': False, 'message': 'Event oder Lauf nicht gefunden.'}), 404
 
-    laufdaten = run.get('laufdaten', {})
-
-    raw_laenge = data.get('parcours_laenge')
-    if raw_laenge not in (None, ''):
-        laufdaten['parcours_laenge'] = raw_laenge
-
-    raw_hind = data.get('anzahl_hindernisse')
-    if raw_hind not in (None, ''):
-        laufdaten['anzahl_hindernisse'] = raw_hind
-
-    if run.get('klasse') in ['1', 'Oldie']:
-        laufdaten['sct_direkt'] = bool(data.get('sct_direkt', False))
-        if laufdaten['sct_direkt']:
-            laufdaten['standardzeit_sct'] = data.get('standardzeit_sct', '')
-            laufdaten['geschwindigkeit'] = ''
-        else:
-            laufdaten['geschwindigkeit'] = data.get('geschwindigkeit', '')
-            laufdaten['standardzeit_sct'] = ''
-
-    judge_id = data.get('judge_id') or ''
-    run['judge_id'] = judge_id
-    run['richter_id'] = judge_id
-    run['laufdaten'] = laufdaten
-
-    # SCT/MCT neu berechnen
     settings = _load_settings()
-    _calculate_run_results(run, settings)
-
-    _save_data('events.json', events)
+    # Resultate desselben Laufs werden gleichzeitig gespeichert: erst nach dem
+    # Journal wieder freigeben, sonst rangiert ein Resultat gegen halbe Laufdaten
+    with _result_lock:
+        laufdaten = run.get('laufdaten', {})
+
+        raw_laenge = data.get('parcours_laenge')
+        if raw_laenge not in (None, ''):
+            laufdaten['parcours_laenge'] = raw_laenge
+
+        raw_hind = data.get('anzahl_hindernisse')
+        if raw_hind not in (None, ''):
+            laufdaten['anzahl_hindernisse'] = raw_hind
+
+        if run.get('klasse') in ['1', 'Oldie']:
+            laufdaten['sct_direkt'] = bool(data.get('sct_direkt', False))
+            if laufdaten['sct_direkt']:
+                laufdaten['standardzeit_sct'] = data.get('standardzeit_sct', '')
+                laufdaten['geschwindigkeit'] = ''
+            else:
+                laufdaten['geschwindigkeit'] = data.get('geschwindigkeit', '')
+                laufdaten['standardzeit_sct'] = ''
+
+        judge_id = data.get('judge_id') or ''
+        run['judge_id'] = judge_id
+        run['richter_id'] = judge_id
+        run['laufdaten'] = laufdaten
+
+        # SCT/MCT neu berechnen
+        invalidate_run_results(run_id)
+        get_run_results(run, settings)
+
+        record_event_ops(event, [
+            set_run_op(run_id, laufdaten=run['laufdaten'], judge_id=judge_id, richter_id=judge_id),
+        ])
 
     # Monitore aktualisieren
     try:
@@ -916,6 +1070,7 @@ def api_update_run_laufdaten(event_id, run_id):
         socketio.emit('announcer_update', payload, room=f"event:{event_id}")
     except Exception:
         pass
+    push_ring_monitor_update(event, ring_num)
 
     updated_laufdaten = run.get('laufdaten', {})
     return jsonify({
@@ -933,27 +1088,33 @@ def api_set_participant_status(event_id, run_id):
     license_nr = data.get('license_number')
     status = data.get('status', '')
 
-    events = _load_data('events.json')
-    event = next((e for e in events if e.get('id') == event_id), None)
-    run = next((r for r in (event.get('runs', []) if event else []) if r.get('id') == run_id), None)
+    event = get_event(event_id)
+    run = get_run(event_id, run_id)
     if not event or not run or not license_nr:
         return jsonify({'success': False, 'message': 'Event, Lauf oder Lizenznummer fehlt.'}), 404
 
-    entry = next((e for e in run.get('entries', []) if e.get('Lizenznummer') == license_nr), None)
-    if not entry:
-        return jsonify({'success': False, 'message': 'Teilnehmer nicht gefunden.'}), 404
-
-    if status == 'DNS':
-        # Nicht gestartet: als Ergebnis speichern (wird in Rangliste als DNS gewertet)
-        entry['result'] = {'zeit': None, 'fehler': 0, 'verweigerungen': 0, 'disqualifikation': 'DNS'}
-        entry['timestamp'] = datetime.now().isoformat()
-    elif status == 'a.K.':
-        # Ausser Konkurrenz: kein Ergebnis, nur Vermerk
-        entry['status_vermerk'] = 'a.K.'
-    else:
-        return jsonify({'success': False, 'message': f'Unbekannter Status: {status}'}), 400
+    # Gleiches Lock wie save_result: die Rangierung des Laufs ist geteilt
+    with _result_lock:
+        entry = next((e for e in run.get('entries', []) if e.get('Lizenznummer') == license_nr), None)
+        if not entry:
+            return jsonify({'success': False, 'message': 'Teilnehmer nicht gefunden.'}), 404
+
+        if status == 'DNS':
+            # Nicht gestartet: als Ergebnis speichern (wird in Rangliste als DNS gewertet)
+            entry['result'] = {'zeit': None, 'fehler': 0, 'verweigerungen': 0, 'disqualifikation': 'DNS'}
+            entry['timestamp'] = datetime.now().isoformat()
+            op = set_entry_op(run_id, license_nr, result=entry['result'], timestamp=entry['timestamp'])
+        elif status == 'a.K.':
+            # Ausser Konkurrenz: kein Ergebnis, nur Vermerk
+            entry['status_vermerk'] = 'a.K.'
+            op = set_entry_op(run_id, license_nr, status_vermerk='a.K.')
+        else:
+            return jsonify({'success': False, 'message': f'Unbekannter Status: {status}'}), 400
 
-    _save_data('events.json', events)
+        ranking = get_run_ranking(run)
+        ranking.update_license(license_nr)
+        store_run_results(run, ranking.results())
+        record_event_ops(event, [op])
 
     try:
         ring_num = re.sub(r"[^0-9]", "", str(run.get('assigned_ring') or "")) or "1"
@@ -964,6 +1125,7 @@ def api_set_participant_status(event_id, run_id):
                       room=f"event:{event_id}")
     except Exception:
         pass
+    push_ring_monitor_update(event, ring_num)
 
     return jsonify({'success': True})
 
@@ -979,24 +1141,29 @@ def export_results_to_portal(event_id):
     POST → ZIP erzeugen und direkt ans Portal senden (benötigt konfigurierte URL+Key)
 
     Query-Parameter:
-      ?final=1  → Export als Abschluss-Export markieren (setzt event.is_completed im Portal)
+      ?final=1    → Export als Abschluss-Export markieren (setzt event.is_completed im Portal)
+      ?delta=1    → nur seit dem letzten bestätigten Export geänderte Läufe
+                    (POST ohne Angabe: Einstellung portal_export_delta)
+      ?pending=1  → (GET) offene Läufe als JSON statt ZIP
     """
-    from utils import _load_data, _load_settings
-    from portal_sync import build_result_export_zip, send_result_export
-    from flask import send_file
+    from portal_sync import build_result_export_zip, send_result_export, pending_export_runs
 
-    events   = _load_data('events.json')
-    event    = next((e for e in events if e.get('id') == event_id), None)
+    event    = get_event(event_id)
     if not event:
         abort(404)
 
     final    = request.args.get('final', '0') == '1'
+    delta_arg = request.args.get('delta')
+    delta    = None if delta_arg is None else delta_arg == '1'
     settings = _load_settings()
 
     if request.method == 'GET':
+        if request.args.get('pending') == '1':
+            pending = pending_export_runs(event, settings)
+            return jsonify({'event_id': event_id, 'pending_count': len(pending), 'pending_runs': pending})
         # ZIP zum Download anbieten
-        zip_bytes = build_result_export_zip(event, final=final)
-        filename  = f"results_{event_id}.zip"
+        zip_bytes = build_result_export_zip(event, final=final, delta=bool(delta))
+        filename  = f"results_{event_id}{'_delta' if delta and not final else ''}.zip"
         return Response(
             zip_bytes,
             mimetype='application/zip',
@@ -1004,11 +1171,14 @@ def export_results_to_portal(event_id):
         )
 
     # POST → ans Portal senden
-    result = send_result_export(settings, event, final=final)
+    result = send_result_export(settings, event, final=final, delta=delta)
     if result.get('error'):
         flash(_('Portal-Export fehlgeschlagen: %(error)s', error=result["error"]), 'danger')
+    elif result.get('skipped'):
+        flash(_('Keine geänderten Ergebnisse seit dem letzten Portal-Export.'), 'info')
     else:
-        status_detail = f'(final={result.get("final")}, event={result.get("event_external_id")})'
+        status_detail = (f'(final={result.get("final")}, event={result.get("event_external_id")}, '
+                         f'{"Delta, " if result.get("delta") else ""}Läufe={result.get("classes_sent")})')
         flash(_('Ergebnisse erfolgreich ans Portal übertragen %(detail)s', detail=status_detail), 'success')
     return redirect(url_for('live_bp.live_event_dashboard'))
 
@@ -1032,12 +1202,11 @@ def upload_ranking_pdf(event_id, run_id):
     import requests as _req
 
     settings = _load_settings()
-    events   = _load_data('events.json')
-    event    = next((e for e in events if e.get('id') == event_id), None)
+    event    = get_event(event_id)
     if not event:
         return jsonify({"error": "Event nicht gefunden"}), 404
 
-    run = next((r for r in event.get('runs', []) if r.get('id') == run_id), None)
+    run = get_run(event_id, run_id)
     if not run:
         return jsonify({"error": "Lauf nicht gefunden"}), 404
 
@@ -1053,7 +1222,7 @@ def upload_ranking_pdf(event_id, run_id):
         return jsonify({"error": "Event hat keine external_id – bitte Turnier neu vom Portal importieren"}), 400
 
     # Ergebnisse berechnen
-    results        = _calculate_run_results(run, settings)
+    results        = get_run_results(run, settings)
     judges         = _load_data('judges.json')
     judge_display  = resolve_judge_name(event, run, judges)
 
@@ -3,8 +3,9 @@ from flask import Blueprint, render_template, abort, request, redirect, url_for,
 from datetime import datetime
 import csv
 import io
-from utils import (_load_data, _save_data, _calculate_run_results, _load_settings,
-                   _calculate_timelines, get_category_sort_key, resolve_judge_id, resolve_judge_name)
+from utils import (_load_data, _save_data, _load_settings,
+                   _calculate_timelines, get_category_sort_key, resolve_judge_id, resolve_judge_name,
+                   get_event, save_event, get_dogs_by_license, get_handlers_by_id, get_run_results)
 from planner.print_order import get_ordered_runs_for_print
 from planner.print_schedule_order import (
     build_schedule_print_sections,
@@ -28,7 +29,7 @@ print_bp = Blueprint('print_bp', __name__, template_folder='../templates')
 @print_bp.route('/print/<event_id>')
 def print_index(event_id):
     """Übersichtsseite für Vorbereitungsdrucksachen."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
     return render_template('print/index.html', event=event)
 
@@ -37,23 +38,24 @@ def _get_enriched_participants(event):
     all_entries = [entry for run in event.get('runs', []) for entry in run.get('entries', []) if entry.get('Startnummer')]
     unique_participants_dict = {v['Lizenznummer']: v for v in all_entries}
     
-    dog_map = {d['Lizenznummer']: d for d in _load_data('dogs.json')}
+    dog_map = get_dogs_by_license()
 
     participants_with_data = []
     for lic, entry in unique_participants_dict.items():
         dog_info = dog_map.get(lic, {})
-        entry.update({
+        # Kopie: die Einträge gehören dem geteilten Event-Cache
+        participants_with_data.append({
+            **entry,
             'Kategorie': dog_info.get('Kategorie', 'N/A'),
             'Klasse': str(dog_info.get('Klasse', 'N/A'))
         })
-        participants_with_data.append(entry)
     
     return participants_with_data
 
 @print_bp.route('/print/schedule/<event_id>')
 def print_schedule(event_id):
     """Druckansicht für den Zeitplan."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
     try:
         timelines_by_ring = _calculate_timelines(event, round_to_minutes=5)
@@ -108,7 +110,7 @@ def print_briefing_groups(event_id=None):
     schedule = event.get('schedule') or {}
     schedule_blocks_count = 0
     briefing_blocks_count = 0
-    dogs_map = {d['Lizenznummer']: d for d in _load_data('dogs.json')}
+    dogs_map = get_dogs_by_license()
     sessions_by_ring = []
     for ring_key in sorted(timelines_by_ring.keys(), key=lambda x: int(x) if str(x).isdigit() else str(x)):
         timeline_items = timelines_by_ring.get(ring_key) or []
@@ -177,7 +179,7 @@ def print_briefing_groups(event_id=None):
 @print_bp.route('/print/startlists/<event_id>')
 def print_startlists(event_id):
     """Offizielle Startliste, sortiert nach Zeitplan-Reihenfolge."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
     ordered_runs = get_ordered_runs_for_print(event)
     return render_template('print_startlists.html', event=event, ordered_runs=ordered_runs)
@@ -186,7 +188,7 @@ def print_startlists(event_id):
 @print_bp.route('/print/startlists_by_schedule/<event_id>')
 def print_startlists_by_schedule(event_id):
     """Startliste nach Zeitplan-Reihenfolge."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event:
         abort(404)
     sections = build_schedule_print_sections(event)
@@ -195,19 +197,18 @@ def print_startlists_by_schedule(event_id):
 @print_bp.route('/print/stewardlists/<event_id>')
 def print_stewardlists(event_id):
     """Ringschreiber-Listen in Zeitplan-Reihenfolge."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
-    ordered_runs = get_ordered_runs_for_print(event)
     judges = _load_data('judges.json')
-    for run in ordered_runs:
-        run["judge_display"] = resolve_judge_name(event, run, judges)
+    ordered_runs = [{**run, "judge_display": resolve_judge_name(event, run, judges)}
+                    for run in get_ordered_runs_for_print(event)]
     return render_template('print/scribe_list.html', event=event, title="Ringschreiberlisten", ordered_runs=ordered_runs, judges=judges)
 
 
 @print_bp.route('/print/stewardlists_by_schedule/<event_id>', endpoint='print_stewardlists_by_schedule_view')
 def print_stewardlists_by_schedule_view(event_id):
     """Ringschreiber-Listen nach Zeitplan-Reihenfolge."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event:
         abort(404)
     judges = _load_data('judges.json')
@@ -225,7 +226,7 @@ def print_stewardlists_by_schedule_view(event_id):
 @print_bp.route('/print/master_steward_list/<event_id>')
 def print_master_steward_list(event_id):
     """Erstellt eine Master-Einweiserliste: 1 Zeile pro Teilnehmer, 1 Spalte pro Lauf."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
     participants, grouped_participants = _get_enriched_participants(event), {}
     for p in participants:
@@ -251,7 +252,7 @@ def print_master_steward_list(event_id):
 @print_bp.route('/print/master_steward_list_by_schedule/<event_id>')
 def print_master_steward_list_by_schedule(event_id):
     """Master-Einweiserliste nach Zeitplan-Reihenfolge."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event:
         abort(404)
     sections = build_schedule_steward_sections(event)
@@ -260,14 +261,13 @@ def print_master_steward_list_by_schedule(event_id):
 @print_bp.route('/print/participant_list/<event_id>')
 def print_participant_list(event_id):
     """Alphabetische Teilnehmerliste mit Startnummer."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
     all_entries, unique_participants_dict = [entry for run in event.get('runs', []) for entry in run.get('entries', [])], {v['Lizenznummer']: v for v in [entry for run in event.get('runs', []) for entry in run.get('entries', [])]}
-    handlers_map, dogs_map, participants_with_data = {h['id']: h for h in _load_data('handlers.json')}, {d['Lizenznummer']: d for d in _load_data('dogs.json')}, []
+    handlers_map, dogs_map, participants_with_data = get_handlers_by_id(), get_dogs_by_license(), []
     for lic, entry in unique_participants_dict.items():
         dog_info, handler_info = dogs_map.get(lic, {}), handlers_map.get(dog_info.get('Hundefuehrer_ID'), {})
-        entry.update({'Kategorie': dog_info.get('Kategorie'), 'Klasse': dog_info.get('Klasse'), 'Hundefuehrer_Nachname': handler_info.get('Nachname', ''), 'Hundefuehrer_Vorname': handler_info.get('Vorname', '')})
-        participants_with_data.append(entry)
+        participants_with_data.append({**entry, 'Kategorie': dog_info.get('Kategorie'), 'Klasse': dog_info.get('Klasse'), 'Hundefuehrer_Nachname': handler_info.get('Nachname', ''), 'Hundefuehrer_Vorname': handler_info.get('Vorname', '')})
     sorted_participants = sorted(participants_with_data, key=lambda x: (x.get('Hundefuehrer_Nachname', 'z').lower(), x.get('Hundefuehrer_Vorname', 'z').lower()))
     return render_template('print/participant_list.html', event=event, participants=sorted_participants)
 
@@ -275,10 +275,10 @@ def print_participant_list(event_id):
 def print_ranking_single(event_id, run_id):
     """Archiv-Rangliste."""
     run_id = str(run_id)
-    settings, event = _load_settings(), next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    settings, event = _load_settings(), get_event(event_id)
     run = next((r for r in event.get('runs', []) if r.get('id') == run_id), None)
     if not event or not run: abort(404)
-    results = _calculate_run_results(run, settings)
+    results = get_run_results(run, settings)
     judges = _load_data('judges.json')
     judge_display = resolve_judge_name(event, run, judges)
     return render_template('print_ranking_single.html', event=event, run=run, results=results, judges=judges, judge_display=judge_display)
@@ -286,17 +286,15 @@ def print_ranking_single(event_id, run_id):
 @print_bp.route('/print/select_award_list/<event_id>', methods=['GET', 'POST'])
 def select_award_list(event_id):
     """Zeigt die Auswahlseite für die Siegerehrungs-Rangliste an und verarbeitet die Auswahl."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
     if request.method == 'POST':
         run_ids = request.form.getlist('run_ids')
         if not run_ids: flash("Keine Läufe für die Liste ausgewählt.", "warning"); return redirect(url_for('print_bp.select_award_list', event_id=event_id))
-        events = _load_data('events.json')
-        event_to_update = next((e for e in events if e.get('id') == event_id), None)
-        for run in event_to_update.get('runs', []):
+        for run in event.get('runs', []):
             if run.get('id') in run_ids:
                 run['awarded_at'] = datetime.now().isoformat()
-        _save_data('events.json', events)
+        save_event(event)
         return redirect(url_for('print_bp.print_award_list', event_id=event_id, run_ids=",".join(run_ids)))
     all_runs = event.get('runs', [])
     available_categories = sorted(list(set(r['kategorie'] for r in all_runs if r.get('kategorie'))), key=get_category_sort_key)
@@ -308,12 +306,12 @@ def select_award_list(event_id):
 def print_award_list(event_id):
     """Druckt die eigentliche Siegerehrungsliste für ausgewählte Läufe."""
     run_ids = request.args.get('run_ids', '').split(',')
-    settings, event = _load_settings(), next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    settings, event = _load_settings(), get_event(event_id)
     if not event: abort(404)
     award_data, runs_to_print = [], [r for r in event.get('runs', []) if r.get('id') in run_ids]
     judges = _load_data('judges.json')
     for run in runs_to_print:
-        results = _calculate_run_results(run, settings)
+        results = get_run_results(run, settings)
         award_data.append({
             'name': run.get('name'),
             'full_judge_name': resolve_judge_name(event, run, judges),
@@ -324,7 +322,7 @@ def print_award_list(event_id):
 @print_bp.route('/print/tkamo_export/<event_id>')
 def tkamo_export(event_id):
     """Erstellt eine reglementskonforme CSV-Datei für den TKAMO-Upload."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
     
     settings = _load_settings()
@@ -338,14 +336,13 @@ def tkamo_export(event_id):
     judges = _load_data('judges.json')
     
     # Lade Hundeführer- und Hundedaten für den Export
-    handlers_data = _load_data('handlers.json')
-    dogs_map = {d['Lizenznummer']: d for d in _load_data('dogs.json')}
-    handler_map = {h['id']: h for h in handlers_data}
+    dogs_map = get_dogs_by_license()
+    handler_map = get_handlers_by_id()
 
     for run in all_runs:
         if run.get('laufart') not in ['Agility', 'Jumping', 'Open', 'Open-Agility']: continue
             
-        results = _calculate_run_results(run, settings)
+        results = get_run_results(run, settings)
         
         for res in results:
             if not res.get('result'): continue
@@ -398,8 +395,8 @@ _CAT_SHORT = {v: k for k, v in _CAT_LABEL_LC.items()}  # Large→L etc.
 def _lizenzcheck_participants(event):
     """Liefert eine deduplizierte, sortierte Liste aller Teilnehmer (nach Kat/Klasse),
     analog zum CSV-Export: je Lizenznummer nur einmal, mit Kat/Klasse aus dogs.json."""
-    dogs_map     = {d['Lizenznummer']: d for d in _load_data('dogs.json')}
-    handlers_map = {h['id']: h for h in _load_data('handlers.json')}
+    dogs_map     = get_dogs_by_license()
+    handlers_map = get_handlers_by_id()
 
     seen = {}
     for run in event.get('runs', []):
@@ -427,7 +424,7 @@ def _lizenzcheck_participants(event):
 @print_bp.route('/print/lizenzcheck/<event_id>', methods=['GET'])
 def lizenzcheck_index(event_id):
     """Lizenzcheck-Seite: CSV-Download-Button + Textarea für TKAMO-Ergebnis."""
-    event = next((e for e in _load_data('events.json') if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
     return render_template('print/lizenzcheck.html', event=event,
                            done=event.get('lizenzcheck_done'),
@@ -438,11 +435,10 @@ def lizenzcheck_index(event_id):
 @print_bp.route('/print/lizenzcheck_cancel/<event_id>', methods=['POST'])
 def lizenzcheck_cancel(event_id):
     """Pending-CSV-Export abbrechen ohne Ergebnis zu importieren."""
-    all_events = _load_data('events.json')
-    event = next((e for e in all_events if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
     event.pop('lizenzcheck_csv_exported_at', None)
-    _save_data('events.json', all_events)
+    save_event(event)
     flash('Lizenzcheck-Export abgebrochen.', 'info')
     return redirect(url_for('print_bp.lizenzcheck_index', event_id=event_id))
 
@@ -450,8 +446,7 @@ def lizenzcheck_cancel(event_id):
 @print_bp.route('/print/lizenzcheck_csv/<event_id>')
 def lizenzcheck_csv(event_id):
     """CSV-Export für TKAMO. ?filter=flagged → nur Lizenzen aus letztem Report."""
-    all_events = _load_data('events.json')
-    event = next((e for e in all_events if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
 
     only_flagged = request.args.get('filter') == 'flagged'
@@ -481,7 +476,7 @@ def lizenzcheck_csv(event_id):
     event['lizenzcheck_csv_exported_at'] = _dt.utcnow().isoformat()
     if not only_flagged:
         event['lizenzcheck_done'] = False  # Neuer Vollcheck → Status zurücksetzen
-    _save_data('events.json', all_events)
+    save_event(event)
 
     suffix = '_abweichungen' if only_flagged else ''
     return Response(
@@ -494,8 +489,7 @@ def lizenzcheck_csv(event_id):
 @print_bp.route('/print/lizenzcheck/<event_id>', methods=['POST'])
 def lizenzcheck_process(event_id):
     """TKAMO-Ergebnistext verarbeiten und Korrekturen automatisch übernehmen."""
-    all_events = _load_data('events.json')
-    event = next((e for e in all_events if e.get('id') == event_id), None)
+    event = get_event(event_id)
     if not event: abort(404)
 
     report_text = request.form.get('tkamo_result', '').strip()
@@ -621,7 +615,7 @@ def lizenzcheck_process(event_id):
     event['lizenzcheck_done_at']         = __import__('datetime').datetime.utcnow().isoformat()
     event['lizenzcheck_flagged_licenses'] = list(flagged_licenses)
     event.pop('lizenzcheck_csv_exported_at', None)  # Pending aufheben
-    _save_data('events.json', all_events)
+    save_event(event)
 
     report = {
         'name_changes':      name_changes,
@@ -7,7 +7,7 @@ import io
 from flask import (Blueprint, render_template, request, redirect,
                    url_for, flash, abort, Response)
 
-from utils import _load_data, _save_data, _load_settings, _calculate_run_results
+from utils import _load_settings, get_run_results, get_event, save_event
 from sm_qualification import (
     calculate_sm_qualification, get_sm_runs,
     CATEGORIES, SM_RUN_TYPES,
@@ -15,15 +15,10 @@ from sm_qualification import (
 
 sm_bp = Blueprint('sm_bp', __name__, template_folder='../templates', url_prefix='/sm')
 
-EVENTS_FILE = 'events.json'
-
-
 # ── Helfer ────────────────────────────────────────────────────────────────────
 
 def _get_event(event_id: str):
-    events = _load_data(EVENTS_FILE)
-    event  = next((e for e in events if e.get('id') == event_id), None)
-    return events, event
+    return get_event(event_id)
 
 
 # ── Routen ────────────────────────────────────────────────────────────────────
@@ -31,7 +26,7 @@ def _get_event(event_id: str):
 @sm_bp.get('/dashboard/<event_id>')
 def sm_dashboard(event_id):
     """SM-Übersicht: Qualifikationsergebnisse aller Kategorien."""
-    events, event = _get_event(event_id)
+    event = _get_event(event_id)
     if not event:
         abort(404)
 
@@ -39,8 +34,8 @@ def sm_dashboard(event_id):
     settings = _load_settings()
     for run in event.get('runs', []):
         if run.get('sm_run_type'):
-            _calculate_run_results(run, settings)
-    _save_data(EVENTS_FILE, events)
+            get_run_results(run, settings)
+    save_event(event)
 
     sm_data = calculate_sm_qualification(event)
     sm_runs = get_sm_runs(event)
@@ -58,7 +53,7 @@ def sm_dashboard(event_id):
 @sm_bp.route('/config/<event_id>', methods=['GET', 'POST'])
 def sm_config(event_id):
     """SM-Konfiguration: Titelverteidiger und Total-Starters pro Kategorie."""
-    events, event = _get_event(event_id)
+    event = _get_event(event_id)
     if not event:
         abort(404)
 
@@ -86,7 +81,7 @@ def sm_config(event_id):
             sm_config_data[cat] = cat_cfg
 
         event['sm_config'] = sm_config_data
-        _save_data(EVENTS_FILE, events)
+        save_event(event)
         flash('SM-Konfiguration gespeichert.', 'success')
         return redirect(url_for('sm_bp.sm_dashboard', event_id=event_id))
 
@@ -102,14 +97,14 @@ def sm_config(event_id):
 @sm_bp.get('/final-list/<event_id>/<category>')
 def sm_final_list(event_id, category):
     """Druckbare Finalliste für eine Kategorie."""
-    events, event = _get_event(event_id)
+    event = _get_event(event_id)
     if not event:
         abort(404)
 
     settings = _load_settings()
     for run in event.get('runs', []):
         if run.get('sm_run_type'):
-            _calculate_run_results(run, settings)
+            get_run_results(run, settings)
 
     sm_data = calculate_sm_qualification(event)
     cat_data = sm_data.get(category)
@@ -128,14 +123,14 @@ def sm_final_list(event_id, category):
 @sm_bp.get('/export-csv/<event_id>')
 def sm_export_csv(event_id):
     """CSV-Export aller SM-Finallisten (alle Kategorien)."""
-    events, event = _get_event(event_id)
+    event = _get_event(event_id)
     if not event:
         abort(404)
 
     settings = _load_settings()
     for run in event.get('runs', []):
         if run.get('sm_run_type'):
-            _calculate_run_results(run, settings)
+            get_run_results(run, settings)
 
     sm_data = calculate_sm_qualification(event)
 
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+WINDOW_SIZE = 512
+PERF_ENV = "AGILITY_PERF"
+
+
+class RollingStats:
+    """
+    Laufende Kennzahlen einer Messreihe: Gesamtzahl/-summe seit Start plus die
+    letzten WINDOW_SIZE Werte für Perzentile. Aufzeichnen ist O(1); sortiert
+    wird erst beim Anzeigen.
+    """
+
+    __slots__ = ("count", "total", "max", "samples", "counters")
+
+    def __init__(self, window=WINDOW_SIZE):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=window)
+        self.counters = {}
+
+    def add(self, seconds, counters=None):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+        for name, value in (counters or {}).items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self):
+        ordered = sorted(self.samples)
+
+        def pct(p):
+            if not ordered:
+                return None
+            idx = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+            return round(ordered[idx] * 1000, 2)
+
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 2),
+            "avg_ms": round(self.total * 1000 / self.count, 2) if self.count else None,
+            "p50_ms": pct(50),
+            "p90_ms": pct(90),
+            "p99_ms": pct(99),
+            "max_ms": round(self.max * 1000, 2),
+            **self.counters,
+        }
+
+
+class PerfRecorder:
+    """
+    Opt-in-Messpunkte (Endpunkte, Datei-I/O, Ranglisten, Socket.IO-Emits).
+    Ist die Messung aus, kostet jeder Messpunkt nur die Abfrage von ``enabled``.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = None
+        self._lock = threading.Lock()
+        self._series = {}
+        self._counts = {}
+
+    def enable(self, enabled=True):
+        self.enabled = bool(enabled)
+        if self.enabled and self.started_at is None:
+            self.started_at = time.time()
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+            self._counts = {}
+            self.started_at = time.time() if self.enabled else None
+
+    def record(self, category, name, seconds, **counters):
+        if not self.enabled:
+            return
+        key = (category, str(name))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = RollingStats()
+            series.add(seconds, counters)
+
+    def count(self, category, name, n=1):
+        if not self.enabled:
+            return
+        key = (category, str(name))
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + n
+
+    @contextmanager
+    def timed(self, category, name, **counters):
+        if not self.enabled:
+            yield counters
+            return
+        started = time.perf_counter()
+        try:
+            # Aufrufer können Zähler (z.B. Bytes) während der Messung nachtragen
+            yield counters
+        finally:
+            self.record(category, name, time.perf_counter() - started, **counters)
+
+    def snapshot(self):
+        with self._lock:
+            series = {key: stats.summary() for key, stats in self._series.items()}
+            counts = dict(self._counts)
+        timings = {}
+        for (category, name), summary in sorted(series.items()):
+            timings.setdefault(category, {})[name] = summary
+        totals = {}
+        for (category, name), value in sorted(counts.items()):
+            totals.setdefault(category, {})[name] = value
+        return {
+            "enabled": self.enabled,
+            "started_at": self.started_at,
+            "window": WINDOW_SIZE,
+            "timings": timings,
+            "counts": totals,
+        }
+
+
+recorder = PerfRecorder()
+
+
+def enabled_by_config(settings=None):
+    """Messung einschalten über die Umgebungsvariable AGILITY_PERF=1 oder settings.json "perf_instrumentation"."""
+    env = (os.environ.get(PERF_ENV) or "").strip().lower()
+    if env:
+        return env in ("1", "true", "yes", "on")
+    return bool((settings or {}).get("perf_instrumentation"))
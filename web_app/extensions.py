@@ -1,3 +1,17 @@
 from flask_socketio import SocketIO
+
+
+class InstrumentedSocketIO(SocketIO):
+    """SocketIO, das bei aktiver Messung die Emits pro Room und Event zählt."""
+
+    def emit(self, event, *args, **kwargs):
+        # spät importieren: extensions wird vor utils geladen (sys.path für web_app.*)
+        from web_app.diagnostics.perf import recorder as perf
+        if perf.enabled:
+            perf.count('socketio_room', kwargs.get('to') or kwargs.get('room') or '(broadcast)')
+            perf.count('socketio_event', event)
+        return super().emit(event, *args, **kwargs)
+
+
 # Zentraler SocketIO-Container, um Zirkularimporte zu vermeiden
-socketio = SocketIO()
+socketio = InstrumentedSocketIO()
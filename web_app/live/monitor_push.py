@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+
+MONITOR_FRAGMENTS = ("meta", "startlist", "ranking", "last_results", "current")
+
+
+def ring_room(event_id: str, ring_no) -> str:
+    return f"event:{event_id}:ring:{ring_no}"
+
+
+class FragmentTracker:
+    """
+    Merkt sich pro Socket.IO-Room den zuletzt gesendeten Stand jedes Fragments
+    (als Hash) und liefert bei update() nur die geänderten Fragmente zurück.
+    So wird pro Änderung einmal gerendert und nur der Unterschied an alle
+    Monitore im Room verteilt.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sent: dict[str, dict[str, str]] = {}
+
+    @staticmethod
+    def _digest(html: str) -> str:
+        return hashlib.sha1(html.encode("utf-8")).hexdigest()
+
+    def update(self, room: str, fragments: dict[str, str]) -> dict[str, str]:
+        with self._lock:
+            sent = self._sent.setdefault(room, {})
+            changed = {}
+            for name, html in fragments.items():
+                digest = self._digest(html)
+                if sent.get(name) != digest:
+                    sent[name] = digest
+                    changed[name] = html
+            return changed
+
+    def forget(self, room: str) -> None:
+        with self._lock:
+            self._sent.pop(room, None)
@@ -0,0 +1,66 @@
+"""
+result_intake.py — Annahme von Resultaten, die der Ring-Server direkt schickt.
+
+Ein Ring-Server sendet fertige Läufe (Zeit, Fehler, Verweigerungen) mit einem
+Idempotenz-Schlüssel an /api/submit_result, einzeln oder als Stapel. Pro
+Resultat wird ein Status zurückgegeben:
+
+  saved       gespeichert
+  duplicate   Schlüssel schon verarbeitet, frühere Antwort (nichts gespeichert)
+  superseded  am Eintrag steht schon ein neueres Ergebnis (z.B. Korrektur am Ring-PC)
+  rejected    unvollständig oder Lauf/Teilnehmer unbekannt – erneutes Senden hilft nicht
+  error       Fehler beim Speichern – der Ring-Server soll es später erneut senden
+
+Ohne Flask: gespeichert wird über ``save(event_id, run_id, data, finished_at)``
+(liefert Antwort und HTTP-Status wie save_result), der Aufrufer serialisiert.
+"""
+
+from __future__ import annotations
+
+FINAL_STATUSES = ("saved", "duplicate", "superseded", "rejected")
+
+
+def submitted_items(payload) -> list:
+    """Einzelnes Resultat oder {"results": [...]} → Liste von Resultaten."""
+    if isinstance(payload, dict) and isinstance(payload.get("results"), list):
+        return payload["results"]
+    return [payload] if payload else []
+
+
+def ingest_result(item, save, log, default_event_id=None) -> dict:
+    if not isinstance(item, dict):
+        return {"key": None, "status": "rejected", "message": "Resultat muss ein Objekt sein."}
+    key = item.get("idempotency_key")
+    if not key:
+        return {"key": None, "status": "rejected", "message": "idempotency_key fehlt."}
+    previous = log.get(key)
+    if previous is not None:
+        return {**previous, "key": key, "status": "duplicate", "original_status": previous.get("status")}
+
+    event_id = item.get("event_id") or default_event_id
+    run_id = item.get("run_id")
+    if not event_id or not run_id or not item.get("license_number"):
+        return {"key": key, "status": "rejected", "message": "event_id, run_id oder license_number fehlt."}
+
+    data = {field: item.get(field) for field in
+            ("license_number", "zeit", "fehler", "verweigerungen", "disqualifikation")}
+    try:
+        response, http_status = save(str(event_id), str(run_id), data, item.get("finished_at"))
+    except Exception as exc:
+        return {"key": key, "status": "error", "message": str(exc)}
+
+    if http_status >= 500:
+        return {"key": key, "status": "error", "message": response.get("message")}
+    if http_status >= 400:
+        status = "rejected"
+    else:
+        status = "superseded" if response.get("superseded") else "saved"
+    outcome = {"key": key, "status": status, "message": response.get("message"),
+               "event_id": str(event_id), "run_id": str(run_id), "license_number": item.get("license_number")}
+    log.remember(key, outcome)
+    return outcome
+
+
+def ingest_results(payload, save, log, default_event_id=None) -> list[dict]:
+    """Verarbeitet alle Resultate in Eingangsreihenfolge; ein Fehler hält die übrigen nicht auf."""
+    return [ingest_result(item, save, log, default_event_id) for item in submitted_items(payload)]
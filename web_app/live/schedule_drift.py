@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta
+
+DEFAULT_ALPHA = 0.2
+# Abstände über diesem Vielfachen der geplanten Zeit pro Start sind Pausen, Umbau
+# oder Laufwechsel und fliessen nicht ins Tempo ein.
+MAX_GAP_FACTOR = 4.0
+
+
+def _parse_timestamp(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class DriftTracker:
+    """
+    Misst pro Ring das tatsächliche Tempo aus den Zeitstempeln gespeicherter
+    Resultate. Gespeichert wird pro Ring nur der letzte Zeitstempel und ein
+    exponentiell gewichteter Faktor (tatsächliche / geplante Sekunden pro Start);
+    jedes Resultat kostet O(1), das Event wird nie neu durchsucht.
+
+    Mit ``license_nr`` zählt pro Lauf nur das erste Resultat eines Starts;
+    Korrekturen oder erneutes Speichern desselben Starts sind kein Tempo-Messwert.
+    """
+
+    def __init__(self, alpha=DEFAULT_ALPHA, max_gap_factor=MAX_GAP_FACTOR):
+        self.alpha = alpha
+        self.max_gap_factor = max_gap_factor
+        self._lock = threading.Lock()
+        self._rings: dict[tuple[str, str], dict] = {}
+
+    def observe(self, event_id, ring, run_id, timestamp, planned_seconds, license_nr=None):
+        """Ein gespeichertes Resultat einrechnen. Liefert den aktuellen Tempo-Faktor (oder None)."""
+        ts = _parse_timestamp(timestamp)
+        if ts is None:
+            return self.pace(event_id, ring)
+        key = (str(event_id), str(ring))
+        with self._lock:
+            state = self._rings.setdefault(key, {"last_ts": None, "last_run_id": None, "pace": None, "samples": 0,
+                                                 "seen": set()})
+            if license_nr is not None:
+                start = (str(run_id), str(license_nr))
+                if start in state["seen"]:
+                    return state["pace"]
+                state["seen"].add(start)
+            last_ts, last_run_id = state["last_ts"], state["last_run_id"]
+            state["last_ts"], state["last_run_id"] = ts, run_id
+            if last_ts is None or last_run_id != run_id or not planned_seconds:
+                return state["pace"]
+            interval = (ts - last_ts).total_seconds()
+            if interval <= 0 or interval > planned_seconds * self.max_gap_factor:
+                return state["pace"]
+            ratio = interval / planned_seconds
+            if state["pace"] is None:
+                state["pace"] = ratio
+            else:
+                state["pace"] = self.alpha * ratio + (1 - self.alpha) * state["pace"]
+            state["samples"] += 1
+            return state["pace"]
+
+    def pace(self, event_id, ring):
+        with self._lock:
+            state = self._rings.get((str(event_id), str(ring)))
+            return state["pace"] if state else None
+
+    def reset(self, event_id=None):
+        with self._lock:
+            if event_id is None:
+                self._rings.clear()
+            else:
+                for key in [k for k in self._rings if k[0] == str(event_id)]:
+                    del self._rings[key]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                f"{event_id}:{ring}": {
+                    "pace": round(state["pace"], 3) if state["pace"] is not None else None,
+                    "samples": state["samples"],
+                    "last_result_at": state["last_ts"].isoformat() if state["last_ts"] else None,
+                }
+                for (event_id, ring), state in self._rings.items()
+            }
+
+
+def _at(now: datetime, hhmm: str):
+    try:
+        hour, minute = (int(p) for p in str(hhmm).split(":")[:2])
+    except (TypeError, ValueError):
+        return None
+    return now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def project_ring_timeline(items, current_block_index, remaining_seconds, now: datetime, pace=None):
+    """
+    Prognose für die restlichen Segmente eines Rings.
+
+    ``items`` sind die Zeitleisten-Einträge des Rings (mit ``block_index``,
+    ``segment_type``, ``start_time``, ``duration`` in Minuten). Der Lauf-Segment
+    des Blocks ``current_block_index`` endet nach ``remaining_seconds`` (geplante
+    Restzeit der offenen Starts) × ``pace``; alle späteren Segmente folgen direkt,
+    Lauf-Segmente ebenfalls mit ``pace`` skaliert. Frühere Segmente gelten als
+    erledigt. Liefert neue dicts mit ``forecast_start``, ``forecast_end``,
+    ``delay_minutes`` und ``done``.
+    """
+    factor = pace or 1.0
+    current_pos = next(
+        (i for i, item in enumerate(items)
+         if item.get("block_index") == current_block_index and item.get("segment_type") == "run"),
+        None,
+    )
+    projected = []
+    cursor = None
+    for i, item in enumerate(items):
+        row = dict(item)
+        if current_pos is None or i < current_pos:
+            row.update(forecast_start=None, forecast_end=None, delay_minutes=None, done=current_pos is not None)
+            projected.append(row)
+            continue
+        if i == current_pos:
+            start = _at(now, item.get("start_time")) or now
+            end = now + timedelta(seconds=max(0.0, remaining_seconds) * factor)
+        else:
+            start = cursor
+            seconds = (item.get("duration") or 0) * 60
+            if item.get("segment_type") == "run":
+                seconds *= factor
+            end = start + timedelta(seconds=seconds)
+        planned = _at(now, item.get("start_time"))
+        delay = round((start - planned).total_seconds() / 60) if planned is not None and i > current_pos else 0
+        row.update(forecast_start=start.strftime("%H:%M"), forecast_end=end.strftime("%H:%M"), delay_minutes=delay, done=False)
+        projected.append(row)
+        cursor = end
+    return projected
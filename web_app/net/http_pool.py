@@ -0,0 +1,274 @@
+"""
+http_pool.py — Gemeinsamer HTTP-Client für ausgehenden Verkehr (Portal).
+
+``HttpPool`` hält pro Ziel-URL bis zu ``max_connections`` keep-alive-Verbindungen
+offen (TLS-Handshake nur beim Aufbau), ist thread-safe und misst jede Anfrage in
+einem ``LatencyHistogram`` pro Anfrage-Name. Ein ``CircuitBreaker`` öffnet nach
+mehreren Fehlern in Folge: solange das Ziel nicht erreichbar ist, scheitern
+Anfragen sofort mit ``CircuitOpenError`` statt jedes Mal in den Timeout zu
+laufen. Nach ``reset_timeout`` Sekunden darf genau eine Probe-Anfrage durch.
+"""
+
+from __future__ import annotations
+
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Obergrenzen der Histogramm-Klassen in Millisekunden (letzte Klasse: alles darüber)
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Diese Fehler bei einer wiederverwendeten Verbindung heissen meist nur: der
+# Server hat die keep-alive-Verbindung inzwischen geschlossen → einmal neu aufbauen.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                            BrokenPipeError, ConnectionResetError)
+
+
+class CircuitOpenError(ConnectionError):
+    """Das Ziel gilt als nicht erreichbar; die Anfrage wurde gar nicht erst gesendet."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def allow(self, probe: bool = False) -> bool:
+        """Darf eine Anfrage gesendet werden? ``probe=True`` (z.B. Verbindungstest) darf immer."""
+        with self._lock:
+            if self.state == "closed" or probe:
+                return True
+            if self.state == "open" and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = self.clock()
+
+    def is_open(self) -> bool:
+        """Offen und Wartezeit noch nicht abgelaufen (ohne eine Probe zu verbrauchen)."""
+        retry_in = self.retry_in()
+        return retry_in is not None and retry_in > 0
+
+    def retry_in(self) -> float | None:
+        with self._lock:
+            if self.state != "open":
+                return None
+            return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+    def snapshot(self) -> dict:
+        retry_in = self.retry_in()
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "retry_in_s": round(retry_in, 1) if retry_in is not None else None,
+        }
+
+
+class LatencyHistogram:
+    def __init__(self, bounds_ms=LATENCY_BUCKETS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float, ok: bool = True) -> None:
+        ms = seconds * 1000.0
+        index = next((i for i, bound in enumerate(self.bounds_ms) if ms <= bound), len(self.bounds_ms))
+        self.counts[index] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if not ok:
+            self.errors += 1
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, p: float) -> float | None:
+        """Obergrenze der Klasse, in die das p-Perzentil fällt (letzte Klasse: Maximum)."""
+        total = self.count
+        if not total:
+            return None
+        rank = p / 100.0 * total
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return float(self.bounds_ms[i]) if i < len(self.bounds_ms) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def snapshot(self) -> dict:
+        labels = [f"≤{b}" for b in self.bounds_ms] + [f">{self.bounds_ms[-1]}"]
+        total = self.count
+        return {
+            "count": total,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / total, 1) if total else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": round(self.max_ms, 1) if total else None,
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class HttpPool:
+    """Thread-sicherer keep-alive-Verbindungspool für eine Basis-URL."""
+
+    def __init__(self, base_url: str, max_connections: int = 4, timeout: float = 8.0,
+                 breaker: CircuitBreaker | None = None):
+        parsed = urlsplit(base_url)
+        self.base_url = base_url
+        self.scheme = parsed.scheme or "http"
+        self.host = parsed.hostname or ""
+        self.port = parsed.port
+        self.prefix = parsed.path.rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._cond = threading.Condition()
+        self._idle: list = []
+        self._open = 0
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self.connects = 0
+        self.requests = 0
+        self.rejected = 0
+
+    # --- Verbindungen -----------------------------------------------------
+
+    def _new_connection(self, timeout: float):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.connects += 1
+        return cls(self.host, self.port, timeout=timeout)
+
+    def _acquire(self, timeout: float):
+        """(Verbindung, wiederverwendet?) – wartet höchstens ``timeout`` auf einen freien Platz."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop(), True
+                if self._open < self.max_connections:
+                    self._open += 1
+                    return self._new_connection(timeout), False
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"keine freie Verbindung zu {self.host} innerhalb von {timeout:.0f}s")
+                self._cond.wait(remaining)
+
+    def _release(self, conn, reusable: bool) -> None:
+        with self._cond:
+            if reusable:
+                self._idle.append(conn)
+            else:
+                self._open -= 1
+            self._cond.notify()
+        if not reusable:
+            conn.close()
+
+    def close(self) -> None:
+        """Schliesst alle freien Verbindungen (belegte werden nach Gebrauch verworfen)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    # --- Anfragen ---------------------------------------------------------
+
+    def request(self, method: str, path: str, body: bytes | None = None, headers: dict | None = None,
+                timeout: float | None = None, name: str = "request", probe: bool = False) -> tuple[int, bytes]:
+        """
+        Sendet eine Anfrage und liefert (status, body). Netzwerkfehler und 5xx
+        zählen für den Circuit-Breaker als Fehler, 4xx nicht (das Ziel antwortet).
+        """
+        if not self.breaker.allow(probe=probe):
+            self.rejected += 1
+            retry_in = self.breaker.retry_in()
+            raise CircuitOpenError(f"{self.host} nicht erreichbar – nächster Versuch in {retry_in or 0:.0f}s")
+        timeout = self.timeout if timeout is None else timeout
+        headers = dict(headers or {})
+        headers.setdefault("Connection", "keep-alive")
+        started = time.perf_counter()
+        ok = False
+        try:
+            status, data = self._send(method, self.prefix + path, body, headers, timeout)
+            ok = status < 500
+            return status, data
+        finally:
+            self._observe(name, time.perf_counter() - started, ok)
+            if ok:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def _send(self, method, url, body, headers, timeout) -> tuple[int, bytes]:
+        while True:
+            conn, reused = self._acquire(timeout)
+            try:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                conn.request(method, url, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except _STALE_CONNECTION_ERRORS:
+                self._release(conn, reusable=False)
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                self._release(conn, reusable=False)
+                raise
+            self._release(conn, reusable=not resp.will_close)
+            return resp.status, data
+
+    def _observe(self, name: str, seconds: float, ok: bool) -> None:
+        with self._cond:
+            self.requests += 1
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.observe(seconds, ok)
+
+    def stats(self) -> dict:
+        with self._cond:
+            latency = {name: h.snapshot() for name, h in sorted(self._histograms.items())}
+            pool = {"open": self._open, "idle": len(self._idle), "max": self.max_connections}
+        return {
+            "base_url": self.base_url,
+            "pool": pool,
+            "connects": self.connects,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "circuit": self.breaker.snapshot(),
+            "latency": latency,
+        }
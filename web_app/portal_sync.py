@@ -2,8 +2,13 @@
 portal_sync.py — Synchronisation AgilitySoftware → AgilityPortal
 
 Schnittstellen:
-  POST {portal_url}/api/liveupdate   → push_live_update()
-  POST {portal_url}/api/resultexport → send_result_export()
+  POST {portal_url}/api/liveupdate   → push_live_update() / push_run_changed()
+                                       (über die Outbox data/outbox.json und den Outbox-Worker)
+  POST {portal_url}/api/resultexport → send_result_export() / schedule_result_export() (entprellt)
+                                       (optional als Delta seit dem letzten bestätigten Export)
+
+Aller Verkehr läuft über einen gemeinsamen keep-alive-Pool mit Circuit-Breaker
+pro Portal-URL (get_portal_client, siehe web_app/net/http_pool.py).
 
 Format Live-Update: agility.exchange.liveupdate.v1
 Format Ergebnis-Export: agility.exchange.resultexport.v1
@@ -11,13 +16,21 @@ Format Ergebnis-Export: agility.exchange.resultexport.v1
 
 from __future__ import annotations
 
+import atexit
+import hashlib
 import io
 import json
+import os
+import sys
+import threading
+import time
 import zipfile
 from datetime import datetime, timezone
-from threading import Thread
 from typing import Optional
 
+from web_app.net.http_pool import CircuitOpenError, HttpPool
+from web_app.storage.outbox import DurableOutbox
+
 # ----------------------------------------------------------------------------
 # Sync-Status (in-memory + persistiert in data/portal_sync_status.json)
 # ----------------------------------------------------------------------------
@@ -66,7 +79,68 @@ def _record_status(key: str, ok: bool, error: str | None = None) -> None:
 
 
 def get_sync_status() -> dict:
-    return _load_sync_status()
+    """Persistierter Status plus Pool-/Breaker-Zustand und Latenz-Histogramme (nur in-memory)."""
+    return {**_load_sync_status(), "http": get_portal_http_stats()}
+
+
+# ----------------------------------------------------------------------------
+# Gemeinsamer HTTP-Client (ein Pool pro Portal-URL)
+# ----------------------------------------------------------------------------
+
+PORTAL_TIMEOUT_SECONDS = 8.0
+PORTAL_EXPORT_TIMEOUT_SECONDS = 30.0
+PORTAL_MAX_CONNECTIONS = 4
+
+_portal_clients: dict[str, HttpPool] = {}
+_portal_clients_lock = threading.Lock()
+
+
+def _setting_seconds(settings: dict, key: str, default: float) -> float:
+    try:
+        value = float(settings.get(key, default))
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+def get_portal_client(settings: dict) -> Optional[HttpPool]:
+    """Der gemeinsame Pool für settings["portal_url"] (None, wenn keine URL konfiguriert ist)."""
+    portal_url = (settings.get("portal_url") or "").rstrip("/")
+    if not portal_url:
+        return None
+    with _portal_clients_lock:
+        client = _portal_clients.get(portal_url)
+        if client is None:
+            client = _portal_clients[portal_url] = HttpPool(portal_url, max_connections=PORTAL_MAX_CONNECTIONS)
+    client.timeout = _setting_seconds(settings, "portal_timeout_seconds", PORTAL_TIMEOUT_SECONDS)
+    return client
+
+
+def close_portal_clients() -> None:
+    with _portal_clients_lock:
+        clients = list(_portal_clients.values())
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_portal_clients)
+
+
+def get_portal_http_stats() -> dict:
+    with _portal_clients_lock:
+        clients = list(_portal_clients.values())
+    return {client.base_url: client.stats() for client in clients}
+
+
+def _multipart_zip(zip_bytes: bytes, filename: str, boundary: bytes) -> tuple[bytes, dict]:
+    body = (
+        b"--" + boundary + b"\r\n"
+        + f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'.encode("utf-8")
+        + b"Content-Type: application/zip\r\n\r\n"
+        + zip_bytes
+        + b"\r\n--" + boundary + b"--\r\n"
+    )
+    return body, {"Content-Type": f"multipart/form-data; boundary={boundary.decode()}"}
 
 
 # ----------------------------------------------------------------------------
@@ -77,8 +151,8 @@ def test_portal_connection(settings: dict) -> dict:
     """
     Testet die Verbindung zum Portal.
     Gibt {"live": True/False, "results": True/False, "errors": {...}} zurück.
+    Der Test läuft auch bei offenem Circuit-Breaker (Probe) und schliesst ihn bei Erfolg.
     """
-    import urllib.request
     portal_url = (settings.get("portal_url") or "").rstrip("/")
     live_key   = settings.get("portal_live_api_key") or ""
     res_key    = settings.get("portal_results_api_key") or ""
@@ -88,77 +162,51 @@ def test_portal_connection(settings: dict) -> dict:
     if not portal_url:
         results["errors"]["general"] = "Keine Portal-URL konfiguriert"
         return results
+    client = get_portal_client(settings)
+
+    def _check(key, path, body, headers, api_key):
+        try:
+            status, _ = client.request("POST", path, body=body, headers={**headers, "X-Api-Key": api_key},
+                                       name="connection_test", probe=True)
+        except Exception as exc:
+            results[key] = False
+            results["errors"][key] = str(exc)
+            return
+        if status == 403:
+            results[key] = False
+            results["errors"][key] = "API-Key ungültig (403)"
+        elif 200 <= status < 300 or status == 400:
+            results[key] = True  # 400 = connected, key ok, payload rejected
+        else:
+            results[key] = False
+            results["errors"][key] = f"HTTP {status}"
 
     # Test Live-Update API mit Minimal-Payload (wird abgelehnt wegen falschem Schema,
     # aber ein 400 statt 403/000 beweist, dass die Verbindung steht und der Key korrekt ist)
     if live_key:
-        try:
-            test_payload = json.dumps({
-                "schema": "agility.exchange.liveupdate.v1",
-                "event_external_id": "test-connection",
-                "source": {"device": settings.get("portal_device_id") or "agility-software"},
-                "sequence_no": 0,
-                "sent_at": _utc_now_iso(),
-            }).encode("utf-8")
-            req = urllib.request.Request(
-                f"{portal_url}/api/liveupdate",
-                data=test_payload,
-                headers={"Content-Type": "application/json", "X-Api-Key": live_key},
-                method="POST",
-            )
-            with urllib.request.urlopen(req, timeout=8) as resp:
-                results["live"] = True  # 200 OK
-        except Exception as exc:
-            code = getattr(getattr(exc, "code", None), "__int__", lambda: None)() or getattr(exc, "code", None)
-            if code == 403:
-                results["live"]   = False
-                results["errors"]["live"] = "API-Key ungültig (403)"
-            elif code in (200, 400):
-                results["live"] = True  # 400 = connected, key ok, payload rejected
-            else:
-                results["live"]   = False
-                results["errors"]["live"] = str(exc)
+        test_payload = json.dumps({
+            "schema": "agility.exchange.liveupdate.v1",
+            "event_external_id": "test-connection",
+            "source": {"device": settings.get("portal_device_id") or "agility-software"},
+            "sequence_no": 0,
+            "sent_at": _utc_now_iso(),
+        }).encode("utf-8")
+        _check("live", "/api/liveupdate", test_payload, {"Content-Type": "application/json"}, live_key)
     else:
         results["errors"]["live"] = "Kein Live-API-Key konfiguriert"
 
     # Test Results API mit leerem ZIP
     if res_key:
-        try:
-            buf = io.BytesIO()
-            with zipfile.ZipFile(buf, "w") as zf:
-                zf.writestr("manifest.json", json.dumps({"schema": "agility.exchange.resultexport.v1"}))
-                zf.writestr("results.json", json.dumps({
-                    "event_external_id": "test-connection",
-                    "exported_at": _utc_now_iso(),
-                    "final": False, "classes": [], "documents": [],
-                }))
-            zip_bytes = buf.getvalue()
-            boundary = b"----TestBoundary"
-            body = (b"--" + boundary + b"\r\n"
-                    b'Content-Disposition: form-data; name="file"; filename="test.zip"\r\n'
-                    b"Content-Type: application/zip\r\n\r\n"
-                    + zip_bytes + b"\r\n--" + boundary + b"--\r\n")
-            req = urllib.request.Request(
-                f"{portal_url}/api/resultexport",
-                data=body,
-                headers={
-                    "Content-Type": f"multipart/form-data; boundary={boundary.decode()}",
-                    "X-Api-Key": res_key,
-                },
-                method="POST",
-            )
-            with urllib.request.urlopen(req, timeout=8) as resp:
-                results["results"] = True
-        except Exception as exc:
-            code = getattr(exc, "code", None)
-            if code == 403:
-                results["results"] = False
-                results["errors"]["results"] = "API-Key ungültig (403)"
-            elif code in (200, 400):
-                results["results"] = True
-            else:
-                results["results"] = False
-                results["errors"]["results"] = str(exc)
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("manifest.json", json.dumps({"schema": "agility.exchange.resultexport.v1"}))
+            zf.writestr("results.json", json.dumps({
+                "event_external_id": "test-connection",
+                "exported_at": _utc_now_iso(),
+                "final": False, "classes": [], "documents": [],
+            }))
+        body, headers = _multipart_zip(buf.getvalue(), "test.zip", b"----TestBoundary")
+        _check("results", "/api/resultexport", body, headers, res_key)
     else:
         results["errors"]["results"] = "Kein Results-API-Key konfiguriert"
 
@@ -250,8 +298,28 @@ def _normalize_ring(raw: str) -> str:
     return f"Ring {m.group()}" if m else str(raw)
 
 
+def _forecast_summary(forecast: dict, limit: int = 5) -> dict:
+    """Kompakte Zeitplan-Prognose eines Rings fürs Portal (Tempo, Verzug, nächste Segmente)."""
+    upcoming = [item for item in forecast.get("items") or [] if item.get("forecast_start") and not item.get("done")]
+    return {
+        "pace":          forecast.get("pace"),
+        "delay_minutes": forecast.get("delay_minutes"),
+        "upcoming": [
+            {
+                "block_id":       item.get("block_id"),
+                "segment_type":   item.get("segment_type"),
+                "title":          (item.get("block") or {}).get("title") or item.get("label"),
+                "planned_start":  item.get("start_time"),
+                "forecast_start": item.get("forecast_start"),
+            }
+            for item in upcoming[:limit]
+        ],
+    }
+
+
 def _build_live_update_payload(event: dict, run: dict, result_entry: dict,
-                                device_id: str, update_type: str = "result") -> dict:
+                                device_id: str, update_type: str = "result",
+                                forecast: Optional[dict] = None) -> dict:
     """Erzeugt das Payload für einen Live-Update (Ergebnis oder Lauf-Wechsel)."""
     entry_result = result_entry.get("result") or {} if result_entry else {}
     startlist    = _build_startlist_snapshot(run)
@@ -294,37 +362,221 @@ def _build_live_update_payload(event: dict, run: dict, result_entry: dict,
             "zeit_total":       _safe_float(result_entry.get("zeit_total")),
         }
 
+    if forecast:
+        payload["schedule_forecast"] = _forecast_summary(forecast)
+
     return payload
 
 
-def _do_push_live_update(url: str, api_key: str, payload: dict) -> None:
-    """Sendet das Live-Update an das Portal (blocking, läuft in Background-Thread)."""
-    try:
-        import urllib.request
-        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-        req = urllib.request.Request(
-            url,
-            data=body,
-            headers={
-                "Content-Type": "application/json",
-                "X-Api-Key":    api_key,
-            },
-            method="POST",
-        )
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            _record_status("live_update", ok=True)
-    except Exception as exc:
-        _record_status("live_update", ok=False, error=str(exc))
+# ----------------------------------------------------------------------------
+# Outbox: dauerhafte Warteschlange + ein Hintergrund-Worker
+# ----------------------------------------------------------------------------
+
+OUTBOX_FILE = "outbox.json"
+OUTBOX_BATCH_SIZE = 25
+OUTBOX_BACKOFF_BASE = 1.0
+OUTBOX_BACKOFF_MAX = 60.0
+
+
+class PermanentSendError(Exception):
+    """Das Portal hat die Nachricht abgelehnt (4xx) – erneutes Senden ist zwecklos."""
+
+
+class OutboxWorker:
+    """
+    Sendet die Outbox in seq-Reihenfolge über den gemeinsamen Portal-Pool.
+    Bei Netzwerkfehlern oder 5xx bleibt die Nachricht liegen und der Worker
+    wartet exponentiell länger (1 s, 2 s, 4 s … max. 60 s), bei offenem
+    Circuit-Breaker mindestens bis zu dessen nächster Probe. Abgelehnte
+    Nachrichten (4xx ausser 408/429) werden verworfen, damit sie die
+    Warteschlange nicht blockieren.
+    """
+
+    def __init__(self, outbox, settings_provider, batch_size: int = OUTBOX_BATCH_SIZE,
+                 backoff_base: float = OUTBOX_BACKOFF_BASE, backoff_max: float = OUTBOX_BACKOFF_MAX):
+        self.outbox = outbox
+        self.settings_provider = settings_provider
+        self.batch_size = batch_size
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failures = 0
+        self.next_attempt_at = 0.0
+        self.sent = 0
+        self.dropped = 0
+        self._client = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Verbindung -------------------------------------------------------
+
+    def _portal(self, settings: dict) -> Optional[HttpPool]:
+        self._client = get_portal_client(settings) or self._client
+        return self._client if settings.get("portal_url") else None
+
+    def backoff_delay(self) -> float:
+        if not self.failures:
+            return 0.0
+        return min(self.backoff_max, self.backoff_base * (2 ** (self.failures - 1)))
+
+    # --- Senden -----------------------------------------------------------
+
+    def _send(self, client: HttpPool, item: dict, settings: dict) -> None:
+        if item.get("kind") != "liveupdate":
+            raise PermanentSendError(f"unbekannter Nachrichtentyp {item.get('kind')!r}")
+        body = json.dumps(item["payload"], ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json", "X-Api-Key": settings.get("portal_live_api_key") or ""}
+        status, body = client.request("POST", "/api/liveupdate", body=body, headers=headers, name="live_update")
+        if 200 <= status < 300:
+            return
+        message = f"HTTP {status}: {body[:200].decode('utf-8', 'replace')}"
+        if 400 <= status < 500 and status not in (408, 429):
+            raise PermanentSendError(message)
+        raise ConnectionError(message)
+
+    def drain_once(self) -> dict:
+        """Sendet einen Batch. Liefert {"sent", "dropped", "failed"}; bei Fehler bleibt der Rest liegen."""
+        settings = self.settings_provider() or {}
+        client = self._portal(settings)
+        result = {"sent": 0, "dropped": 0, "failed": False}
+        if client is None or not settings.get("portal_live_api_key"):
+            return result
+        batch = self.outbox.peek(self.batch_size)
+        done = []
         try:
-            import sys
-            print(f"[portal_sync] Live-Update fehlgeschlagen: {exc}", file=sys.stderr)
-        except Exception:
-            pass
+            for item in batch:
+                try:
+                    self._send(client, item, settings)
+                    result["sent"] += 1
+                except PermanentSendError as exc:
+                    result["dropped"] += 1
+                    _record_status("live_update", ok=False, error=str(exc))
+                done.append(item["seq"])
+        except Exception as exc:
+            # Reihenfolge wahren: ab der fehlgeschlagenen Nachricht später neu versuchen
+            failed = batch[len(done)]
+            self.outbox.mark_failed(failed["seq"], str(exc))
+            self.failures += 1
+            retry_in = client.breaker.retry_in() if isinstance(exc, CircuitOpenError) else None
+            self.next_attempt_at = time.monotonic() + max(self.backoff_delay(), retry_in or 0.0)
+            result["failed"] = True
+            _record_status("live_update", ok=False, error=str(exc))
+            try:
+                print(f"[portal_sync] Live-Update fehlgeschlagen (neuer Versuch in {self.backoff_delay():.0f}s): {exc}",
+                      file=sys.stderr)
+            except Exception:
+                pass
+        self.outbox.ack(done)
+        self.sent += result["sent"]
+        self.dropped += result["dropped"]
+        if result["sent"] and not result["failed"]:
+            self.failures = 0
+            self.next_attempt_at = 0.0
+            _record_status("live_update", ok=True)
+        return result
+
+    # --- Thread -----------------------------------------------------------
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="portal-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._client is not None:
+            self._client.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            if self.failures:
+                delay = self.next_attempt_at - time.monotonic()
+                if delay > 0:
+                    # neue Nachrichten verkürzen die Wartezeit nach einem Fehler nicht
+                    self._stop.wait(delay)
+                    continue
+            if not len(self.outbox):
+                self._wake.wait(30.0)
+                continue
+            try:
+                result = self.drain_once()
+            except Exception as exc:
+                print(f"[portal_sync] Outbox-Worker: {exc}", file=sys.stderr)
+                self.failures += 1
+                self.next_attempt_at = time.monotonic() + self.backoff_delay()
+                result = {"sent": 0, "dropped": 0, "failed": True}
+            if not (result["sent"] or result["dropped"] or result["failed"]):
+                # Portal nicht konfiguriert → Nachrichten bleiben liegen
+                self._wake.wait(30.0)
+
+    def stats(self) -> dict:
+        return {
+            **self.outbox.stats(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "consecutive_failures": self.failures,
+            "retry_in_s": round(max(0.0, self.next_attempt_at - time.monotonic()), 1) if self.failures else None,
+            "connections": self._client.connects if self._client else 0,
+        }
+
+
+_outbox_lock = threading.Lock()
+_outbox_worker: Optional[OutboxWorker] = None
+
+
+def _settings_for_outbox() -> dict:
+    try:
+        from utils import _load_settings
+        return _load_settings()
+    except Exception:
+        return {}
+
+
+def get_outbox_worker() -> OutboxWorker:
+    global _outbox_worker
+    with _outbox_lock:
+        if _outbox_worker is None:
+            outbox = DurableOutbox(os.path.join("data", OUTBOX_FILE))
+            _outbox_worker = OutboxWorker(outbox, _settings_for_outbox)
+        return _outbox_worker
+
+
+def start_outbox_worker() -> OutboxWorker:
+    """Startet den Worker (z.B. beim App-Start, damit Nachrichten vor einem Neustart nachgesendet werden)."""
+    worker = get_outbox_worker()
+    worker.start()
+    atexit.register(worker.stop)
+    return worker
+
+
+def _enqueue_live_update(payload: dict, coalesce_key: str, supersedes: tuple = ()) -> None:
+    worker = get_outbox_worker()
+    worker.outbox.enqueue(payload["sequence_no"], "liveupdate", payload,
+                          coalesce_key=coalesce_key, supersedes=supersedes)
+    worker.start()
+    client = worker._client
+    # Portal nicht erreichbar: Nachricht liegt sicher in der Outbox, der Worker
+    # sendet nach Ablauf des Breakers – jetzt keinen zum Scheitern verurteilten Versuch auslösen.
+    if client is None or not client.breaker.is_open():
+        worker.notify()
 
 
 def push_live_update(settings: dict, event: dict, run: dict,
-                     result_entry: dict) -> None:
-    """Schickt einen Ergebnis-Live-Update asynchron ans Portal."""
+                     result_entry: dict, forecast: Optional[dict] = None) -> None:
+    """
+    Legt einen Ergebnis-Live-Update (optional mit Zeitplan-Prognose des Rings) in die Outbox.
+    Ein neueres Ergebnis desselben Starters ersetzt ein noch nicht gesendetes; ein
+    wartender Lauf-Wechsel desselben Laufs ist durch die neuere Startliste überholt.
+    """
     portal_url = (settings.get("portal_url") or "").rstrip("/")
     api_key    = settings.get("portal_live_api_key") or ""
     device_id  = settings.get("portal_device_id") or "agility-software"
@@ -332,15 +584,15 @@ def push_live_update(settings: dict, event: dict, run: dict,
     if not portal_url or not api_key:
         return
 
-    endpoint = f"{portal_url}/api/liveupdate"
-    payload  = _build_live_update_payload(event, run, result_entry, device_id, update_type="result")
-
-    t = Thread(target=_do_push_live_update, args=(endpoint, api_key, payload), daemon=True)
-    t.start()
+    payload  = _build_live_update_payload(event, run, result_entry, device_id, update_type="result",
+                                          forecast=forecast)
+    run_id = run.get("id")
+    license_no = (result_entry or {}).get("Lizenznummer") or ""
+    _enqueue_live_update(payload, f"{run_id}:result:{license_no}", supersedes=(f"{run_id}:run_changed",))
 
 
 def push_run_changed(settings: dict, event: dict, run: dict) -> None:
-    """Schickt einen Lauf-Wechsel-Update asynchron ans Portal (kein Ergebnis, nur Startliste)."""
+    """Legt einen Lauf-Wechsel-Update in die Outbox (kein Ergebnis, nur Startliste)."""
     portal_url = (settings.get("portal_url") or "").rstrip("/")
     api_key    = settings.get("portal_live_api_key") or ""
     device_id  = settings.get("portal_device_id") or "agility-software"
@@ -348,127 +600,235 @@ def push_run_changed(settings: dict, event: dict, run: dict) -> None:
     if not portal_url or not api_key:
         return
 
-    endpoint = f"{portal_url}/api/liveupdate"
     payload  = _build_live_update_payload(event, run, None, device_id, update_type="run_changed")
+    _enqueue_live_update(payload, f"{run.get('id')}:run_changed")
 
-    t = Thread(target=_do_push_live_update, args=(endpoint, api_key, payload), daemon=True)
-    t.start()
+
+def get_outbox_status() -> dict:
+    return get_outbox_worker().stats()
 
 
 # ----------------------------------------------------------------------------
 # Result-Export ZIP
 # ----------------------------------------------------------------------------
 
-def build_result_export_zip(event: dict, final: bool = False) -> bytes:
-    """
-    Erzeugt ein agility.exchange.resultexport.v1 ZIP im Arbeitsspeicher.
+# Pro Lauf zwischengespeichertes classes[]-Fragment (fertig serialisiert).
+# Gültig, solange get_run_results() dieselbe Ergebnisliste liefert – die wird bei
+# jeder Änderung an Startliste/Resultaten/Laufdaten neu berechnet (bzw. per
+# invalidate_run_results verworfen) – und die Lauf-Kopfdaten gleich sind.
+_export_fragments: dict[str, tuple] = {}
+_export_fragments_lock = threading.Lock()
+export_fragment_stats = {"hits": 0, "misses": 0}
+
+
+def _run_export_header(run: dict) -> tuple:
+    return (
+        _normalize_ring(run.get("assigned_ring") or run.get("ring")),
+        run.get("laufart") or run.get("discipline") or "",
+        run.get("kategorie") or run.get("category") or "",
+        _safe_int(run.get("klasse") or run.get("class_level")),
+    )
+
+
+def _build_run_class(header: tuple, results_all: list) -> Optional[dict]:
+    rows = []
+    for entry in results_all:
+        entry_result = entry.get("result") or {}
+        # Nur Entries mit Ergebnis
+        if not entry_result.get("zeit") and not entry_result.get("disqualifikation"):
+            continue
+
+        disq = entry_result.get("disqualifikation")
+        eliminated = disq in ("DIS", "ABR")
+        dns        = disq == "DNS"
+        status     = entry.get("qualifikation") or ("DNS" if dns else ("DIS" if disq else "NB"))
+        rows.append({
+            "registration_external_id": entry.get("external_id") or entry.get("Lizenznummer") or "",
+            "start_no":    _safe_int(entry.get("Startnummer")),
+            "rank":        entry.get("platz"),
+            "time_s":      _safe_float(entry.get("zeit_total")),
+            "faults":      _safe_int(entry_result.get("fehler")),
+            "refusals":    _safe_int(entry_result.get("verweigerungen")),
+            "eliminated":  eliminated,
+            "status":      status,
+            "dog_name":    entry.get("Hundename") or "",
+            "handler_name":entry.get("Hundefuehrer") or "",
+        })
 
-    Jeder Lauf (run) im Event wird als eigene Klasse exportiert.
-    Nur Entries mit gespeichertem Ergebnis werden inkludiert.
-    """
+    if not rows:
+        return None  # Lauf ohne Ergebnisse überspringen
+    return _run_class(header, rows)
+
+
+def _run_class(header: tuple, rows: list) -> dict:
+    ring, discipline, category_code, class_level = header
+    return {
+        "ring":          ring,
+        "discipline":    discipline,
+        "category_code": category_code,
+        "class_level":   class_level,
+        "run_no":        1,
+        "results":       rows,
+    }
+
+
+def _run_class_fragment(run: dict, settings: dict) -> Optional[str]:
+    """Serialisiertes classes[]-Element eines Laufs (None = keine Ergebnisse); aus dem Cache, wenn unverändert."""
+    from utils import get_run_results
+    run_id = str(run.get("id") or "")
     try:
-        from utils import _calculate_run_results, _load_settings
-        settings = _load_settings()
+        results_all = get_run_results(run, settings)
     except Exception:
-        settings = {}
+        results_all = []
+    header = _run_export_header(run)
+    with _export_fragments_lock:
+        cached = _export_fragments.get(run_id)
+        if cached is not None and cached[0] is results_all and cached[1] == header:
+            export_fragment_stats["hits"] += 1
+            return cached[2]
+        export_fragment_stats["misses"] += 1
+    run_class = _build_run_class(header, results_all)
+    fragment = json.dumps(run_class, ensure_ascii=False) if run_class is not None else None
+    if run_id:
+        with _export_fragments_lock:
+            _export_fragments[run_id] = (results_all, header, fragment)
+    return fragment
+
+
+def _fragment_digest(fragment: str) -> str:
+    return hashlib.sha1(fragment.encode("utf-8")).hexdigest()
+
+
+def _collect_export_fragments(event: dict, settings: dict, watermark: Optional[dict] = None) -> list[tuple[str, str]]:
+    """
+    [(run_id, fragment), ...] aller Läufe mit Ergebnissen, in Event-Reihenfolge.
+    Mit ``watermark`` (Delta) kommen Läufe dazu, die das Portal schon kennt, die
+    aber keine Ergebnisse mehr haben: als leere Klasse, damit das Portal sie leert.
+    """
+    fragments = []
+    for run in event.get("runs") or []:
+        run_id = str(run.get("id") or "")
+        fragment = _run_class_fragment(run, settings)
+        if fragment is None and watermark and run_id in watermark:
+            fragment = json.dumps(_run_class(_run_export_header(run), []), ensure_ascii=False)
+        if fragment is not None:
+            fragments.append((run_id, fragment))
+    return fragments
 
-    event_external_id = event.get("external_id") or event.get("id") or ""
 
-    classes = []
-    for run in event.get("runs") or []:
-        run_id_for_log = run.get("id") or ""
-        try:
-            results_all = _calculate_run_results(run, settings)
-        except Exception:
-            results_all = []
-
-        rows = []
-        for entry in results_all:
-            entry_result = entry.get("result") or {}
-            # Nur Entries mit Ergebnis
-            if not entry_result.get("zeit") and not entry_result.get("disqualifikation"):
-                continue
+def _load_export_watermark(event_id: str) -> dict:
+    """{run_id: digest} des zuletzt vom Portal bestätigten Exports dieses Events."""
+    watermarks = _load_sync_status().get("export_watermark") or {}
+    return dict(watermarks.get(str(event_id)) or {})
+
+
+def _store_export_watermark(event_id: str, sent: list[tuple[str, str]], replace: bool) -> None:
+    _load_sync_status()
+    watermarks = _sync_status.setdefault("export_watermark", {})
+    current = {} if replace else dict(watermarks.get(str(event_id)) or {})
+    current.update({run_id: _fragment_digest(fragment) for run_id, fragment in sent if run_id})
+    watermarks[str(event_id)] = current
+    _save_sync_status()
+
+
+def _pending_fragments(fragments: list[tuple[str, str]], watermark: dict) -> list[tuple[str, str]]:
+    return [(run_id, fragment) for run_id, fragment in fragments
+            if watermark.get(run_id) != _fragment_digest(fragment)]
+
+
+def pending_export_runs(event: dict, settings: Optional[dict] = None) -> list[dict]:
+    """Läufe, deren Ergebnisse sich seit dem letzten bestätigten Export geändert haben."""
+    if settings is None:
+        settings = _load_export_settings()
+    watermark = _load_export_watermark(event.get("id"))
+    fragments = _collect_export_fragments(event, settings, watermark)
+    pending = {run_id for run_id, _ in _pending_fragments(fragments, watermark)}
+    return [
+        {"run_id": str(run.get("id")), "name": run.get("name") or ""}
+        for run in event.get("runs") or []
+        if str(run.get("id")) in pending
+    ]
+
+
+def _load_export_settings() -> dict:
+    try:
+        from utils import _load_settings
+        return _load_settings()
+    except Exception:
+        return {}
 
-            disq = entry_result.get("disqualifikation")
-            eliminated = disq in ("DIS", "ABR")
-            dns        = disq == "DNS"
-            status     = entry.get("qualifikation") or ("DNS" if dns else ("DIS" if disq else "NB"))
-            rows.append({
-                "registration_external_id": entry.get("external_id") or entry.get("Lizenznummer") or "",
-                "start_no":    _safe_int(entry.get("Startnummer")),
-                "rank":        entry.get("platz"),
-                "time_s":      _safe_float(entry.get("zeit_total")),
-                "faults":      _safe_int(entry_result.get("fehler")),
-                "refusals":    _safe_int(entry_result.get("verweigerungen")),
-                "eliminated":  eliminated,
-                "status":      status,
-                "dog_name":    entry.get("Hundename") or "",
-                "handler_name":entry.get("Hundefuehrer") or "",
-            })
-
-        if not rows:
-            continue  # Lauf ohne Ergebnisse überspringen
-
-        classes.append({
-            "ring":          _normalize_ring(run.get("assigned_ring") or run.get("ring")),
-            "discipline":    run.get("laufart") or run.get("discipline") or "",
-            "category_code": run.get("kategorie") or run.get("category") or "",
-            "class_level":   _safe_int(run.get("klasse") or run.get("class_level")),
-            "run_no":        1,
-            "results":       rows,
-        })
 
-    results_payload = {
+def _assemble_result_export_zip(event: dict, fragments: list[tuple[str, str]], final: bool, delta: bool) -> bytes:
+    event_external_id = event.get("external_id") or event.get("id") or ""
+    # results.json aus den Fragmenten zusammensetzen (identisch zu json.dumps des ganzen Dicts)
+    head_fields = {
         "event_external_id": event_external_id,
         "exported_at":       _utc_now_iso(),
         "final":             bool(final),
-        "classes":           classes,
-        "documents":         [],
     }
+    if delta:
+        # Portal: nur die enthaltenen Klassen ersetzen, fehlende unverändert lassen
+        head_fields["delta"] = True
+    head = json.dumps(head_fields, ensure_ascii=False)
+    results_json = head[:-1] + ', "classes": [' + ", ".join(f for _, f in fragments) + '], "documents": []}'
     manifest = {"schema": "agility.exchange.resultexport.v1", "generated_at": _utc_now_iso()}
 
     buf = io.BytesIO()
     with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
         zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False))
-        zf.writestr("results.json",  json.dumps(results_payload, ensure_ascii=False))
+        zf.writestr("results.json",  results_json)
     return buf.getvalue()
 
 
-def _do_send_result_export(url: str, api_key: str, zip_bytes: bytes) -> dict:
+def build_result_export_zip(event: dict, final: bool = False, delta: bool = False) -> bytes:
+    """
+    Erzeugt ein agility.exchange.resultexport.v1 ZIP im Arbeitsspeicher.
+
+    Jeder Lauf (run) im Event wird als eigene Klasse exportiert.
+    Nur Entries mit gespeichertem Ergebnis werden inkludiert.
+    Unveränderte Läufe kommen als fertiges JSON-Fragment aus dem Cache; neu
+    serialisiert wird nur, was sich seit dem letzten Export geändert hat.
+
+    ``delta=True`` enthält nur Läufe, die sich seit dem letzten vom Portal
+    bestätigten Export geändert haben (Wasserzeichen in portal_sync_status.json).
+    Ein Abschluss-Export (``final=True``) enthält immer alle Läufe.
+    """
+    delta = delta and not final
+    watermark = _load_export_watermark(event.get("id")) if delta else None
+    fragments = _collect_export_fragments(event, _load_export_settings(), watermark)
+    if delta:
+        fragments = _pending_fragments(fragments, watermark)
+    return _assemble_result_export_zip(event, fragments, final, delta)
+
+
+def _do_send_result_export(client: HttpPool, api_key: str, zip_bytes: bytes,
+                           timeout: float = PORTAL_EXPORT_TIMEOUT_SECONDS) -> dict:
     """Sendet den Result-Export an das Portal (blocking)."""
     try:
-        import urllib.request
-        boundary = b"----AgilitySoftwareBoundary"
-        body = (
-            b"--" + boundary + b"\r\n"
-            b'Content-Disposition: form-data; name="file"; filename="result_export.zip"\r\n'
-            b"Content-Type: application/zip\r\n\r\n"
-            + zip_bytes
-            + b"\r\n--" + boundary + b"--\r\n"
-        )
-        req = urllib.request.Request(
-            url,
-            data=body,
-            headers={
-                "Content-Type": f"multipart/form-data; boundary={boundary.decode()}",
-                "X-Api-Key":    api_key,
-            },
-            method="POST",
-        )
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            result = json.loads(resp.read().decode("utf-8"))
-            _record_status("result_export", ok=True)
-            return result
+        body, headers = _multipart_zip(zip_bytes, "result_export.zip", b"----AgilitySoftwareBoundary")
+        status, data = client.request("POST", "/api/resultexport", body=body,
+                                      headers={**headers, "X-Api-Key": api_key},
+                                      timeout=timeout, name="result_export")
+        if not 200 <= status < 300:
+            raise ConnectionError(f"HTTP {status}: {data[:200].decode('utf-8', 'replace')}")
+        result = json.loads(data.decode("utf-8"))
+        _record_status("result_export", ok=True)
+        return result
     except Exception as exc:
         _record_status("result_export", ok=False, error=str(exc))
         return {"error": str(exc)}
 
 
-def send_result_export(settings: dict, event: dict, final: bool = False) -> dict:
+def send_result_export(settings: dict, event: dict, final: bool = False, delta: Optional[bool] = None) -> dict:
     """
     Erzeugt den Result-Export ZIP und sendet ihn ans Portal.
     Gibt das JSON-Response-Dict zurück (oder {"error": ...} bei Fehler).
     Blockierend (für manuellen Export via UI).
+
+    ``delta`` (Standard: settings["portal_export_delta"]) sendet nur die seit dem
+    letzten bestätigten Export geänderten Läufe; ist nichts offen, wird nichts
+    hochgeladen. Nach jeder erfolgreichen Übertragung wird das Wasserzeichen
+    nachgeführt, nach einem Abschluss-Export vollständig ersetzt.
     """
     portal_url = (settings.get("portal_url") or "").rstrip("/")
     api_key    = settings.get("portal_results_api_key") or ""
@@ -476,6 +836,208 @@ def send_result_export(settings: dict, event: dict, final: bool = False) -> dict
     if not portal_url or not api_key:
         return {"error": "portal_url oder portal_results_api_key nicht konfiguriert"}
 
-    zip_bytes = build_result_export_zip(event, final=final)
-    endpoint  = f"{portal_url}/api/resultexport"
-    return _do_send_result_export(endpoint, api_key, zip_bytes)
+    if delta is None:
+        delta = bool(settings.get("portal_export_delta"))
+    delta = delta and not final
+    client = get_portal_client(settings)
+    if client.breaker.is_open():
+        # Portal seit mehreren Versuchen nicht erreichbar → ZIP gar nicht erst bauen
+        return {"error": f"Portal nicht erreichbar (neuer Versuch in {client.breaker.retry_in():.0f}s)"}
+    timeout = _setting_seconds(settings, "portal_export_timeout_seconds", PORTAL_EXPORT_TIMEOUT_SECONDS)
+    event_id = str(event.get("id") or "")
+    # Nie zwei Uploads gleichzeitig (Scheduler und manueller Export teilen sich das Lock)
+    with _export_upload_lock:
+        watermark = _load_export_watermark(event_id) if delta else None
+        fragments = _collect_export_fragments(event, settings, watermark)
+        if delta:
+            fragments = _pending_fragments(fragments, watermark)
+            if not fragments:
+                return {"skipped": True, "delta": True, "classes_sent": 0}
+        zip_bytes = _assemble_result_export_zip(event, fragments, final, delta)
+        result = _do_send_result_export(client, api_key, zip_bytes, timeout=timeout)
+        if not result.get("error"):
+            _store_export_watermark(event_id, fragments, replace=not delta)
+            result.setdefault("classes_sent", len(fragments))
+            result.setdefault("delta", delta)
+        return result
+
+
+# ----------------------------------------------------------------------------
+# Result-Export-Scheduler: Trigger sammeln, höchstens ein Upload gleichzeitig
+# ----------------------------------------------------------------------------
+
+EXPORT_DEBOUNCE_SECONDS = 20.0
+# Bei Dauerbetrieb (alle paar Sekunden ein Resultat) spätestens nach 3 Fenstern exportieren
+EXPORT_MAX_DELAY_FACTOR = 3
+# Fehlgeschlagener Upload: erneut anfordern, Pause verdoppelt sich bis zum Maximum
+EXPORT_RETRY_BASE = 5.0
+EXPORT_RETRY_MAX = 300.0
+
+_export_upload_lock = threading.Lock()
+
+
+class ExportScheduler:
+    """
+    Entprellt Result-Export-Trigger pro Event: nach dem letzten Trigger wird
+    ``window`` Sekunden gewartet (höchstens ``window * EXPORT_MAX_DELAY_FACTOR``
+    seit dem ersten), dann exportiert ein einziger Hintergrund-Thread den zu
+    diesem Zeitpunkt aktuellen Stand. Trigger während eines Uploads lösen
+    danach genau einen weiteren Export aus. Schlägt ein Upload fehl, wird das
+    Event mit wachsender Pause (``retry_base`` … ``retry_max``) erneut
+    angefordert; neue Trigger holen den Versuch nicht vor.
+    """
+
+    def __init__(self, upload, clock=time.monotonic,
+                 retry_base: float = EXPORT_RETRY_BASE, retry_max: float = EXPORT_RETRY_MAX):
+        self.upload = upload          # upload(event_id) → exportiert den aktuellen Stand
+        self.clock = clock
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._cond = threading.Condition()
+        self._pending: dict[str, dict] = {}
+        self._failures: dict[str, int] = {}
+        self._thread = None
+        self._stopped = False
+        self.requested = 0
+        self.uploads = 0
+        self.errors = 0
+
+    def request(self, event_id: str, window: float = EXPORT_DEBOUNCE_SECONDS) -> None:
+        now = self.clock()
+        with self._cond:
+            pending = self._pending.get(event_id)
+            if pending is None:
+                pending = self._pending[event_id] = {"first": now, "window": window}
+            pending["last"] = now
+            pending["window"] = window
+            self.requested += 1
+            self._cond.notify()
+
+    @staticmethod
+    def _due_at(pending: dict) -> float:
+        window = pending["window"]
+        due = min(pending["last"] + window, pending["first"] + window * EXPORT_MAX_DELAY_FACTOR)
+        return max(due, pending.get("not_before", due))
+
+    def _take_due(self, now: float) -> list[str]:
+        due = [event_id for event_id, pending in self._pending.items() if self._due_at(pending) <= now]
+        for event_id in due:
+            del self._pending[event_id]
+        return due
+
+    def retry_delay(self, failures: int) -> float:
+        return min(self.retry_max, self.retry_base * (2 ** (failures - 1)))
+
+    def _upload(self, event_id: str) -> None:
+        try:
+            self.upload(event_id)
+        except Exception as exc:
+            now = self.clock()
+            with self._cond:
+                self.errors += 1
+                failures = self._failures[event_id] = self._failures.get(event_id, 0) + 1
+                delay = self.retry_delay(failures)
+                pending = self._pending.get(event_id)
+                if pending is None:
+                    pending = self._pending[event_id] = {"first": now, "last": now, "window": 0.0}
+                pending["not_before"] = now + delay
+                self._cond.notify()
+            print(f"[portal_sync] Result-Export fehlgeschlagen (neuer Versuch in {delay:.0f}s): {exc}",
+                  file=sys.stderr)
+        else:
+            with self._cond:
+                self.uploads += 1
+                self._failures.pop(event_id, None)
+
+    def run_due(self) -> list[str]:
+        """Exportiert alle fälligen Events (synchron). Liefert deren IDs."""
+        with self._cond:
+            due = self._take_due(self.clock())
+        for event_id in due:
+            self._upload(event_id)
+        return due
+
+    def flush(self) -> list[str]:
+        """
+        Exportiert sofort alles, was noch wartet (beim Beenden, siehe
+        get_export_scheduler). Fehlschläge werden wieder vorgemerkt, aber hier nicht abgewartet.
+        """
+        with self._cond:
+            due = list(self._pending)
+            self._pending.clear()
+        for event_id in due:
+            self._upload(event_id)
+        return due
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="portal-result-export", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._pending:
+                        wait = min(self._due_at(p) for p in self._pending.values()) - self.clock()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+                due = self._take_due(self.clock())
+            for event_id in due:
+                self._upload(event_id)
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._pending)
+        return {"pending": pending, "requested": self.requested, "uploads": self.uploads, "errors": self.errors}
+
+
+_export_scheduler: Optional[ExportScheduler] = None
+
+
+def _upload_latest_export(event_id: str) -> None:
+    from utils import get_event, _load_settings
+    event = get_event(event_id)
+    if not event:
+        return
+    result = send_result_export(_load_settings(), event, final=False)
+    if result.get("error"):
+        raise RuntimeError(result["error"])
+
+
+def get_export_scheduler() -> ExportScheduler:
+    global _export_scheduler
+    with _outbox_lock:
+        if _export_scheduler is None:
+            _export_scheduler = ExportScheduler(_upload_latest_export)
+            # noch entprellte Exporte beim Beenden nicht verlieren
+            atexit.register(_export_scheduler.flush)
+        return _export_scheduler
+
+
+def schedule_result_export(settings: dict, event_id: str) -> None:
+    """Fordert einen (entprellten) Result-Export an; Fenster aus settings["portal_export_debounce_seconds"]."""
+    if not (settings.get("portal_url") and settings.get("portal_results_api_key")):
+        return
+    try:
+        window = float(settings.get("portal_export_debounce_seconds", EXPORT_DEBOUNCE_SECONDS))
+    except (TypeError, ValueError):
+        window = EXPORT_DEBOUNCE_SECONDS
+    scheduler = get_export_scheduler()
+    scheduler.request(str(event_id), max(0.0, window))
+    scheduler.start()
@@ -0,0 +1,209 @@
+# event_log.py
+"""
+Ereignis-Protokoll der Ringe: jede Rohzeile des Zeitmessgeräts und jeder
+Zustandswechsel (Starter bereit/gewechselt, Fehler/Verweigerung, Start, Ziel,
+Reset) als eine JSON-Zeile, pro Ring und Event eine Datei:
+
+    data/ring_logs/ring1_<event_id>.jsonl   (.1, .2 … ältere Teile)
+
+Eine Zeile: {"t": <Unix-Zeit>, "ring": "1", "event": "<id>", "k": "<art>", …}
+
+  impulse   line, ch, tod, status (Status des Rings vor dem Impuls)
+  ready     run_id, license, start_no
+  reassign  run_id, license, start_no
+  count     type (faults/refusals), value (neuer Stand)
+  start     tod
+  finish    run_id, license, start_tod, tod, final_time, faults, refusals
+  invalid   tod (Ziel vor Start o.ä., Ring wurde zurückgesetzt)
+  reset
+  saved     run_id, license, zeit, fehler, verweigerungen, disqualifikation,
+            source (dialog/ring_server), status (saved/superseded), finished_at
+            – schreibt der Hauptserver nach data/result_logs/ (Abspielen
+            überspringt diese Einträge)
+
+Geschrieben wird in einem eigenen Thread: ``record`` reiht nur ein und kehrt
+sofort zurück, der Impuls wird dadurch nicht verzögert. Übersteigt eine Datei
+``max_bytes``, wird sie wie bei logging.handlers.RotatingFileHandler zu .1
+umbenannt. ``read_records`` liest Dateien samt älterer Teile in Zeitfolge,
+``replay_schedule`` liefert die Pausen zum Abspielen (tools/replay_ring_log.py).
+"""
+
+from __future__ import annotations
+
+import glob
+import heapq
+import json
+import os
+import queue
+import re
+import threading
+import time
+
+from web_app.storage.files import read_json_lines
+
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+
+
+def _safe(value) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", str(value or "")).strip("_") or "ohne_event"
+
+
+def log_filename(ring_id, event_id) -> str:
+    return f"ring{_safe(ring_id)}_{_safe(event_id)}.jsonl"
+
+
+class RingEventLog:
+    """Asynchroner, größenrotierter JSONL-Schreiber; als ``recorder`` der Ringe verwendbar."""
+
+    def __init__(self, directory: str, max_bytes: int = LOG_MAX_BYTES, backups: int = LOG_BACKUPS,
+                 fsync: bool = True, clock=time.time):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.fsync = fsync
+        self.clock = clock
+        self._queue = queue.SimpleQueue()
+        self._files: dict[str, object] = {}
+        self._thread = None
+        self.written = 0
+        self.rotations = 0
+        self.errors = 0
+
+    # --- Aufrufer (Ring-Threads) -----------------------------------------
+
+    def record(self, ring_id, event_id, kind, fields=None) -> None:
+        self._queue.put((self.clock(), str(ring_id), event_id, kind, fields or {}))
+
+    __call__ = record
+
+    # --- Schreiber-Thread -------------------------------------------------
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="ring-event-log", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # alles, was inzwischen angekommen ist, in einem Durchgang schreiben
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            try:
+                self.write_batch([item for item in batch if item is not None])
+            except Exception as e:
+                self.errors += 1
+                print(f"!! Ring-Protokoll konnte nicht geschrieben werden: {e}")
+            if stop:
+                self._close_files()
+                return
+
+    def write_batch(self, batch) -> None:
+        touched = {}
+        for t, ring_id, event_id, kind, fields in batch:
+            line = json.dumps({"t": round(t, 4), "ring": ring_id, "event": event_id, "k": kind, **fields},
+                              ensure_ascii=False, separators=(",", ":")) + "\n"
+            name = log_filename(ring_id, event_id)
+            handle = self._open(name)
+            handle.write(line)
+            touched[name] = handle
+            self.written += 1
+            if handle.tell() >= self.max_bytes:
+                self._rotate(name)
+                touched.pop(name, None)
+        for handle in touched.values():
+            handle.flush()
+            if self.fsync:
+                os.fsync(handle.fileno())
+
+    def _open(self, name):
+        handle = self._files.get(name)
+        if handle is None:
+            handle = self._files[name] = open(os.path.join(self.directory, name), "a", encoding="utf-8")
+        return handle
+
+    def _rotate(self, name):
+        handle = self._files.pop(name)
+        handle.flush()
+        if self.fsync:
+            os.fsync(handle.fileno())
+        handle.close()
+        path = os.path.join(self.directory, name)
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{index}"):
+                os.replace(f"{path}.{index}", f"{path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
+        self.rotations += 1
+
+    def _close_files(self):
+        for handle in self._files.values():
+            try:
+                handle.close()
+            except OSError:
+                pass
+        self._files.clear()
+
+    def close(self, timeout=2.0) -> None:
+        """Schreibt alles Eingereihte und schliesst die Dateien."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {"directory": self.directory, "written": self.written, "pending": self.pending(),
+                "rotations": self.rotations, "errors": self.errors}
+
+
+def log_files(directory, ring_id=None, event_id=None) -> list[str]:
+    """Protokolldateien (ältere Teile liest read_records mit), optional nur eines Rings/Events."""
+    pattern = f"ring{_safe(ring_id) if ring_id is not None else '*'}_" \
+              f"{_safe(event_id) if event_id is not None else '*'}.jsonl"
+    # auch wenn gerade rotiert wurde und nur noch ältere Teile (.1 …) existieren
+    paths = glob.glob(os.path.join(directory, pattern)) + \
+        [p.rsplit(".", 1)[0] for p in glob.glob(os.path.join(directory, pattern + ".*"))
+         if p.rsplit(".", 1)[-1].isdigit()]
+    return sorted(set(paths))
+
+
+def _chunks(path) -> list[str]:
+    """Eine Protokolldatei mit ihren älteren Teilen, älteste zuerst (.N … .1, dann die Datei selbst)."""
+    backups = [p for p in glob.glob(f"{glob.escape(path)}.*") if p.rsplit(".", 1)[-1].isdigit()]
+    backups.sort(key=lambda p: int(p.rsplit(".", 1)[-1]), reverse=True)
+    return backups + ([path] if os.path.exists(path) else [])
+
+
+def _read_file(path):
+    for chunk in _chunks(path):
+        yield from read_json_lines(chunk)
+
+
+def read_records(paths):
+    """Alle Einträge der Dateien (samt älterer Teile), über Ringe hinweg nach Zeit gemischt."""
+    if isinstance(paths, str):
+        paths = [paths]
+    return heapq.merge(*(_read_file(path) for path in paths), key=lambda record: record.get("t", 0))
+
+
+def replay_schedule(records, speed=1.0):
+    """(Pause in Sekunden, Eintrag): Abstände wie aufgezeichnet, geteilt durch ``speed`` (0 = ohne Pause)."""
+    previous = None
+    for record in records:
+        t = record.get("t", 0)
+        delay = 0.0
+        if speed > 0 and previous is not None and t > previous:
+            delay = (t - previous) / speed
+        previous = t if previous is None else max(previous, t)
+        yield delay, record
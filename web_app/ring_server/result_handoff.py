@@ -0,0 +1,197 @@
+# result_handoff.py
+"""
+Direkte Übergabe fertiger Läufe vom Ring-Server an den Hauptserver
+(POST /api/submit_result), unabhängig vom Browser des Ring-PCs.
+
+Jedes Resultat bekommt einen Idempotenz-Schlüssel (Ring, Lauf, Lizenz,
+Startzeit des Timy) und landet zuerst in einer persistenten Outbox
+(storage/outbox.py). Ein Worker-Thread sendet die Outbox in Eingangsreihenfolge
+als Stapel über eine keep-alive-Verbindung (net/http_pool.py). Ist der
+Hauptserver nicht erreichbar, bleibt alles liegen und wird nach dem
+Wiederverbinden (oder Neustart des Ring-Servers) erneut gesendet; doppelt
+Angekommenes erkennt der Hauptserver am Schlüssel.
+
+Der Ring-PC speichert weiterhin über den Dialog; eine Korrektur dort ist
+neuer und wird vom Hauptserver nicht überschrieben.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime
+
+from web_app.live.result_intake import FINAL_STATUSES
+from web_app.net.http_pool import CircuitBreaker, CircuitOpenError, HttpPool
+from web_app.storage.outbox import DurableOutbox
+
+HANDOFF_BATCH_SIZE = 20
+HANDOFF_BACKOFF_BASE = 0.5
+HANDOFF_BACKOFF_MAX = 15.0
+
+
+def idempotency_key(ring_id, run_id, license_nr, start_time_tod) -> str:
+    return f"ring{ring_id}:{run_id}:{license_nr}:{start_time_tod}"
+
+
+def build_submission(ring_id, state, result_package, finished_at=None) -> dict | None:
+    """Resultat für /api/submit_result aus Ring-Zustand und run_finished_timing; None ohne Lauf/Starter."""
+    starter = state.get('current_starter') or {}
+    license_nr = starter.get('Lizenznummer')
+    run_id = state.get('active_run_id')
+    if not license_nr or not run_id:
+        return None
+    return {
+        "idempotency_key": idempotency_key(ring_id, run_id, license_nr, state.get('start_time_tod')),
+        "ring": ring_id,
+        "event_id": state.get('event_id'),
+        "run_id": run_id,
+        "license_number": license_nr,
+        "zeit": result_package.get('final_time'),
+        "fehler": result_package.get('faults', 0),
+        "verweigerungen": result_package.get('refusals', 0),
+        "disqualifikation": None,
+        "finished_at": finished_at or datetime.now().isoformat(),
+    }
+
+
+class ResultHandoff:
+    """
+    Als ``on_result`` der Ringe verwendbar (``handoff(ring_id, state, result_package)``).
+    Netzwerkfehler, 5xx und Resultate mit Status "error" bleiben liegen; der
+    Worker wartet dann exponentiell länger (0.5 s … 15 s), bei offenem
+    Circuit-Breaker mindestens bis zu dessen nächster Probe.
+    """
+
+    def __init__(self, api_url: str, outbox_path: str, batch_size: int = HANDOFF_BATCH_SIZE,
+                 timeout: float = 5.0, backoff_base: float = HANDOFF_BACKOFF_BASE,
+                 backoff_max: float = HANDOFF_BACKOFF_MAX, pool: HttpPool | None = None):
+        self.api_url = api_url
+        self.pool = pool or HttpPool(api_url, max_connections=1, timeout=timeout,
+                                     breaker=CircuitBreaker(failure_threshold=3, reset_timeout=5.0))
+        self.outbox = DurableOutbox(outbox_path)
+        self.batch_size = batch_size
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failures = 0
+        self.next_attempt_at = 0.0
+        self.last_error = None
+        self.counts = {status: 0 for status in FINAL_STATUSES}
+        pending = self.outbox.peek()
+        self._seq = pending[-1]["seq"] if pending else 0
+        self._seq_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Annehmen ---------------------------------------------------------
+
+    def submit(self, ring_id, state, result_package, finished_at=None) -> dict | None:
+        submission = build_submission(ring_id, state, result_package, finished_at)
+        if submission is None:
+            print(f"!! [Ring {ring_id}] Resultat ohne Lauf/Starter – nur über den Ring-PC speicherbar.")
+            return None
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+        self.outbox.enqueue(seq, "result", submission, coalesce_key=submission["idempotency_key"])
+        self._wake.set()
+        return submission
+
+    __call__ = submit
+
+    # --- Senden -----------------------------------------------------------
+
+    def backoff_delay(self) -> float:
+        if not self.failures:
+            return 0.0
+        return min(self.backoff_max, self.backoff_base * (2 ** (self.failures - 1)))
+
+    def _post(self, batch: list[dict]) -> dict:
+        body = json.dumps({"results": [item["payload"] for item in batch]}, ensure_ascii=False).encode("utf-8")
+        status, data = self.pool.request("POST", "", body=body, headers={"Content-Type": "application/json"},
+                                         name="submit_result")
+        if not 200 <= status < 300:
+            raise ConnectionError(f"HTTP {status}: {data[:200].decode('utf-8', 'replace')}")
+        outcomes = json.loads(data.decode("utf-8")).get("results") or []
+        return {outcome.get("key"): outcome for outcome in outcomes if isinstance(outcome, dict)}
+
+    def drain_once(self) -> dict:
+        """Sendet einen Stapel. Liefert {"done", "failed"}; ab dem ersten Fehler bleibt der Rest liegen."""
+        batch = self.outbox.peek(self.batch_size)
+        result = {"done": 0, "failed": False}
+        if not batch:
+            return result
+        done, error = [], None
+        try:
+            outcomes = self._post(batch)
+            for item in batch:
+                outcome = outcomes.get(item["payload"]["idempotency_key"]) or {}
+                status = outcome.get("status")
+                if status not in FINAL_STATUSES:
+                    error = outcome.get("message") or f"Status {status!r}"
+                    break
+                self.counts[status] += 1
+                if status == "rejected":
+                    print(f"!! Resultat {item['payload']['idempotency_key']} abgelehnt: {outcome.get('message')}")
+                done.append(item["seq"])
+        except (OSError, ValueError) as exc:
+            error = exc
+        self.outbox.ack(done)
+        result["done"] = len(done)
+        if error is not None:
+            failed = batch[len(done)]
+            self.outbox.mark_failed(failed["seq"], str(error))
+            self.failures += 1
+            retry_in = self.pool.breaker.retry_in() if isinstance(error, CircuitOpenError) else None
+            self.next_attempt_at = time.monotonic() + max(self.backoff_delay(), retry_in or 0.0)
+            self.last_error = str(error)
+            result["failed"] = True
+        else:
+            self.failures = 0
+            self.next_attempt_at = 0.0
+            self.last_error = None
+        return result
+
+    # --- Worker -----------------------------------------------------------
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="result-handoff", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            wait = self.next_attempt_at - time.monotonic()
+            if wait > 0 or not len(self.outbox):
+                self._wake.wait(wait if wait > 0 else None)
+                self._wake.clear()
+                continue
+            try:
+                self.drain_once()
+            except Exception as e:
+                print(f"!! Resultat-Übergabe: {e}")
+                self.failures += 1
+                self.next_attempt_at = time.monotonic() + self.backoff_delay()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.pool.close()
+
+    def stats(self) -> dict:
+        retry_in = self.next_attempt_at - time.monotonic()
+        return {
+            "target": self.api_url,
+            "outbox": self.outbox.stats(),
+            "results": dict(self.counts),
+            "consecutive_failures": self.failures,
+            "retry_in_s": round(retry_in, 1) if retry_in > 0 else None,
+            "last_error": self.last_error,
+            "http": self.pool.stats(),
+        }
@@ -0,0 +1,321 @@
+# ring_machine.py
+"""
+Zustandsautomat eines Rings (Timy-Impulse → Laufstatus) und die Sammlung aller
+Ringe eines Ring-Servers. Ohne Flask/Socket.IO: gesendet wird über die
+``emit(event, payload)``-Funktion, die der Ring-Server pro Ring mitgibt (Raum
+des Rings). Jeder Ring hat seinen eigenen Zustand und sein eigenes Lock; ein
+Impuls oder Fehler in einem Ring berührt die anderen nicht.
+
+Ein fertiger Lauf geht zusätzlich an ``on_result(ring_id, state, result_package)``
+(z.B. result_handoff.ResultHandoff: direkt an den Hauptserver, ohne Browser).
+Liefert on_result die Übergabe zurück, meldet der Ring ``result_handed_off``
+(Idempotenz-Schlüssel und Werte): der Ring-PC speichert dann nur Korrekturen.
+Rohimpulse und Zustandswechsel gehen an ``recorder(ring_id, event_id, kind, fields)``
+(event_log.RingEventLog, reiht nur ein).
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+IDLE_STATE = dict(run_status="idle", active_run_id=None, current_starter=None, event_id=None,
+                  start_time_tod=None, faults=0, refusals=0)
+
+
+def _time_str_to_seconds(time_str):
+    if not time_str: return 0.0
+    try:
+        parts = time_str.split(':'); h, m = int(parts[0]), int(parts[1])
+        s_parts = parts[2].split('.'); s = int(s_parts[0])
+        frac_s = int(s_parts[1]) / (10**len(s_parts[1])) if len(s_parts) > 1 else 0
+        return (h * 3600) + (m * 60) + s + frac_s
+    except (ValueError, IndexError, TypeError): return 0.0
+
+
+_IMPULSE_RE = re.compile(r'^\s*(\d+)\s+(C\w+)\s+(\d{2}:\d{2}:\d{2}\.\d+)')
+
+
+def parse_timy_output(line):
+    impulse_match = _IMPULSE_RE.match(line)
+    if impulse_match: return {'type': 'impulse', 'channel': impulse_match.group(2), 'time_of_day': impulse_match.group(3)}
+    return None
+
+
+class Impulse(NamedTuple):
+    """Ein Impuls, einmal beim Eintreffen geparst (Tageszeit des Geräts + Empfangszeit des Rechners)."""
+    channel: str
+    time_of_day: str
+    seconds: float          # Tageszeit des Timy in Sekunden (Hardware-Zeitstempel)
+    received_at: float      # time.perf_counter() beim Eintreffen
+    line: str
+
+
+def parse_impulse(line, received_at=None):
+    parsed = parse_timy_output((line or "").strip())
+    if not parsed:
+        return None
+    return Impulse(parsed['channel'], parsed['time_of_day'], _time_str_to_seconds(parsed['time_of_day']),
+                   time.perf_counter() if received_at is None else received_at, (line or "").strip())
+
+
+class ImpulseLatency:
+    """Zeit vom Eintreffen eines Impulses bis zum Senden von start_clock / run_finished_timing."""
+
+    def __init__(self, keep=1000):
+        self.keep = keep
+        self._samples = {"start": deque(maxlen=keep), "finish": deque(maxlen=keep)}
+        self._lock = threading.Lock()
+
+    def record(self, kind, seconds):
+        with self._lock:
+            self._samples.setdefault(kind, deque(maxlen=self.keep)).append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = {kind: sorted(values) for kind, values in self._samples.items()}
+        out = {}
+        for kind, ordered in samples.items():
+            if not ordered:
+                out[kind] = {"count": 0}
+                continue
+
+            def pct(p):
+                return round(ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))] * 1000, 3)
+
+            out[kind] = {"count": len(ordered), "p50_ms": pct(50), "p99_ms": pct(99),
+                         "max_ms": round(ordered[-1] * 1000, 3)}
+        return out
+
+
+def normalize_ring_id(value) -> str:
+    """'Ring 2', 'ring_2', 2 → '2' (ohne Ziffer: Text unverändert)."""
+    text = str(value or "").strip()
+    digits = re.findall(r"\d+", text)
+    return str(int(digits[-1])) if digits else text
+
+
+class RingStateMachine:
+    def __init__(self, ring_id, label=None, emit=None, on_result=None, recorder=None):
+        self.ring_id = normalize_ring_id(ring_id)
+        self.label = label or f"Ring {self.ring_id}"
+        self.emit = emit or (lambda event, payload=None: None)
+        self.on_result = on_result
+        self.recorder = recorder
+        self.lock = threading.RLock()
+        self.state = {"ring_id": self.label, **IDLE_STATE}
+        self.latency = ImpulseLatency()
+        self.input_name = None
+        self._start_seconds = 0.0
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.state)
+
+    def _log(self, message):
+        print(f"[{self.label}] {message}")
+
+    def _emit_state(self):
+        self.emit('state_update', dict(self.state))
+
+    def _record(self, kind, **fields):
+        if self.recorder is not None:
+            try:
+                self.recorder(self.ring_id, self.state.get('event_id'), kind, fields)
+            except Exception as e:
+                self._log(f"!! Protokoll: {e}")
+
+    def _starter_fields(self):
+        starter = self.state.get('current_starter') or {}
+        return dict(run_id=self.state.get('active_run_id'), license=starter.get('Lizenznummer'),
+                    start_no=starter.get('Startnummer'))
+
+    def reset(self):
+        with self.lock:
+            self._record('reset')
+            self._reset()
+
+    def _reset(self):
+        with self.lock:
+            self.state.update(IDLE_STATE)
+            self._emit_state()
+        self._log("Zustand zurückgesetzt.")
+
+    def set_starter_ready(self, data):
+        with self.lock:
+            if self.state['run_status'] not in ['idle', 'finished_timing']:
+                return False
+            self._reset()
+            self.state.update(run_status='ready', active_run_id=data.get('run_id'), current_starter=data.get('starter'),
+                              event_id=data.get('event_id'))
+            self._emit_state()
+            self._record('ready', **self._starter_fields())
+        self._log(f"Starter bereit: {(data.get('starter') or {}).get('Startnummer')}")
+        return True
+
+    def reassign_starter(self, data):
+        """Falscher Starter bereit gemeldet: Starter tauschen, Zeitmessung läuft weiter."""
+        starter = data.get('starter')
+        if not starter:
+            return False
+        with self.lock:
+            self.state.update(current_starter=starter, active_run_id=data.get('run_id') or self.state['active_run_id'])
+            if data.get('event_id'):
+                self.state['event_id'] = data.get('event_id')
+            self._emit_state()
+            self._record('reassign', **self._starter_fields())
+        self._log(f"Starter gewechselt: {starter.get('Startnummer')}")
+        return True
+
+    def increment_counter(self, data):
+        with self.lock:
+            if self.state['run_status'] != 'running' or data.get('type') not in ['faults', 'refusals']:
+                return False
+            self.state[data['type']] += data.get('value', 1)
+            self._emit_state()
+            value = self.state[data['type']]
+            self._record('count', type=data['type'], value=value)
+        self._log(f"{data['type']} erhöht auf: {value}")
+        return True
+
+    def handle_line(self, line, received_at=None):
+        """
+        Eine Zeile vom Zeitmessgerät; liefert den geparsten Impuls (oder None).
+        ``received_at`` (time.perf_counter beim Eintreffen) dient der Latenzmessung.
+        """
+        impulse = parse_impulse(line, received_at)
+        if impulse:
+            self.handle_impulse(impulse)
+        return impulse
+
+    def handle_impulse(self, impulse):
+        """
+        Verarbeitet einen geparsten Impuls. Zuerst wird gesendet, dann die Latenz
+        erfasst und erst danach geloggt – die Konsole bremst den Ring-PC nicht.
+        """
+        log = finished = transition = None
+        with self.lock:
+            state = self.state
+            status = state['run_status']
+            if impulse.channel.startswith('C0') and status == 'ready':
+                state.update(run_status='running', start_time_tod=impulse.time_of_day)
+                self._start_seconds = impulse.seconds
+                self.emit('start_clock', None)
+                self.latency.record("start", time.perf_counter() - impulse.received_at)
+                self._emit_state()
+                transition = ('start', dict(tod=impulse.time_of_day))
+
+            elif impulse.channel.startswith('C1') and status == 'running':
+                start_s, stop_s = self._start_seconds, impulse.seconds
+
+                if start_s > 0 and stop_s > start_s:
+                    final_time = stop_s - start_s
+                    state['run_status'] = "finished_timing"
+                    result_package = {
+                        'final_time': f"{final_time:.2f}",
+                        'faults': state['faults'],
+                        'refusals': state['refusals']
+                    }
+                    self.emit('run_finished_timing', result_package)
+                    self.latency.record("finish", time.perf_counter() - impulse.received_at)
+                    self._emit_state()
+                    finished = (dict(state), result_package)
+                    transition = ('finish', dict(self._starter_fields(), start_tod=state['start_time_tod'],
+                                                 tod=impulse.time_of_day, final_time=result_package['final_time'],
+                                                 faults=state['faults'], refusals=state['refusals']))
+                else:
+                    log = "!! FEHLER: Ungültige Zeitberechnung. Status wird zurückgesetzt."
+                    transition = ('invalid', dict(tod=impulse.time_of_day))
+            # Protokoll erst nach dem Senden (unter dem Lock, damit die Reihenfolge stimmt)
+            self._record('impulse', line=impulse.line, ch=impulse.channel, tod=impulse.time_of_day, status=status)
+            if transition:
+                self._record(transition[0], **transition[1])
+            if transition and transition[0] == 'invalid':
+                self._reset()
+        if finished and self.on_result:
+            try:
+                submission = self.on_result(self.ring_id, *finished)
+                if submission:
+                    self.emit('result_handed_off', {key: submission.get(key) for key in (
+                        "idempotency_key", "run_id", "license_number", "zeit", "fehler", "verweigerungen")})
+            except Exception as e:
+                log = f"!! Resultat konnte nicht weitergegeben werden: {e}"
+        self._log(f"Impuls: {impulse.line} | Status: {status}")
+        if log:
+            self._log(log)
+
+
+class RingHub:
+    """
+    Alle Ringe eines Ring-Servers, nach Ring-ID. ``emit_factory(ring_id)``
+    liefert die emit-Funktion eines Rings (z.B. Socket.IO in dessen Raum).
+    Clients werden per Socket-ID einem Ring zugeordnet.
+    """
+
+    def __init__(self, emit_factory=None, on_result=None, recorder=None):
+        self.emit_factory = emit_factory
+        self.on_result = on_result
+        self.recorder = recorder
+        self.rings: dict[str, RingStateMachine] = {}
+        self._clients: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, ring_id, label=None) -> RingStateMachine:
+        ring_id = normalize_ring_id(ring_id)
+        emit = self.emit_factory(ring_id) if self.emit_factory else None
+        machine = self.rings[ring_id] = RingStateMachine(ring_id, label, emit, self.on_result, self.recorder)
+        return machine
+
+    def resolve(self, ring_id=None):
+        """Ring zu einer ID; ohne (passende) ID nur dann der einzige Ring, wenn es genau einen gibt."""
+        if ring_id not in (None, ""):
+            machine = self.rings.get(normalize_ring_id(ring_id))
+            if machine is not None:
+                return machine
+        if len(self.rings) == 1:
+            return next(iter(self.rings.values()))
+        return None
+
+    def attach(self, sid, ring_id=None):
+        machine = self.resolve(ring_id)
+        if machine is not None:
+            with self._lock:
+                self._clients[sid] = machine.ring_id
+        return machine
+
+    def detach(self, sid):
+        with self._lock:
+            self._clients.pop(sid, None)
+
+    def for_client(self, sid, data=None):
+        """Ring eines Events: explizit im Payload (``ring``) oder der Ring der Verbindung."""
+        if isinstance(data, dict) and data.get('ring') not in (None, ""):
+            return self.resolve(data.get('ring'))
+        with self._lock:
+            ring_id = self._clients.get(sid)
+        return self.resolve(ring_id)
+
+    def config(self) -> list[dict]:
+        with self._lock:
+            clients = list(self._clients.values())
+        return [
+            {"ring": ring_id, "label": machine.label, "room": ring_room(ring_id),
+             "clients": clients.count(ring_id), "run_status": machine.snapshot()["run_status"],
+             "input": machine.input_name, "latency": machine.latency.snapshot()}
+            for ring_id, machine in self.rings.items()
+        ]
+
+
+def ring_room(ring_id) -> str:
+    return f"ring:{normalize_ring_id(ring_id)}"
+
+
+def parse_ring_spec(spec) -> list[str]:
+    """'3' → ['1','2','3']; '1,3' oder 'Ring 1,Ring 3' → ['1','3']."""
+    text = str(spec or "").strip()
+    if text.isdigit():
+        return [str(i) for i in range(1, int(text) + 1)]
+    return [normalize_ring_id(part) for part in text.split(",") if part.strip()]
@@ -1,25 +1,57 @@
-import argparse
 # ring_server.py
+"""
+Ring-Server: ein Prozess für alle Ringe eines Geräts.
+
+    python ring_server.py --rings 3 --port 5001          # Ring 1–3 in einem Prozess
+    python ring_server.py --rings 1,3 --timy 1=0,3=1     # Timy-USB-Gerät pro Ring
+    python ring_server.py --ring "Ring 2" --port 5002    # wie bisher: ein Ring
+    python ring_server.py --rings 2 --input 1=serial:COM4,2=sim:impulse.txt@10
+
+Zeitmess-Quellen (--input, siehe timing_input.py): timy:<gerät>, serial:<port>[@baud],
+file:<pfad>, sim:<impulsdatei|anzahl starter>[@tempo]. Ohne --input bekommt jeder
+Ring ein Timy-USB-Gerät (--timy, falls pywin32 vorhanden).
+
+Jeder Ring hat einen eigenen Zustandsautomaten (ring_machine.RingStateMachine)
+und einen eigenen Socket.IO-Raum ``ring:<n>``. Der Ring-PC verbindet sich mit
+``?ring=<n>``; ohne Angabe gilt der einzige Ring (Einzel-Ring-Betrieb).
+/config listet alle Ringe.
+
+Fertige Läufe gehen direkt an den Hauptserver (result_handoff.py, POST auf
+--main-server, Standard MAIN_SERVER_API) – auch wenn der Browser am Ring-PC
+hängt oder geschlossen ist. Nicht gesendete Resultate liegen in
+data/ring_results_outbox.json und werden nach dem Wiederverbinden nachgeliefert.
+--main-server off schaltet die Übergabe ab.
+
+Alle Rohimpulse und Zustandswechsel landen in data/ring_logs/ (event_log.py,
+pro Ring und Event, --event-log off schaltet ab). Abspielen gegen den
+Hauptserver: tools/replay_ring_log.py.
+"""
+import argparse
+import atexit
+import importlib.util
+import os
 import sys
-import time
-import requests
-import re
-import threading
-from flask import Flask
-from flask_socketio import SocketIO
-
-try:
-    import pythoncom
-    import win32com.client
-    TIMY_AVAILABLE = True
-except ImportError:
-    TIMY_AVAILABLE = False
-MAIN_SERVER_API = "http://127.0.0.1:5000/api/submit_result" 
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from flask import Flask, request
+from flask_socketio import SocketIO, join_room
+
+from web_app.ring_server.event_log import RingEventLog
+from web_app.ring_server.result_handoff import ResultHandoff
+from web_app.ring_server.ring_machine import RingHub, normalize_ring_id, parse_ring_spec, ring_room
+from web_app.ring_server.timing_input import ImpulseDispatcher, build_input, parse_input_spec
+
+# Der COM-Listener selbst steckt in timing_input.ComTimyInput; hier nur prüfen, ob pywin32 da ist
+TIMY_AVAILABLE = importlib.util.find_spec("win32com") is not None
+MAIN_SERVER_API = "http://127.0.0.1:5000/api/submit_result"
+HANDOFF_OUTBOX = os.path.join(PROJECT_ROOT, 'web_app', 'data', 'ring_results_outbox.json')
+EVENT_LOG_DIR = os.path.join(PROJECT_ROOT, 'web_app', 'data', 'ring_logs')
 port_num = 5001
 app = Flask(__name__)
 
-from flask import request
-
 @app.after_request
 def add_cors_headers(resp):
     # Erlaube lokale Zugriffe von 127.0.0.1:* und localhost
@@ -34,177 +66,183 @@ def health():
     return {'ok': True}, 200
 
 # Wird nach dem Parsen befüllt:
-_RING_LABEL = None
 _PORT_NUM = None
 
 @app.route('/config')
 def config():
-    return {'ring': _RING_LABEL, 'port': _PORT_NUM}, 200
-socketio = SocketIO(app, cors_allowed_origins="*") 
-
-state = {
-    "ring_id": None, "run_status": "idle", "active_run_id": None, 
-    "current_starter": None, "start_time_tod": None,
-    "faults": 0, "refusals": 0
-}
-
-def reset_state():
-    state.update(run_status="idle", active_run_id=None, current_starter=None, 
-                 start_time_tod=None, faults=0, refusals=0)
-    socketio.emit('state_update', state)
-    print(f"[{state['ring_id']}] Zustand zurückgesetzt.")
-
-def _time_str_to_seconds(time_str):
-    if not time_str: return 0.0
-    try:
-        parts = time_str.split(':'); h, m = int(parts[0]), int(parts[1])
-        s_parts = parts[2].split('.'); s = int(s_parts[0])
-        frac_s = int(s_parts[1]) / (10**len(s_parts[1])) if len(s_parts) > 1 else 0
-        return (h * 3600) + (m * 60) + s + frac_s
-    except (ValueError, IndexError, TypeError): return 0.0
-
-def parse_timy_output(line):
-    impulse_match = re.match(r'^\s*(\d+)\s+(C\w+)\s+(\d{2}:\d{2}:\d{2}\.\d+)', line)
-    if impulse_match: return {'type': 'impulse', 'channel': impulse_match.group(2), 'time_of_day': impulse_match.group(3)}
+    rings = hub.config()
+    # 'ring' für ältere Ring-PC-Seiten (Einzel-Ring-Betrieb)
+    return {'ring': rings[0]['label'] if len(rings) == 1 else None, 'port': _PORT_NUM, 'rings': rings,
+            'handoff': handoff.stats() if handoff else None,
+            'event_log': event_log.stats() if event_log else None}, 200
+socketio = SocketIO(app, cors_allowed_origins="*")
+
+
+def _ring_emitter(ring_id):
+    room = ring_room(ring_id)
+
+    def emit(event, payload=None):
+        if payload is None:
+            socketio.emit(event, to=room)
+        else:
+            socketio.emit(event, payload, to=room)
+    return emit
+
+
+# Werden nach dem Parsen gesetzt (None bei --main-server off / --event-log off)
+handoff = None
+event_log = None
+
+
+def _on_result(ring_id, state, result_package):
+    if handoff is not None:
+        return handoff.submit(ring_id, state, result_package)
     return None
 
-class TimyEvents:
-    def OnConnectionOpen(self): print(f"[{state['ring_id']}] >> Verbindung zum Timy erfolgreich.")
-    def OnUSBInput(self, data):
-        line = data.strip()
-        parsed = parse_timy_output(line)
-        if not parsed: return
-
-        print(f"[{state['ring_id']}] Impuls: {line} | Status: {state['run_status']}")
-
-        if parsed['type'] == 'impulse':
-            if parsed['channel'].startswith('C0') and state['run_status'] == 'ready':
-                state.update(run_status='running', start_time_tod=parsed['time_of_day'])
-                socketio.emit('start_clock')
-                socketio.emit('state_update', state)
-
-            elif parsed['channel'].startswith('C1') and state['run_status'] == 'running':
-                stop_time_tod = parsed['time_of_day']
-                start_s = _time_str_to_seconds(state['start_time_tod'])
-                stop_s = _time_str_to_seconds(stop_time_tod)
-                
-                if start_s > 0 and stop_s > start_s:
-                    final_time = stop_s - start_s
-                    state['run_status'] = "finished_timing"
-                    
-                    # KORREKTUR: Sendet das ganze Paket an den Ring-PC
-                    result_package = {
-                        'final_time': f"{final_time:.2f}",
-                        'faults': state['faults'],
-                        'refusals': state['refusals']
-                    }
-                    socketio.emit('run_finished_timing', result_package)
-                    socketio.emit('state_update', state)
-                else:
-                    print("!! FEHLER: Ungültige Zeitberechnung. Status wird zurückgesetzt.")
-                    reset_state()
+
+def _record(ring_id, event_id, kind, fields):
+    if event_log is not None:
+        event_log.record(ring_id, event_id, kind, fields)
+
+
+hub = RingHub(_ring_emitter, on_result=_on_result, recorder=_record)
+
+
+def _ring_for_request(data=None):
+    machine = hub.for_client(request.sid, data)
+    if machine is None:
+        print(f"!! Unbekannter Ring für Client {request.sid}: {data!r}")
+    return machine
+
 
 @socketio.on('connect')
-def handle_connect(): 
-    print(f"[{state['ring_id']}] Client verbunden.")
-    socketio.emit('state_update', state)
+def handle_connect():
+    machine = hub.attach(request.sid, request.args.get('ring'))
+    if machine is None:
+        print(f"Client {request.sid} ohne gültigen Ring (?ring=…) verbunden – Ringe: {', '.join(hub.rings)}")
+        return
+    join_room(ring_room(machine.ring_id))
+    print(f"[{machine.label}] Client verbunden.")
+    socketio.emit('state_update', machine.snapshot(), to=request.sid)
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    hub.detach(request.sid)
 
 @socketio.on('set_starter_ready')
 def handle_set_ready(data):
-    if state['run_status'] in ['idle', 'finished_timing']:
-        reset_state()
-        state.update(run_status='ready', active_run_id=data.get('run_id'), current_starter=data.get('starter'))
-        socketio.emit('state_update', state)
-        print(f"[{state['ring_id']}] Starter bereit: {data.get('starter', {}).get('Startnummer')}")
+    machine = _ring_for_request(data)
+    if machine:
+        machine.set_starter_ready(data)
+
+@socketio.on('reassign_current_starter')
+def handle_reassign(data):
+    machine = _ring_for_request(data)
+    if machine:
+        machine.reassign_starter(data or {})
 
 @socketio.on('increment_counter')
 def handle_increment(data):
-    # KORREKTUR: Zählt Fehler/Verweigerung hoch
-    if state['run_status'] == 'running' and data['type'] in ['faults', 'refusals']:
-        state[data['type']] += data.get('value', 1)
-        socketio.emit('state_update', state)
-        print(f"[{state['ring_id']}] {data['type']} erhöht auf: {state[data['type']]}")
+    machine = _ring_for_request(data)
+    if machine:
+        machine.increment_counter(data)
 
 @socketio.on('reset_current_run')
 def handle_reset(data=None):
-    print(f"[{state['ring_id']}] Manueller Reset für aktuellen Lauf erhalten.")
-    reset_state()
+    machine = _ring_for_request(data)
+    if machine:
+        print(f"[{machine.label}] Manueller Reset für aktuellen Lauf erhalten.")
+        machine.reset()
 
-def run_timy_listener():
-    global timy_usb_connection
-    pythoncom.CoInitialize()
-    try:
-        timy_usb_connection = win32com.client.DispatchWithEvents('ALGEUSB.TimyUSB', TimyEvents)
-        timy_usb_connection.Init()
-        timy_usb_connection.OpenConnection(0)
-        while True:
-            pythoncom.PumpWaitingMessages()
-            time.sleep(0.1)
-    except Exception as e:
-        print(f"!! TIMY-THREAD FEHLER: {e}")
-    finally:
-        if 'timy_usb_connection' in globals() and timy_usb_connection:
-            timy_usb_connection.CloseConnection()
-        pythoncom.CoUninitialize()
 
-if __name__ == '__main__':
-    import argparse, os
+def parse_timy_map(spec, ring_ids):
+    """'1=0,3=1' → {'1': 0, '3': 1}; ohne Angabe bekommt Ring i das i-te Gerät."""
+    if not spec:
+        return {ring_id: index for index, ring_id in enumerate(ring_ids)}
+    mapping = {}
+    for part in str(spec).split(','):
+        ring, _, index = part.partition('=')
+        if ring.strip() and index.strip().isdigit():
+            mapping[normalize_ring_id(ring)] = int(index)
+    return mapping
+
 
+if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument("--ring", dest="ring", default=None)
+    parser.add_argument("--ring", dest="ring", default=None, help="einzelner Ring (z.B. 'Ring 1')")
+    parser.add_argument("--rings", dest="rings", default=None, help="Anzahl Ringe (3) oder Liste (1,3)")
     parser.add_argument("--port", dest="port", type=int, default=None)
+    parser.add_argument("--timy", dest="timy", default=None, help="Timy-Gerät pro Ring, z.B. 1=0,2=1")
+    parser.add_argument("--input", dest="input", default=None,
+                        help="Zeitmess-Quelle pro Ring, z.B. 1=timy:0,2=serial:COM4,3=sim:impulse.txt@10")
+    parser.add_argument("--main-server", dest="main_server", default=None,
+                        help=f"Resultat-Übergabe an den Hauptserver (Standard {MAIN_SERVER_API}, 'off' = aus)")
+    parser.add_argument("--event-log", dest="event_log", default=None,
+                        help=f"Ordner für das Ring-Protokoll (Standard {EVENT_LOG_DIR}, 'off' = aus)")
     # Fallback: Positionsargumente [ring_label] [port]
     parser.add_argument("pos_ring", nargs="?", default=None)
     parser.add_argument("pos_port", nargs="?", default=None)
     args, _unknown = parser.parse_known_args()
 
-    ring_label = args.ring or args.pos_ring or os.environ.get("RING_LABEL") or "Ring 1"
+    rings_spec = args.rings or os.environ.get("RING_IDS")
+    if rings_spec:
+        for ring_id in parse_ring_spec(rings_spec):
+            hub.add(ring_id)
+    else:
+        ring_label = args.ring or args.pos_ring or os.environ.get("RING_LABEL") or "Ring 1"
+        hub.add(normalize_ring_id(ring_label) or "1", ring_label)
     try:
         port_num = int(args.port or (args.pos_port if args.pos_port else 5001))
     except Exception:
         port_num = 5001
 
     # Für /config
-
-    _RING_LABEL, _PORT_NUM = ring_label, port_num
-
-    # State mit Ring befüllen
-    state['ring_id'] = ring_label
-
-    print(f"--- Ring-Server startet für '{ring_label}' auf Port {port_num} ---")
-
-    # TIMY-Thread nur starten, wenn pywin32 vorhanden ist
-    if TIMY_AVAILABLE:
-        import threading
-        def run_timy_listener():
-            try:
-                pythoncom.CoInitialize()
-                try:
-                    timy = win32com.client.DispatchWithEvents('ALGEUSB.TimyUSB', TimyEvents)
-                    timy.Init()
-                    timy.OpenConnection(0)
-                    import time
-                    while True:
-                        pythoncom.PumpWaitingMessages()
-                        time.sleep(0.1)
-                finally:
-                    try:
-                        timy.CloseConnection()
-                    except Exception:
-                        pass
-                    pythoncom.CoUninitialize()
-            except Exception as e:
-                print(f"!! TIMY-THREAD FEHLER: {e}")
-
-        threading.Thread(target=run_timy_listener, daemon=True).start()
-    else:
-        print("!! TIMY nicht verfügbar (pywin32 fehlt) – Server läuft im 'ohne TIMY'-Modus.")
+    _PORT_NUM = port_num
+
+    labels = ", ".join(machine.label for machine in hub.rings.values())
+    print(f"--- Ring-Server startet für {labels} auf Port {port_num} ---")
+
+    main_server = args.main_server or os.environ.get("MAIN_SERVER_API") or MAIN_SERVER_API
+    if main_server.lower() not in ("off", "none", "0"):
+        if "/api/" not in main_server:
+            main_server = main_server.rstrip("/") + "/api/submit_result"
+        handoff = ResultHandoff(main_server, HANDOFF_OUTBOX).start()
+        pending = len(handoff.outbox)
+        print(f"Resultat-Übergabe an {main_server}" + (f" ({pending} noch nicht gesendet)" if pending else ""))
+
+    log_dir = args.event_log or os.environ.get("RING_EVENT_LOG") or EVENT_LOG_DIR
+    if log_dir.lower() not in ("off", "none", "0"):
+        event_log = RingEventLog(log_dir).start()
+        atexit.register(event_log.close)
+        print(f"Ring-Protokoll: {log_dir}")
+
+    # Zeitmess-Quellen: eine pro Ring, jede in ihrem eigenen Thread
+    inputs = parse_input_spec(args.input or os.environ.get("RING_INPUTS"))
+    if not inputs:
+        if TIMY_AVAILABLE:
+            inputs = {ring_id: ("timy", str(index), None)
+                      for ring_id, index in parse_timy_map(args.timy, list(hub.rings)).items()}
+        else:
+            print("!! TIMY nicht verfügbar (pywin32 fehlt) – Server läuft im 'ohne TIMY'-Modus.")
+    for ring_id, (kind, arg, option) in inputs.items():
+        machine = hub.rings.get(ring_id)
+        if machine is None:
+            print(f"!! Zeitmessung: Ring {ring_id} wird von diesem Server nicht bedient.")
+            continue
+        try:
+            source = build_input(kind, arg, option)
+        except ValueError as e:
+            print(f"!! Zeitmessung [{machine.label}]: {e}")
+            continue
+        machine.input_name = source.name
+        # Geräte-Thread → Queue → Dispatcher-Thread des Rings (sendet sofort).
+        # Simulation: Starter werden automatisch bereit gemeldet (kein Ring-PC nötig)
+        source.start(ImpulseDispatcher(machine, auto_ready=(kind == "sim")).start())
+        print(f"[{machine.label}] Zeitmessung: {source.name}")
 
     # SocketIO/Flask starten – wichtig: port_num verwenden
-    from flask_socketio import SocketIO
     try:
         socketio.run(app, host='127.0.0.1', port=port_num, allow_unsafe_werkzeug=True)
     except TypeError:
         # ältere Flask-SocketIO-Versionen haben allow_unsafe_werkzeug nicht
         socketio.run(app, host='127.0.0.1', port=port_num)
-
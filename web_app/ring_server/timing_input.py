@@ -0,0 +1,355 @@
+# timing_input.py
+"""
+Eingangsseite der Zeitmessung: liefert Rohzeilen eines Zeitmessgeräts an den
+Ring (``on_line(line, received_at)``), unabhängig davon, woher sie kommen.
+
+  ComTimyInput     ALGE Timy über USB/COM (win32com, nur Windows)
+  LineReaderInput  zeilenweise aus seriellem Port (pyserial) oder Datei/Pipe
+  SimulatedTimy    spielt eine Impulsdatei deterministisch ab (beliebiges Tempo)
+
+Alle Quellen liefern das Timy-Zeilenformat, das ring_machine.parse_timy_output
+versteht (z.B. ``0012 C0  10:15:01.2345 00``). Damit lässt sich die Latenz
+Impuls → start_clock/run_finished_timing auf jedem Rechner messen.
+
+Im Ring-Server hängt zwischen Quelle und Ring ein ``ImpulseDispatcher``: der
+Geräte-Thread parst den Impuls einmal und legt ihn in eine blockierende Queue,
+der Dispatcher-Thread des Rings wacht sofort auf und sendet start_clock bzw.
+run_finished_timing. Kein Polling, keine Wartezeit zwischen Impuls und Senden.
+"""
+
+from __future__ import annotations
+
+import queue
+import random
+import re
+import threading
+import time
+
+from web_app.ring_server.ring_machine import _time_str_to_seconds, normalize_ring_id, parse_impulse, parse_timy_output
+
+
+class TimingInput:
+    """Basis: ``run(on_line)`` blockiert bis Ende/stop(); ``start`` startet es in einem Thread."""
+
+    name = "input"
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self, on_line) -> None:
+        raise NotImplementedError
+
+    def start(self, on_line) -> threading.Thread:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_logged, args=(on_line,),
+                                        name=f"timing-{self.name}", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _run_logged(self, on_line) -> None:
+        try:
+            self.run(on_line)
+        except Exception as e:
+            print(f"!! ZEITMESSUNG FEHLER ({self.name}): {e}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def join(self, timeout=None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+class ComTimyInput(TimingInput):
+    """
+    ALGE Timy über den COM-Treiber ALGEUSB.TimyUSB (pywin32). Der Thread
+    schläft in MsgWaitForMultipleObjects und wacht auf, sobald der Treiber eine
+    Nachricht (OnUSBInput) einreiht oder stop() aufgerufen wird – kein Polling.
+    """
+
+    def __init__(self, device_index=0):
+        super().__init__()
+        self.device_index = device_index
+        self.name = f"timy:{device_index}"
+        self._stop_handle = None
+
+    def stop(self) -> None:
+        super().stop()
+        if self._stop_handle is not None:
+            import win32event
+            win32event.SetEvent(self._stop_handle)
+
+    def run(self, on_line) -> None:
+        import pythoncom
+        import win32com.client
+        import win32event
+
+        device_index = self.device_index
+
+        class _Events:
+            def OnConnectionOpen(self):
+                print(f">> Verbindung zum Timy {device_index} erfolgreich.")
+
+            def OnUSBInput(self, data):
+                on_line(data, time.perf_counter())
+
+        timy = None
+        self._stop_handle = win32event.CreateEvent(None, 0, 0, None)
+        pythoncom.CoInitialize()
+        try:
+            timy = win32com.client.DispatchWithEvents('ALGEUSB.TimyUSB', _Events)
+            timy.Init()
+            timy.OpenConnection(self.device_index)
+            while not self._stop.is_set():
+                rc = win32event.MsgWaitForMultipleObjects([self._stop_handle], False, win32event.INFINITE,
+                                                          win32event.QS_ALLINPUT)
+                if rc == win32event.WAIT_OBJECT_0:
+                    break
+                pythoncom.PumpWaitingMessages()
+        finally:
+            try:
+                if timy is not None:
+                    timy.CloseConnection()
+            except Exception:
+                pass
+            pythoncom.CoUninitialize()
+
+
+# Timy: CR, Dateien/Pipes: LF oder CRLF
+_LINE_END_RE = re.compile(r"\r\n|\r|\n")
+
+
+class LineReaderInput(TimingInput):
+    """Liest Zeilen aus einem Datei-ähnlichen Objekt (``opener()`` liefert es, bytes oder str)."""
+
+    def __init__(self, opener, name="lines"):
+        super().__init__()
+        self.opener = opener
+        self.name = name
+
+    @classmethod
+    def serial(cls, port, baudrate=9600):
+        """Timy an RS232/USB-Seriell (8N1). Benötigt pyserial."""
+        def opener():
+            try:
+                import serial
+            except ImportError as exc:
+                raise RuntimeError("pyserial fehlt (pip install pyserial)") from exc
+            return serial.Serial(port, baudrate=baudrate, timeout=0.5)
+        return cls(opener, name=f"serial:{port}")
+
+    @classmethod
+    def file(cls, path):
+        return cls(lambda: open(path, "r", encoding="utf-8", errors="replace"), name=f"file:{path}")
+
+    def run(self, on_line) -> None:
+        stream = self.opener()
+        pending = ""
+        try:
+            while not self._stop.is_set():
+                raw = stream.readline()
+                received_at = time.perf_counter()
+                if not raw:
+                    # Datei zu Ende; ein serieller Port (hat is_open) liefert b"" nur beim Lese-Timeout
+                    if getattr(stream, "is_open", None) is None:
+                        break
+                    continue
+                if isinstance(raw, bytes):
+                    raw = raw.decode("ascii", errors="replace")
+                # Beim Lese-Timeout liefert readline() auch eine halbe Zeile: sammeln bis zum Zeilenende
+                pending += raw
+                *lines, pending = _LINE_END_RE.split(pending)
+                for line in lines:
+                    if line.strip():
+                        on_line(line, received_at)
+            if pending.strip() and not self._stop.is_set():
+                on_line(pending, time.perf_counter())
+        finally:
+            stream.close()
+
+
+class SimulatedTimy(TimingInput):
+    """
+    Spielt Timy-Zeilen ab. Die Pausen ergeben sich aus den Tageszeiten der
+    Impulse, geteilt durch ``rate`` (1 = Echtzeit, 10 = zehnfach, 0 = ohne Pause).
+    Andere Zeilen werden ohne Pause durchgereicht.
+    """
+
+    def __init__(self, lines, rate=1.0, sleep=None, name="sim"):
+        super().__init__()
+        self.lines = list(lines)
+        self.rate = float(rate)
+        self.sleep = sleep or self._stop.wait
+        self.name = name
+        self.sent = 0
+
+    @classmethod
+    def from_file(cls, path, rate=1.0):
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.rstrip("\n") for line in f if line.strip() and not line.startswith("#")]
+        return cls(lines, rate=rate, name=f"sim:{path}")
+
+    def run(self, on_line) -> None:
+        previous = None
+        for line in self.lines:
+            if self._stop.is_set():
+                return
+            parsed = parse_timy_output(line)
+            if parsed and self.rate > 0:
+                at = _time_str_to_seconds(parsed["time_of_day"])
+                if previous is not None and at > previous:
+                    self.sleep((at - previous) / self.rate)
+                previous = at
+            on_line(line, time.perf_counter())
+            self.sent += 1
+
+
+def _tod(seconds):
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:07.4f}"
+
+
+def generate_impulses(starters=100, seed=1, start="08:00:00.0000", run_seconds=(28.0, 55.0),
+                      gap_seconds=(12.0, 30.0), noise=0.0):
+    """
+    Deterministische Impulsfolge: pro Starter ein C0 (Start) und ein C1 (Ziel).
+    ``noise`` ist der Anteil zusätzlicher Fehl-Impulse (doppelte Lichtschranke),
+    die der Ring ignorieren muss.
+    """
+    rng = random.Random(seed)
+    clock = _time_str_to_seconds(start)
+    lines, no = [], 0
+
+    def add(channel, at):
+        nonlocal no
+        no += 1
+        lines.append(f"{no:04d} {channel}  {_tod(at)} 00")
+
+    for _ in range(starters):
+        add("C0", clock)
+        if noise and rng.random() < noise:
+            add("C0", clock + 0.05)
+        finish = clock + rng.uniform(*run_seconds)
+        add("C1", finish)
+        if noise and rng.random() < noise:
+            add("C1", finish + 0.02)
+        clock = finish + rng.uniform(*gap_seconds)
+    return lines
+
+
+class _AutoReady:
+    """Simulation/Lasttest: vor jedem Start-Impuls selbst einen Starter bereit melden, wie sonst der Ring-PC."""
+
+    def __init__(self, machine):
+        self.machine = machine
+        self.count = 0
+
+    def before(self, impulse):
+        if impulse.channel.startswith("C0") and \
+                self.machine.snapshot()["run_status"] in ("idle", "finished_timing"):
+            self.count += 1
+            self.machine.set_starter_ready({"run_id": "sim", "starter": {"Startnummer": self.count}})
+
+
+def feed_machine(machine, auto_ready=False):
+    """Synchrone on_line-Funktion für einen Ring (Impuls wird im Aufrufer-Thread verarbeitet)."""
+    ready = _AutoReady(machine) if auto_ready else None
+
+    def on_line(line, received_at=None):
+        impulse = parse_impulse(line, received_at)
+        if impulse:
+            if ready:
+                ready.before(impulse)
+            machine.handle_impulse(impulse)
+        return impulse
+
+    return on_line
+
+
+class ImpulseDispatcher:
+    """
+    Blockierende Queue + Dispatcher-Thread pro Ring. Als on_line einer Quelle
+    verwendet: der Geräte-Thread parst nur und reiht ein (kehrt sofort zurück),
+    der Dispatcher verarbeitet die Impulse in Eingangsreihenfolge.
+    """
+
+    def __init__(self, machine, auto_ready=False):
+        self.machine = machine
+        self._ready = _AutoReady(machine) if auto_ready else None
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self.dispatched = 0
+        self.ignored = 0
+
+    def __call__(self, line, received_at=None):
+        impulse = parse_impulse(line, received_at)
+        if impulse is None:
+            self.ignored += 1
+            return None
+        self._queue.put(impulse)
+        return impulse
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=f"impulse-ring-{self.machine.ring_id}",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            impulse = self._queue.get()
+            if impulse is None:
+                return
+            try:
+                if self._ready:
+                    self._ready.before(impulse)
+                self.machine.handle_impulse(impulse)
+            except Exception as e:
+                print(f"!! [{self.machine.label}] Impuls konnte nicht verarbeitet werden: {e}")
+            self.dispatched += 1
+
+    def stop(self, timeout=2.0):
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def pending(self):
+        return self._queue.qsize()
+
+
+def parse_input_spec(spec) -> dict:
+    """
+    '1=timy:0,2=serial:COM4@9600,3=sim:impulse.txt@20' →
+    {'1': ('timy', '0', None), '2': ('serial', 'COM4', 9600.0), '3': ('sim', 'impulse.txt', 20.0)}
+    """
+    result = {}
+    for part in str(spec or "").split(","):
+        ring, _, source = part.partition("=")
+        kind, _, arg = source.partition(":")
+        if not ring.strip() or not kind.strip():
+            continue
+        arg, _, option = arg.rpartition("@") if "@" in arg else (arg, "", "")
+        try:
+            value = float(option) if option else None
+        except ValueError:
+            value = None
+        result[normalize_ring_id(ring)] = (kind.strip().lower(), arg.strip(), value)
+    return result
+
+
+def build_input(kind, arg, option=None) -> TimingInput:
+    if kind == "timy":
+        return ComTimyInput(int(arg or 0))
+    if kind == "serial":
+        return LineReaderInput.serial(arg, baudrate=int(option or 9600))
+    if kind == "file":
+        return LineReaderInput.file(arg)
+    if kind == "sim":
+        if arg.isdigit():
+            return SimulatedTimy(generate_impulses(int(arg)), rate=option if option is not None else 1.0,
+                                 name=f"sim:{arg}")
+        return SimulatedTimy.from_file(arg, rate=option if option is not None else 1.0)
+    raise ValueError(f"unbekannte Zeitmess-Quelle {kind!r} (timy, serial, file, sim)")
@@ -0,0 +1,385 @@
+"""
+event_repository.py — In-Process-Repository für die Event-Datenbank.
+
+Jedes Event liegt in einer eigenen Datei data/events/<id>.json (kompaktes JSON,
+atomar geschrieben). Die Reihenfolge der Events steht in data/events/_order.json.
+Ein Ergebnis-Speichern schreibt damit nur noch das aktive Event und nicht mehr
+die komplette Historie aller Turniere.
+
+Die geparsten Events werden im Speicher gehalten (nach ID indiziert). Eine
+Datei wird nur neu eingelesen, wenn sich mtime oder Grösse geändert haben
+(z.B. weil ein externes Tool sie überschrieben hat). Schreibzugriffe gehen
+sofort auf die Platte (write-through) und aktualisieren den Cache.
+
+Live-Mutationen (Resultat, Status, Laufdaten) werden nicht als Snapshot,
+sondern als Zeile im Journal data/events/<id>.journal.jsonl gespeichert
+(siehe result_journal.py). Ein Hintergrund-Thread (start_compactor) faltet
+das Journal periodisch in den Snapshot; beim Laden wird ein vorhandenes
+Journal auf den Snapshot eingespielt.
+
+Eine noch vorhandene Alt-Datei data/events.json (eine Liste aller Events) wird
+beim ersten Zugriff automatisch in Einzeldateien aufgeteilt; das Original
+bleibt als events.json.migrated erhalten.
+
+Wichtig: get_event()/get_run()/load_all() liefern die gecachten Objekte selbst
+(keine Kopien). Wer ein Event verändert, muss es anschliessend mit
+save_event()/save_all() zurückschreiben.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+from web_app.storage.files import atomic_write_bytes, atomic_write_json, dump_json_bytes
+from web_app.storage.result_journal import JOURNAL_SUFFIX, ResultJournal, apply_ops
+
+EVENTS_FILENAME = "events.json"
+EVENTS_DIRNAME = "events"
+ORDER_FILENAME = "_order.json"
+MIGRATED_SUFFIX = ".migrated"
+
+
+def _file_stamp(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def shard_name(event_id) -> str:
+    """Dateiname (ohne Endung) für eine Event-ID; entschärft Pfadzeichen."""
+    return re.sub(r"[^\w.-]", "_", str(event_id))
+
+
+class EventRepository:
+    def __init__(self, data_dir: str, filename: str = EVENTS_FILENAME):
+        self.data_dir = data_dir
+        self.legacy_path = os.path.join(data_dir, filename)
+        self.events_dir = os.path.join(data_dir, EVENTS_DIRNAME)
+        self.order_path = os.path.join(self.events_dir, ORDER_FILENAME)
+        self._lock = threading.RLock()
+        # shard_name -> {"stamp", "event", "digest"}
+        self._shards: dict[str, dict] = {}
+        self._runs_by_event: dict[str, dict[str, dict]] = {}
+        self._order: list[str] | None = None
+        self._legacy_stamp = None
+        self._legacy_checked = False
+        # Events mit Journal-Zeilen, die noch nicht im Snapshot stehen
+        self._journal_pending: set[str] = set()
+        self._compactor: threading.Thread | None = None
+        self._compactor_stop = threading.Event()
+        self.parse_count = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.journal_lines = 0
+
+    def shard_path(self, event_id) -> str:
+        return os.path.join(self.events_dir, f"{shard_name(event_id)}.json")
+
+    def _journal(self, key: str) -> ResultJournal:
+        return ResultJournal(os.path.join(self.events_dir, f"{key}{JOURNAL_SUFFIX}"))
+
+    # ------------------------------------------------------------------
+    # Migration der Alt-Datei events.json
+    # ------------------------------------------------------------------
+
+    def _check_legacy(self) -> None:
+        stamp = _file_stamp(self.legacy_path)
+        if self._legacy_checked and stamp == self._legacy_stamp:
+            return
+        self._legacy_checked = True
+        self._legacy_stamp = stamp
+        if stamp is None:
+            return
+        self.parse_count += 1
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if isinstance(data, dict):
+            data = [data] if data.get("id") else []
+        events = [e for e in data if isinstance(e, dict) and e.get("id") is not None] if isinstance(data, list) else []
+        if not events:
+            return
+        self.migrate_legacy(events)
+
+    def migrate_legacy(self, events: list[dict]) -> int:
+        """Teilt eine Liste von Events in Einzeldateien auf und sichert die Alt-Datei."""
+        order = self._load_order()
+        for event in events:
+            self._write_shard(event)
+            key = shard_name(event.get("id"))
+            if key not in order:
+                order.append(key)
+        self._write_order(order)
+        if os.path.exists(self.legacy_path):
+            os.replace(self.legacy_path, self.legacy_path + MIGRATED_SUFFIX)
+            atomic_write_json(self.legacy_path, [])
+            self._legacy_stamp = _file_stamp(self.legacy_path)
+        return len(events)
+
+    # ------------------------------------------------------------------
+    # Einzeldateien
+    # ------------------------------------------------------------------
+
+    def _load_order(self) -> list[str]:
+        if self._order is None:
+            try:
+                with open(self.order_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._order = [str(x) for x in data] if isinstance(data, list) else []
+            except (OSError, json.JSONDecodeError):
+                self._order = []
+        return self._order
+
+    def _write_order(self, order: list[str]) -> None:
+        self._order = list(order)
+        atomic_write_json(self.order_path, self._order)
+
+    def _load_shard(self, key: str) -> dict | None:
+        path = os.path.join(self.events_dir, f"{key}.json")
+        stamp = _file_stamp(path)
+        cached = self._shards.get(key)
+        if stamp is None:
+            if cached is not None:
+                self._shards.pop(key, None)
+                self._runs_by_event.pop(key, None)
+            return None
+        if cached is not None and cached["stamp"] == stamp:
+            return cached["event"]
+        self.parse_count += 1
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+            self.bytes_read += len(payload)
+            event = json.loads(payload.decode("utf-8"))
+        except (OSError, ValueError):
+            return cached["event"] if cached else None
+        if not isinstance(event, dict):
+            return None
+        ops = self._journal(key).read_ops()
+        if ops:
+            apply_ops(event, ops)
+            self._journal_pending.add(key)
+        self._shards[key] = {"stamp": stamp, "event": event, "digest": hashlib.sha1(payload).digest()}
+        self._runs_by_event.pop(key, None)
+        return event
+
+    def _write_shard(self, event: dict, force: bool = True) -> bool:
+        key = shard_name(event.get("id"))
+        payload = dump_json_bytes(event)
+        digest = hashlib.sha1(payload).digest()
+        cached = self._shards.get(key)
+        if not force and cached is not None and cached["digest"] == digest:
+            cached["event"] = event
+            return False
+        path = os.path.join(self.events_dir, f"{key}.json")
+        atomic_write_bytes(path, payload)
+        self.bytes_written += len(payload)
+        self._shards[key] = {"stamp": _file_stamp(path), "event": event, "digest": digest}
+        self._runs_by_event.pop(key, None)
+        # Der Snapshot enthält jetzt alle Journal-Einträge
+        if key in self._journal_pending:
+            self._journal(key).remove()
+            self._journal_pending.discard(key)
+        return True
+
+    def _scan_keys(self) -> list[str]:
+        try:
+            names = os.listdir(self.events_dir)
+        except FileNotFoundError:
+            return []
+        return [n[:-5] for n in names if n.endswith(".json") and not n.startswith(("_", "."))]
+
+    def invalidate(self) -> None:
+        """Verwirft den Cache; der nächste Zugriff liest die Dateien neu."""
+        with self._lock:
+            self._shards.clear()
+            self._runs_by_event.clear()
+            self._order = None
+            self._legacy_checked = False
+
+    # ------------------------------------------------------------------
+    # Lesen
+    # ------------------------------------------------------------------
+
+    def load_all(self) -> list[dict]:
+        """Alle Events als neue Liste (die Event-Objekte selbst sind geteilt)."""
+        with self._lock:
+            self._check_legacy()
+            present = set(self._scan_keys())
+            ordered = [k for k in self._load_order() if k in present]
+            known = set(ordered)
+            ordered.extend(sorted(k for k in present if k not in known))
+            for key in list(self._shards):
+                if key not in present:
+                    self._shards.pop(key, None)
+                    self._runs_by_event.pop(key, None)
+            events = []
+            for key in ordered:
+                event = self._load_shard(key)
+                if event is not None:
+                    events.append(event)
+            return events
+
+    def get_event(self, event_id) -> dict | None:
+        if event_id is None:
+            return None
+        with self._lock:
+            self._check_legacy()
+            event = self._load_shard(shard_name(event_id))
+            if event is not None and str(event.get("id")) != str(event_id):
+                return None
+            return event
+
+    def get_run(self, event_id, run_id) -> dict | None:
+        if run_id is None:
+            return None
+        with self._lock:
+            event = self.get_event(event_id)
+            if not event:
+                return None
+            key = shard_name(event_id)
+            runs = self._runs_by_event.get(key)
+            run = runs.get(str(run_id)) if runs is not None else None
+            if run is None or str(run.get("id")) != str(run_id):
+                # Index fehlt oder ist veraltet (Läufe wurden in-place verändert)
+                runs = {
+                    str(r.get("id")): r
+                    for r in event.get("runs", []) or []
+                    if isinstance(r, dict) and r.get("id") is not None
+                }
+                self._runs_by_event[key] = runs
+                run = runs.get(str(run_id))
+            return run
+
+    # ------------------------------------------------------------------
+    # Schreiben (write-through)
+    # ------------------------------------------------------------------
+
+    def save_event(self, event: dict) -> None:
+        """Schreibt ein einzelnes (neues oder geändertes) Event zurück."""
+        with self._lock:
+            self._check_legacy()
+            self._write_shard(event)
+            key = shard_name(event.get("id"))
+            order = self._load_order()
+            if key not in order:
+                self._write_order(order + [key])
+
+    def delete_event(self, event_id) -> bool:
+        with self._lock:
+            key = shard_name(event_id)
+            try:
+                os.remove(os.path.join(self.events_dir, f"{key}.json"))
+                removed = True
+            except FileNotFoundError:
+                removed = False
+            self._shards.pop(key, None)
+            self._runs_by_event.pop(key, None)
+            self._journal(key).remove()
+            self._journal_pending.discard(key)
+            order = self._load_order()
+            if key in order:
+                self._write_order([k for k in order if k != key])
+            return removed
+
+    def save_all(self, events: list[dict]) -> None:
+        """
+        Ersetzt die komplette Event-Liste (Kompatibilität zu _save_data).
+        Nur tatsächlich veränderte Events werden neu geschrieben; Events,
+        die nicht mehr in der Liste stehen, werden gelöscht.
+        """
+        with self._lock:
+            self._check_legacy()
+            events = [e for e in (events or []) if isinstance(e, dict) and e.get("id") is not None]
+            keys = [shard_name(e.get("id")) for e in events]
+            for key in self._scan_keys():
+                self._load_shard(key)
+            for event in events:
+                self._write_shard(event, force=False)
+            wanted = set(keys)
+            for key in self._scan_keys():
+                if key not in wanted:
+                    self.delete_event(key)
+            if keys != self._load_order():
+                self._write_order(keys)
+
+    # ------------------------------------------------------------------
+    # Journal & Kompaktierung
+    # ------------------------------------------------------------------
+
+    def append_journal(self, event: dict, ops: list[dict]) -> None:
+        """
+        Hält bereits im Speicher angewandte Änderungen als eine Journal-Zeile fest
+        (eine fsync'te Zeile statt eines kompletten Snapshots).
+        """
+        if not ops:
+            return
+        with self._lock:
+            key = shard_name(event.get("id"))
+            if key not in self._shards:
+                # Neues Event ohne Snapshot: direkt vollständig schreiben
+                self.save_event(event)
+                return
+            self._journal(key).append(ops)
+            self._shards[key]["event"] = event
+            self._journal_pending.add(key)
+            self.journal_lines += 1
+
+    def compact(self) -> int:
+        """Faltet alle offenen Journale in ihre Snapshots; gibt die Anzahl Events zurück."""
+        with self._lock:
+            keys = list(self._journal_pending)
+            for key in keys:
+                cached = self._shards.get(key)
+                if cached is None:
+                    self._journal_pending.discard(key)
+                    continue
+                self._write_shard(cached["event"])
+            return len(keys)
+
+    def start_compactor(self, interval: float = 5.0) -> None:
+        """Startet (einmalig) den Hintergrund-Thread für die Kompaktierung."""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor_stop.clear()
+            self._compactor = threading.Thread(
+                target=self._compactor_loop, args=(interval,), daemon=True, name="event-compactor"
+            )
+            self._compactor.start()
+
+    def stop_compactor(self) -> None:
+        self._compactor_stop.set()
+        if self._compactor is not None:
+            self._compactor.join(timeout=2)
+        self.compact()
+
+    def _compactor_loop(self, interval: float) -> None:
+        while not self._compactor_stop.wait(interval):
+            try:
+                self.compact()
+            except Exception as exc:
+                print(f"[event-compactor] Fehler: {exc}")
+
+
+_repositories: dict[str, EventRepository] = {}
+_repositories_lock = threading.Lock()
+
+
+def get_repository(data_dir: str = "data") -> EventRepository:
+    """Liefert das (prozessweite) Repository für das angegebene Datenverzeichnis."""
+    key = os.path.abspath(data_dir)
+    with _repositories_lock:
+        repo = _repositories.get(key)
+        if repo is None:
+            repo = EventRepository(key)
+            _repositories[key] = repo
+        return repo
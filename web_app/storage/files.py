@@ -0,0 +1,79 @@
+"""
+files.py — Atomare Datei-Schreibzugriffe für den Datenordner.
+
+Es wird immer zuerst in eine temporäre Datei im selben Verzeichnis geschrieben,
+diese per fsync auf die Platte gebracht und danach per os.replace() über die
+Zieldatei gelegt. Ein Absturz mitten im Schreiben hinterlässt damit entweder
+die alte oder die neue Datei, aber nie eine halb geschriebene.
+
+Angehängte JSONL-Protokolle (Journal, Idempotenz-Log, Ring-Protokoll) liest
+``read_json_lines``; dort kann ein Absturz nur die letzte Zeile abschneiden.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+
+_REPLACE_RETRIES = 5
+
+
+def atomic_write_bytes(path: str, payload: bytes) -> None:
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        # Unter Windows schlägt os.replace fehl, solange ein anderer Thread die
+        # Zieldatei gerade liest – kurz warten und erneut versuchen.
+        for attempt in range(_REPLACE_RETRIES):
+            try:
+                os.replace(tmp_path, path)
+                break
+            except PermissionError:
+                if attempt == _REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(0.02 * (attempt + 1))
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def dump_json_bytes(data, indent=None) -> bytes:
+    if indent is None:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(data, ensure_ascii=False, indent=indent)
+    return text.encode("utf-8")
+
+
+def atomic_write_json(path: str, data, indent=None) -> int:
+    """Schreibt JSON atomar; gibt die Anzahl geschriebener Bytes zurück."""
+    payload = dump_json_bytes(data, indent=indent)
+    atomic_write_bytes(path, payload)
+    return len(payload)
+
+
+def read_json_lines(path: str):
+    """Einträge einer JSONL-Datei; fehlt sie, gibt es keine. Unlesbare Zeilen werden übersprungen."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Absturz mitten im Schreiben: nur die letzte Zeile ist betroffen
+                    continue
+    except FileNotFoundError:
+        return
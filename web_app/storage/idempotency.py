@@ -0,0 +1,78 @@
+"""
+idempotency.py — Gedächtnis für bereits verarbeitete Anfragen (Idempotenz-Schlüssel).
+
+Der Ring-Server sendet jedes Resultat mit einem eindeutigen Schlüssel und
+wiederholt es, bis eine Antwort ankommt. Kam die Antwort nicht an (WLAN weg,
+Timeout), wird dasselbe Resultat erneut geschickt; hier steht dann schon die
+frühere Antwort und es wird nichts doppelt gespeichert.
+
+Die Datei (data/submitted_results.jsonl) ist append-only, eine Zeile pro
+Schlüssel mit fsync. Übersteigt sie ``keep`` Einträge deutlich, wird sie
+atomar auf die neuesten ``keep`` Schlüssel gekürzt.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from web_app.storage.files import atomic_write_bytes, read_json_lines
+
+
+class IdempotencyLog:
+    def __init__(self, path: str, keep: int = 5000):
+        self.path = path
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, dict] = self._read()
+        self._lines = len(self._entries)
+
+    def _read(self) -> OrderedDict:
+        entries: OrderedDict[str, dict] = OrderedDict()
+        for record in read_json_lines(self.path):
+            key = record.get("key")
+            if key:
+                entries.pop(key, None)
+                entries[key] = record.get("response") or {}
+        return entries
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            response = self._entries.get(key)
+            return dict(response) if response is not None else None
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def remember(self, key: str, response: dict) -> None:
+        line = json.dumps({"key": key, "ts": datetime.now().isoformat(), "response": response},
+                          ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = dict(response)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._lines += 1
+            if self._lines > 2 * self.keep:
+                self._compact()
+
+    def _compact(self) -> None:
+        while len(self._entries) > self.keep:
+            self._entries.popitem(last=False)
+        payload = "".join(
+            json.dumps({"key": key, "response": response}, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for key, response in self._entries.items()
+        )
+        atomic_write_bytes(self.path, payload.encode("utf-8"))
+        self._lines = len(self._entries)
@@ -0,0 +1,101 @@
+"""
+outbox.py — Persistente Warteschlange für ausgehende Portal-Nachrichten.
+
+Jede Nachricht wird vor dem Senden in data/outbox.json geschrieben (atomar) und
+erst nach erfolgreicher Zustellung entfernt. Ein Absturz oder ein WLAN-Ausfall
+in der Halle verliert damit nichts; nach dem Neustart wird weitergesendet.
+
+Nachrichten mit ``coalesce_key`` ersetzen eine noch wartende Nachricht mit
+demselben Schlüssel, ``supersedes`` verwirft zusätzlich wartende Nachrichten
+mit den genannten Schlüsseln (z.B. veraltete Startlisten-Stände eines Laufs).
+Gesendet wird immer in ``seq``-Reihenfolge.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+
+from web_app.storage.files import atomic_write_json
+
+
+class DurableOutbox:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._items: list[dict] = self._read()
+        self.coalesced = 0
+
+    def _read(self) -> list[dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+        items = [item for item in data if isinstance(item, dict) and "seq" in item] if isinstance(data, list) else []
+        return sorted(items, key=lambda item: item["seq"])
+
+    def _write(self) -> None:
+        atomic_write_json(self.path, self._items)
+
+    def enqueue(self, seq: int, kind: str, payload: dict, coalesce_key: str | None = None,
+                supersedes: tuple = ()) -> dict:
+        item = {
+            "seq": seq,
+            "kind": kind,
+            "coalesce_key": coalesce_key,
+            "payload": payload,
+            "attempts": 0,
+            "enqueued_at": time.time(),
+        }
+        drop = set(supersedes or ())
+        if coalesce_key:
+            drop.add(coalesce_key)
+        with self._lock:
+            if drop:
+                before = len(self._items)
+                self._items = [i for i in self._items if i.get("coalesce_key") not in drop]
+                self.coalesced += before - len(self._items)
+            self._items.append(item)
+            self._items.sort(key=lambda i: i["seq"])
+            self._write()
+        return item
+
+    def peek(self, limit: int | None = None) -> list[dict]:
+        """Die ältesten wartenden Nachrichten (Kopien der Einträge, Reihenfolge nach seq)."""
+        with self._lock:
+            items = self._items if limit is None else self._items[:limit]
+            return [dict(item) for item in items]
+
+    def ack(self, seqs) -> None:
+        done = set(seqs)
+        if not done:
+            return
+        with self._lock:
+            self._items = [item for item in self._items if item["seq"] not in done]
+            self._write()
+
+    def mark_failed(self, seq: int, error: str) -> None:
+        with self._lock:
+            for item in self._items:
+                if item["seq"] == seq:
+                    item["attempts"] = item.get("attempts", 0) + 1
+                    item["last_error"] = error
+                    break
+            self._write()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def stats(self) -> dict:
+        with self._lock:
+            oldest = self._items[0]["enqueued_at"] if self._items else None
+            return {
+                "pending": len(self._items),
+                "coalesced": self.coalesced,
+                "oldest_age_s": round(time.time() - oldest, 1) if oldest else None,
+                "path": os.path.basename(self.path),
+            }
@@ -0,0 +1,101 @@
+"""
+result_journal.py — Append-only Journal für Live-Mutationen eines Events.
+
+Pro Event gibt es eine Datei data/events/<id>.journal.jsonl. Jede Zeile ist ein
+JSON-Objekt {"ts": ..., "ops": [...]} und wird einzeln mit fsync geschrieben;
+das Speichern eines Resultats kostet damit eine kurze Zeile statt eines
+kompletten Event-Snapshots.
+
+Alle Operationen sind "set"-Operationen (Feld X hat jetzt Wert Y). Sie sind
+idempotent: ein mehrfaches Einspielen auf denselben oder einen neueren Snapshot
+führt zum gleichen Ergebnis. Das erlaubt eine einfache Kompaktierung
+(Snapshot schreiben, danach Journal löschen) ohne Zwei-Phasen-Logik.
+
+Operationen:
+  {"op": "set_entry", "run_id": ..., "license": ..., "fields": {...}}
+  {"op": "set_run",   "run_id": ..., "fields": {...}}
+  {"op": "set_event", "fields": {...}}   (z.B. ring_entry_state)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+
+from web_app.storage.files import read_json_lines
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
+def set_entry_op(run_id, license_nr, **fields) -> dict:
+    return {"op": "set_entry", "run_id": str(run_id), "license": license_nr, "fields": fields}
+
+
+def set_run_op(run_id, **fields) -> dict:
+    return {"op": "set_run", "run_id": str(run_id), "fields": fields}
+
+
+def set_event_op(**fields) -> dict:
+    return {"op": "set_event", "fields": fields}
+
+
+def apply_ops(event: dict, ops: list[dict]) -> int:
+    """Spielt Operationen auf ein Event ein; gibt die Anzahl angewandter Ops zurück."""
+    runs = {str(r.get("id")): r for r in event.get("runs", []) or [] if isinstance(r, dict)}
+    applied = 0
+    for op in ops:
+        fields = op.get("fields") or {}
+        kind = op.get("op")
+        if kind == "set_event":
+            event.update(fields)
+            applied += 1
+            continue
+        run = runs.get(str(op.get("run_id")))
+        if run is None:
+            continue
+        if kind == "set_run":
+            run.update(fields)
+            applied += 1
+        elif kind == "set_entry":
+            entry = next(
+                (e for e in run.get("entries", []) or [] if e.get("Lizenznummer") == op.get("license")),
+                None,
+            )
+            if entry is not None:
+                entry.update(fields)
+                applied += 1
+    return applied
+
+
+class ResultJournal:
+    def __init__(self, path: str):
+        self.path = path
+
+    def append(self, ops: list[dict]) -> None:
+        line = json.dumps(
+            {"ts": datetime.now().isoformat(), "ops": ops},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read_ops(self) -> list[dict]:
+        """Alle Operationen in Schreibreihenfolge; eine abgeschnittene letzte Zeile wird ignoriert."""
+        ops: list[dict] = []
+        for record in read_json_lines(self.path):
+            ops.extend(record.get("ops") or [])
+        return ops
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,411 @@
+"""
+sqlite_store.py — Optionales SQLite-Backend (stdlib sqlite3, WAL-Modus).
+
+Aktivierung über settings.json: "storage_backend": "sqlite". Die Datenbank liegt
+unter data/agility.sqlite3; beim ersten Öffnen werden die bestehenden
+JSON-Dateien automatisch importiert (siehe import_json()).
+
+Tabellen:
+  events   (id, pos, body)                          – Event ohne Läufe
+  runs     (event_id, pos, id, body)                – Lauf ohne Startliste
+  entries  (event_id, run_pos, pos, run_id, license, body)
+  dogs / handlers / judges / clubs (pos, key, body) – Stammdaten
+
+Die Spalten id/license/key sind indiziert; Abfragen nach Lizenznummer oder
+Lauf-ID sind damit Index-Treffer statt Datei-Parses. "body" enthält jeweils
+das restliche Objekt als JSON, damit neue Felder ohne Schema-Migration
+weiterhin durchgereicht werden.
+
+SQLiteEventRepository bietet dieselbe Schnittstelle wie EventRepository
+(load_all/get_event/get_run/save_event/save_all/delete_event/append_journal),
+damit utils._load_data/_save_data und alle Aufrufer unverändert bleiben.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DB_FILENAME = "agility.sqlite3"
+
+# Dateiname -> (Tabelle, Schlüsselfeld im Objekt)
+COLLECTIONS = {
+    "dogs.json": ("dogs", "Lizenznummer"),
+    "handlers.json": ("handlers", "id"),
+    "judges.json": ("judges", "id"),
+    "clubs.json": ("clubs", "nummer"),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS events (id TEXT PRIMARY KEY, pos INTEGER NOT NULL, body TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS runs (
+    event_id TEXT NOT NULL, pos INTEGER NOT NULL, id TEXT, body TEXT NOT NULL,
+    PRIMARY KEY (event_id, pos)
+);
+CREATE INDEX IF NOT EXISTS runs_by_id ON runs (event_id, id);
+CREATE TABLE IF NOT EXISTS entries (
+    event_id TEXT NOT NULL, run_pos INTEGER NOT NULL, pos INTEGER NOT NULL,
+    run_id TEXT, license TEXT, body TEXT NOT NULL,
+    PRIMARY KEY (event_id, run_pos, pos)
+);
+CREATE INDEX IF NOT EXISTS entries_by_license ON entries (license);
+CREATE INDEX IF NOT EXISTS entries_by_run ON entries (event_id, run_id);
+"""
+
+_COLLECTION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (pos INTEGER PRIMARY KEY, key TEXT, body TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS {table}_by_key ON {table} (key);
+"""
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class SQLiteStore:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self.write_lock = threading.RLock()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = self.connection()
+        with conn:
+            conn.executescript(_SCHEMA)
+            for table, _key in COLLECTIONS.values():
+                conn.executescript(_COLLECTION_SCHEMA.format(table=table))
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', '0')")
+
+    def connection(self) -> sqlite3.Connection:
+        """Eine Verbindung pro Thread (sqlite3-Verbindungen sind nicht threadsicher)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # Meta / Revision
+    # ------------------------------------------------------------------
+
+    def get_meta(self, key: str, default=None):
+        row = self.connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, conn: sqlite3.Connection, key: str, value) -> None:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def revision(self) -> int:
+        return int(self.get_meta("revision", 0))
+
+    def bump_revision(self, conn: sqlite3.Connection) -> int:
+        conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'revision'")
+        return int(conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0])
+
+    def collection_revision(self, filename: str) -> int:
+        """Revision der letzten Änderung einer Stammdaten-Tabelle (für Caches der Aufrufer)."""
+        table, _key = COLLECTIONS[filename]
+        return int(self.get_meta(f"revision:{table}", 0))
+
+    # ------------------------------------------------------------------
+    # Stammdaten
+    # ------------------------------------------------------------------
+
+    def load_collection(self, filename: str) -> list:
+        table, _key = COLLECTIONS[filename]
+        rows = self.connection().execute(f"SELECT body FROM {table} ORDER BY pos")
+        return [json.loads(body) for (body,) in rows]
+
+    def save_collection(self, filename: str, items: list) -> None:
+        table, key_field = COLLECTIONS[filename]
+        conn = self.connection()
+        with self.write_lock, conn:
+            conn.execute(f"DELETE FROM {table}")
+            conn.executemany(
+                f"INSERT INTO {table} (pos, key, body) VALUES (?, ?, ?)",
+                [
+                    (pos, str(item.get(key_field)) if isinstance(item, dict) and item.get(key_field) is not None else None,
+                     _dumps(item))
+                    for pos, item in enumerate(items or [])
+                ],
+            )
+            self.set_meta(conn, f"revision:{table}", self.bump_revision(conn))
+
+    def get_records(self, filename: str, keys=None) -> dict:
+        """Objekte einer Stammdaten-Tabelle nach Schlüssel (optional nur die angegebenen)."""
+        table, _key = COLLECTIONS[filename]
+        conn = self.connection()
+        if keys is None:
+            rows = conn.execute(f"SELECT key, body FROM {table} WHERE key IS NOT NULL ORDER BY pos")
+            result = {}
+            for k, b in rows:
+                if k not in result:
+                    result[k] = json.loads(b)
+            return result
+        keys = [str(k) for k in keys if k is not None]
+        result = {}
+        # SQLite begrenzt die Anzahl Parameter pro Statement
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for k, b in conn.execute(f"SELECT key, body FROM {table} WHERE key IN ({marks})", chunk):
+                result.setdefault(k, json.loads(b))
+        return result
+
+    def get_record(self, filename: str, key):
+        table, _key = COLLECTIONS[filename]
+        row = self.connection().execute(
+            f"SELECT body FROM {table} WHERE key = ? ORDER BY pos LIMIT 1", (str(key),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_entries_by_license(self, license_nr) -> list[tuple[str, str, dict]]:
+        """Alle Starts einer Lizenz über alle Events: [(event_id, run_id, entry), ...]."""
+        rows = self.connection().execute(
+            "SELECT event_id, run_id, body FROM entries WHERE license = ? ORDER BY event_id, run_pos, pos",
+            (str(license_nr),),
+        )
+        return [(e, r, json.loads(b)) for e, r, b in rows]
+
+    # ------------------------------------------------------------------
+    # Import
+    # ------------------------------------------------------------------
+
+    def import_json(self, data_dir: str) -> dict:
+        """Importiert Events (Shards, Journale, Alt-Datei) und Stammdaten aus dem JSON-Datenordner."""
+        from web_app.storage.event_repository import EventRepository
+
+        counts = {}
+        events = EventRepository(data_dir).load_all()
+        SQLiteEventRepository(self).save_all(events)
+        counts["events"] = len(events)
+        for filename in COLLECTIONS:
+            path = os.path.join(data_dir, filename)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    items = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                items = []
+            if not isinstance(items, list):
+                items = []
+            self.save_collection(filename, items)
+            counts[filename] = len(items)
+        conn = self.connection()
+        with self.write_lock, conn:
+            self.set_meta(conn, "imported_at", datetime.now().isoformat())
+        return counts
+
+
+class SQLiteEventRepository:
+    def __init__(self, store: SQLiteStore):
+        self.store = store
+        self._lock = store.write_lock
+        self._cache: dict[str, dict] = {}
+        self._revision = None
+        self.parse_count = 0
+
+    def _check_revision(self) -> None:
+        # Schreibt ein anderer Prozess in die DB, ändert sich die Revision
+        rev = self.store.revision()
+        if rev != self._revision:
+            self._cache.clear()
+            self._revision = rev
+
+    def _assemble(self, event_id: str) -> dict | None:
+        conn = self.store.connection()
+        row = conn.execute("SELECT body FROM events WHERE id = ?", (event_id,)).fetchone()
+        if row is None:
+            return None
+        self.parse_count += 1
+        event = json.loads(row[0])
+        runs = []
+        by_pos = {}
+        for pos, body in conn.execute("SELECT pos, body FROM runs WHERE event_id = ? ORDER BY pos", (event_id,)):
+            run = json.loads(body)
+            run["entries"] = []
+            by_pos[pos] = run
+            runs.append(run)
+        for run_pos, body in conn.execute(
+            "SELECT run_pos, body FROM entries WHERE event_id = ? ORDER BY run_pos, pos", (event_id,)
+        ):
+            run = by_pos.get(run_pos)
+            if run is not None:
+                run["entries"].append(json.loads(body))
+        event["runs"] = runs
+        return event
+
+    def _write_event(self, conn: sqlite3.Connection, event: dict, pos: int) -> None:
+        event_id = str(event.get("id"))
+        conn.execute("DELETE FROM runs WHERE event_id = ?", (event_id,))
+        conn.execute("DELETE FROM entries WHERE event_id = ?", (event_id,))
+        head = {k: v for k, v in event.items() if k != "runs"}
+        conn.execute("INSERT OR REPLACE INTO events (id, pos, body) VALUES (?, ?, ?)", (event_id, pos, _dumps(head)))
+        run_rows, entry_rows = [], []
+        for run_pos, run in enumerate(event.get("runs", []) or []):
+            if not isinstance(run, dict):
+                continue
+            run_id = str(run.get("id")) if run.get("id") is not None else None
+            run_rows.append((event_id, run_pos, run_id, _dumps({k: v for k, v in run.items() if k != "entries"})))
+            for entry_pos, entry in enumerate(run.get("entries", []) or []):
+                lic = entry.get("Lizenznummer") if isinstance(entry, dict) else None
+                entry_rows.append((event_id, run_pos, entry_pos, run_id, lic, _dumps(entry)))
+        conn.executemany("INSERT INTO runs (event_id, pos, id, body) VALUES (?, ?, ?, ?)", run_rows)
+        conn.executemany(
+            "INSERT INTO entries (event_id, run_pos, pos, run_id, license, body) VALUES (?, ?, ?, ?, ?, ?)",
+            entry_rows,
+        )
+        self._cache[event_id] = event
+
+    # ------------------------------------------------------------------
+    # Lesen
+    # ------------------------------------------------------------------
+
+    def load_all(self) -> list[dict]:
+        with self._lock:
+            self._check_revision()
+            ids = [i for (i,) in self.store.connection().execute("SELECT id FROM events ORDER BY pos")]
+            events = []
+            for event_id in ids:
+                event = self.get_event(event_id)
+                if event is not None:
+                    events.append(event)
+            return events
+
+    def get_event(self, event_id) -> dict | None:
+        if event_id is None:
+            return None
+        with self._lock:
+            self._check_revision()
+            key = str(event_id)
+            event = self._cache.get(key)
+            if event is None:
+                event = self._assemble(key)
+                if event is not None:
+                    self._cache[key] = event
+            return event
+
+    def get_run(self, event_id, run_id) -> dict | None:
+        event = self.get_event(event_id)
+        if not event or run_id is None:
+            return None
+        return next((r for r in event.get("runs", []) or [] if str(r.get("id")) == str(run_id)), None)
+
+    # ------------------------------------------------------------------
+    # Schreiben
+    # ------------------------------------------------------------------
+
+    def save_event(self, event: dict) -> None:
+        conn = self.store.connection()
+        with self._lock, conn:
+            self._check_revision()
+            row = conn.execute("SELECT pos FROM events WHERE id = ?", (str(event.get("id")),)).fetchone()
+            if row is None:
+                row = conn.execute("SELECT COALESCE(MAX(pos) + 1, 0) FROM events").fetchone()
+            self._write_event(conn, event, row[0])
+            self._revision = self.store.bump_revision(conn)
+
+    def save_all(self, events: list[dict]) -> None:
+        conn = self.store.connection()
+        events = [e for e in (events or []) if isinstance(e, dict) and e.get("id") is not None]
+        with self._lock, conn:
+            self._check_revision()
+            wanted = {str(e.get("id")) for e in events}
+            for (event_id,) in conn.execute("SELECT id FROM events").fetchall():
+                if event_id not in wanted:
+                    self._delete(conn, event_id)
+            for pos, event in enumerate(events):
+                self._write_event(conn, event, pos)
+            self._revision = self.store.bump_revision(conn)
+
+    def _delete(self, conn: sqlite3.Connection, event_id: str) -> bool:
+        cur = conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+        conn.execute("DELETE FROM runs WHERE event_id = ?", (event_id,))
+        conn.execute("DELETE FROM entries WHERE event_id = ?", (event_id,))
+        self._cache.pop(event_id, None)
+        return cur.rowcount > 0
+
+    def delete_event(self, event_id) -> bool:
+        conn = self.store.connection()
+        with self._lock, conn:
+            removed = self._delete(conn, str(event_id))
+            self._revision = self.store.bump_revision(conn)
+            return removed
+
+    def append_journal(self, event: dict, ops: list[dict]) -> None:
+        """
+        Live-Mutationen als gezielte Zeilen-Updates: nur der betroffene Lauf bzw.
+        die betroffenen Starts werden neu geschrieben, bei "set_event" die
+        Event-Zeile ohne Läufe (die Ops sind bereits im Speicher angewandt).
+        """
+        if not ops:
+            return
+        event_id = str(event.get("id"))
+        conn = self.store.connection()
+        with self._lock, conn:
+            runs = event.get("runs", []) or []
+            for op in ops:
+                if op.get("op") == "set_event":
+                    head = {k: v for k, v in event.items() if k != "runs"}
+                    conn.execute("UPDATE events SET body = ? WHERE id = ?", (_dumps(head), event_id))
+                    continue
+                run_pos = next((i for i, r in enumerate(runs) if str(r.get("id")) == str(op.get("run_id"))), None)
+                if run_pos is None:
+                    continue
+                run = runs[run_pos]
+                if op.get("op") == "set_run":
+                    conn.execute(
+                        "UPDATE runs SET body = ? WHERE event_id = ? AND pos = ?",
+                        (_dumps({k: v for k, v in run.items() if k != "entries"}), event_id, run_pos),
+                    )
+                elif op.get("op") == "set_entry":
+                    for entry_pos, entry in enumerate(run.get("entries", []) or []):
+                        if entry.get("Lizenznummer") == op.get("license"):
+                            conn.execute(
+                                "UPDATE entries SET body = ? WHERE event_id = ? AND run_pos = ? AND pos = ?",
+                                (_dumps(entry), event_id, run_pos, entry_pos),
+                            )
+            self._cache[event_id] = event
+            self._revision = self.store.bump_revision(conn)
+
+    def compact(self) -> int:
+        return 0
+
+    def start_compactor(self, interval: float = 5.0) -> None:
+        """Kein Journal im SQLite-Backend – nichts zu kompaktieren."""
+
+    def stop_compactor(self) -> None:
+        pass
+
+
+_stores: dict[str, SQLiteStore] = {}
+_repositories: dict[str, SQLiteEventRepository] = {}
+_stores_lock = threading.Lock()
+
+
+def get_sqlite_store(data_dir: str = "data") -> SQLiteStore:
+    """Prozessweiter Store; importiert beim ersten Öffnen die JSON-Daten."""
+    key = os.path.abspath(data_dir)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = SQLiteStore(os.path.join(key, DB_FILENAME))
+            if store.get_meta("imported_at") is None:
+                store.import_json(key)
+            _stores[key] = store
+        return store
+
+
+def get_sqlite_repository(data_dir: str = "data") -> SQLiteEventRepository:
+    store = get_sqlite_store(data_dir)
+    key = os.path.abspath(data_dir)
+    with _stores_lock:
+        repo = _repositories.get(key)
+        if repo is None:
+            repo = SQLiteEventRepository(store)
+            _repositories[key] = repo
+        return repo
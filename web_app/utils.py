@@ -1,11 +1,16 @@
 # utils.py
 import os
 import sys
+import atexit
 import json
 import csv
 from io import StringIO
 from datetime import datetime, timedelta
 import math
+import bisect
+import threading
+import time
+from collections import OrderedDict
 import uuid
 import random
 import re
@@ -17,12 +22,18 @@ if PROJECT_ROOT not in sys.path:
 
 import planner.schedule_planner as schedule_planner
 from planner.schedule_planner import upgrade_settings
+from planner.schedule_index import ScheduleIndex
+from web_app.storage.event_repository import EVENTS_FILENAME, get_repository
+from web_app.storage.files import atomic_write_json
+from web_app.diagnostics.perf import recorder as perf
+from web_app.storage.sqlite_store import COLLECTIONS as SQLITE_COLLECTIONS, get_sqlite_repository, get_sqlite_store
 from web_app.live.ring_state import (
     apply_result_saved,
     apply_start_impulse,
     build_view_model_from_state,
     init_ring_entry_state,
 )
+from web_app.live.schedule_drift import DriftTracker, project_ring_timeline
 
 CATEGORY_SORT_ORDER = {'Large': 0, 'Intermediate': 1, 'Medium': 2, 'Small': 3}
 
@@ -72,19 +83,171 @@ def _to_float(value, default=0.0):
     except (ValueError, TypeError):
         return default
 
+_backend_cache = {'stamp': None, 'backend': 'json'}
+
+
+def _storage_backend():
+    """'json' (Standard) oder 'sqlite' gemäss settings.json; neu gelesen nur bei Dateiänderung."""
+    filepath = os.path.join('data', 'settings.json')
+    try:
+        st = os.stat(filepath)
+        stamp = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        stamp = None
+    if stamp != _backend_cache['stamp']:
+        backend = 'json'
+        if stamp is not None:
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    backend = (json.load(f) or {}).get('storage_backend') or 'json'
+            except (OSError, json.JSONDecodeError, AttributeError):
+                backend = 'json'
+        _backend_cache['stamp'], _backend_cache['backend'] = stamp, str(backend).lower()
+    return _backend_cache['backend']
+
+
+def _get_event_repository():
+    if _storage_backend() == 'sqlite':
+        return get_sqlite_repository('data')
+    return get_repository('data')
+
+
+def get_event(event_id):
+    """Event direkt aus dem In-Process-Repository (kein erneutes Parsen, kein Scan)."""
+    return _get_event_repository().get_event(event_id)
+
+
+def get_run(event_id, run_id):
+    """Lauf eines Events direkt aus dem Repository (None, falls unbekannt)."""
+    return _get_event_repository().get_run(event_id, run_id)
+
+
+def save_event(event):
+    """Schreibt ein einzelnes Event zurück (write-through in den Cache)."""
+    repo = _get_event_repository()
+    with perf.timed('save_data', 'event') as counters:
+        before = getattr(repo, 'bytes_written', 0)
+        repo.save_event(event)
+        counters['bytes_written'] = getattr(repo, 'bytes_written', 0) - before
+    invalidate_event_results(event)
+    invalidate_schedule_index(event.get('id'))
+    touch_ring_views(event.get('id'))
+
+
+def record_event_ops(event, ops):
+    """Hält Live-Mutationen (Resultat, Status, Laufdaten, Ring-Zustand) als Journal-Zeile fest."""
+    with perf.timed('save_data', 'journal', ops=len(ops)):
+        _get_event_repository().append_journal(event, ops)
+    touch_ring_views(event.get('id'))
+
+
+def start_event_compactor(interval=None):
+    """Startet den Hintergrund-Thread, der die Event-Journale in die Snapshots faltet."""
+    repo = _get_event_repository()
+    if interval is None:
+        interval = _to_float(_load_settings().get('journal_compact_interval'), 5.0) or 5.0
+    repo.start_compactor(interval)
+    atexit.register(repo.stop_compactor)
+
+
+def delete_event(event_id):
+    """Entfernt ein Event (seine Einzeldatei) aus dem Repository."""
+    touch_ring_views(event_id)
+    invalidate_schedule_index(event_id)
+    return _get_event_repository().delete_event(event_id)
+
+
+_record_map_cache = {}
+
+
+def _get_record_map(filename, key_field):
+    """
+    Stammdaten als Dict nach Schlüssel, gecacht bis zur nächsten Änderung
+    (JSON: Zeitstempel/Grösse der Datei, SQLite: Revision der Tabelle).
+    """
+    store = get_sqlite_store('data') if _storage_backend() == 'sqlite' else None
+    if store is not None:
+        stamp = ('sqlite', store.collection_revision(filename))
+    else:
+        try:
+            st = os.stat(os.path.join('data', filename))
+            stamp = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamp = None
+    cached = _record_map_cache.get(filename)
+    if cached is None or cached[0] != stamp:
+        if store is not None:
+            records = store.get_records(filename)
+        else:
+            records = {}
+            for item in _load_data(filename):
+                if isinstance(item, dict) and item.get(key_field) is not None:
+                    records.setdefault(str(item.get(key_field)), item)
+        cached = (stamp, records)
+        _record_map_cache[filename] = cached
+    return cached[1]
+
+
+def get_dogs_by_license():
+    """Hunde nach Lizenznummer (nur lesen – das Dict ist geteilt)."""
+    return _get_record_map('dogs.json', 'Lizenznummer')
+
+
+def get_handlers_by_id():
+    """Hundeführer nach ID (nur lesen – das Dict ist geteilt)."""
+    return _get_record_map('handlers.json', 'id')
+
+
 def _load_data(filename, default_data=[]):
+    if not perf.enabled:
+        return _read_data(filename, default_data, None)
+    with perf.timed('load_data', filename) as counters:
+        return _read_data(filename, default_data, counters)
+
+
+def _read_data(filename, default_data, counters):
+    if filename == EVENTS_FILENAME:
+        repo = _get_event_repository()
+        if counters is None:
+            return repo.load_all()
+        parsed, read = getattr(repo, 'parse_count', 0), getattr(repo, 'bytes_read', 0)
+        events = repo.load_all()
+        counters['parsed'] = getattr(repo, 'parse_count', 0) - parsed
+        counters['bytes_read'] = getattr(repo, 'bytes_read', 0) - read
+        return events
+    if filename in SQLITE_COLLECTIONS and _storage_backend() == 'sqlite':
+        return get_sqlite_store('data').load_collection(filename)
     filepath = os.path.join('data', filename)
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            if counters is None:
+                return json.load(f)
+            raw = f.read()
+        counters['bytes_read'] = len(raw)
+        started = time.perf_counter()
+        data = json.loads(raw)
+        counters['parse_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return data
     except (FileNotFoundError, json.JSONDecodeError):
         return default_data
 
 def _save_data(filename, data):
-    filepath = os.path.join('data', filename)
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    if filename in _RING_VIEW_SOURCES:
+        touch_ring_views()
+    with perf.timed('save_data', filename) as counters:
+        if filename == EVENTS_FILENAME:
+            invalidate_all_run_results()
+            invalidate_schedule_index()
+            repo = _get_event_repository()
+            before = getattr(repo, 'bytes_written', 0)
+            repo.save_all(data)
+            counters['bytes_written'] = getattr(repo, 'bytes_written', 0) - before
+            return
+        if filename in SQLITE_COLLECTIONS and _storage_backend() == 'sqlite':
+            get_sqlite_store('data').save_collection(filename, data)
+            return
+        filepath = os.path.join('data', filename)
+        counters['bytes_written'] = atomic_write_json(filepath, data, indent=4)
 
 def _load_settings():
     defaults = {
@@ -111,8 +274,7 @@ def _get_active_event_id():
 def _get_active_event():
     active_id = _get_active_event_id()
     if not active_id: return None
-    events = _load_data('events.json')
-    return next((e for e in events if e.get('id') == active_id), None)
+    return get_event(active_id)
 
 def _decode_csv_file(file_storage):
     try:
@@ -186,27 +348,40 @@ def _get_concrete_run_list(event):
     return ordered_runs
 
 
-def _match_run_to_block(run_item, block):
-    laufart = (_norm(run_item.get('laufart')) or '').lower()
-    block_laufart = (block.get('timing_run_type') or '').lower()
-    if block_laufart and block_laufart != 'other' and laufart != block_laufart:
-        return False
+_schedule_index_cache = {}
+_schedule_index_lock = threading.Lock()
+schedule_index_stats = {'builds': 0, 'hits': 0}
 
-    category = (_norm(run_item.get('kategorie')) or '').lower()
-    size_categories = [normalize_size(s) for s in (block.get('size_categories') or []) if normalize_size(s)]
-    if size_categories:
-        if category not in size_categories:
-            return False
-    else:
-        size_cat = (block.get('size_category') or '').lower()
-        if size_cat not in ('', 'all') and category != size_cat:
-            return False
 
-    klasse = str(run_item.get('klasse'))
-    if block.get('classes'):
-        if str(klasse) not in [str(c) for c in block.get('classes', [])]:
-            return False
-    return True
+def get_schedule_index(event, schedule=None):
+    """
+    Lauf↔Block-Index eines Events (siehe planner.schedule_index), einmal pro
+    Zeitplan-Stand gebaut. Gültig, solange Zeitplan- und Laufliste dieselben
+    Objekte sind und keine Invalidierung (Speichern, Block-Änderung) erfolgte.
+    """
+    if schedule is None:
+        schedule = event.get('schedule') or {}
+    runs = event.get('runs')
+    key = str(event.get('id'))
+    with _schedule_index_lock:
+        index = _schedule_index_cache.get(key)
+        if index is not None and index.is_current(schedule, runs):
+            schedule_index_stats['hits'] += 1
+            return index
+    index = ScheduleIndex(schedule, runs)
+    with _schedule_index_lock:
+        schedule_index_stats['builds'] += 1
+        _schedule_index_cache[key] = index
+    return index
+
+
+def invalidate_schedule_index(event_id=None):
+    """Verwirft den Lauf↔Block-Index eines Events (ohne event_id: alle)."""
+    with _schedule_index_lock:
+        if event_id is None:
+            _schedule_index_cache.clear()
+        else:
+            _schedule_index_cache.pop(str(event_id), None)
 
 
 def _get_run_list_from_schedule(event, schedule):
@@ -214,12 +389,14 @@ def _get_run_list_from_schedule(event, schedule):
     run_map = {r['id']: r for r in all_runs if isinstance(r, dict)}
     seen_ids = set()
 
+    index = get_schedule_index(event, schedule)
     rings = schedule.get('rings') or {}
     for ring_key in sorted(rings.keys(), key=lambda x: int(x) if str(x).isdigit() else str(x)):
         ring_data = rings[ring_key]
         for block in ring_data.get('blocks') or []:
             if block.get('type') != 'run':
                 continue
+            block_runs = index.runs_for_block(block)
             sort_info = block.get('sort') or {}
             primary = sort_info.get('primary') or {}
             secondary = sort_info.get('secondary') or {}
@@ -231,10 +408,8 @@ def _get_run_list_from_schedule(event, schedule):
                 block.get('size_categories', []),
             )
             for size_val, cls_val in groups:
-                for run_item in all_runs:
-                    if not isinstance(run_item, dict):
-                        continue
-                    if _match_run_to_block(run_item, block) and (_norm(run_item.get('kategorie')).lower() == size_val):
+                for run_item in block_runs:
+                    if _norm(run_item.get('kategorie')).lower() == size_val:
                         if str(run_item.get('klasse')) != str(cls_val):
                             continue
                         run_id = run_item.get('id')
@@ -268,181 +443,417 @@ def _place_entries_with_distance(entries, distance):
     final_order.extend(start_at_end_entries)
     return final_order
 
-def _calculate_run_results(run, settings):
-    """
-    Berechnet Ranglisten-Ergebnisse inkl. SCT/MCT gemäß aktueller Fachlogik.
-    - Laufzeiten bleiben ungerundet (Hundertstel).
-    - SCT/MCT werden nach Berechnung stets auf volle Sekunden aufgerundet (ceil).
-    - Zeitfehler = max(0, Laufzeit - SCT_gerundet).
-    - Automatische DIS, wenn Laufzeit > MCT_gerundet.
-    """
-    results = []
+_SCT_FACTOR_CONFIG = {
+    "2": {"standard": 1.4, "qualification": 1.2},
+    "3": {"standard": 1.3, "qualification": 1.15},
+}
+
+
+def _entry_result_data(entry):
+    return entry.get("result") or {
+        "zeit": entry.get("zeit"),
+        "fehler": entry.get("fehler"),
+        "verweigerungen": entry.get("verweigerungen"),
+        "disqualifikation": entry.get("dis_abr") or entry.get("disqualifikation"),
+    }
+
+
+def _ranking_params(run):
+    """Laufdaten-abhängige Parameter der Rangierung (ohne Teilnehmer-Resultate)."""
     laufdaten = run.get("laufdaten", {}) or {}
     run["laufdaten"] = laufdaten
     klasse = str(run.get("klasse"))
     laufart = run.get("laufart")
-
     parcours_laenge = _to_float(laufdaten.get("parcours_laenge"), 0.0)
-    sct_factor_config = {
-        "2": {"standard": 1.4, "qualification": 1.2},
-        "3": {"standard": 1.3, "qualification": 1.15},
+    mct_seconds = None
+    if klasse in ["2", "3"] and parcours_laenge > 0:
+        mct_seconds = parcours_laenge / 3.0 if laufart == "Jumping" else parcours_laenge / 2.5
+    return {
+        "klasse": klasse,
+        "parcours_laenge": parcours_laenge,
+        "is_qualification": bool(
+            laufdaten.get("is_qualification")
+            or laufdaten.get("qualification_mode")
+            or laufdaten.get("sct_mode") == "qualification"
+        ),
+        "auto_dis": laufdaten.get("auto_dis_on_mct_exceeded", True),
+        "mct_seconds": mct_seconds,
+        "mct_limit": math.ceil(mct_seconds) if mct_seconds is not None else None,
+        "manual_sct": _to_float(laufdaten.get("standardzeit_sct"), None),
+        "speed": _to_float(laufdaten.get("geschwindigkeit"), None),
     }
-    is_qualification = bool(
-        laufdaten.get("is_qualification")
-        or laufdaten.get("qualification_mode")
-        or laufdaten.get("sct_mode") == "qualification"
-    )
-    auto_dis_on_mct_exceeded = laufdaten.get("auto_dis_on_mct_exceeded", True)
 
+
+def _sct_candidate(entry, params):
+    """(Fehler+Verweigerungen, Laufzeit) eines Teilnehmers als SCT-Basis (Klasse 2/3) oder None."""
+    result_data = _entry_result_data(entry)
+    if result_data.get("disqualifikation") in ["DIS", "ABR", "DNS"]:
+        return None
+    laufzeit = _to_float(result_data.get("zeit"), None)
+    if laufzeit is None:
+        return None
+    if params["auto_dis"] and params["mct_limit"] is not None and laufzeit > params["mct_limit"]:
+        return None
+    fehler = _to_int(result_data.get("fehler", "0"), 0)
+    verweigerungen = _to_int(result_data.get("verweigerungen", "0"), 0)
+    return (fehler + verweigerungen, laufzeit)
+
+
+def _sct_mct_rounded(params, best_candidate):
+    """SCT/MCT (aufgerundet) aus den Laufdaten und – für Klasse 2/3 – dem besten Kandidaten."""
+    klasse = params["klasse"]
     sct_seconds, mct_seconds = None, None
 
     # Klasse 1: SCT vorgegeben oder aus Geschwindigkeit, MCT = ceil(SCT*1.5)
     if klasse in ["1", "Oldie"]:
-        provided_sct = _to_float(laufdaten.get("standardzeit_sct"), None)
-        speed = _to_float(laufdaten.get("geschwindigkeit"), None)
-        if provided_sct is not None:
-            sct_seconds = provided_sct
-        elif parcours_laenge > 0 and speed not in (None, 0):
-            sct_seconds = parcours_laenge / speed
+        speed = params["speed"]
+        if params["manual_sct"] is not None:
+            sct_seconds = params["manual_sct"]
+        elif params["parcours_laenge"] > 0 and speed not in (None, 0):
+            sct_seconds = params["parcours_laenge"] / speed
         if sct_seconds is not None:
             mct_seconds = sct_seconds * 1.5
 
     elif klasse in ["2", "3"]:
-        if parcours_laenge > 0:
-            if laufart == "Jumping":
-                mct_seconds = parcours_laenge / 3.0
-            else:
-                mct_seconds = parcours_laenge / 2.5
-
-        mct_limit = math.ceil(mct_seconds) if mct_seconds is not None else None
-        best_candidate = None
-        for entry in run.get("entries", []):
-            result_data = entry.get("result") or {
-                "zeit": entry.get("zeit"),
-                "fehler": entry.get("fehler"),
-                "verweigerungen": entry.get("verweigerungen"),
-                "disqualifikation": entry.get("dis_abr") or entry.get("disqualifikation"),
-            }
-
-            dis_abr = result_data.get("disqualifikation")
-            if dis_abr in ["DIS", "ABR", "DNS"]:
-                continue
-
-            laufzeit = _to_float(result_data.get("zeit"), None)
-            if laufzeit is None:
-                continue
-
-            if auto_dis_on_mct_exceeded and mct_limit is not None and laufzeit > mct_limit:
-                continue
-
-            fehler = _to_int(result_data.get("fehler", "0"), 0)
-            verweigerungen = _to_int(result_data.get("verweigerungen", "0"), 0)
-            candidate = (fehler + verweigerungen, laufzeit)
-            if best_candidate is None or candidate < best_candidate:
-                best_candidate = candidate
-
+        mct_seconds = params["mct_seconds"]
         if best_candidate:
             base_time = best_candidate[1]
-            factor_cfg = sct_factor_config.get(klasse, {"standard": 1.0, "qualification": 1.0})
-            factor = factor_cfg["qualification"] if is_qualification else factor_cfg["standard"]
+            factor_cfg = _SCT_FACTOR_CONFIG.get(klasse, {"standard": 1.0, "qualification": 1.0})
+            factor = factor_cfg["qualification"] if params["is_qualification"] else factor_cfg["standard"]
             sct_seconds = base_time * factor
-
-        manual_sct = _to_float(laufdaten.get("standardzeit_sct"), None)
-        if sct_seconds is None and manual_sct is not None:
-            sct_seconds = manual_sct
+        if sct_seconds is None and params["manual_sct"] is not None:
+            sct_seconds = params["manual_sct"]
     else:
-        manual_sct = _to_float(laufdaten.get("standardzeit_sct"), None)
-        if manual_sct is not None:
-            sct_seconds = manual_sct
+        if params["manual_sct"] is not None:
+            sct_seconds = params["manual_sct"]
 
     sct_rounded = math.ceil(sct_seconds) if sct_seconds is not None else None
-    if mct_seconds is None and klasse in ["1", "Oldie"] and sct_seconds is not None:
-        mct_seconds = sct_seconds * 1.5
     mct_rounded = math.ceil(mct_seconds) if mct_seconds is not None else None
+    return sct_rounded, mct_rounded
+
 
+def _apply_sct_mct(laufdaten, sct_rounded, mct_rounded):
     laufdaten["standardzeit_sct_berechnet"] = sct_rounded
     laufdaten["standardzeit_sct_gerundet"] = sct_rounded
     laufdaten["maximalzeit_mct_berechnet"] = mct_rounded
     laufdaten["maximalzeit_mct_gerundet"] = mct_rounded
 
-    for entry in run.get("entries", []):
-        res = entry.copy()
-        result_data = res.get("result") or {
-            "zeit": res.get("zeit"),
-            "fehler": res.get("fehler"),
-            "verweigerungen": res.get("verweigerungen"),
-            "disqualifikation": res.get("dis_abr") or res.get("disqualifikation"),
-        }
 
-        dis_abr = result_data.get("disqualifikation")
-        laufzeit = _to_float(result_data.get("zeit"), None)
-        fehler = _to_int(result_data.get("fehler", "0") or "0", 0)
-        verweigerungen = _to_int(result_data.get("verweigerungen", "0") or "0", 0)
+def _score_entry(entry, sct_rounded, mct_rounded, auto_dis_on_mct_exceeded):
+    """Bewertet einen Start (Kopie des Eintrags inkl. fehler_total/zeit_total/qualifikation)."""
+    res = entry.copy()
+    result_data = _entry_result_data(res)
 
-        auto_dis_mct = (
-            auto_dis_on_mct_exceeded
-            and laufzeit is not None
-            and mct_rounded is not None
-            and laufzeit > mct_rounded
-        )
+    dis_abr = result_data.get("disqualifikation")
+    laufzeit = _to_float(result_data.get("zeit"), None)
+    fehler = _to_int(result_data.get("fehler", "0") or "0", 0)
+    verweigerungen = _to_int(result_data.get("verweigerungen", "0") or "0", 0)
+
+    auto_dis_mct = (
+        auto_dis_on_mct_exceeded
+        and laufzeit is not None
+        and mct_rounded is not None
+        and laufzeit > mct_rounded
+    )
 
-        if dis_abr in ["DIS", "ABR", "DNS"] or auto_dis_mct:
-            dis_value = dis_abr if dis_abr in ["DIS", "ABR", "DNS"] else "DIS"
-            res.update({
-                'fehler_total': 999,
-                'zeit_total': laufzeit if laufzeit is not None else 999.99,
-                'qualifikation': dis_value,
-                'fehler_parcours_anzahl': fehler,
-                'verweigerung_parcours_anzahl': verweigerungen,
-                'fehler_parcours': fehler,
-                'verweigerung_parcours': verweigerungen,
-                'disqualifikation': dis_value,
-            })
-        elif laufzeit is not None:
-            fehler_parcours = fehler * 5 + verweigerungen * 5
-            if sct_rounded is None:
-                fehler_zeit = 0
-            else:
-                fehler_zeit = max(0, laufzeit - sct_rounded)
-            fehler_total = fehler_parcours + fehler_zeit
-            qualifikation = 'N/A'
-            if fehler_total < 6:
-                qualifikation = "V0" if fehler_total == 0 else "V"
-            elif fehler_total < 16:
-                qualifikation = "SG"
-            elif fehler_total < 26:
-                qualifikation = "G"
-            else:
-                qualifikation = "NB"
-            res.update({
-                'fehler_zeit': fehler_zeit,
-                'fehler_total': fehler_total,
-                'zeit_total': laufzeit,
-                'fehler_parcours_anzahl': fehler,
-                'verweigerung_parcours_anzahl': verweigerungen,
-                'fehler_parcours': fehler_parcours,
-                'verweigerung_parcours': verweigerungen,
-                'qualifikation': qualifikation,
-                'disqualifikation': dis_abr,
-            })
+    if dis_abr in ["DIS", "ABR", "DNS"] or auto_dis_mct:
+        dis_value = dis_abr if dis_abr in ["DIS", "ABR", "DNS"] else "DIS"
+        res.update({
+            'fehler_total': 999,
+            'zeit_total': laufzeit if laufzeit is not None else 999.99,
+            'qualifikation': dis_value,
+            'fehler_parcours_anzahl': fehler,
+            'verweigerung_parcours_anzahl': verweigerungen,
+            'fehler_parcours': fehler,
+            'verweigerung_parcours': verweigerungen,
+            'disqualifikation': dis_value,
+        })
+    elif laufzeit is not None:
+        fehler_parcours = fehler * 5 + verweigerungen * 5
+        if sct_rounded is None:
+            fehler_zeit = 0
+        else:
+            fehler_zeit = max(0, laufzeit - sct_rounded)
+        fehler_total = fehler_parcours + fehler_zeit
+        qualifikation = 'N/A'
+        if fehler_total < 6:
+            qualifikation = "V0" if fehler_total == 0 else "V"
+        elif fehler_total < 16:
+            qualifikation = "SG"
+        elif fehler_total < 26:
+            qualifikation = "G"
         else:
-            res.update({'fehler_total': 998, 'zeit_total': 998.99, 'qualifikation': 'N/A', 'disqualifikation': dis_abr})
+            qualifikation = "NB"
+        res.update({
+            'fehler_zeit': fehler_zeit,
+            'fehler_total': fehler_total,
+            'zeit_total': laufzeit,
+            'fehler_parcours_anzahl': fehler,
+            'verweigerung_parcours_anzahl': verweigerungen,
+            'fehler_parcours': fehler_parcours,
+            'verweigerung_parcours': verweigerungen,
+            'qualifikation': qualifikation,
+            'disqualifikation': dis_abr,
+        })
+    else:
+        res.update({'fehler_total': 998, 'zeit_total': 998.99, 'qualifikation': 'N/A', 'disqualifikation': dis_abr})
+    return res
 
-        results.append(res)
 
-    results.sort(key=lambda x: (x.get('fehler_total', 999), x.get('zeit_total', 999)))
-    rank = 1
-    for res in results:
-        if res.get('fehler_total', 999) < 998:
-            res['platz'] = rank
-            rank += 1
+def _calculate_run_results(run, settings):
+    """
+    Berechnet Ranglisten-Ergebnisse inkl. SCT/MCT gemäß aktueller Fachlogik.
+    - Laufzeiten bleiben ungerundet (Hundertstel).
+    - SCT/MCT werden nach Berechnung stets auf volle Sekunden aufgerundet (ceil).
+    - Zeitfehler = max(0, Laufzeit - SCT_gerundet).
+    - Automatische DIS, wenn Laufzeit > MCT_gerundet.
+    """
+    with perf.timed('ranking', 'calculate_run_results', entries=len(run.get('entries') or [])):
+        params = _ranking_params(run)
+
+        best_candidate = None
+        if params["klasse"] in ["2", "3"]:
+            for entry in run.get("entries", []):
+                candidate = _sct_candidate(entry, params)
+                if candidate is not None and (best_candidate is None or candidate < best_candidate):
+                    best_candidate = candidate
+
+        sct_rounded, mct_rounded = _sct_mct_rounded(params, best_candidate)
+        _apply_sct_mct(run["laufdaten"], sct_rounded, mct_rounded)
+
+        results = [
+            _score_entry(entry, sct_rounded, mct_rounded, params["auto_dis"])
+            for entry in run.get("entries", [])
+        ]
+        results.sort(key=lambda x: (x.get('fehler_total', 999), x.get('zeit_total', 999)))
+        rank = 1
+        for res in results:
+            if res.get('fehler_total', 999) < 998:
+                res['platz'] = rank
+                rank += 1
+        return results
+
+
+class RunRanking:
+    """
+    Inkrementelle Rangierung eines Laufs (gleiche Ausgabe wie _calculate_run_results).
+
+    - Die SCT-Kandidaten (Klasse 2/3) liegen sortiert in einer Liste; der beste
+      Kandidat ist damit immer das erste Element.
+    - Die bewerteten Starts liegen sortiert nach (fehler_total, zeit_total, idx);
+      idx (Position in entries) hält die Reihenfolge bei Gleichstand stabil wie
+      beim sort() der Vollberechnung.
+    - update_entry() bewertet nur den geänderten Start neu (bisect, O(log n)
+      Suche). Nur wenn sich dadurch SCT/MCT ändern, wird der ganze Lauf neu
+      bewertet.
+    """
+
+    def __init__(self, run):
+        self.run = run
+        self.full_rescores = 0
+        self.rebuild()
+
+    def rebuild(self):
+        run = self.run
+        self._entries = run.get("entries", []) or []
+        self._entry_count = len(self._entries)
+        self._params = _ranking_params(run)
+        self._candidates = []  # sortiert: (candidate, idx)
+        self._candidate_of = {}
+        if self._params["klasse"] in ["2", "3"]:
+            for idx, entry in enumerate(self._entries):
+                candidate = _sct_candidate(entry, self._params)
+                if candidate is not None:
+                    self._candidate_of[idx] = candidate
+                    self._candidates.append((candidate, idx))
+            self._candidates.sort()
+        self._sct_mct = _sct_mct_rounded(self._params, self._best_candidate())
+        self._rescore_all()
+
+    def _best_candidate(self):
+        return self._candidates[0][0] if self._candidates else None
+
+    def _rescore_all(self):
+        sct_rounded, mct_rounded = self._sct_mct
+        self._scored = {}
+        self._order = []
+        for idx, entry in enumerate(self._entries):
+            res = _score_entry(entry, sct_rounded, mct_rounded, self._params["auto_dis"])
+            self._scored[idx] = res
+            self._order.append(self._sort_key(res, idx))
+        self._order.sort()
+        self.full_rescores += 1
+
+    @staticmethod
+    def _sort_key(res, idx):
+        return (res.get('fehler_total', 999), res.get('zeit_total', 999), idx)
+
+    def is_stale(self):
+        """True, wenn Startliste oder Laufdaten ausserhalb von update_entry() geändert wurden."""
+        entries = self.run.get("entries", []) or []
+        return (
+            entries is not self._entries
+            or len(entries) != self._entry_count
+            or _ranking_params(self.run) != self._params
+        )
+
+    def update_entry(self, idx):
+        """Nach Änderung von entries[idx] aufrufen; gibt True zurück, wenn SCT/MCT neu bestimmt wurden."""
+        if self.is_stale():
+            self.rebuild()
+            return True
+        entry = self._entries[idx]
+        if self._params["klasse"] in ["2", "3"]:
+            old = self._candidate_of.pop(idx, None)
+            if old is not None:
+                del self._candidates[bisect.bisect_left(self._candidates, (old, idx))]
+            candidate = _sct_candidate(entry, self._params)
+            if candidate is not None:
+                self._candidate_of[idx] = candidate
+                bisect.insort(self._candidates, (candidate, idx))
+            sct_mct = _sct_mct_rounded(self._params, self._best_candidate())
+            if sct_mct != self._sct_mct:
+                self._sct_mct = sct_mct
+                self._rescore_all()
+                return True
+
+        sct_rounded, mct_rounded = self._sct_mct
+        old_res = self._scored[idx]
+        del self._order[bisect.bisect_left(self._order, self._sort_key(old_res, idx))]
+        res = _score_entry(entry, sct_rounded, mct_rounded, self._params["auto_dis"])
+        self._scored[idx] = res
+        bisect.insort(self._order, self._sort_key(res, idx))
+        return False
+
+    def update_license(self, license_nr):
+        """Aktualisiert alle Starts einer Lizenznummer in diesem Lauf."""
+        rescored = False
+        for idx, entry in enumerate(self._entries):
+            if entry.get("Lizenznummer") == license_nr:
+                rescored = self.update_entry(idx) or rescored
+        return rescored
+
+    def place_of(self, idx):
+        """Rang eines Starts (None bei DIS/ohne Resultat)."""
+        res = self._scored[idx]
+        if res.get('fehler_total', 999) >= 998:
+            return None
+        return bisect.bisect_left(self._order, self._sort_key(res, idx)) + 1
+
+    def results(self):
+        """Rangliste wie _calculate_run_results (inkl. SCT/MCT in den Laufdaten)."""
+        if self.is_stale():
+            self.rebuild()
+        _apply_sct_mct(self.run["laufdaten"], *self._sct_mct)
+        results = []
+        rank = 1
+        for key in self._order:
+            res = dict(self._scored[key[2]])
+            if res.get('fehler_total', 999) < 998:
+                res['platz'] = rank
+                rank += 1
+            results.append(res)
+        return results
+
+
+_RUN_RANKINGS_MAX = 512
+_run_rankings = {}
+
+
+def get_run_ranking(run):
+    """Inkrementelle Rangierung (RunRanking) eines Laufs; wird pro Lauf-ID wiederverwendet."""
+    key = str(run.get('id'))
+    ranking = _run_rankings.get(key)
+    if ranking is None or ranking.run is not run:
+        ranking = RunRanking(run)
+        _run_rankings.pop(key, None)
+        if len(_run_rankings) >= _RUN_RANKINGS_MAX:
+            _run_rankings.pop(next(iter(_run_rankings)))
+        _run_rankings[key] = ranking
+    return ranking
+
+
+_RUN_RESULTS_CACHE_MAX = 256
+_run_results_cache = OrderedDict()
+_run_results_lock = threading.Lock()
+run_results_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def _run_results_fingerprint(run):
+    # Billig: erkennt neu geladene Events/Läufe, ersetzte Startlisten und Laufdaten.
+    # Änderungen innerhalb der Startliste melden die Routen per invalidate_run_results();
+    # save_event()/_save_data() verwerfen zusätzlich alle Ranglisten der gespeicherten Events.
+    # Die Objekte selbst (nicht id()) werden gehalten, damit keine Adresse wiederverwendet wird.
+    entries = run.get('entries')
+    return (run, entries, run.get('laufdaten'), len(entries or ()))
+
+
+def _same_fingerprint(a, b):
+    return a[0] is b[0] and a[1] is b[1] and a[2] is b[2] and a[3] == b[3]
+
+
+def get_run_results(run, settings=None):
+    """
+    Rangliste eines Laufs mit Memoisierung (LRU nach Lauf-ID + Fingerprint).
+    Die gelieferte Liste ist geteilt und darf nicht verändert werden.
+    """
+    key = str(run.get('id'))
+    fingerprint = _run_results_fingerprint(run)
+    with _run_results_lock:
+        cached = _run_results_cache.get(key)
+        if cached is not None and _same_fingerprint(cached[0], fingerprint):
+            _run_results_cache.move_to_end(key)
+            run_results_cache_stats['hits'] += 1
+            # Seiteneffekt der Vollberechnung: SCT/MCT in den Laufdaten
+            _apply_sct_mct(run['laufdaten'], *cached[2])
+            return cached[1]
+        run_results_cache_stats['misses'] += 1
+    results = _calculate_run_results(run, settings)
+    store_run_results(run, results)
     return results
 
+
+def store_run_results(run, results):
+    """Legt eine frisch berechnete Rangliste (z.B. aus RunRanking) in den Cache."""
+    laufdaten = run.get('laufdaten') or {}
+    sct_mct = (laufdaten.get('standardzeit_sct_gerundet'), laufdaten.get('maximalzeit_mct_gerundet'))
+    key = str(run.get('id'))
+    with _run_results_lock:
+        _run_results_cache[key] = (_run_results_fingerprint(run), results, sct_mct)
+        _run_results_cache.move_to_end(key)
+        while len(_run_results_cache) > _RUN_RESULTS_CACHE_MAX:
+            _run_results_cache.popitem(last=False)
+
+
+def invalidate_run_results(run_id):
+    """Verwirft die gecachte Rangliste und die Rangierung eines Laufs (nach jeder Änderung an Resultaten/Laufdaten)."""
+    with _run_results_lock:
+        _run_results_cache.pop(str(run_id), None)
+        # RunRanking hält bewertete Kopien der Einträge; nach Änderungen ausserhalb
+        # von update_entry() wären sie veraltet
+        _run_rankings.pop(str(run_id), None)
+
+
+def invalidate_event_results(event):
+    """Verwirft Ranglisten und Rangierungen aller Läufe eines Events (nach save_event)."""
+    with _run_results_lock:
+        for run in (event or {}).get('runs', []) or []:
+            if isinstance(run, dict):
+                _run_results_cache.pop(str(run.get('id')), None)
+                _run_rankings.pop(str(run.get('id')), None)
+
+
+def invalidate_all_run_results():
+    """Verwirft alle Ranglisten (nach dem Speichern der kompletten Event-Liste)."""
+    with _run_results_lock:
+        _run_results_cache.clear()
+        _run_rankings.clear()
+
+
 def _calculate_timelines(event, round_to_minutes=None):
     settings = _load_settings()
     schedule = event.get('schedule')
     if isinstance(schedule, dict) and schedule.get('rings'):
-        _recalculate_schedule_estimates(event, schedule, settings)
         return _calculate_timelines_from_schedule(event, schedule, settings, round_to_minutes)
 
     time_per_starter = settings.get('time_per_starter', 90)
@@ -493,7 +904,9 @@ def _calculate_timelines(event, round_to_minutes=None):
 
 
 def _calculate_timelines_from_schedule(event, schedule, settings, round_to_minutes=None):
-    return schedule_planner.compute_computed_timeline(
+    # Der Zeitplan selbst wird nicht kopiert: die Segmente kommen (gecacht) aus dem Planner,
+    # nur die Schätzungen werden wie bisher in die Lauf-Blöcke geschrieben.
+    computed = schedule_planner.compute_timeline_segments(
         schedule,
         event_runs=event.get('runs', []),
         settings=settings,
@@ -501,6 +914,8 @@ def _calculate_timelines_from_schedule(event, schedule, settings, round_to_minut
         event_date=event.get('Datum') or datetime.now().strftime('%Y-%m-%d'),
         round_to_minutes=round_to_minutes,
     )
+    schedule_planner.apply_estimates(schedule, computed)
+    return schedule_planner.materialize_timeline(schedule, computed)
 
 
 def _collect_participants_by_class(event_runs, block):
@@ -508,13 +923,15 @@ def _collect_participants_by_class(event_runs, block):
 
 
 def _recalculate_schedule_estimates(event, schedule, settings):
-    rings = schedule.get('rings') or {}
-    for ring in rings.values():
-        for block in ring.get('blocks') or []:
-            if block.get('type') != 'run':
-                continue
-            participants_by_class = _collect_participants_by_class(event.get('runs', []), block)
-            block['estimated'] = schedule_planner.calculate_estimates(participants_by_class, block, settings)
+    # Gleiche Berechnung wie die Zeitleiste ohne Rundung → die nächste Anzeige ist ein Cache-Treffer
+    computed = schedule_planner.compute_timeline_segments(
+        schedule,
+        event_runs=event.get('runs', []),
+        settings=settings,
+        start_times_by_ring=event.get('start_times_by_ring', {}),
+        event_date=event.get('Datum') or datetime.now().strftime('%Y-%m-%d'),
+    )
+    schedule_planner.apply_estimates(schedule, computed)
 
 
 def _to_int(x, default=0):
@@ -551,14 +968,8 @@ def judge_name(judges, judge_id):
 
 
 def _find_schedule_block_for_run(event, run):
-    schedule = event.get('schedule') or {}
-    for ring_data in (schedule.get('rings') or {}).values():
-        for block in ring_data.get('blocks') or []:
-            if (block.get('type') or '').lower() != 'run':
-                continue
-            if schedule_planner._match_run_to_block(run, block):
-                return block
-    return None
+    block, _ = get_schedule_index(event).first_slot_for_run(run)
+    return block
 
 
 def resolve_judge_id(event, run, schedule_block=None):
@@ -672,14 +1083,7 @@ def collect_ring_numbers(event: dict):
 
 
 def _find_schedule_block_by_id(event: dict, block_id: str | None):
-    if not block_id:
-        return None, None
-    schedule = event.get("schedule") or {}
-    for ring_key, ring_data in (schedule.get("rings") or {}).items():
-        for block in ring_data.get("blocks") or []:
-            if block.get("id") == block_id:
-                return block, ring_key
-    return None, None
+    return get_schedule_index(event).block_by_id(block_id)
 
 
 def _get_current_runs_by_ring(event: dict):
@@ -698,20 +1102,153 @@ def _get_ring_entry_state(event: dict, ring_number: int):
 
 
 def find_run_ring_number(event: dict, run: dict):
-    schedule = event.get("schedule") or {}
-    for ring_key, ring_data in (schedule.get("rings") or {}).items():
-        for block in ring_data.get("blocks") or []:
-            if (block.get("type") or "").lower() != "run":
-                continue
-            if schedule_planner._match_run_to_block(run, block):
-                digits = re.sub(r"[^0-9]", "", str(ring_key))
-                return digits or str(ring_key)
+    _, ring_key = get_schedule_index(event).first_slot_for_run(run)
+    if ring_key is not None:
+        digits = re.sub(r"[^0-9]", "", str(ring_key))
+        return digits or str(ring_key)
     assigned = run.get("assigned_ring") or run.get("ring") or run.get("ring_id") or run.get("ringName")
     digits = re.sub(r"[^0-9]", "", str(assigned or ""))
     return digits or None
 
 
+schedule_drift = DriftTracker()
+
+
+def _is_finished(entry):
+    result = (entry or {}).get('result') or {}
+    return bool(result.get('zeit') or result.get('disqualifikation'))
+
+
+def planned_seconds_per_starter(run, settings=None):
+    """Geplante Sekunden pro Start eines Laufs (Zeitmatrix aus den Einstellungen)."""
+    klasse = str(run.get('klasse'))
+    return schedule_planner.calculate_run_seconds(
+        {klasse: 1}, run.get('laufart'), run.get('kategorie'), [klasse], settings or _load_settings()
+    )
+
+
+def record_result_timing(event, run, timestamp, settings=None, license_nr=None):
+    """Nach jedem gespeicherten Resultat: Tempo des Rings nachführen (O(1))."""
+    ring = find_run_ring_number(event, run) or '1'
+    return schedule_drift.observe(event.get('id'), ring, run.get('id'), timestamp,
+                                  planned_seconds_per_starter(run, settings), license_nr=license_nr)
+
+
+def get_schedule_forecast(event, ring=None, now=None, settings=None):
+    """
+    Live-Prognose des Zeitplans: {ring: {"pace", "delay_minutes", "items"}}.
+    Basis ist die (gecachte) geplante Zeitleiste; neu gerechnet wird pro Ring nur
+    die Restzeit des aktuellen Blocks (offene Starts) und alles danach.
+    """
+    settings = settings or _load_settings()
+    now = now or datetime.now()
+    timelines = _calculate_timelines(event)
+    index = get_schedule_index(event)
+    rings = (event.get('schedule') or {}).get('rings') or {}
+    current_runs = _get_current_runs_by_ring(event)
+    current_blocks = event.get('current_run_blocks') or {}
+    forecast = {}
+    for ring_key, items in timelines.items():
+        if ring is not None and str(ring_key) != str(ring):
+            continue
+        block = None
+        block_entry = current_blocks.get(str(ring_key))
+        if isinstance(block_entry, dict) and block_entry.get('run_block_id'):
+            block, _ = index.block_by_id(block_entry['run_block_id'])
+        if block is None and current_runs.get(str(ring_key)):
+            run = next((r for r in event.get('runs', []) if r.get('id') == current_runs[str(ring_key)]), None)
+            if run:
+                block, _ = index.first_slot_for_run(run, ring_key)
+        blocks = (rings.get(str(ring_key)) or {}).get('blocks') or []
+        block_index = next((i for i, b in enumerate(blocks) if b is block), None)
+
+        remaining = 0.0
+        if block is not None:
+            for run in index.runs_for_block(block):
+                open_starts = sum(1 for e in run.get('entries', []) if not _is_finished(e))
+                if open_starts:
+                    remaining += open_starts * planned_seconds_per_starter(run, settings)
+        pace = schedule_drift.pace(event.get('id'), ring_key)
+        projected = project_ring_timeline(items, block_index, remaining, now, pace)
+        upcoming = [item for item in projected if item.get('forecast_start') and not item.get('done')]
+        forecast[str(ring_key)] = {
+            'pace': round(pace, 3) if pace is not None else None,
+            'delay_minutes': upcoming[1]['delay_minutes'] if len(upcoming) > 1 else 0,
+            'items': projected,
+        }
+    return forecast
+
+
+_RING_VIEW_CACHE_MAX = 64
+_RING_VIEW_SOURCES = {EVENTS_FILENAME, 'judges.json', 'settings.json'}
+_ring_view_cache = OrderedDict()
+_ring_view_lock = threading.Lock()
+_ring_view_revisions = {}
+_ring_view_generation = [0]
+ring_view_cache_stats = {'hits': 0, 'misses': 0, 'recompute_seconds': 0.0, 'recompute_max_seconds': 0.0}
+
+
+def touch_ring_views(event_id=None):
+    """
+    Markiert die Ring-Ansichten eines Events als veraltet (ohne event_id: alle).
+    Wird von jedem Schreibpfad aufgerufen (save_event, record_event_ops, _save_data).
+    """
+    with _ring_view_lock:
+        if event_id is None:
+            _ring_view_generation[0] += 1
+        else:
+            key = str(event_id)
+            _ring_view_revisions[key] = _ring_view_revisions.get(key, 0) + 1
+
+
+def ring_view_cache_snapshot():
+    """Zähler des Ring-View-Caches für die Debug-Ansicht."""
+    with _ring_view_lock:
+        stats = dict(ring_view_cache_stats)
+        stats['size'] = len(_ring_view_cache)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else None
+    stats['recompute_avg_ms'] = round(stats['recompute_seconds'] * 1000 / stats['misses'], 2) if stats['misses'] else None
+    stats['recompute_seconds'] = round(stats['recompute_seconds'], 4)
+    stats['recompute_max_seconds'] = round(stats['recompute_max_seconds'], 4)
+    return stats
+
+
 def build_ring_view_model(event: dict, ring_number: int, max_startlist=10, max_ranking=10, max_last_results=3):
+    """
+    Gemeinsames View-Model eines Rings für Sprecher, Ring-Monitor, Ring-PC und
+    Live-Dashboard. Wird pro Zustandsänderung nur einmal berechnet und danach
+    geteilt – das gelieferte Dict darf nicht verändert werden.
+    """
+    if not event:
+        return _compute_ring_view_model(event, ring_number, max_startlist, max_ranking, max_last_results)
+    event_id = str(event.get('id'))
+    key = (event_id, str(ring_number), max_startlist, max_ranking, max_last_results)
+    with _ring_view_lock:
+        revision = (_ring_view_generation[0], _ring_view_revisions.get(event_id, 0))
+        cached = _ring_view_cache.get(key)
+        # Event-Objekt selbst vergleichen: ein neu geladenes Event (externe Änderung) gilt als neuer Stand
+        if cached is not None and cached[0] is event and cached[1] == revision:
+            _ring_view_cache.move_to_end(key)
+            ring_view_cache_stats['hits'] += 1
+            return cached[2]
+
+    started = time.perf_counter()
+    view = _compute_ring_view_model(event, ring_number, max_startlist, max_ranking, max_last_results)
+    elapsed = time.perf_counter() - started
+
+    with _ring_view_lock:
+        ring_view_cache_stats['misses'] += 1
+        ring_view_cache_stats['recompute_seconds'] += elapsed
+        ring_view_cache_stats['recompute_max_seconds'] = max(ring_view_cache_stats['recompute_max_seconds'], elapsed)
+        _ring_view_cache[key] = (event, revision, view)
+        _ring_view_cache.move_to_end(key)
+        while len(_ring_view_cache) > _RING_VIEW_CACHE_MAX:
+            _ring_view_cache.popitem(last=False)
+    return view
+
+
+def _compute_ring_view_model(event: dict, ring_number: int, max_startlist=10, max_ranking=10, max_last_results=3):
     ring_label = _ring_label_for_display(ring_number)
     view = {
         "ring_no": ring_number,
@@ -743,10 +1280,8 @@ def build_ring_view_model(event: dict, ring_number: int, max_startlist=10, max_r
     if run_block_id and not run_block:
         run_block, _ = _find_schedule_block_by_id(event, run_block_id)
         if run_block and not run:
-            for candidate in event.get("runs", []) or []:
-                if schedule_planner._match_run_to_block(candidate, run_block):
-                    run = candidate
-                    break
+            matched = get_schedule_index(event).runs_for_block(run_block)
+            run = matched[0] if matched else None
 
     if not run:
         schedule = event.get("schedule") or {}
@@ -754,13 +1289,12 @@ def build_ring_view_model(event: dict, ring_number: int, max_startlist=10, max_r
         ring_data = (schedule.get("rings") or {}).get(ring_key)
         blocks = (ring_data or {}).get("blocks") or []
         run_blocks = [b for b in blocks if (b.get("type") or "").lower() == "run"]
+        index = get_schedule_index(event)
         for block in run_blocks:
-            for candidate in event.get("runs", []) or []:
-                if schedule_planner._match_run_to_block(candidate, block):
-                    run = candidate
-                    run_block = block
-                    break
-            if run:
+            matched = index.runs_for_block(block)
+            if matched:
+                run = matched[0]
+                run_block = block
                 break
 
     if not run:
@@ -797,7 +1331,7 @@ def build_ring_view_model(event: dict, ring_number: int, max_startlist=10, max_r
     view["startlist"] = unfinished_entries[:max_startlist]
 
     settings = _load_settings()
-    results = _calculate_run_results(run, settings)
+    results = get_run_results(run, settings)
     ranking = [r for r in results if r.get("platz")]
     ranking.sort(key=lambda r: _to_int(r.get("platz"), default=999999))
     view["ranking"] = [
@@ -856,23 +1390,23 @@ def get_ring_state(event: dict, ring_number: int):
     schedule = event.get("schedule") or {}
     ring_data = (schedule.get("rings") or {}).get(str(ring_number)) or {}
     blocks = ring_data.get("blocks") or []
+    index = get_schedule_index(event)
     for block in blocks:
         if (block.get("type") or "").lower() != "run":
             continue
-        for run in event.get("runs", []) or []:
-            if schedule_planner._match_run_to_block(run, block):
-                run_block = _find_schedule_block_for_run(event, run) or block
-                run["judge_display"] = resolve_judge_name(event, run, judges, run_block)
-                state["schedule_runs"].append(run)
-                break
+        matched = index.runs_for_block(block)
+        if matched:
+            run = matched[0]
+            run_block = _find_schedule_block_for_run(event, run) or block
+            # Kopie: die Läufe gehören dem Event-Cache des Repositorys
+            state["schedule_runs"].append({**run, "judge_display": resolve_judge_name(event, run, judges, run_block)})
     if not state["schedule_runs"]:
         for run in event.get("runs", []) or []:
             assigned = run.get("assigned_ring") or run.get("ring") or run.get("ring_id") or run.get("ringName")
             digits = re.sub(r"[^0-9]", "", str(assigned or ""))
             if digits and int(digits) == int(ring_number):
                 run_block = _find_schedule_block_for_run(event, run)
-                run["judge_display"] = resolve_judge_name(event, run, judges, run_block)
-                state["schedule_runs"].append(run)
+                state["schedule_runs"].append({**run, "judge_display": resolve_judge_name(event, run, judges, run_block)})
     state["no_schedule"] = not bool(state["schedule_runs"])
 
     view = build_ring_view_model(event, ring_number)